@@ -0,0 +1,91 @@
+"""
+Measure the per-request overhead of the engine, comparing the default
+Deferred-based request flow with the coroutine-based one enabled by the
+ENGINE_COROUTINES setting.
+
+Requests use data: URLs, so that no network or server time is measured.
+
+usage:
+
+    python extras/engine-bench.py [-n REQUESTS] [--reactor REACTOR]
+
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+import scrapy
+from scrapy.crawler import CrawlerProcess
+
+ASYNCIO_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
+
+
+class BenchSpider(scrapy.Spider):
+    name = "engine-bench"
+    total = 10000
+
+    def start_requests(self):
+        for i in range(int(self.total)):
+            yield scrapy.Request(f"data:,{i}", dont_filter=True)
+
+    def parse(self, response):
+        yield {"body": response.body}
+
+
+def run(total, coroutines, reactor):
+    settings = {
+        "ENGINE_COROUTINES": coroutines,
+        "TWISTED_REACTOR": reactor,
+        "CONCURRENT_REQUESTS": 500,
+        # data: responses are delayed by 0.1s by the downloader, a high
+        # concurrency hides that delay.
+        "CONCURRENT_REQUESTS_PER_DOMAIN": 500,
+        # Avoid measuring the cost of starting CONCURRENT_ITEMS tasks per
+        # response.
+        "CONCURRENT_ITEMS": 1,
+        "LOG_LEVEL": "ERROR",
+        "TELNETCONSOLE_ENABLED": False,
+    }
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(BenchSpider)
+    process.crawl(crawler, total=total)
+    start = time.perf_counter()
+    process.start()
+    elapsed = time.perf_counter() - start
+    count = crawler.stats.get_value("item_scraped_count", 0)
+    print(
+        f"ENGINE_COROUTINES={coroutines}: {count / elapsed:.0f} requests/s "
+        f"({count} requests in {elapsed:.2f}s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", type=int, default=10000, help="number of requests")
+    parser.add_argument("--reactor", default=ASYNCIO_REACTOR)
+    parser.add_argument("--coroutines", choices=["0", "1"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.coroutines is not None:
+        run(args.n, args.coroutines == "1", args.reactor)
+        return
+    # The reactor can only be started once per process.
+    for coroutines in ("0", "1"):
+        subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "-n",
+                str(args.n),
+                "--reactor",
+                args.reactor,
+                "--coroutines",
+                coroutines,
+            ],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
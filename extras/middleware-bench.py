@@ -0,0 +1,155 @@
+"""
+Measure the per-request overhead of the downloader and spider middleware
+chains, comparing the compiled downloader middleware chain with the previous
+implementation, which ran every method through ``inlineCallbacks``.
+
+usage:
+
+    python extras/middleware-bench.py [-n REQUESTS] [--extra MIDDLEWARES]
+
+"""
+
+import argparse
+import time
+from typing import Any, Callable, Generator
+
+from twisted.internet.defer import Deferred, inlineCallbacks
+from twisted.python.failure import Failure
+
+from scrapy import Request, Spider
+from scrapy.core.downloader.middleware import DownloaderMiddlewareManager
+from scrapy.core.spidermw import SpiderMiddlewareManager
+from scrapy.http import HtmlResponse
+from scrapy.utils.defer import deferred_from_coro, mustbe_deferred
+from scrapy.utils.test import get_crawler
+
+
+class LegacyDownloaderMiddlewareManager(DownloaderMiddlewareManager):
+    """Downloader middleware manager with the chain implementation used
+    before chains were compiled, without output validation."""
+
+    def download(
+        self, download_func: Callable, request: Request, spider: Spider
+    ) -> Deferred:
+        @inlineCallbacks
+        def process_request(request: Request) -> Generator[Deferred, Any, Any]:
+            for method in self.methods["process_request"]:
+                response = yield deferred_from_coro(
+                    method(request=request, spider=spider)
+                )
+                if response:
+                    return response
+            return (yield download_func(request=request, spider=spider))
+
+        @inlineCallbacks
+        def process_response(response: Any) -> Generator[Deferred, Any, Any]:
+            if isinstance(response, Request):
+                return response
+            for method in self.methods["process_response"]:
+                response = yield deferred_from_coro(
+                    method(request=request, response=response, spider=spider)
+                )
+                if isinstance(response, Request):
+                    return response
+            return response
+
+        @inlineCallbacks
+        def process_exception(failure: Failure) -> Generator[Deferred, Any, Any]:
+            for method in self.methods["process_exception"]:
+                response = yield deferred_from_coro(
+                    method(request=request, exception=failure.value, spider=spider)
+                )
+                if response:
+                    return response
+            return failure
+
+        deferred = mustbe_deferred(process_request, request)
+        deferred.addErrback(process_exception)
+        deferred.addCallback(process_response)
+        return deferred
+
+
+class NoopMiddleware:
+    def process_request(self, request, spider):
+        return None
+
+    def process_response(self, request, response, spider):
+        return response
+
+    def process_spider_output(self, response, result, spider):
+        yield from result
+
+
+def bench_downloader(mwman, spider, n):
+    body = b"<html><body>" + b"<a href='/a'>a</a>" * 10 + b"</body></html>"
+
+    def download_func(request, spider):
+        return HtmlResponse(request.url, body=body, request=request)
+
+    results = []
+    start = time.perf_counter()
+    for i in range(n):
+        request = Request(f"https://example.com/{i}")
+        mwman.download(download_func, request, spider).addBoth(results.append)
+    elapsed = time.perf_counter() - start
+    assert len(results) == n, "Some downloads did not finish synchronously"
+    return elapsed
+
+
+def bench_spider(mwman, spider, n):
+    request = Request("https://example.com")
+    response = HtmlResponse(request.url, body=b"", request=request)
+    items = [{"n": i} for i in range(10)]
+    start = time.perf_counter()
+    for _ in range(n):
+        dfd = mwman._process_spider_output(response, spider, items)
+        list(dfd.result)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", type=int, default=20000, help="number of requests")
+    parser.add_argument(
+        "--extra",
+        type=int,
+        default=5,
+        help="number of no-op middlewares to add to the default ones",
+    )
+    args = parser.parse_args()
+
+    crawler = get_crawler(Spider)
+    spider = crawler._create_spider("bench")
+    crawler.stats.open_spider(spider)
+
+    def build(cls):
+        mwman = cls.from_crawler(crawler)
+        for _ in range(args.extra):
+            mwman._add_middleware(NoopMiddleware())
+        return mwman
+
+    legacy = build(LegacyDownloaderMiddlewareManager)
+    compiled = build(DownloaderMiddlewareManager)
+    spidermw = build(SpiderMiddlewareManager)
+    print(
+        f"{len(compiled.methods['process_request'])} process_request and "
+        f"{len(compiled.methods['process_response'])} process_response methods, "
+        f"{len(spidermw.methods['process_spider_output'])} "
+        "process_spider_output methods"
+    )
+    for name, mwman in (("legacy", legacy), ("compiled", compiled)):
+        bench_downloader(mwman, spider, min(args.n, 1000))  # warm-up
+        elapsed = bench_downloader(mwman, spider, args.n)
+        print(
+            f"downloader middlewares ({name}): {args.n / elapsed:.0f} requests/s, "
+            f"{elapsed / args.n * 1e6:.1f} us/request"
+        )
+    elapsed = bench_spider(spidermw, spider, args.n)
+    print(
+        f"spider middlewares: {args.n / elapsed:.0f} responses/s, "
+        f"{elapsed / args.n * 1e6:.1f} us/response"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from typing import List, cast
 from twisted.python.failure import Failure
 
 from scrapy.commands import BaseRunSpiderCommand
+from scrapy.core.workers import WorkerPool
 from scrapy.exceptions import UsageError
 
 
@@ -16,6 +17,21 @@ class Command(BaseRunSpiderCommand):
     def short_desc(self) -> str:
         return "Run a spider"
 
+    def add_options(self, parser: argparse.ArgumentParser) -> None:
+        super().add_options(parser)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            metavar="N",
+            help="split the crawl across N worker processes",
+        )
+
+    def process_options(self, args: List[str], opts: argparse.Namespace) -> None:
+        super().process_options(args, opts)
+        if opts.workers < 1:
+            raise UsageError("--workers must be a positive number", print_help=False)
+
     def run(self, args: List[str], opts: argparse.Namespace) -> None:
         if len(args) < 1:
             raise UsageError()
@@ -25,6 +41,12 @@ class Command(BaseRunSpiderCommand):
             )
         spname = args[0]
 
+        if opts.workers > 1:
+            pool = WorkerPool(self.settings, opts.workers)
+            if not pool.crawl(spname, **opts.spargs):
+                self.exitcode = 1
+            return
+
         assert self.crawler_process
         crawl_defer = self.crawler_process.crawl(spname, **opts.spargs)
 
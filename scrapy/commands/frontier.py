@@ -0,0 +1,44 @@
+import argparse
+import logging
+from typing import List
+
+from scrapy.commands import ScrapyCommand
+from scrapy.core.frontier import FrontierServer
+from scrapy.utils.misc import build_from_settings, load_object
+
+logger = logging.getLogger(__name__)
+
+
+class Command(ScrapyCommand):
+    default_settings = {"LOG_LEVEL": "INFO"}
+
+    def syntax(self) -> str:
+        return "[options]"
+
+    def short_desc(self) -> str:
+        return "Run a frontier server for crawls split across processes"
+
+    def add_options(self, parser: argparse.ArgumentParser) -> None:
+        super().add_options(parser)
+        parser.add_argument(
+            "--address",
+            metavar="ADDRESS",
+            help="address to listen on, tcp://host:port or unix:///path "
+            "(default: FRONTIER_ADDRESS)",
+        )
+
+    def run(self, args: List[str], opts: argparse.Namespace) -> None:
+        backend_cls = load_object(self.settings["FRONTIER_BACKEND"])
+        backend = build_from_settings(backend_cls, self.settings)
+        server = FrontierServer(
+            opts.address or self.settings["FRONTIER_ADDRESS"], backend
+        )
+        logger.info(
+            "Frontier server listening on %(address)s", {"address": server.address}
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
@@ -7,6 +7,7 @@ from types import ModuleType
 from typing import List, Union
 
 from scrapy.commands import BaseRunSpiderCommand
+from scrapy.core.workers import WorkerPool
 from scrapy.exceptions import UsageError
 from scrapy.utils.spider import iter_spider_classes
 
@@ -37,6 +38,21 @@ class Command(BaseRunSpiderCommand):
     def long_desc(self) -> str:
         return "Run the spider defined in the given file"
 
+    def add_options(self, parser: argparse.ArgumentParser) -> None:
+        super().add_options(parser)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            metavar="N",
+            help="split the crawl across N worker processes",
+        )
+
+    def process_options(self, args: List[str], opts: argparse.Namespace) -> None:
+        super().process_options(args, opts)
+        if opts.workers < 1:
+            raise UsageError("--workers must be a positive number", print_help=False)
+
     def run(self, args: List[str], opts: argparse.Namespace) -> None:
         if len(args) != 1:
             raise UsageError()
@@ -52,6 +68,12 @@ class Command(BaseRunSpiderCommand):
             raise UsageError(f"No spider found in file: {filename}\n")
         spidercls = spclasses.pop()
 
+        if opts.workers > 1:
+            pool = WorkerPool(self.settings, opts.workers)
+            if not pool.crawl(spidercls, **opts.spargs):
+                self.exitcode = 1
+            return
+
         assert self.crawler_process
         self.crawler_process.crawl(spidercls, **opts.spargs)
         self.crawler_process.start()
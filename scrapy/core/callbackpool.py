@@ -0,0 +1,206 @@
+"""
+Support for running spider callbacks in a pool of worker processes.
+
+Callbacks usually run in the reactor thread, so while a big response is being
+parsed no network events are processed, and parsing can only use one CPU
+core. Callbacks decorated with :func:`process_pool_callback`, or callbacks of
+requests with the ``callback_pool`` meta key set to ``True``, run instead in
+a :class:`~concurrent.futures.ProcessPoolExecutor`.
+
+See :ref:`topics-callback-pool`.
+"""
+
+from __future__ import annotations
+
+import inspect
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Type
+
+from twisted.internet.defer import Deferred
+
+from scrapy import Request, Spider
+from scrapy.exceptions import NotSupported
+from scrapy.http import Response, TextResponse
+from scrapy.utils.request import request_from_dict
+from scrapy.utils.spider import iterate_spider_output
+
+if TYPE_CHECKING:
+    from scrapy.crawler import Crawler
+
+
+logger = logging.getLogger(__name__)
+
+
+_CallbackT = Callable[..., Any]
+
+
+def process_pool_callback(callback: _CallbackT) -> _CallbackT:
+    """Decorator that marks a spider callback to be run in the callback
+    process pool."""
+    callback._scrapy_callback_pool = True  # type: ignore[attr-defined]
+    return callback
+
+
+def get_callback(request: Request, spider: Spider) -> Optional[_CallbackT]:
+    """Return the callback of *request*, or the ``parse`` method of *spider*
+    if it has none."""
+    return request.callback or getattr(spider, "parse", None)
+
+
+def is_process_pool_callback(request: Request, spider: Spider) -> bool:
+    if request.meta.get("callback_pool", False):
+        return True
+    return getattr(get_callback(request, spider), "_scrapy_callback_pool", False)
+
+
+#: Spider of the current pool worker process, inherited from the parent.
+_worker_spider: Optional[Spider] = None
+
+
+def _init_worker(spider: Spider) -> None:
+    global _worker_spider
+    _worker_spider = spider
+
+
+def _response_kwargs(response: Response) -> Dict[str, Any]:
+    kwargs = {
+        "url": response.url,
+        "status": response.status,
+        "headers": dict(response.headers),
+        "body": response.body,
+        "flags": response.flags,
+        "ip_address": response.ip_address,
+        "protocol": response.protocol,
+    }
+    if isinstance(response, TextResponse):
+        kwargs["encoding"] = response.encoding
+    return kwargs
+
+
+def _run_callback(
+    response_cls: Type[Response],
+    response_kwargs: Dict[str, Any],
+    request_dict: Dict[str, Any],
+) -> List[Tuple[bool, Any]]:
+    """Run the callback of a request in a worker process, and return its
+    output as a list of ``(is_request, value)`` tuples, where requests are
+    serialized as dicts."""
+    spider = _worker_spider
+    assert spider is not None
+    request = request_from_dict(request_dict, spider=spider)
+    response = response_cls(request=request, **response_kwargs)
+    callback = request.callback or spider._parse
+    output = []
+    for value in iterate_spider_output(callback(response, **request.cb_kwargs)):
+        if isinstance(value, Request):
+            output.append((True, value.to_dict(spider=spider)))
+        else:
+            output.append((False, value))
+    return output
+
+
+class CallbackPool:
+    """Runs spider callbacks in a pool of forked worker processes.
+
+    Worker processes are forked from the crawl process when needed, so they
+    get a copy of the spider as it is at that time. Callbacks run in the pool
+    cannot change the state of the spider of the crawl process, and can only
+    return items and requests, which must be picklable and
+    :ref:`serializable <request-serialization>` respectively.
+    """
+
+    def __init__(self, crawler: Crawler):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise NotSupported("The callback pool requires the fork start method")
+        self.crawler: Crawler = crawler
+        self.size: int = crawler.settings.getint("CALLBACK_POOL_SIZE") or (
+            os.cpu_count() or 1
+        )
+        self.max_pending: int = (
+            crawler.settings.getint("CALLBACK_POOL_MAX_PENDING") or 2 * self.size
+        )
+        self.pending: int = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._warned: bool = False
+
+    def can_run(self, request: Request, spider: Spider) -> bool:
+        """Return ``True`` if the callback of *request* can be run in the
+        pool, and log a warning otherwise."""
+        callback = get_callback(request, spider)
+        if inspect.iscoroutinefunction(callback) or inspect.isasyncgenfunction(
+            callback
+        ):
+            reason = "asynchronous callbacks are not supported"
+        else:
+            try:
+                request.to_dict(spider=spider)
+            except ValueError as e:
+                reason = str(e)
+            else:
+                return True
+        if not self._warned:
+            logger.warning(
+                "Running the callback of %(request)s in the crawl process "
+                "instead of the callback pool - reason: %(reason)s - no more "
+                "such callbacks will be logged",
+                {"request": request, "reason": reason},
+                extra={"spider": spider},
+            )
+            self._warned = True
+        return False
+
+    def needs_backout(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def call(self, response: Response, request: Request, spider: Spider) -> Deferred:
+        """Run the callback of *request* with *response* in the pool, and
+        return a deferred that fires with the list of its output."""
+        from twisted.internet import reactor
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.size,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+                initargs=(spider,),
+            )
+        future = self._executor.submit(
+            _run_callback,
+            type(response),
+            _response_kwargs(response),
+            request.to_dict(spider=spider),
+        )
+        self.pending += 1
+        dfd: Deferred = Deferred()
+
+        def _done(future: Future) -> None:
+            exception = future.exception()
+            if exception is not None:
+                reactor.callFromThread(dfd.errback, exception)
+            else:
+                reactor.callFromThread(dfd.callback, future.result())
+
+        def _finished(result: Any) -> Any:
+            self.pending -= 1
+            assert self.crawler.stats is not None
+            self.crawler.stats.inc_value("callback_pool/processed", spider=spider)
+            return result
+
+        def _deserialize(output: List[Tuple[bool, Any]]) -> List[Any]:
+            return [
+                request_from_dict(value, spider=spider) if is_request else value
+                for is_request, value in output
+            ]
+
+        future.add_done_callback(_done)
+        dfd.addBoth(_finished)
+        dfd.addCallback(_deserialize)
+        return dfd
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
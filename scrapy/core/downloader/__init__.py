@@ -10,12 +10,20 @@ from twisted.internet.defer import Deferred
 from scrapy import Request, Spider, signals
 from scrapy.core.downloader.handlers import DownloadHandlers
 from scrapy.core.downloader.middleware import DownloaderMiddlewareManager
+from scrapy.core.downloader.ratelimit import (
+    RateLimiter,
+    TokenBucket,
+    _RateLimitT,
+    bucket_from_setting,
+)
+from scrapy.core.tracing import add_delay, mark
 from scrapy.http import Response
 from scrapy.resolver import dnscache
 from scrapy.settings import BaseSettings
 from scrapy.signalmanager import SignalManager
 from scrapy.utils.defer import mustbe_deferred
 from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.memory import estimate_request_size
 
 if TYPE_CHECKING:
     from scrapy.crawler import Crawler
@@ -31,11 +39,15 @@ class Slot:
         randomize_delay: bool,
         *,
         throttle: Optional[bool] = None,
+        rate_limit: Optional[_RateLimitT] = None,
     ):
         self.concurrency: int = concurrency
         self.delay: float = delay
         self.randomize_delay: bool = randomize_delay
         self.throttle = throttle
+        self.rate_limit = rate_limit
+        self.rate_bucket: Optional[TokenBucket] = bucket_from_setting(rate_limit)
+        self.rate_reserved: bool = False
 
         self.active: Set[Request] = set()
         self.queue: Deque[Tuple[Request, Deferred]] = deque()
@@ -111,6 +123,10 @@ class Downloader:
         self.per_slot_settings: Dict[str, Dict[str, Any]] = self.settings.getdict(
             "DOWNLOAD_SLOTS", {}
         )
+        self.rate_limiter: Optional[RateLimiter] = RateLimiter.from_settings(
+            self.settings
+        )
+        self.tracing: bool = self.settings.getbool("REQUEST_TRACING_ENABLED")
 
     def fetch(self, request: Request, spider: Spider) -> Deferred:
         def _deactivate(response: Response) -> Response:
@@ -118,12 +134,18 @@ class Downloader:
             return response
 
         self.active.add(request)
+        if self.tracing:
+            mark(request, "dequeued")
         dfd = self.middleware.download(self._enqueue_request, request, spider)
         return dfd.addBoth(_deactivate)
 
     def needs_backout(self) -> bool:
         return len(self.active) >= self.total_concurrency
 
+    def memory_usage(self) -> int:
+        """Return the estimated memory used by active requests, in bytes."""
+        return sum(map(estimate_request_size, self.active))
+
     def _get_slot(self, request: Request, spider: Spider) -> Tuple[str, Slot]:
         key = self._get_slot_key(request, spider)
         if key not in self.slots:
@@ -138,7 +160,10 @@ class Downloader:
             )
             randomize_delay = slot_settings.get("randomize_delay", self.randomize_delay)
             throttle = slot_settings.get("throttle", None)
-            new_slot = Slot(conc, delay, randomize_delay, throttle=throttle)
+            rate_limit = slot_settings.get("rate_limit", None)
+            new_slot = Slot(
+                conc, delay, randomize_delay, throttle=throttle, rate_limit=rate_limit
+            )
             self.slots[key] = new_slot
 
         return key, self.slots[key]
@@ -162,6 +187,8 @@ class Downloader:
             return response
 
         slot.active.add(request)
+        if self.tracing:
+            mark(request, "enqueued")
         self.signals.send_catch_log(
             signal=signals.request_reached_downloader, request=request, spider=spider
         )
@@ -182,6 +209,8 @@ class Downloader:
         if delay:
             penalty = delay - now + slot.lastseen
             if penalty > 0:
+                if slot.queue and self.tracing:
+                    add_delay(slot.queue[0][0], penalty)
                 slot.latercall = reactor.callLater(
                     penalty, self._process_queue, spider, slot
                 )
@@ -189,8 +218,25 @@ class Downloader:
 
         # Process enqueued requests if there are free slots to transfer for this slot
         while slot.queue and slot.free_transfer_slots() > 0:
+            # Wait for rate limit tokens, reusing the latercall of the slot.
+            # Tokens are reserved, so once the wait is over the request can
+            # be sent without checking the buckets again.
+            if slot.rate_reserved:
+                slot.rate_reserved = False
+            elif self.rate_limiter is not None or slot.rate_bucket is not None:
+                wait = self._reserve_rate_limit(slot.queue[0][0], slot, now)
+                if wait > 0:
+                    if self.tracing:
+                        add_delay(slot.queue[0][0], wait)
+                    slot.rate_reserved = True
+                    slot.latercall = reactor.callLater(
+                        wait, self._process_queue, spider, slot
+                    )
+                    return
             slot.lastseen = now
             request, deferred = slot.queue.popleft()
+            if self.tracing:
+                mark(request, "sent")
             dfd = self._download(slot, request, spider)
             dfd.chainDeferred(deferred)
             # prevent burst if inter-request delays were configured
@@ -198,6 +244,12 @@ class Downloader:
                 self._process_queue(spider, slot)
                 break
 
+    def _reserve_rate_limit(self, request: Request, slot: Slot, now: float) -> float:
+        if self.rate_limiter is None:
+            assert slot.rate_bucket is not None
+            return slot.rate_bucket.reserve(now)
+        return self.rate_limiter.reserve(request, now, slot.rate_bucket)
+
     def _download(self, slot: Slot, request: Request, spider: Spider) -> Deferred:
         # The order is very important for the following deferreds. Do not change!
 
@@ -207,6 +259,8 @@ class Downloader:
         # 2. Notify response_downloaded listeners about the recent download
         # before querying queue for next request
         def _downloaded(response: Response) -> Response:
+            if self.tracing:
+                mark(request, "downloaded")
             self.signals.send_catch_log(
                 signal=signals.response_downloaded,
                 response=response,
@@ -27,6 +27,7 @@ from zope.interface import implementer
 from scrapy import signals
 from scrapy.core.downloader.contextfactory import load_context_factory_from_settings
 from scrapy.core.downloader.webclient import _parse
+from scrapy.core.tracing import mark
 from scrapy.exceptions import StopDownload
 from scrapy.http import Headers
 from scrapy.responsetypes import responsetypes
@@ -402,13 +403,13 @@ class ScrapyAgent:
 
     @staticmethod
     def _headers_from_twisted_response(response):
-        headers = Headers()
-        if response.length != UNKNOWN_LENGTH:
+        headers = Headers.from_raw_headers(response.headers.getAllRawHeaders())
+        if response.length != UNKNOWN_LENGTH and b"Content-Length" not in headers:
             headers[b"Content-Length"] = str(response.length).encode()
-        headers.update(response.headers.getAllRawHeaders())
         return headers
 
     def _cb_bodyready(self, txresponse, request):
+        mark(request, "headers")
         headers_received_result = self._crawler.signals.send_catch_log(
             signal=signals.headers_received,
             headers=self._headers_from_twisted_response(txresponse),
@@ -4,9 +4,10 @@ Downloader Middleware manager
 See documentation in docs/topics/downloader-middleware.rst
 """
 
-from typing import Any, Callable, Generator, List, Union, cast
+from inspect import isawaitable, iscoroutinefunction
+from typing import Any, Callable, Dict, Generator, List, Tuple, Union
 
-from twisted.internet.defer import Deferred, inlineCallbacks
+from twisted.internet.defer import Deferred, fail, inlineCallbacks, succeed
 from twisted.python.failure import Failure
 
 from scrapy import Spider
@@ -15,12 +16,52 @@ from scrapy.http import Request, Response
 from scrapy.middleware import MiddlewareManager
 from scrapy.settings import BaseSettings
 from scrapy.utils.conf import build_component_list
-from scrapy.utils.defer import deferred_from_coro, mustbe_deferred
+from scrapy.utils.defer import deferred_from_coro
+
+#: A compiled chain of middleware methods: a tuple of ``(method, is_async)``
+#: pairs, where ``is_async`` is ``True`` for coroutine functions.
+_ChainT = Tuple[Tuple[Callable, bool], ...]
+
+
+def compile_chain(methods: Any) -> _ChainT:
+    """Return the compiled chain of *methods*.
+
+    Methods defined with ``async def`` are known to need the asynchronous
+    path. Other methods are run synchronously, without allocating a
+    :class:`~twisted.internet.defer.Deferred`, and the rest of the chain only
+    switches to the asynchronous path if one of them returns a
+    :class:`~twisted.internet.defer.Deferred` or an awaitable object.
+    """
+    return tuple((method, iscoroutinefunction(method)) for method in methods)
+
+
+def _is_pending(result: Any) -> bool:
+    return isinstance(result, Deferred) or isawaitable(result)
+
+
+def _check_request_output(method: Callable, response: Any) -> None:
+    if response is not None and not isinstance(response, (Response, Request)):
+        raise _InvalidOutput(
+            f"Middleware {method.__qualname__} must return None, Response or "
+            f"Request, got {response.__class__.__name__}"
+        )
+
+
+def _check_response_output(method: Callable, response: Any) -> None:
+    if not isinstance(response, (Response, Request)):
+        raise _InvalidOutput(
+            f"Middleware {method.__qualname__} must return Response or Request, "
+            f"got {type(response)}"
+        )
 
 
 class DownloaderMiddlewareManager(MiddlewareManager):
     component_name = "downloader middleware"
 
+    def __init__(self, *middlewares: Any) -> None:
+        self._chains: Dict[str, _ChainT] = {}
+        super().__init__(*middlewares)
+
     @classmethod
     def _get_mwlist_from_settings(cls, settings: BaseSettings) -> List[Any]:
         return build_component_list(settings.getwithbase("DOWNLOADER_MIDDLEWARES"))
@@ -32,73 +73,148 @@ class DownloaderMiddlewareManager(MiddlewareManager):
             self.methods["process_response"].appendleft(mw.process_response)
         if hasattr(mw, "process_exception"):
             self.methods["process_exception"].appendleft(mw.process_exception)
+        self._chains.clear()
+
+    def _get_chain(self, methodname: str) -> _ChainT:
+        try:
+            return self._chains[methodname]
+        except KeyError:
+            chain = self._chains[methodname] = compile_chain(self.methods[methodname])
+            return chain
 
     def download(
         self, download_func: Callable, request: Request, spider: Spider
     ) -> Deferred:
-        @inlineCallbacks
-        def process_request(request: Request) -> Generator[Deferred, Any, Any]:
-            for method in self.methods["process_request"]:
-                method = cast(Callable, method)
-                response = yield deferred_from_coro(
-                    method(request=request, spider=spider)
+        def process_response(response: Union[Response, Request]) -> Any:
+            return self._process_response(request, response, spider)
+
+        def process_exception(failure: Failure) -> Any:
+            return self._process_exception(request, failure, spider)
+
+        try:
+            result = self._process_request(download_func, request, spider)
+        except Exception:
+            deferred = fail()
+        else:
+            if isinstance(result, Deferred):
+                deferred = result
+            else:
+                deferred = succeed(result)
+        deferred.addErrback(process_exception)
+        deferred.addCallback(process_response)
+        return deferred
+
+    def _process_request(
+        self, download_func: Callable, request: Request, spider: Spider
+    ) -> Any:
+        chain = self._get_chain("process_request")
+        for index, (method, is_async) in enumerate(chain):
+            response = method(request=request, spider=spider)
+            if is_async or _is_pending(response):
+                return self._process_request_async(
+                    chain, index, response, download_func, request, spider
                 )
-                if response is not None and not isinstance(
-                    response, (Response, Request)
-                ):
-                    raise _InvalidOutput(
-                        f"Middleware {method.__qualname__} must return None, Response or "
-                        f"Request, got {response.__class__.__name__}"
-                    )
-                if response:
-                    return response
-            return (yield download_func(request=request, spider=spider))
-
-        @inlineCallbacks
-        def process_response(
-            response: Union[Response, Request]
-        ) -> Generator[Deferred, Any, Union[Response, Request]]:
-            if response is None:
-                raise TypeError("Received None in process_response")
-            elif isinstance(response, Request):
+            _check_request_output(method, response)
+            if response:
                 return response
+        return download_func(request=request, spider=spider)
 
-            for method in self.methods["process_response"]:
-                method = cast(Callable, method)
-                response = yield deferred_from_coro(
-                    method(request=request, response=response, spider=spider)
-                )
-                if not isinstance(response, (Response, Request)):
-                    raise _InvalidOutput(
-                        f"Middleware {method.__qualname__} must return Response or Request, "
-                        f"got {type(response)}"
-                    )
-                if isinstance(response, Request):
-                    return response
+    @inlineCallbacks
+    def _process_request_async(
+        self,
+        chain: _ChainT,
+        index: int,
+        pending: Any,
+        download_func: Callable,
+        request: Request,
+        spider: Spider,
+    ) -> Generator[Deferred, Any, Any]:
+        while True:
+            response = yield deferred_from_coro(pending)
+            _check_request_output(chain[index][0], response)
+            if response:
+                return response
+            index += 1
+            if index == len(chain):
+                break
+            pending = chain[index][0](request=request, spider=spider)
+        return (yield download_func(request=request, spider=spider))
+
+    def _process_response(
+        self,
+        request: Request,
+        response: Union[Response, Request],
+        spider: Spider,
+    ) -> Any:
+        if response is None:
+            raise TypeError("Received None in process_response")
+        if isinstance(response, Request):
             return response
+        chain = self._get_chain("process_response")
+        for index, (method, is_async) in enumerate(chain):
+            result = method(request=request, response=response, spider=spider)
+            if is_async or _is_pending(result):
+                return self._process_response_async(
+                    chain, index, result, request, spider
+                )
+            _check_response_output(method, result)
+            if isinstance(result, Request):
+                return result
+            response = result
+        return response
 
-        @inlineCallbacks
-        def process_exception(
-            failure: Failure,
-        ) -> Generator[Deferred, Any, Union[Failure, Response, Request]]:
-            exception = failure.value
-            for method in self.methods["process_exception"]:
-                method = cast(Callable, method)
-                response = yield deferred_from_coro(
-                    method(request=request, exception=exception, spider=spider)
+    @inlineCallbacks
+    def _process_response_async(
+        self,
+        chain: _ChainT,
+        index: int,
+        pending: Any,
+        request: Request,
+        spider: Spider,
+    ) -> Generator[Deferred, Any, Union[Response, Request]]:
+        while True:
+            response = yield deferred_from_coro(pending)
+            _check_response_output(chain[index][0], response)
+            index += 1
+            if isinstance(response, Request) or index == len(chain):
+                return response
+            pending = chain[index][0](request=request, response=response, spider=spider)
+
+    def _process_exception(
+        self, request: Request, failure: Failure, spider: Spider
+    ) -> Any:
+        exception = failure.value
+        chain = self._get_chain("process_exception")
+        for index, (method, is_async) in enumerate(chain):
+            response = method(request=request, exception=exception, spider=spider)
+            if is_async or _is_pending(response):
+                return self._process_exception_async(
+                    chain, index, response, request, failure, spider
                 )
-                if response is not None and not isinstance(
-                    response, (Response, Request)
-                ):
-                    raise _InvalidOutput(
-                        f"Middleware {method.__qualname__} must return None, Response or "
-                        f"Request, got {type(response)}"
-                    )
-                if response:
-                    return response
-            return failure
-
-        deferred = mustbe_deferred(process_request, request)
-        deferred.addErrback(process_exception)
-        deferred.addCallback(process_response)
-        return deferred
+            _check_request_output(method, response)
+            if response:
+                return response
+        return failure
+
+    @inlineCallbacks
+    def _process_exception_async(
+        self,
+        chain: _ChainT,
+        index: int,
+        pending: Any,
+        request: Request,
+        failure: Failure,
+        spider: Spider,
+    ) -> Generator[Deferred, Any, Union[Failure, Response, Request]]:
+        exception = failure.value
+        while True:
+            response = yield deferred_from_coro(pending)
+            _check_request_output(chain[index][0], response)
+            if response:
+                return response
+            index += 1
+            if index == len(chain):
+                return failure
+            pending = chain[index][0](
+                request=request, exception=exception, spider=spider
+            )
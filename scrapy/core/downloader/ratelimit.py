@@ -0,0 +1,209 @@
+"""
+Token-bucket rate limiting for the downloader.
+
+Rate limits are defined at 3 levels: a global limit
+(:setting:`DOWNLOAD_RATE_LIMIT`), limits per domain suffix
+(:setting:`DOWNLOAD_RATE_LIMITS`) and limits per download slot (the
+``rate_limit`` key of :setting:`DOWNLOAD_SLOTS`). A request can only be sent
+once every bucket that applies to it has a token for it.
+
+Global and domain suffix buckets are shared by all crawlers of the process,
+so that limits are enforced even when several crawlers run in the same
+:class:`~scrapy.crawler.CrawlerProcess`.
+
+See :ref:`topics-rate-limits`.
+"""
+
+from __future__ import annotations
+
+import json
+import weakref
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from scrapy import Request
+from scrapy.utils.datatypes import LocalCache
+from scrapy.utils.httpobj import urlparse_cached
+
+_RateLimitT = Union[float, Dict[str, float]]
+
+
+class TokenBucket:
+    """Token bucket that gets *rate* tokens per second, up to *burst*
+    tokens.
+
+    Tokens are reserved rather than taken: :meth:`reserve` always takes a
+    token, even if the bucket is empty, and returns how long to wait before
+    the token can be used. That way, requests waiting for a token are served
+    in order, and each of them only needs to be scheduled once.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated", "__weakref__")
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        if rate <= 0:
+            raise ValueError(f"Invalid rate limit {rate!r}, it must be positive")
+        self.rate: float = rate
+        self.burst: float = max(burst, 1.0)
+        self.tokens: float = self.burst
+        self.updated: float = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            if self.updated:
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Return how many seconds must pass from *now* for a token to be
+        available."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def reserve(self, now: float) -> float:
+        """Take a token, and return how many seconds must pass from *now*
+        before it can be used."""
+        wait = self.wait_time(now)
+        self.take()
+        return wait
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(rate={self.rate!r}, burst={self.burst!r})"
+
+
+#: Buckets shared by all crawlers of the process, by scope.
+_shared_buckets: "weakref.WeakValueDictionary[str, TokenBucket]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def get_shared_bucket(scope: str, rate: float, burst: float = 1.0) -> TokenBucket:
+    """Return the bucket of the process for *scope*, creating it if needed.
+
+    If the bucket already exists with a different configuration, the most
+    restrictive rate and burst are used.
+    """
+    bucket = _shared_buckets.get(scope)
+    if bucket is None:
+        bucket = TokenBucket(rate, burst)
+        _shared_buckets[scope] = bucket
+    else:
+        bucket.rate = min(bucket.rate, rate)
+        bucket.burst = min(bucket.burst, max(burst, 1.0))
+    return bucket
+
+
+def parse_rate_limit(value: _RateLimitT) -> Tuple[float, float]:
+    """Return the ``(rate, burst)`` tuple of a rate limit setting value,
+    which is either a number of requests per second or a dict with ``rate``
+    and, optionally, ``burst`` keys."""
+    if isinstance(value, dict):
+        return float(value["rate"]), float(value.get("burst", 1.0))
+    if isinstance(value, str):
+        value = json.loads(value)
+        return parse_rate_limit(value)
+    return float(value), 1.0
+
+
+def bucket_from_setting(
+    value: Optional[_RateLimitT], scope: Optional[str] = None
+) -> Optional[TokenBucket]:
+    """Return a bucket for a rate limit setting value, or ``None`` if
+    *value* is empty. If *scope* is not ``None``, the bucket is shared by all
+    crawlers of the process."""
+    if not value:
+        return None
+    rate, burst = parse_rate_limit(value)
+    if scope is None:
+        return TokenBucket(rate, burst)
+    return get_shared_bucket(scope, rate, burst)
+
+
+class RateLimiter:
+    """Applies the global and domain suffix rate limits of a crawler, and
+    the rate limit of the download slot, to requests."""
+
+    def __init__(
+        self,
+        rate_limit: Optional[_RateLimitT] = None,
+        domain_rate_limits: Optional[Dict[str, _RateLimitT]] = None,
+    ):
+        self.global_bucket: Optional[TokenBucket] = bucket_from_setting(
+            rate_limit, "global"
+        )
+        self.domain_buckets: Dict[str, TokenBucket] = {}
+        for domain, value in (domain_rate_limits or {}).items():
+            domain = domain.lower().lstrip(".")
+            bucket = bucket_from_setting(value, f"domain:{domain}")
+            if bucket is not None:
+                self.domain_buckets[domain] = bucket
+        self._host_buckets: LocalCache[str, Tuple[TokenBucket, ...]] = LocalCache(
+            limit=10000
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> Optional["RateLimiter"]:
+        """Return a rate limiter for *settings*, or ``None`` if no global or
+        domain suffix rate limit is set."""
+        rate_limit = settings.get("DOWNLOAD_RATE_LIMIT")
+        domain_rate_limits = settings.getdict("DOWNLOAD_RATE_LIMITS")
+        if not rate_limit and not domain_rate_limits:
+            return None
+        return cls(rate_limit, domain_rate_limits)
+
+    def _get_host_buckets(self, host: str) -> Tuple[TokenBucket, ...]:
+        try:
+            return self._host_buckets[host]
+        except KeyError:
+            pass
+        buckets = []
+        if self.domain_buckets:
+            parts = host.split(".")
+            for i in range(len(parts)):
+                bucket = self.domain_buckets.get(".".join(parts[i:]))
+                if bucket is not None:
+                    buckets.append(bucket)
+        self._host_buckets[host] = result = tuple(buckets)
+        return result
+
+    def get_buckets(
+        self, request: Request, slot_bucket: Optional[TokenBucket] = None
+    ) -> List[TokenBucket]:
+        """Return the buckets that apply to *request*, from the most general
+        to the most specific one."""
+        buckets = []
+        if self.global_bucket is not None:
+            buckets.append(self.global_bucket)
+        host = urlparse_cached(request).hostname or ""
+        buckets.extend(self._get_host_buckets(host))
+        if slot_bucket is not None:
+            buckets.append(slot_bucket)
+        return buckets
+
+    def reserve(
+        self,
+        request: Request,
+        now: float,
+        slot_bucket: Optional[TokenBucket] = None,
+    ) -> float:
+        """Take a token for *request* from every bucket that applies to it,
+        and return how many seconds must pass from *now* before *request*
+        can be sent."""
+        return reserve(self.get_buckets(request, slot_bucket), now)
+
+
+def reserve(buckets: List[TokenBucket], now: float) -> float:
+    """Take a token from each of *buckets*, and return how many seconds must
+    pass from *now* before all those tokens can be used."""
+    wait = 0.0
+    for bucket in buckets:
+        wait = max(wait, bucket.wait_time(now))
+    for bucket in buckets:
+        bucket.take()
+    return wait
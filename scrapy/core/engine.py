@@ -5,15 +5,18 @@ For more information see docs/topics/architecture.rst
 
 """
 
+import asyncio
 import logging
 from time import time
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    Coroutine,
     Generator,
     Iterable,
     Iterator,
+    List,
     Optional,
     Set,
     Type,
@@ -21,13 +24,16 @@ from typing import (
     cast,
 )
 
-from twisted.internet.defer import Deferred, inlineCallbacks, succeed
+from twisted.internet.defer import Deferred, ensureDeferred, inlineCallbacks, succeed
 from twisted.internet.task import LoopingCall
 from twisted.python.failure import Failure
 
 from scrapy import signals
 from scrapy.core.downloader import Downloader
+from scrapy.core.feeder import StartRequestsFeeder
+from scrapy.core.flowcontrol import MemoryFlowController
 from scrapy.core.scraper import Scraper
+from scrapy.core.tracing import RequestTracer, mark
 from scrapy.exceptions import CloseSpider, DontCloseSpider
 from scrapy.http import Request, Response
 from scrapy.logformatter import LogFormatter
@@ -36,7 +42,11 @@ from scrapy.signalmanager import SignalManager
 from scrapy.spiders import Spider
 from scrapy.utils.log import failure_to_exc_info, logformatter_adapter
 from scrapy.utils.misc import build_from_crawler, load_object
-from scrapy.utils.reactor import CallLaterOnce
+from scrapy.utils.reactor import (
+    CallLaterOnce,
+    _get_asyncio_event_loop,
+    is_asyncio_reactor_installed,
+)
 
 if TYPE_CHECKING:
     from scrapy.core.scheduler import BaseScheduler
@@ -59,7 +69,11 @@ class Slot:
         self.close_if_idle: bool = close_if_idle
         self.nextcall: CallLaterOnce = nextcall
         self.scheduler: "BaseScheduler" = scheduler
+        # Schedulers that only implement the minimal interface do not have
+        # next_requests().
+        self.batch_scheduling: bool = hasattr(scheduler, "next_requests")
         self.heartbeat: LoopingCall = LoopingCall(nextcall.schedule)
+        self.start_requests_feeder: Optional[StartRequestsFeeder] = None
 
     def add_request(self, request: Request) -> None:
         self.inprogress.add(request)
@@ -70,6 +84,8 @@ class Slot:
 
     def close(self) -> Deferred:
         self.closing = Deferred()
+        if self.start_requests_feeder is not None:
+            self.start_requests_feeder.close()
         self._maybe_fire_closing()
         return self.closing
 
@@ -99,8 +115,17 @@ class ExecutionEngine:
         downloader_cls: Type[Downloader] = load_object(self.settings["DOWNLOADER"])
         self.downloader: Downloader = downloader_cls(crawler)
         self.scraper = Scraper(crawler)
+        self.memory_flow = MemoryFlowController(crawler, self)
+        self.tracer: Optional[RequestTracer] = RequestTracer.from_crawler(crawler)
         self._spider_closed_callback: Callable = spider_closed_callback
         self.start_time: Optional[float] = None
+        # When enabled, each request goes from the downloader to the scraper
+        # in a single coroutine instead of a chain of Deferred callbacks.
+        self._coroutines: bool = self.settings.getbool("ENGINE_COROUTINES")
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Strong references to running tasks, which asyncio only keeps weak
+        # references to.
+        self._tasks: Set[asyncio.Future] = set()
 
     def _get_scheduler_class(self, settings: BaseSettings) -> Type["BaseScheduler"]:
         from scrapy.core.scheduler import BaseScheduler
@@ -171,13 +196,21 @@ class ExecutionEngine:
         if self.paused:
             return None
 
-        while (
-            not self._needs_backout()
-            and self._next_request_from_scheduler() is not None
-        ):
-            pass
-
-        if self.slot.start_requests is not None and not self._needs_backout():
+        if self.slot.batch_scheduling:
+            while not self._needs_backout() and self._next_requests_from_scheduler():
+                pass
+        else:
+            while (
+                not self._needs_backout()
+                and self._next_request_from_scheduler() is not None
+            ):
+                pass
+
+        if self.slot.start_requests_feeder is not None:
+            if not self._start_requests_need_backout():
+                if not self.slot.start_requests_feeder.feed():
+                    self.slot.start_requests = None
+        elif self.slot.start_requests is not None and not self._needs_backout():
             try:
                 request = next(self.slot.start_requests)
             except StopIteration:
@@ -203,15 +236,56 @@ class ExecutionEngine:
             or bool(self.slot.closing)
             or self.downloader.needs_backout()
             or self.scraper.slot.needs_backout()
+            # Let at least one request in progress, otherwise a crawl whose
+            # memory usage does not go down would never finish.
+            or (bool(self.slot.inprogress) and self.memory_flow.needs_backout())
+        )
+
+    def _start_requests_need_backout(self) -> bool:
+        """Unlike :meth:`_needs_backout`, ignore the downloader and the
+        scraper, so that the scheduler gets start requests in advance."""
+        assert self.slot is not None  # typing
+        return (
+            not self.running
+            or bool(self.slot.closing)
+            or (bool(self.slot.inprogress) and self.memory_flow.needs_backout())
         )
 
-    def _next_request_from_scheduler(self) -> Optional[Deferred]:
+    def _next_request_from_scheduler(
+        self,
+    ) -> Optional[Union[Deferred, asyncio.Future]]:
         assert self.slot is not None  # typing
         assert self.spider is not None  # typing
 
         request = self.slot.scheduler.next_request()
         if request is None:
             return None
+        return self._crawl_scheduled_request(request)
+
+    def _next_requests_from_scheduler(self) -> int:
+        """Send as many requests from the scheduler to the downloader as the
+        downloader has free capacity for, and return how many were sent."""
+        assert self.slot is not None  # typing
+        free = self.downloader.total_concurrency - len(self.downloader.active)
+        if free <= 0:
+            return 0
+        requests = self.slot.scheduler.next_requests(free)
+        for request in requests:
+            self._crawl_scheduled_request(request)
+        return len(requests)
+
+    def _crawl_scheduled_request(
+        self, request: Request
+    ) -> Union[Deferred, asyncio.Future]:
+        assert self.slot is not None  # typing
+        assert self.spider is not None  # typing
+
+        if self._coroutines:
+            # Start the download right away, so that the request counts as
+            # active before the coroutine starts running.
+            self.slot.add_request(request)
+            dwld = self.downloader.fetch(request, self.spider)
+            return self._start_coroutine(self._process_request(request, dwld))
 
         d = self._download(request)
         d.addBoth(self._handle_downloader_output, request)
@@ -246,6 +320,81 @@ class ExecutionEngine:
         )
         return d
 
+    def _start_coroutine(self, coro: Coroutine) -> Union[Deferred, asyncio.Future]:
+        if self._event_loop is None:
+            return ensureDeferred(coro)
+        task = self._event_loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _awaitable(self, d: Deferred) -> Union[Deferred, asyncio.Future]:
+        # Same as maybe_deferred_to_future(), without getting the event loop
+        # every time.
+        if self._event_loop is None:
+            return d
+        return d.asFuture(self._event_loop)
+
+    async def _process_request(self, request: Request, dwld: Deferred) -> None:
+        """Wait for the *dwld* download of *request* and send its result to
+        the scraper, replacing the chain of callbacks of
+        :meth:`_next_request_from_scheduler` when :setting:`ENGINE_COROUTINES`
+        is enabled."""
+        slot = self.slot
+        assert slot is not None
+        result: Union[Request, Response, Failure]
+        try:
+            try:
+                result = self._on_downloaded(await self._awaitable(dwld), request)
+            except Exception:
+                result = Failure()
+            finally:
+                slot.nextcall.schedule()
+            try:
+                if isinstance(result, Request):
+                    self._handle_downloader_output(result, request)
+                else:
+                    await self._scrape_coro(result, request)
+            except Exception:
+                logger.info(
+                    "Error while handling downloader output",
+                    exc_info=True,
+                    extra={"spider": self.spider},
+                )
+        finally:
+            try:
+                slot.remove_request(request)
+            except Exception:
+                logger.info(
+                    "Error while removing request from slot",
+                    exc_info=True,
+                    extra={"spider": self.spider},
+                )
+            slot.nextcall.schedule()
+
+    async def _scrape_coro(
+        self, result: Union[Response, Failure], request: Request
+    ) -> None:
+        assert self.spider is not None  # typing
+        try:
+            await self._awaitable(
+                self.scraper.enqueue_scrape(result, request, self.spider)
+            )
+        except Exception:
+            logger.error(
+                "Error while enqueuing downloader output",
+                exc_info=True,
+                extra={"spider": self.spider},
+            )
+        if self.tracer is not None:
+            self.tracer.finish(request, result)
+
+    def _finish_trace(
+        self, _: Any, request: Request, result: Union[Response, Failure]
+    ) -> None:
+        assert self.tracer is not None  # typing
+        self.tracer.finish(request, result)
+
     def _handle_downloader_output(
         self, result: Union[Request, Response, Failure], request: Request
     ) -> Optional[Deferred]:
@@ -269,6 +418,8 @@ class ExecutionEngine:
                 extra={"spider": self.spider},
             )
         )
+        if self.tracer is not None:
+            d.addBoth(self._finish_trace, request, result)
         return d
 
     def spider_is_idle(self) -> bool:
@@ -300,6 +451,25 @@ class ExecutionEngine:
                 signals.request_dropped, request=request, spider=spider
             )
 
+    def _schedule_requests(self, requests: List[Request]) -> None:
+        """Same as calling :meth:`_schedule_request` for each request, but
+        enqueuing requests in a batch if the scheduler supports it."""
+        assert self.slot is not None  # typing
+        scheduler = self.slot.scheduler
+        if not hasattr(scheduler, "enqueue_requests"):
+            for request in requests:
+                self._schedule_request(request, self.spider)  # type: ignore[arg-type]
+            return
+        for request in requests:
+            self.signals.send_catch_log(
+                signals.request_scheduled, request=request, spider=self.spider
+            )
+        for request, enqueued in zip(requests, scheduler.enqueue_requests(requests)):
+            if not enqueued:
+                self.signals.send_catch_log(
+                    signals.request_dropped, request=request, spider=self.spider
+                )
+
     def download(self, request: Request) -> Deferred:
         """Return a Deferred which fires with a Response as result, only downloader middlewares are applied"""
         if self.spider is None:
@@ -318,28 +488,6 @@ class ExecutionEngine:
 
         self.slot.add_request(request)
 
-        def _on_success(result: Union[Response, Request]) -> Union[Response, Request]:
-            if not isinstance(result, (Response, Request)):
-                raise TypeError(
-                    f"Incorrect type: expected Response or Request, got {type(result)}: {result!r}"
-                )
-            if isinstance(result, Response):
-                if result.request is None:
-                    result.request = request
-                assert self.spider is not None
-                logkws = self.logformatter.crawled(result.request, result, self.spider)
-                if logkws is not None:
-                    logger.log(
-                        *logformatter_adapter(logkws), extra={"spider": self.spider}
-                    )
-                self.signals.send_catch_log(
-                    signal=signals.response_received,
-                    response=result,
-                    request=result.request,
-                    spider=self.spider,
-                )
-            return result
-
         def _on_complete(_: Any) -> Any:
             assert self.slot is not None
             self.slot.nextcall.schedule()
@@ -347,10 +495,34 @@ class ExecutionEngine:
 
         assert self.spider is not None
         dwld = self.downloader.fetch(request, self.spider)
-        dwld.addCallbacks(_on_success)
+        dwld.addCallbacks(self._on_downloaded, callbackArgs=(request,))
         dwld.addBoth(_on_complete)
         return dwld
 
+    def _on_downloaded(
+        self, result: Union[Response, Request], request: Request
+    ) -> Union[Response, Request]:
+        if not isinstance(result, (Response, Request)):
+            raise TypeError(
+                f"Incorrect type: expected Response or Request, got {type(result)}: {result!r}"
+            )
+        if isinstance(result, Response):
+            if self.tracer is not None:
+                mark(request, "received")
+            if result.request is None:
+                result.request = request
+            assert self.spider is not None
+            logkws = self.logformatter.crawled(result.request, result, self.spider)
+            if logkws is not None:
+                logger.log(*logformatter_adapter(logkws), extra={"spider": self.spider})
+            self.signals.send_catch_log(
+                signal=signals.response_received,
+                response=result,
+                request=result.request,
+                spider=self.spider,
+            )
+        return result
+
     @inlineCallbacks
     def open_spider(
         self, spider: Spider, start_requests: Iterable = (), close_if_idle: bool = True
@@ -358,12 +530,22 @@ class ExecutionEngine:
         if self.slot is not None:
             raise RuntimeError(f"No free spider slot when opening {spider.name!r}")
         logger.info("Spider opened", extra={"spider": spider})
+        if self._coroutines and is_asyncio_reactor_installed():
+            self._event_loop = _get_asyncio_event_loop()
         nextcall = CallLaterOnce(self._next_request)
         scheduler = build_from_crawler(self.scheduler_cls, self.crawler)
+        feeder = StartRequestsFeeder.from_engine(self, iter(start_requests))
+        if feeder is not None:
+            # The feeder may read start requests in a thread, but spider
+            # middlewares always run in the reactor thread.
+            start_requests = feeder.requests
         start_requests = yield self.scraper.spidermw.process_start_requests(
             start_requests, spider
         )
         self.slot = Slot(start_requests, close_if_idle, nextcall, scheduler)
+        if feeder is not None:
+            feeder.requests = self.slot.start_requests  # type: ignore[assignment]
+            self.slot.start_requests_feeder = feeder
         self.spider = spider
         if hasattr(scheduler, "open"):
             yield scheduler.open(spider)
@@ -0,0 +1,262 @@
+"""
+Feeding of start requests to the scheduler in batches.
+
+By default, the engine gets start requests one at a time, only when the
+downloader has free capacity. With :setting:`START_REQUESTS_BATCH_SIZE` set,
+:class:`StartRequestsFeeder` gets them in batches instead, and keeps the
+scheduler filled up to :setting:`START_REQUESTS_HIGH_WATERMARK` requests, so
+that the downloader always has requests to choose from, without reading all
+start requests into memory.
+
+See :ref:`topics-start-requests-feeder`.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections import deque
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Deque, Iterator, List, Optional, Union
+
+from twisted.python.failure import Failure
+
+from scrapy import Request
+
+if TYPE_CHECKING:
+    from scrapy.core.engine import ExecutionEngine
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Error:
+    """Wraps an exception raised by start requests in the feeder thread."""
+
+    def __init__(self, exception: BaseException):
+        self.exception: BaseException = exception
+
+
+_BatchT = Union[List[Request], _Error, None]
+
+
+class StartRequestsFeeder:
+    """Gets start requests from *start_requests* in batches of *batch_size*,
+    and sends them to the scheduler of *engine* while it has less than
+    *high_watermark* pending requests.
+
+    Batches are read from :attr:`requests`, which the engine sets to
+    *start_requests* wrapped by the ``process_start_requests`` method of
+    spider middlewares.
+
+    If *use_thread* is ``True``, *start_requests* is read in a background
+    thread, which keeps up to 2 batches ready, so that blocking sources of
+    start requests (files, databases) do not block the reactor. Spider
+    middlewares still run in the reactor thread, on the requests read by the
+    background thread, which :attr:`requests` then initially yields. A batch
+    is only read from :attr:`requests` once the background thread has read
+    at least a full batch. If spider middlewares drop some of them, the
+    batch ends early instead of waiting for the background thread, and the
+    next requests it reads go through a new chain of spider middlewares.
+    """
+
+    #: Seconds between checks of whether the feeder thread must stop.
+    _thread_poll_interval: float = 0.1
+
+    def __init__(
+        self,
+        engine: ExecutionEngine,
+        start_requests: Iterator[Request],
+        batch_size: int,
+        high_watermark: int,
+        use_thread: bool = False,
+    ):
+        self.engine: ExecutionEngine = engine
+        self.start_requests: Iterator[Request] = start_requests
+        self.requests: Iterator[Request] = start_requests
+        self.batch_size: int = batch_size
+        self.high_watermark: int = high_watermark
+        self.done: bool = False
+        self._pending: Deque[_BatchT] = deque()
+        self._batches: Optional[queue.Queue[_BatchT]] = None
+        self._stopping: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Start requests received from the background thread.
+        self._received: Deque[Request] = deque()
+        self._received_all: bool = False
+        self._error: Optional[BaseException] = None
+        # Whether the chain of spider middlewares ended because it ran out
+        # of received start requests, rather than because there are none left.
+        self._ran_out: bool = False
+        if use_thread:
+            self._batches = queue.Queue(maxsize=2)
+            self._thread = threading.Thread(
+                target=self._read_batches, name="start-requests", daemon=True
+            )
+            self.requests = self._iter_received()
+
+    @classmethod
+    def from_engine(
+        cls, engine: ExecutionEngine, start_requests: Iterator[Request]
+    ) -> Optional[StartRequestsFeeder]:
+        """Return a feeder for *start_requests*, or ``None`` if
+        :setting:`START_REQUESTS_BATCH_SIZE` is ``0``."""
+        settings = engine.settings
+        batch_size = settings.getint("START_REQUESTS_BATCH_SIZE")
+        if batch_size <= 0:
+            return None
+        return cls(
+            engine,
+            start_requests,
+            batch_size=batch_size,
+            high_watermark=settings.getint("START_REQUESTS_HIGH_WATERMARK"),
+            use_thread=settings.getbool("START_REQUESTS_THREAD"),
+        )
+
+    def _read_batch(self, requests: Iterator[Request]) -> List[_BatchT]:
+        """Return the next batch of *requests*, followed by the error raised
+        while reading it, if any, or ``[None]`` if there are no requests
+        left."""
+        batch: List[Request] = []
+        try:
+            batch.extend(islice(requests, self.batch_size))
+        except Exception as e:
+            return [batch, _Error(e)] if batch else [_Error(e)]
+        return [batch] if batch else [None]
+
+    def _read_batches(self) -> None:
+        assert self._batches is not None
+        while not self._stopping.is_set():
+            for batch in self._read_batch(self.start_requests):
+                while not self._stopping.is_set():
+                    try:
+                        self._batches.put(batch, timeout=self._thread_poll_interval)
+                    except queue.Full:
+                        continue
+                    self._wake_engine()
+                    break
+                if not isinstance(batch, list):
+                    return
+
+    def _receive(self) -> None:
+        """Move batches read by the background thread to ``_received``,
+        until it has a full batch or there are no more batches ready."""
+        assert self._batches is not None
+        while not self._received_all and len(self._received) < self.batch_size:
+            try:
+                batch = self._batches.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(batch, list):
+                self._received.extend(batch)
+                continue
+            self._received_all = True
+            if isinstance(batch, _Error):
+                self._error = batch.exception
+
+    def _iter_received(self) -> Iterator[Request]:
+        while self._received:
+            yield self._received.popleft()
+        if self._received_all:
+            if self._error is not None:
+                raise self._error
+            return
+        # Spider middlewares dropped start requests, so a full batch needs
+        # more of them. Stop instead of waiting for the background thread.
+        self._ran_out = True
+
+    def _wrap_received(self) -> None:
+        # Once a chain of spider middlewares has ended, it cannot yield
+        # anything else, so more received requests need a new chain.
+        assert self.engine.spider is not None
+        dfd = self.engine.scraper.spidermw.process_start_requests(
+            self._iter_received(), self.engine.spider
+        )
+        dfd.addBoth(self._set_requests)
+
+    def _set_requests(self, result: Any) -> None:
+        if isinstance(result, Failure):
+            assert result.value is not None
+            self._pending.append(_Error(result.value))
+        else:
+            self.requests = result
+
+    def _wake_engine(self) -> None:
+        from twisted.internet import reactor
+
+        slot = self.engine.slot
+        if slot is not None:
+            reactor.callFromThread(slot.nextcall.schedule)
+
+    def _is_full(self) -> bool:
+        scheduler = self.engine.slot.scheduler  # type: ignore[union-attr]
+        if hasattr(scheduler, "__len__"):
+            return len(scheduler) >= self.high_watermark
+        return scheduler.has_pending_requests()
+
+    def _next_batch(self) -> _BatchT:
+        if self._thread is not None:
+            return self._next_received_batch()
+        if not self._pending:
+            self._pending.extend(self._read_batch(self.requests))
+        return self._pending.popleft()
+
+    def _next_received_batch(self) -> _BatchT:
+        assert self._thread is not None
+        if not self._thread.is_alive() and self._thread.ident is None:
+            # Started on first use, so that start requests are not read
+            # before the spider_opened signal is sent.
+            self._thread.start()
+        while not self._pending:
+            self._receive()
+            if len(self._received) < self.batch_size and not self._received_all:
+                # _read_batches() wakes the engine up once there are more.
+                return []
+            if self._ran_out:
+                self._ran_out = False
+                self._wrap_received()
+                continue
+            self._pending.extend(self._read_batch(self.requests))
+            if self._ran_out and self._pending[-1] is None:
+                self._pending.pop()
+        return self._pending.popleft()
+
+    def feed(self) -> bool:
+        """Send a batch of start requests to the scheduler if it has room
+        for them, and return ``False`` once there are no start requests
+        left."""
+        if self.done:
+            return False
+        if self._is_full():
+            return True
+        batch = self._next_batch()
+        if isinstance(batch, list):
+            if batch:
+                self.engine._schedule_requests(batch)
+                # Give the reactor a chance to run before the next batch.
+                self.engine.slot.nextcall.schedule()  # type: ignore[union-attr]
+            return True
+        if isinstance(batch, _Error):
+            logger.error(
+                "Error while obtaining start requests",
+                exc_info=(
+                    type(batch.exception),
+                    batch.exception,
+                    batch.exception.__traceback__,
+                ),
+                extra={"spider": self.engine.spider},
+            )
+        self.done = True
+        return False
+
+    def close(self) -> None:
+        """Stop reading start requests."""
+        self.done = True
+        self._stopping.set()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} batch_size={self.batch_size} "
+            f"high_watermark={self.high_watermark} done={self.done}>"
+        )
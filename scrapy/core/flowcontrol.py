@@ -0,0 +1,121 @@
+"""
+Memory-aware flow control for the engine.
+
+While memory usage is above a soft limit, the engine stops getting new
+requests from the scheduler and from ``start_requests``, so that requests
+in progress can finish and release their memory. It starts again once memory
+usage goes below a lower threshold, so that the crawl does not keep pausing
+and resuming around the soft limit.
+
+See :ref:`topics-memory-flow-control`.
+"""
+
+from __future__ import annotations
+
+import logging
+from time import monotonic
+from typing import TYPE_CHECKING, Optional
+
+from scrapy.utils.memory import get_memory_usage, get_rss
+
+if TYPE_CHECKING:
+    from scrapy.core.engine import ExecutionEngine
+    from scrapy.crawler import Crawler
+
+
+logger = logging.getLogger(__name__)
+
+
+#: Components whose memory usage does not go down when the engine stops
+#: getting new requests, and that are hence not taken into account.
+_UNBUFFERED_COMPONENTS = {"scheduler", "dupefilter"}
+
+
+def _format_size(size: Optional[int]) -> str:
+    return "-" if size is None else f"{size / 1024 / 1024:.1f}MiB"
+
+
+class MemoryFlowController:
+    """Tells the engine to back out while the current memory usage of the
+    process (:setting:`MEMUSAGE_SOFT_LIMIT_MB`) or the memory used by
+    requests and responses in progress
+    (:setting:`MEMUSAGE_TRACKED_SOFT_LIMIT_MB`) is above its soft limit,
+    until both go below :setting:`MEMUSAGE_RESUME_RATIO` times their soft
+    limit."""
+
+    #: Minimum number of seconds between memory usage checks.
+    check_interval: float = 1.0
+
+    def __init__(self, crawler: Crawler, engine: ExecutionEngine):
+        settings = crawler.settings
+        self.crawler: Crawler = crawler
+        self.engine: ExecutionEngine = engine
+        self.rss_limit: int = settings.getint("MEMUSAGE_SOFT_LIMIT_MB") * 1024 * 1024
+        self.tracked_limit: int = (
+            settings.getint("MEMUSAGE_TRACKED_SOFT_LIMIT_MB") * 1024 * 1024
+        )
+        self.resume_ratio: float = settings.getfloat("MEMUSAGE_RESUME_RATIO")
+        if not 0 < self.resume_ratio <= 1:
+            raise ValueError(
+                f"MEMUSAGE_RESUME_RATIO must be in the (0, 1] range, got "
+                f"{self.resume_ratio!r}"
+            )
+        if self.rss_limit and get_rss() is None:
+            logger.warning(
+                "MEMUSAGE_SOFT_LIMIT_MB is ignored because the current memory "
+                "usage of the process cannot be read on this platform",
+                extra={"crawler": crawler},
+            )
+            self.rss_limit = 0
+        self.enabled: bool = bool(self.rss_limit or self.tracked_limit)
+        self.paused: bool = False
+        self._last_check: float = float("-inf")
+
+    def get_tracked_size(self) -> int:
+        """Return the estimated memory used by requests and responses in
+        progress, in bytes."""
+        return sum(
+            size
+            for name, size in get_memory_usage(self.engine).items()
+            if name not in _UNBUFFERED_COMPONENTS
+        )
+
+    def needs_backout(self) -> bool:
+        if not self.enabled:
+            return False
+        now = monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            self._update()
+        return self.paused
+
+    def _is_above(self, size: Optional[int], limit: float) -> bool:
+        return size is not None and size > limit
+
+    def _update(self) -> None:
+        rss = get_rss() if self.rss_limit else None
+        tracked = self.get_tracked_size() if self.tracked_limit else None
+        if not self.paused:
+            if self._is_above(rss, self.rss_limit) or self._is_above(
+                tracked, self.tracked_limit
+            ):
+                self.paused = True
+                assert self.crawler.stats is not None
+                self.crawler.stats.inc_value("memusage/soft_limit_reached")
+                logger.warning(
+                    "Memory usage is above its soft limit (current: %(rss)s, "
+                    "tracked: %(tracked)s), no new requests will be sent until "
+                    "it goes down",
+                    {"rss": _format_size(rss), "tracked": _format_size(tracked)},
+                    extra={"crawler": self.crawler},
+                )
+        elif not self._is_above(
+            rss, self.rss_limit * self.resume_ratio
+        ) and not self._is_above(tracked, self.tracked_limit * self.resume_ratio):
+            self.paused = False
+            logger.info(
+                "Memory usage went down (current: %(rss)s, tracked: "
+                "%(tracked)s), resuming the crawl",
+                {"rss": _format_size(rss), "tracked": _format_size(tracked)},
+                extra={"crawler": self.crawler},
+            )
@@ -0,0 +1,863 @@
+"""
+Support for sharing the frontier of a crawl among several processes.
+
+:class:`FrontierScheduler` and :class:`FrontierDupeFilter` store requests and
+request fingerprints in a frontier server instead of in the crawl process, so
+that several crawl processes, on one or more machines, can work on the same
+crawl. The :command:`frontier` command runs a reference server that keeps the
+frontier in memory (:class:`MemoryFrontierBackend`).
+
+Clients and the server exchange length-prefixed JSON messages over TCP or
+Unix sockets. Requests are serialized (see :ref:`request-serialization`) and
+encoded as JSON by clients, and the server stores them as opaque data.
+
+See :ref:`topics-frontier`.
+"""
+
+from __future__ import annotations
+
+import base64
+import heapq
+import itertools
+import json
+import logging
+import socket
+import socketserver
+import struct
+import threading
+from collections import deque
+from time import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+from urllib.parse import urlparse
+
+from twisted.internet import task, threads
+from twisted.internet.defer import Deferred, succeed
+from twisted.python.failure import Failure
+from twisted.python.threadpool import ThreadPool
+
+from scrapy import Request, Spider
+from scrapy.core.scheduler import Scheduler, _pop_many
+from scrapy.dupefilters import RFPDupeFilter
+from scrapy.pqueues import DownloaderInterface
+from scrapy.settings import BaseSettings
+from scrapy.utils.misc import load_object
+from scrapy.utils.request import RequestFingerprinterProtocol, request_from_dict
+
+if TYPE_CHECKING:
+    # typing.Self requires Python 3.11
+    from typing_extensions import Self
+
+
+logger = logging.getLogger(__name__)
+
+
+_HEADER = struct.Struct("!I")
+_MAX_MESSAGE_SIZE = 256 * 1024 * 1024
+
+_AddressT = Union[str, Tuple[str, int]]
+
+
+class FrontierError(Exception):
+    """Error returned by a frontier server."""
+
+
+def parse_address(address: str) -> Tuple[str, _AddressT]:
+    """Return the kind (``"tcp"`` or ``"unix"``) and socket address of a
+    ``tcp://host:port`` or ``unix:///path`` frontier address."""
+    parsed = urlparse(address)
+    if parsed.scheme == "tcp" and parsed.hostname and parsed.port is not None:
+        return "tcp", (parsed.hostname, parsed.port)
+    if parsed.scheme == "unix" and parsed.path:
+        return "unix", parsed.path
+    raise ValueError(
+        f"Invalid frontier address {address!r}, it must be tcp://host:port "
+        f"or unix:///path"
+    )
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Frontier connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_message(sock: socket.socket, message: Any) -> None:
+    data = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock: socket.socket) -> Any:
+    (size,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    if size > _MAX_MESSAGE_SIZE:
+        raise ConnectionError(f"Frontier message too big ({size} bytes)")
+    return json.loads(_recv_exactly(sock, size))
+
+
+def _encode(value: Any) -> Any:
+    """Return *value* as JSON-compatible data. Bytes, tuples and dicts, whose
+    keys may not be strings, are tagged so that :func:`_decode` can restore
+    them."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return {"b": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return {"t": [_encode(item) for item in value]}
+    if isinstance(value, dict):
+        return {"d": [[_encode(k), _encode(v)] for k, v in value.items()]}
+    raise ValueError(f"{type(value).__name__} values cannot be sent to a frontier")
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    ((tag, data),) = value.items()
+    if tag == "b":
+        return base64.b64decode(data)
+    if tag == "t":
+        return tuple(_decode(item) for item in data)
+    if tag == "d":
+        return {_decode(k): _decode(v) for k, v in data}
+    raise ValueError(f"Unknown frontier value tag {tag!r}")
+
+
+def serialize_request(request: Request, spider: Spider) -> str:
+    """Return *request* as a JSON string that can be sent to a frontier
+    server.
+
+    Raises :exc:`ValueError` if *request* cannot be serialized."""
+    return json.dumps(_encode(request.to_dict(spider=spider)))
+
+
+def deserialize_request(data: str, spider: Spider) -> Request:
+    """Return the request that :func:`serialize_request` turned into
+    *data*.
+
+    Raises :exc:`ValueError` if *data* is not a serialized request."""
+    request_dict = _decode(json.loads(data))
+    if not isinstance(request_dict, dict):
+        raise ValueError("Frontier requests must be dicts")
+    if "_class" in request_dict:
+        request_cls: Type[Any] = load_object(request_dict["_class"])
+        if not (isinstance(request_cls, type) and issubclass(request_cls, Request)):
+            raise ValueError(f"{request_dict['_class']!r} is not a Request class")
+    return request_from_dict(request_dict, spider=spider)
+
+
+class _Lease:
+    __slots__ = ("client", "slot", "entry", "deadline")
+
+    def __init__(
+        self, client: int, slot: str, entry: Tuple[int, int, str], deadline: float
+    ):
+        self.client: int = client
+        self.slot: str = slot
+        self.entry: Tuple[int, int, str] = entry
+        self.deadline: float = deadline
+
+
+class MemoryFrontierBackend:
+    """Frontier backend that keeps requests and fingerprints in memory.
+
+    Requests are queued per download slot. :meth:`dequeue` takes requests from
+    slots in turns, so that a slot with many requests does not delay the
+    requests of other slots. Within a slot, requests are dequeued by
+    priority, and then in the order in which they were enqueued.
+
+    Dequeued requests are leased to the client that dequeued them until that
+    client acknowledges them with :meth:`settle`. Leases that are not
+    acknowledged or renewed in time, and leases of clients that disconnect,
+    are queued again.
+
+    All methods get the ID of the calling client as first argument. The
+    server calls them from a single thread at a time.
+    """
+
+    def __init__(self) -> None:
+        self.slots: Dict[str, List[Tuple[int, int, str]]] = {}
+        self.ready: Deque[str] = deque()
+        self.queued: int = 0
+        self.fingerprints: Set[str] = set()
+        self.leases: Dict[int, _Lease] = {}
+        self._deadlines: List[Tuple[float, int]] = []
+        self._ids = itertools.count()
+
+    @classmethod
+    def from_settings(cls, settings: BaseSettings) -> Self:
+        return cls()
+
+    def seen(self, client: int, fingerprints: List[str]) -> List[bool]:
+        """Return whether each fingerprint had been seen before, and mark all
+        of them as seen."""
+        results = []
+        for fingerprint in fingerprints:
+            results.append(fingerprint in self.fingerprints)
+            self.fingerprints.add(fingerprint)
+        return results
+
+    def enqueue(self, client: int, requests: List[List[Any]]) -> List[bool]:
+        """Queue *requests*, a list of ``[fingerprint, slot, priority,
+        data]`` lists, and return whether each of them was queued.
+
+        Requests with a fingerprint that has been seen before are not queued.
+        Requests with a ``None`` fingerprint are always queued.
+        """
+        results = []
+        for fingerprint, slot, priority, data in requests:
+            if fingerprint is not None:
+                if fingerprint in self.fingerprints:
+                    results.append(False)
+                    continue
+                self.fingerprints.add(fingerprint)
+            self._push(slot, (-priority, next(self._ids), data))
+            results.append(True)
+        return results
+
+    def _push(self, slot: str, entry: Tuple[int, int, str]) -> None:
+        queue = self.slots.get(slot)
+        if queue is None:
+            queue = self.slots[slot] = []
+            self.ready.append(slot)
+        heapq.heappush(queue, entry)
+        self.queued += 1
+
+    def dequeue(self, client: int, count: int, lease_timeout: float) -> List[List[Any]]:
+        """Lease up to *count* requests to *client* for *lease_timeout*
+        seconds, and return them as ``[lease_id, data]`` lists."""
+        now = time()
+        self._expire(now)
+        deadline = now + lease_timeout
+        leased: List[List[Any]] = []
+        while self.ready and len(leased) < count:
+            slot = self.ready.popleft()
+            queue = self.slots[slot]
+            entry = heapq.heappop(queue)
+            if queue:
+                self.ready.append(slot)
+            else:
+                del self.slots[slot]
+            self.queued -= 1
+            lease_id = next(self._ids)
+            self.leases[lease_id] = _Lease(client, slot, entry, deadline)
+            heapq.heappush(self._deadlines, (deadline, lease_id))
+            leased.append([lease_id, entry[2]])
+        return leased
+
+    def settle(
+        self, client: int, done: List[int], renew: List[int], lease_timeout: float
+    ) -> None:
+        """Remove the *done* leases, and extend the *renew* leases of
+        *client* by *lease_timeout* seconds."""
+        for lease_id in done:
+            self.leases.pop(lease_id, None)
+        deadline = time() + lease_timeout
+        for lease_id in renew:
+            lease = self.leases.get(lease_id)
+            if lease is not None and lease.client == client:
+                lease.deadline = deadline
+                heapq.heappush(self._deadlines, (deadline, lease_id))
+
+    def release(self, client: int) -> None:
+        """Queue again the requests leased to *client*."""
+        for lease_id, lease in list(self.leases.items()):
+            if lease.client == client:
+                self._requeue(lease_id)
+
+    def _requeue(self, lease_id: int) -> None:
+        lease = self.leases.pop(lease_id)
+        self._push(lease.slot, lease.entry)
+
+    def _expire(self, now: float) -> None:
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now:
+            _, lease_id = heapq.heappop(deadlines)
+            lease = self.leases.get(lease_id)
+            if lease is not None and lease.deadline <= now:
+                self._requeue(lease_id)
+
+    def stats(self, client: int) -> Dict[str, int]:
+        self._expire(time())
+        return {
+            "queued": self.queued,
+            "leased": len(self.leases),
+            "seen": len(self.fingerprints),
+        }
+
+
+class _FrontierRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        frontier: FrontierServer = self.server.frontier  # type: ignore[attr-defined]
+        client = next(frontier._clients)
+        try:
+            while True:
+                try:
+                    message = recv_message(self.request)
+                except (ConnectionError, OSError):
+                    return
+                send_message(self.request, frontier.handle(client, message))
+        finally:
+            with frontier.lock:
+                frontier.backend.release(client)
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+class FrontierServer:
+    """Serves a frontier backend, by default a :class:`MemoryFrontierBackend`,
+    on *address* (``tcp://host:port`` or ``unix:///path``).
+
+    Each connection is handled in its own thread, and backend methods are
+    called with a lock held.
+    """
+
+    commands = frozenset({"seen", "enqueue", "dequeue", "settle", "stats"})
+
+    def __init__(self, address: str, backend: Any = None):
+        self.backend: Any = backend if backend is not None else MemoryFrontierBackend()
+        self.lock: threading.Lock = threading.Lock()
+        self._clients = itertools.count()
+        kind, socket_address = parse_address(address)
+        server_cls = _TCPServer if kind == "tcp" else _UnixServer
+        self.server: socketserver.BaseServer = server_cls(
+            socket_address, _FrontierRequestHandler
+        )
+        self.server.frontier = self  # type: ignore[attr-defined]
+
+    @property
+    def address(self) -> str:
+        """Address the server listens on, with the actual port if the
+        requested one was ``0``."""
+        socket_address = self.server.server_address
+        if isinstance(socket_address, tuple):
+            return f"tcp://{socket_address[0]}:{socket_address[1]}"
+        return f"unix://{socket_address}"
+
+    def handle(self, client: int, message: Dict[str, Any]) -> Dict[str, Any]:
+        command = message.get("command")
+        if command not in self.commands:
+            return {"error": f"Unknown command {command!r}"}
+        with self.lock:
+            try:
+                result = getattr(self.backend, command)(client, **message["args"])
+            except Exception as e:
+                logger.exception("Error running frontier command %r", command)
+                return {"error": repr(e)}
+        return {"result": result}
+
+    def serve_forever(self) -> None:
+        self.server.serve_forever()
+
+    def shutdown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FrontierClient:
+    """Blocking client of a :class:`FrontierServer`.
+
+    Connection errors are raised as :exc:`OSError`, and errors returned by
+    the server as :exc:`FrontierError`.
+
+    It connects on the first call, and closes the connection on errors, in
+    which case the server queues again the requests leased to it.
+    """
+
+    def __init__(self, address: str, timeout: Optional[float] = 30.0):
+        parse_address(address)  # Fail early on invalid addresses.
+        self.address: str = address
+        self.timeout: Optional[float] = timeout
+        self._socket: Optional[socket.socket] = None
+
+    def _connect(self) -> socket.socket:
+        kind, socket_address = parse_address(self.address)
+        if kind == "tcp":
+            assert isinstance(socket_address, tuple)
+            sock = socket.create_connection(socket_address, timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(socket_address)
+        return sock
+
+    def call(self, command: str, **args: Any) -> Any:
+        if self._socket is None:
+            self._socket = self._connect()
+        try:
+            send_message(self._socket, {"command": command, "args": args})
+            response = recv_message(self._socket)
+        except OSError:
+            self.close()
+            raise
+        if "error" in response:
+            raise FrontierError(response["error"])
+        return response["result"]
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class FrontierDupeFilter(RFPDupeFilter):
+    """Duplicates filter that stores request fingerprints in the frontier
+    server at :setting:`FRONTIER_ADDRESS`.
+
+    When used together with :class:`FrontierScheduler`, the fingerprints of
+    requests are checked by the server while enqueuing them, and requests
+    that cannot be serialized, which stay in the crawl process, are checked
+    with :meth:`request_seen_locally`. Otherwise, :meth:`request_seen` blocks
+    until the server answers.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        debug: bool = False,
+        *,
+        fingerprinter: Optional[RequestFingerprinterProtocol] = None,
+        address: str = "",
+    ) -> None:
+        # Fingerprints are persisted by the server, not in JOBDIR.
+        super().__init__(None, debug, fingerprinter=fingerprinter)
+        self.client: FrontierClient = FrontierClient(address)
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: BaseSettings,
+        *,
+        fingerprinter: Optional[RequestFingerprinterProtocol] = None,
+    ) -> Self:
+        return cls(
+            debug=settings.getbool("DUPEFILTER_DEBUG"),
+            fingerprinter=fingerprinter,
+            address=settings["FRONTIER_ADDRESS"],
+        )
+
+    def request_seen_locally(self, request: Request) -> bool:
+        """Like :meth:`request_seen`, but only checks the fingerprints seen
+        by this process, without contacting the server."""
+        return super().request_seen(request)
+
+    def request_seen(self, request: Request) -> bool:
+        fingerprint = self.request_fingerprint(request)
+        try:
+            return bool(self.client.call("seen", fingerprints=[fingerprint])[0])
+        except (OSError, FrontierError) as e:
+            # Crawling a request twice is better than not crawling it.
+            logger.error(
+                "Could not check if %(request)s was seen in the frontier: %(error)s",
+                {"request": request, "error": e},
+            )
+            return False
+
+    def close(self, reason: str) -> None:
+        self.client.close()
+
+
+class FrontierScheduler(Scheduler):
+    """Scheduler that stores requests in the frontier server at
+    :setting:`FRONTIER_ADDRESS`, so that several crawl processes can share
+    them.
+
+    Requests are dequeued in batches of up to :setting:`FRONTIER_BATCH_SIZE`
+    requests, which are leased to this process for
+    :setting:`FRONTIER_LEASE_TIMEOUT` seconds. Leases of requests that the
+    engine has finished processing are acknowledged, and leases of requests
+    still being processed are renewed, so that only requests of processes
+    that stop responding are given to other processes.
+
+    Requests that cannot be serialized are kept in a local memory queue, and
+    so are requests that cannot be sent to the server when it cannot be
+    reached. :setting:`JOBDIR` is ignored: requests are kept by the server.
+
+    Calls to the server run one at a time in a dedicated thread, so that they
+    do not block the reactor. Scheduled requests are sent to the server in
+    the background, and requests are dequeued from it ahead of time, so
+    :meth:`next_request` only returns requests that have already been
+    received. Because of that, :meth:`enqueue_request` returns ``True`` for
+    requests sent to the server: duplicates that the server filters are
+    logged once it answers, without a :signal:`request_dropped` signal. The
+    server stats used by :meth:`has_pending_requests` and :meth:`__len__`
+    are refreshed in the background when they are older than
+    :attr:`stats_interval` seconds.
+    """
+
+    #: Number of seconds that server stats are cached for.
+    stats_interval: float = 1.0
+
+    #: Number of seconds to wait before contacting the server again after an
+    #: error.
+    retry_delay: float = 5.0
+
+    def __init__(self, dupefilter, jobdir=None, *args, **kwargs):
+        super().__init__(dupefilter, None, *args, **kwargs)
+        assert self.crawler is not None
+        settings = self.crawler.settings
+        self.client: FrontierClient = FrontierClient(settings["FRONTIER_ADDRESS"])
+        self.batch_size: int = max(settings.getint("FRONTIER_BATCH_SIZE"), 1)
+        self.lease_timeout: float = settings.getfloat("FRONTIER_LEASE_TIMEOUT")
+        self.threadpool: Optional[ThreadPool] = None
+        # Requests dequeued from the server but not returned yet, and leases
+        # of the returned requests that the engine may be processing.
+        self._prefetched: Deque[Tuple[int, Request]] = deque()
+        self._leases: Dict[Request, int] = {}
+        self._fetching: bool = False
+        # Requests waiting to be sent to the server, and the number of
+        # requests sent that the server has not answered for yet.
+        self._outgoing: List[Tuple[Request, List[Any]]] = []
+        self._sending: int = 0
+        self._settle_loop: task.LoopingCall = task.LoopingCall(self._settle, True)
+        self._stats: Optional[Dict[str, int]] = None
+        self._stats_time: float = 0.0
+        self._stats_pending: bool = False
+        self._stats_confirmed: bool = False
+        self._reachable: bool = True
+        self._retry_time: float = 0.0
+
+    def open(self, spider: Spider) -> Optional[Deferred]:
+        self.spider = spider
+        self.mqs = self._mq()
+        self.dqs = None
+        self._server_dupefilter: bool = isinstance(self.df, FrontierDupeFilter)
+        self._slot_keys = DownloaderInterface(self.crawler)
+        self.threadpool = ThreadPool(minthreads=1, maxthreads=1, name="frontier")
+        self.threadpool.start()
+        self._settle_loop.start(self.lease_timeout / 3, now=False)
+        return self.df.open()
+
+    def close(self, reason: str) -> Optional[Deferred]:
+        if self._settle_loop.running:
+            self._settle_loop.stop()
+        if self.threadpool is None:
+            return self.df.close(reason)
+        self._flush(force=True)
+        self._settle()
+        # The server queues again the requests that were not acknowledged.
+        dfd = self._in_thread(self.client.close)
+        dfd.addBoth(self._stop_threadpool)
+        dfd.addBoth(lambda _: self.df.close(reason))
+        return dfd
+
+    def _stop_threadpool(self, result: Any) -> Any:
+        assert self.threadpool is not None
+        self.threadpool.stop()
+        return result
+
+    def _in_thread(self, f: Any, *args: Any, **kwargs: Any) -> Deferred:
+        from twisted.internet import reactor
+
+        assert self.threadpool is not None
+        return threads.deferToThreadPool(reactor, self.threadpool, f, *args, **kwargs)
+
+    def _wake_engine(self) -> None:
+        assert self.crawler is not None
+        engine_slot = getattr(self.crawler.engine, "slot", None)
+        if engine_slot is not None:
+            engine_slot.nextcall.schedule()
+
+    def _call(self, command: str, **args: Any) -> Deferred:
+        """Return a deferred that fires with the result of *command* in the
+        frontier server, or with ``None`` if the server cannot be reached or
+        fails.
+
+        After an error, the server is not contacted again for
+        :attr:`retry_delay` seconds, so that an unreachable server does not
+        delay every call."""
+        if not self._reachable and time() < self._retry_time:
+            return succeed(None)
+        dfd = self._in_thread(self.client.call, command, **args)
+        dfd.addCallbacks(self._call_succeeded, self._call_failed)
+        return dfd
+
+    def _call_succeeded(self, result: Any) -> Any:
+        if not self._reachable:
+            logger.info(
+                "Frontier server %(address)s is working again",
+                {"address": self.client.address},
+                extra={"spider": self.spider},
+            )
+            self._reachable = True
+        return result
+
+    def _call_failed(self, failure: Failure) -> None:
+        self._retry_time = time() + self.retry_delay
+        if self._reachable:
+            logger.error(
+                "Frontier server %(address)s error: %(error)s",
+                {"address": self.client.address, "error": failure.value},
+                extra={"spider": self.spider},
+            )
+            self._reachable = False
+
+    def _get_stats(self) -> Optional[Dict[str, int]]:
+        """Return the last stats of the frontier server, or ``None`` if they
+        are not known, and refresh them in the background if they are older
+        than :attr:`stats_interval` seconds."""
+        expired = time() - self._stats_time > self.stats_interval
+        if expired or self._stats is None:
+            self._refresh_stats()
+        return self._stats
+
+    def _refresh_stats(self, confirm: bool = False) -> None:
+        """Get the stats of the frontier server in the background, unless
+        they are already being requested.
+
+        If *confirm* is ``True``, the stats received are trusted by
+        :meth:`has_pending_requests` to finish the crawl."""
+        if self._stats_pending:
+            return
+        self._stats_pending = True
+        self._call("stats").addCallback(self._stats_received, confirm)
+
+    def _stats_received(self, stats: Optional[Dict[str, int]], confirm: bool) -> None:
+        self._stats_pending = False
+        self._stats = stats
+        self._stats_time = time()
+        self._stats_confirmed = confirm and stats is not None
+        if stats is not None:
+            # The engine may be waiting for them to finish the crawl.
+            self._wake_engine()
+
+    def _stats_changed(self, result: Any = None) -> Any:
+        # Stats received before the server answered are out of date.
+        self._stats = None
+        self._stats_confirmed = False
+        return result
+
+    def _settle(self, renew: bool = False) -> None:
+        """Acknowledge the leases of requests that the engine has finished
+        processing, and renew the other leases if *renew* is ``True``."""
+        assert self.crawler is not None
+        engine_slot = getattr(self.crawler.engine, "slot", None)
+        inprogress = engine_slot.inprogress if engine_slot is not None else ()
+        done = [
+            lease_id
+            for request, lease_id in self._leases.items()
+            if request not in inprogress
+        ]
+        if done:
+            self._leases = {
+                request: lease_id
+                for request, lease_id in self._leases.items()
+                if request in inprogress
+            }
+        renewed: List[int] = []
+        if renew:
+            renewed.extend(self._leases.values())
+            renewed.extend(lease_id for lease_id, _ in self._prefetched)
+        if done or renewed:
+            # If this fails, the server queues again the leased requests once
+            # their lease expires or the connection is closed.
+            dfd = self._call(
+                "settle", done=done, renew=renewed, lease_timeout=self.lease_timeout
+            )
+            if done:
+                dfd.addCallback(self._stats_changed)
+
+    def _fetch(self, count: int) -> None:
+        """Dequeue up to *count* requests from the server in the background,
+        unless requests are already being dequeued."""
+        if self._fetching:
+            return
+        self._fetching = True
+        dfd = self._call("dequeue", count=count, lease_timeout=self.lease_timeout)
+        dfd.addCallback(self._fetched)
+
+    def _fetched(self, leased: Optional[List[List[Any]]]) -> None:
+        self._fetching = False
+        if leased:
+            self._stats_changed()
+        done = []
+        for lease_id, data in leased or ():
+            try:
+                request = deserialize_request(data, self.spider)
+            except Exception:
+                logger.exception(
+                    "Dropping a frontier request that cannot be deserialized",
+                    extra={"spider": self.spider},
+                )
+                done.append(lease_id)
+            else:
+                self._prefetched.append((lease_id, request))
+        if done:
+            self._call("settle", done=done, renew=[], lease_timeout=self.lease_timeout)
+        if self._prefetched:
+            self._wake_engine()
+
+    def _flush(self, force: bool = False) -> None:
+        """Send the requests waiting to be sent to the server in a single
+        batch, unless a batch is already being sent and *force* is
+        ``False``."""
+        if not self._outgoing or (self._sending and not force):
+            return
+        batch, self._outgoing = self._outgoing, []
+        self._sending += len(batch)
+        dfd = self._call("enqueue", requests=[entry for _, entry in batch])
+        dfd.addCallback(self._enqueued, batch)
+
+    def _enqueued(
+        self, queued: Optional[List[bool]], batch: List[Tuple[Request, List[Any]]]
+    ) -> None:
+        self._sending -= len(batch)
+        assert self.stats is not None
+        if queued is None:
+            # Keep the requests until the server works again.
+            for request, _ in batch:
+                self._mqpush(request)
+            self.stats.inc_value(
+                "scheduler/enqueued/memory", len(batch), spider=self.spider
+            )
+            self.stats.inc_value("scheduler/enqueued", len(batch), spider=self.spider)
+            self._wake_engine()
+        else:
+            if any(queued):
+                self._stats_changed()
+            for (request, _), ok in zip(batch, queued):
+                if not ok:
+                    self.df.log(request, self.spider)
+            frontier = sum(map(bool, queued))
+            if frontier:
+                self.stats.inc_value(
+                    "scheduler/enqueued/frontier", frontier, spider=self.spider
+                )
+                self.stats.inc_value("scheduler/enqueued", frontier, spider=self.spider)
+        self._flush()
+
+    def has_pending_requests(self) -> bool:
+        if self.mqs or self._prefetched or self._outgoing or self._sending:
+            return True
+        self._settle()
+        stats = self._get_stats()
+        if stats is None:
+            # Wait for the server to answer, or to work again.
+            return True
+        if stats["queued"] + stats["leased"] == 0 and not self._stats_confirmed:
+            # Cached stats may miss requests that other processes enqueued
+            # since, so ask again before finishing the crawl.
+            self._refresh_stats(confirm=True)
+            return True
+        # Requests leased by other processes may lead to new requests.
+        return stats["queued"] + stats["leased"] > 0
+
+    def enqueue_request(self, request: Request) -> bool:
+        return self.enqueue_requests([request])[0]
+
+    def enqueue_requests(self, requests: Iterable[Request]) -> List[bool]:
+        """
+        Send requests to the frontier server in a single batch, filtering
+        duplicates on the server if the dupefilter is a
+        :class:`FrontierDupeFilter`.
+        """
+        results: List[bool] = []
+        memory = 0
+        for request in requests:
+            fingerprint = None
+            if not request.dont_filter:
+                if self._server_dupefilter:
+                    assert isinstance(self.df, FrontierDupeFilter)
+                    fingerprint = self.df.request_fingerprint(request)
+                elif self.df.request_seen(request):
+                    self.df.log(request, self.spider)
+                    results.append(False)
+                    continue
+            try:
+                data = serialize_request(request, self.spider)
+            except ValueError as e:
+                self._log_unserializable(request, e)
+                if fingerprint is not None:
+                    assert isinstance(self.df, FrontierDupeFilter)
+                    if self.df.request_seen_locally(request):
+                        self.df.log(request, self.spider)
+                        results.append(False)
+                        continue
+                self._mqpush(request)
+                memory += 1
+                results.append(True)
+                continue
+            slot = self._slot_keys.get_slot_key(request)
+            self._outgoing.append(
+                (request, [fingerprint, slot, request.priority, data])
+            )
+            results.append(True)
+        self._flush()
+        assert self.stats is not None
+        if memory:
+            self.stats.inc_value(
+                "scheduler/enqueued/memory", memory, spider=self.spider
+            )
+            self.stats.inc_value("scheduler/enqueued", memory, spider=self.spider)
+        return results
+
+    def next_request(self) -> Optional[Request]:
+        requests = self.next_requests(1)
+        return requests[0] if requests else None
+
+    def next_requests(self, count: int) -> List[Request]:
+        """
+        Return up to ``count`` requests, from the local memory queue first
+        and then from those already received from the frontier server, and
+        dequeue more from the server in the background if needed.
+        """
+        self._settle()
+        requests = _pop_many(self.mqs, count)
+        memory = len(requests)
+        while len(requests) < count and self._prefetched:
+            lease_id, request = self._prefetched.popleft()
+            self._leases[request] = lease_id
+            requests.append(request)
+        if len(self._prefetched) < self.batch_size:
+            self._fetch(max(count - len(requests), self.batch_size))
+        assert self.stats is not None
+        if memory:
+            self.stats.inc_value(
+                "scheduler/dequeued/memory", memory, spider=self.spider
+            )
+        if len(requests) > memory:
+            self.stats.inc_value(
+                "scheduler/dequeued/frontier",
+                len(requests) - memory,
+                spider=self.spider,
+            )
+        if requests:
+            self.stats.inc_value(
+                "scheduler/dequeued", len(requests), spider=self.spider
+            )
+        return requests
+
+    def __len__(self) -> int:
+        stats = self._get_stats()
+        queued = stats["queued"] if stats is not None else 0
+        local = len(self.mqs) + len(self._prefetched) + len(self._outgoing)
+        return local + self._sending + queued
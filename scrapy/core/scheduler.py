@@ -4,7 +4,7 @@ import json
 import logging
 from abc import abstractmethod
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Optional, Type, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Type, TypeVar, cast
 
 from twisted.internet.defer import Deferred
 
@@ -14,6 +14,7 @@ from scrapy.http.request import Request
 from scrapy.spiders import Spider
 from scrapy.statscollectors import StatsCollector
 from scrapy.utils.job import job_dir
+from scrapy.utils.memory import estimate_request_size
 from scrapy.utils.misc import build_from_crawler, load_object
 
 if TYPE_CHECKING:
@@ -120,10 +121,74 @@ class BaseScheduler(metaclass=BaseSchedulerMeta):
         """
         raise NotImplementedError()
 
+    def next_requests(self, count: int) -> List[Request]:
+        """
+        Return up to ``count`` :class:`~scrapy.http.Request` objects to be
+        processed, in the order in which :meth:`next_request` would return them.
+
+        Returning fewer than ``count`` requests implies that no more requests
+        are considered ready at the moment.
+
+        The engine uses this method to fill the free capacity of the downloader
+        in a single call. The default implementation calls :meth:`next_request`
+        until it returns ``None`` or ``count`` requests have been returned;
+        override it if your scheduler can return several requests more
+        efficiently.
+        """
+        requests: List[Request] = []
+        while len(requests) < count:
+            request = self.next_request()
+            if request is None:
+                break
+            requests.append(request)
+        return requests
+
+    def enqueue_requests(self, requests: Iterable[Request]) -> List[bool]:
+        """
+        Process several requests, and return a list with the result of
+        processing each of them, as :meth:`enqueue_request` would return it.
+
+        The default implementation calls :meth:`enqueue_request` for each
+        request; override it if your scheduler can store several requests more
+        efficiently.
+        """
+        return [self.enqueue_request(request) for request in requests]
+
 
 SchedulerTV = TypeVar("SchedulerTV", bound="Scheduler")
 
 
+def _pop_many(queue: Any, count: int) -> List[Request]:
+    """Pop up to *count* requests from *queue*, in a single call if it
+    supports it."""
+    if hasattr(queue, "pop_many"):
+        return cast(List[Request], queue.pop_many(count))
+    requests: List[Request] = []
+    while len(requests) < count:
+        request = queue.pop()
+        if request is None:
+            break
+        requests.append(request)
+    return requests
+
+
+def _push_many(queue: Any, requests: List[Request]) -> None:
+    """Push *requests* into *queue*, in a single call if it supports it."""
+    if hasattr(queue, "push_many"):
+        queue.push_many(requests)
+    else:
+        for request in requests:
+            queue.push(request)
+
+
+def _overrides(obj: Any, cls: type, names: Iterable[str]) -> bool:
+    """Return ``True`` if the class of *obj* overrides any of the *names*
+    methods of *cls*."""
+    return any(
+        getattr(type(obj), name, None) is not getattr(cls, name, None) for name in names
+    )
+
+
 class Scheduler(BaseScheduler):
     """
     Default Scrapy scheduler. This implementation also handles duplication
@@ -194,6 +259,10 @@ class Scheduler(BaseScheduler):
         self.logunser: bool = logunser
         self.stats: Optional[StatsCollector] = stats
         self.crawler: Optional[Crawler] = crawler
+        # Estimated size and count of the requests pushed to the memory
+        # queue, used to estimate its memory usage from its length.
+        self._mq_pushed_size: int = 0
+        self._mq_pushed: int = 0
 
     @classmethod
     def from_crawler(cls: Type[SchedulerTV], crawler: Crawler) -> SchedulerTV:
@@ -281,39 +350,129 @@ class Scheduler(BaseScheduler):
             self.stats.inc_value("scheduler/dequeued", spider=self.spider)
         return request
 
+    def next_requests(self, count: int) -> List[Request]:
+        """
+        Return up to ``count`` requests, from the memory queue first and then
+        from the disk queue, popping them in batches from the priority queues
+        and incrementing stats once per batch.
+        """
+        if _overrides(self, Scheduler, ("next_request", "_mqpop", "_dqpop")):
+            # Keep the logic of subclasses that customize how requests are
+            # popped.
+            return super().next_requests(count)
+        requests = _pop_many(self.mqs, count)
+        memory = len(requests)
+        if memory < count and self.dqs is not None:
+            requests.extend(_pop_many(self.dqs, count - memory))
+        assert self.stats is not None
+        if memory:
+            self.stats.inc_value(
+                "scheduler/dequeued/memory", memory, spider=self.spider
+            )
+        if len(requests) > memory:
+            self.stats.inc_value(
+                "scheduler/dequeued/disk", len(requests) - memory, spider=self.spider
+            )
+        if requests:
+            self.stats.inc_value(
+                "scheduler/dequeued", len(requests), spider=self.spider
+            )
+        return requests
+
+    def enqueue_requests(self, requests: Iterable[Request]) -> List[bool]:
+        """
+        Same as calling :meth:`enqueue_request` for each request, but pushing
+        requests to the memory queue in a batch and incrementing stats once.
+        """
+        if _overrides(self, Scheduler, ("enqueue_request", "_mqpush", "_dqpush")):
+            # Keep the logic of subclasses that customize how requests are
+            # pushed.
+            return super().enqueue_requests(requests)
+        results: List[bool] = []
+        memory_requests: List[Request] = []
+        disk = 0
+        for request in requests:
+            if not request.dont_filter and self.df.request_seen(request):
+                self.df.log(request, self.spider)
+                results.append(False)
+                continue
+            if self._dqpush(request):
+                disk += 1
+            else:
+                memory_requests.append(request)
+            results.append(True)
+        if memory_requests:
+            _push_many(self.mqs, memory_requests)
+            self._mq_pushed += len(memory_requests)
+            self._mq_pushed_size += sum(map(estimate_request_size, memory_requests))
+        assert self.stats is not None
+        if disk:
+            self.stats.inc_value("scheduler/enqueued/disk", disk, spider=self.spider)
+        if memory_requests:
+            self.stats.inc_value(
+                "scheduler/enqueued/memory", len(memory_requests), spider=self.spider
+            )
+        if disk or memory_requests:
+            self.stats.inc_value(
+                "scheduler/enqueued", disk + len(memory_requests), spider=self.spider
+            )
+        return results
+
     def __len__(self) -> int:
         """
         Return the total amount of enqueued requests
         """
         return len(self.dqs) + len(self.mqs) if self.dqs is not None else len(self.mqs)
 
+    def memory_usage(self) -> int:
+        """
+        Return the estimated memory used by enqueued requests, in bytes.
+
+        Priority queues that keep track of their memory usage report it
+        through their own ``memory_usage`` method. Otherwise, the memory
+        queue is assumed to hold requests of the average size of the
+        requests pushed to it so far.
+        """
+        size = 0
+        for queue in (self.mqs, self.dqs):
+            if hasattr(queue, "memory_usage"):
+                size += queue.memory_usage()
+            elif queue is self.mqs and self._mq_pushed:
+                size += len(queue) * self._mq_pushed_size // self._mq_pushed
+        return size
+
     def _dqpush(self, request: Request) -> bool:
         if self.dqs is None:
             return False
         try:
             self.dqs.push(request)
         except ValueError as e:  # non serializable request
-            if self.logunser:
-                msg = (
-                    "Unable to serialize request: %(request)s - reason:"
-                    " %(reason)s - no more unserializable requests will be"
-                    " logged (stats being collected)"
-                )
-                logger.warning(
-                    msg,
-                    {"request": request, "reason": e},
-                    exc_info=True,
-                    extra={"spider": self.spider},
-                )
-                self.logunser = False
-            assert self.stats is not None
-            self.stats.inc_value("scheduler/unserializable", spider=self.spider)
+            self._log_unserializable(request, e)
             return False
         else:
             return True
 
+    def _log_unserializable(self, request: Request, reason: Exception) -> None:
+        if self.logunser:
+            msg = (
+                "Unable to serialize request: %(request)s - reason:"
+                " %(reason)s - no more unserializable requests will be"
+                " logged (stats being collected)"
+            )
+            logger.warning(
+                msg,
+                {"request": request, "reason": reason},
+                exc_info=True,
+                extra={"spider": self.spider},
+            )
+            self.logunser = False
+        assert self.stats is not None
+        self.stats.inc_value("scheduler/unserializable", spider=self.spider)
+
     def _mqpush(self, request: Request) -> None:
         self.mqs.push(request)
+        self._mq_pushed += 1
+        self._mq_pushed_size += estimate_request_size(request)
 
     def _dqpop(self) -> Optional[Request]:
         if self.dqs is not None:
@@ -25,7 +25,9 @@ from twisted.internet.defer import Deferred, inlineCallbacks
 from twisted.python.failure import Failure
 
 from scrapy import Spider, signals
+from scrapy.core.callbackpool import CallbackPool, is_process_pool_callback
 from scrapy.core.spidermw import SpiderMiddlewareManager
+from scrapy.core.tracing import mark
 from scrapy.exceptions import CloseSpider, DropItem, IgnoreRequest
 from scrapy.http import Request, Response
 from scrapy.logformatter import LogFormatter
@@ -65,6 +67,8 @@ class Slot:
         self.active_size: int = 0
         self.itemproc_size: int = 0
         self.closing: Optional[Deferred] = None
+        self.callback_pool: Optional[CallbackPool] = None
+        self.itemproc: Optional[ItemPipelineManager] = None
 
     def add_response_request(
         self, result: Union[Response, Failure], request: Request
@@ -95,6 +99,10 @@ class Slot:
         return not (self.queue or self.active)
 
     def needs_backout(self) -> bool:
+        if self.callback_pool is not None and self.callback_pool.needs_backout():
+            return True
+        if self.itemproc is not None and self.itemproc.needs_backout():
+            return True
         return self.active_size > self.max_active_size
 
 
@@ -109,6 +117,7 @@ class Scraper:
         )
         self.itemproc: ItemPipelineManager = itemproc_cls.from_crawler(crawler)
         self.concurrent_items: int = crawler.settings.getint("CONCURRENT_ITEMS")
+        self.tracing: bool = crawler.settings.getbool("REQUEST_TRACING_ENABLED")
         self.crawler: Crawler = crawler
         self.signals: SignalManager = crawler.signals
         assert crawler.logformatter
@@ -118,6 +127,8 @@ class Scraper:
     def open_spider(self, spider: Spider) -> Generator[Deferred, Any, None]:
         """Open the given spider for scraping and allocate resources for it"""
         self.slot = Slot(self.crawler.settings.getint("SCRAPER_SLOT_MAX_ACTIVE_SIZE"))
+        if hasattr(self.itemproc, "needs_backout"):
+            self.slot.itemproc = self.itemproc
         yield self.itemproc.open_spider(spider)
 
     def close_spider(self, spider: Spider) -> Deferred:
@@ -126,9 +137,21 @@ class Scraper:
             raise RuntimeError("Scraper slot not assigned")
         self.slot.closing = Deferred()
         self.slot.closing.addCallback(self.itemproc.close_spider)
+        self.slot.closing.addBoth(self._close_callback_pool)
         self._check_if_closing(spider)
         return self.slot.closing
 
+    def _close_callback_pool(self, result: Any) -> Any:
+        if self.slot is not None and self.slot.callback_pool is not None:
+            self.slot.callback_pool.close()
+        return result
+
+    def _get_callback_pool(self) -> CallbackPool:
+        assert self.slot is not None  # typing
+        if self.slot.callback_pool is None:
+            self.slot.callback_pool = CallbackPool(self.crawler)
+        return self.slot.callback_pool
+
     def is_idle(self) -> bool:
         """Return True if there isn't any more spiders to process"""
         return not self.slot
@@ -168,6 +191,8 @@ class Scraper:
         assert self.slot is not None  # typing
         while self.slot.queue:
             response, request, deferred = self.slot.next_response_request_deferred()
+            if self.tracing:
+                mark(request, "scrape_started")
             self._scrape(response, request, spider).chainDeferred(deferred)
 
     def _scrape(
@@ -209,6 +234,10 @@ class Scraper:
                 result.request = request
             assert result.request
             callback = result.request.callback or spider._parse
+            if is_process_pool_callback(
+                result.request, spider
+            ) and self._get_callback_pool().can_run(result.request, spider):
+                return self._get_callback_pool().call(result, result.request, spider)
             warn_on_generator_with_return_value(spider, callback)
             dfd = defer_succeed(result)
             dfd.addCallbacks(
@@ -21,7 +21,7 @@ from typing import (
     cast,
 )
 
-from twisted.internet.defer import Deferred, inlineCallbacks
+from twisted.internet.defer import Deferred, fail, inlineCallbacks, succeed
 from twisted.python.failure import Failure
 
 from scrapy import Request, Spider
@@ -44,15 +44,33 @@ logger = logging.getLogger(__name__)
 
 ScrapeFunc = Callable[[Union[Response, Failure], Request, Spider], Any]
 
+_OutputMethodT = Union[None, Callable, Tuple[Callable, Callable]]
+_OutputChainT = Tuple[Tuple[_OutputMethodT, bool], ...]
+
 
 def _isiterable(o: Any) -> bool:
     return isinstance(o, (Iterable, AsyncIterable))
 
 
+class _Downgrade:
+    """Returned when the process_spider_output chain must wait for an async
+    iterable to be downgraded before calling the method at *index*."""
+
+    __slots__ = ("result", "index")
+
+    def __init__(self, result: AsyncIterable, index: int):
+        self.result: AsyncIterable = result
+        self.index: int = index
+
+
 class SpiderMiddlewareManager(MiddlewareManager):
     component_name = "spider middleware"
 
     def __init__(self, *middlewares: Any):
+        # Compiled process_spider_output chain, and whether there are
+        # process_spider_exception methods from each index on.
+        self._output_chain: Optional[_OutputChainT] = None
+        self._exception_handlers_from: Optional[Tuple[bool, ...]] = None
         super().__init__(*middlewares)
         self.downgrade_warning_done = False
 
@@ -70,6 +88,29 @@ class SpiderMiddlewareManager(MiddlewareManager):
         self.methods["process_spider_output"].appendleft(process_spider_output)
         process_spider_exception = getattr(mw, "process_spider_exception", None)
         self.methods["process_spider_exception"].appendleft(process_spider_exception)
+        self._output_chain = None
+        self._exception_handlers_from = None
+
+    def _get_output_chain(self) -> _OutputChainT:
+        """Return the process_spider_output chain as ``(method, is_async)``
+        pairs, classifying each method only once instead of once per
+        response."""
+        if self._output_chain is None:
+            self._output_chain = tuple(
+                (method, not isinstance(method, tuple) and isasyncgenfunction(method))
+                for method in self.methods["process_spider_output"]
+            )
+        return self._output_chain
+
+    def _has_exception_handlers(self, start_index: int) -> bool:
+        """Return ``True`` if there are process_spider_exception methods at
+        *start_index* or later."""
+        if self._exception_handlers_from is None:
+            handlers = [False]
+            for method in reversed(self.methods["process_spider_exception"]):
+                handlers.append(handlers[-1] or method is not None)
+            self._exception_handlers_from = tuple(reversed(handlers))
+        return self._exception_handlers_from[start_index]
 
     def _process_spider_input(
         self,
@@ -101,7 +142,12 @@ class SpiderMiddlewareManager(MiddlewareManager):
         iterable: Union[Iterable, AsyncIterable],
         exception_processor_index: int,
         recover_to: Union[MutableChain, MutableAsyncChain],
-    ) -> Union[Generator, AsyncGenerator]:
+    ) -> Union[Iterable, AsyncIterable]:
+        if not self._has_exception_handlers(exception_processor_index):
+            # Exceptions would be re-raised as is, there is no need to wrap
+            # the iterable.
+            return iterable
+
         def process_sync(iterable: Iterable) -> Generator:
             try:
                 yield from iterable
@@ -175,23 +221,59 @@ class SpiderMiddlewareManager(MiddlewareManager):
 
     # This method cannot be made async def, as _process_spider_exception relies on the Deferred result
     # being available immediately which doesn't work when it's a wrapped coroutine.
-    # It also needs @inlineCallbacks only because of downgrading so it can be removed when downgrading is removed.
-    @inlineCallbacks
+    # It only returns a Deferred because of downgrading, and the result is available immediately
+    # unless an async iterable needs to be downgraded.
     def _process_spider_output(
         self,
         response: Response,
         spider: Spider,
         result: Union[Iterable, AsyncIterable],
         start_index: int = 0,
-    ) -> Generator[Deferred, Any, Union[MutableChain, MutableAsyncChain]]:
+    ) -> Deferred:
         # items in this iterable do not need to go through the process_spider_output
         # chain, they went through it already from the process_spider_exception method
         recovered: Union[MutableChain, MutableAsyncChain]
-        last_result_is_async = isinstance(result, AsyncIterable)
-        if last_result_is_async:
+        if isinstance(result, AsyncIterable):
             recovered = MutableAsyncChain()
         else:
             recovered = MutableChain()
+        return self._continue_spider_output(
+            response, spider, result, start_index, recovered
+        )
+
+    def _continue_spider_output(
+        self,
+        response: Response,
+        spider: Spider,
+        result: Union[Iterable, AsyncIterable],
+        start_index: int,
+        recovered: Union[MutableChain, MutableAsyncChain],
+    ) -> Deferred:
+        try:
+            output = self._run_spider_output(
+                response, spider, result, start_index, recovered
+            )
+        except Exception:
+            return fail()
+        if isinstance(output, _Downgrade):
+            return self._downgrade_spider_output(
+                response, spider, output.result, output.index, recovered
+            )
+        return succeed(output)
+
+    def _run_spider_output(
+        self,
+        response: Response,
+        spider: Spider,
+        result: Union[Iterable, AsyncIterable],
+        start_index: int,
+        recovered: Union[MutableChain, MutableAsyncChain],
+    ) -> Union[MutableChain, MutableAsyncChain, "_Downgrade"]:
+        """Pass *result* through the process_spider_output chain, starting at
+        *start_index*, and return the resulting iterable, or a
+        :class:`_Downgrade` object if an async iterable needs to be
+        downgraded before continuing."""
+        last_result_is_async = isinstance(result, AsyncIterable)
 
         # There are three cases for the middleware: def foo, async def foo, def foo + async def foo_async.
         # 1. def foo. Sync iterables are passed as is, async ones are downgraded.
@@ -200,40 +282,26 @@ class SpiderMiddlewareManager(MiddlewareManager):
         # Storing methods and method tuples in the same list is weird but we should be able to roll this back
         # when we drop this compatibility feature.
 
-        method_list = islice(self.methods["process_spider_output"], start_index, None)
-        for method_index, method_pair in enumerate(method_list, start=start_index):
+        chain = self._get_output_chain()
+        for method_index in range(start_index, len(chain)):
+            method_pair, is_async = chain[method_index]
             if method_pair is None:
                 continue
-            need_upgrade = need_downgrade = False
+            need_upgrade = False
             if isinstance(method_pair, tuple):
                 # This tuple handling is only needed until _async compatibility methods are removed.
                 method_sync, method_async = method_pair
                 method = method_async if last_result_is_async else method_sync
             else:
                 method = method_pair
-                if not last_result_is_async and isasyncgenfunction(method):
+                if not last_result_is_async and is_async:
                     need_upgrade = True
-                elif last_result_is_async and not isasyncgenfunction(method):
-                    need_downgrade = True
+                elif last_result_is_async and not is_async:
+                    return _Downgrade(cast(AsyncIterable, result), method_index)
             try:
                 if need_upgrade:
                     # Iterable -> AsyncIterable
                     result = as_async_generator(result)
-                elif need_downgrade:
-                    if not self.downgrade_warning_done:
-                        logger.warning(
-                            f"Async iterable passed to {method.__qualname__} "
-                            f"was downgraded to a non-async one"
-                        )
-                        self.downgrade_warning_done = True
-                    assert isinstance(result, AsyncIterable)
-                    # AsyncIterable -> Iterable
-                    result = yield deferred_from_coro(collect_asyncgen(result))
-                    if isinstance(recovered, AsyncIterable):
-                        recovered_collected = yield deferred_from_coro(
-                            collect_asyncgen(recovered)
-                        )
-                        recovered = MutableChain(recovered_collected)
                 # might fail directly if the output value is not a generator
                 result = method(response=response, result=result, spider=spider)
             except Exception as ex:
@@ -266,6 +334,44 @@ class SpiderMiddlewareManager(MiddlewareManager):
             return MutableAsyncChain(result, recovered)
         return MutableChain(result, recovered)  # type: ignore[arg-type]
 
+    # This is only needed because of downgrading so it can be removed when downgrading is removed.
+    @inlineCallbacks
+    def _downgrade_spider_output(
+        self,
+        response: Response,
+        spider: Spider,
+        result: AsyncIterable,
+        method_index: int,
+        recovered: Union[MutableChain, MutableAsyncChain],
+    ) -> Generator[Deferred, Any, Union[MutableChain, MutableAsyncChain]]:
+        method = cast(Callable, self._get_output_chain()[method_index][0])
+        if not self.downgrade_warning_done:
+            logger.warning(
+                f"Async iterable passed to {method.__qualname__} "
+                f"was downgraded to a non-async one"
+            )
+            self.downgrade_warning_done = True
+        try:
+            # AsyncIterable -> Iterable
+            collected = yield deferred_from_coro(collect_asyncgen(result))
+            if isinstance(recovered, AsyncIterable):
+                recovered_collected = yield deferred_from_coro(
+                    collect_asyncgen(recovered)
+                )
+                recovered = MutableChain(recovered_collected)
+        except Exception as ex:
+            exception_result = self._process_spider_exception(
+                response, spider, Failure(ex), method_index + 1
+            )
+            if isinstance(exception_result, Failure):
+                raise
+            return exception_result
+        return (
+            yield self._continue_spider_output(
+                response, spider, collected, method_index, recovered
+            )
+        )
+
     async def _process_callback_output(
         self, response: Response, spider: Spider, result: Union[Iterable, AsyncIterable]
     ) -> Union[MutableChain, MutableAsyncChain]:
@@ -0,0 +1,292 @@
+"""
+Request lifecycle tracing.
+
+When :setting:`REQUEST_TRACING_ENABLED` is ``True``, the engine, the
+downloader and the scraper timestamp the phases that each scheduled request
+goes through, from the moment it is scheduled until the output of its
+callback has been processed. Once a request is done, the time spent in each
+phase is aggregated per downloader slot into percentiles that are stored in
+the crawl stats, and the request and its phases can be written as spans to an
+OpenTelemetry-compatible JSON file (:setting:`REQUEST_TRACING_OUTPUT`).
+
+See :ref:`topics-request-tracing`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+from pathlib import Path
+from time import time
+from typing import IO, TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+from twisted.python.failure import Failure
+
+from scrapy import Request, Spider, signals
+from scrapy.http import Response
+from scrapy.utils.python import global_object_name
+
+if TYPE_CHECKING:
+    # typing.Self requires Python 3.11
+    from typing_extensions import Self
+
+    from scrapy.crawler import Crawler
+
+
+logger = logging.getLogger(__name__)
+
+
+#: Request meta key holding the timestamps of the phases of the request.
+TRACE_META_KEY = "_trace"
+
+#: Phases of a request, as (name, start mark, end mark) tuples, in order.
+PHASES: Tuple[Tuple[str, str, str], ...] = (
+    # Waiting in the scheduler.
+    ("scheduler", "scheduled", "dequeued"),
+    # process_request() of downloader middlewares.
+    ("downloader_middleware.request", "dequeued", "enqueued"),
+    # Waiting in the queue of the downloader slot, for a free transfer slot,
+    # the download delay or the rate limit.
+    ("slot_queue", "enqueued", "sent"),
+    # From sending the request until the response headers are received,
+    # including DNS resolution and connection setup if needed.
+    ("ttfb", "sent", "headers"),
+    # Receiving the response body.
+    ("body", "headers", "downloaded"),
+    # process_response() of downloader middlewares.
+    ("downloader_middleware.response", "downloaded", "received"),
+    # Waiting for the scraper.
+    ("scraper_queue", "received", "scrape_started"),
+    # Spider middlewares, the callback and the processing of its output.
+    ("scrape", "scrape_started", "scraped"),
+)
+
+#: Key of the accumulated time that a request spent at the head of the queue
+#: of its downloader slot, waiting for the download delay or the rate limit.
+DELAY_KEY = "delay"
+
+PERCENTILES = (50, 90, 99)
+
+
+def mark(request: Request, name: str) -> None:
+    """Record the current time as the *name* mark of *request*, if the
+    request is being traced."""
+    trace = request.meta.get(TRACE_META_KEY)
+    if trace is not None:
+        trace[name] = time()
+
+
+def add_delay(request: Request, delay: float) -> None:
+    """Add *delay* seconds to the time that *request* is expected to wait
+    for the download delay or the rate limit, if the request is being
+    traced."""
+    trace = request.meta.get(TRACE_META_KEY)
+    if trace is not None:
+        trace[DELAY_KEY] = trace.get(DELAY_KEY, 0.0) + delay
+
+
+def get_phase_durations(trace: Dict[str, float]) -> Dict[str, float]:
+    """Return the number of seconds spent in each phase of *trace* for which
+    both marks were recorded, plus the ``delay`` and the ``total`` time."""
+    durations = {
+        name: trace[end] - trace[start]
+        for name, start, end in PHASES
+        if start in trace and end in trace
+    }
+    if DELAY_KEY in trace:
+        durations[DELAY_KEY] = trace[DELAY_KEY]
+    if "scheduled" in trace and "scraped" in trace:
+        durations["total"] = trace["scraped"] - trace["scheduled"]
+    return durations
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Return the *percent* percentile of the sorted *values*, using the
+    nearest-rank method."""
+    index = max(0, -(-len(values) * percent // 100) - 1)
+    return values[int(index)]
+
+
+class _Reservoir:
+    """Uniform random sample of at most *size* values."""
+
+    def __init__(self, size: int):
+        self.size: int = size
+        self.count: int = 0
+        self.values: List[float] = []
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+            return
+        index = random.randrange(self.count)  # nosec
+        if index < self.size:
+            self.values[index] = value
+
+
+def _to_nano(timestamp: float) -> str:
+    # OTLP JSON encodes 64-bit integers as strings.
+    return str(int(timestamp * 1e9))
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class RequestTracer:
+    """Aggregates the phase timestamps of requests that go through the
+    scheduler into per-slot percentiles, and exports them as spans.
+
+    Samples of each phase are kept in a reservoir of at most
+    :attr:`max_samples` values per downloader slot, so that memory usage
+    does not grow with the number of requests."""
+
+    #: Maximum number of durations kept per slot and phase.
+    max_samples: int = 10000
+
+    def __init__(self, crawler: Crawler, output: Optional[str] = None):
+        self.crawler: Crawler = crawler
+        self.output: Optional[str] = output
+        self.samples: Dict[str, Dict[str, _Reservoir]] = {}
+        self._file: Optional[IO[str]] = None
+        crawler.signals.connect(self.request_scheduled, signals.request_scheduled)
+        crawler.signals.connect(self.spider_opened, signals.spider_opened)
+        crawler.signals.connect(self.spider_closed, signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Optional[Self]:
+        """Return a tracer for *crawler*, or ``None`` if
+        :setting:`REQUEST_TRACING_ENABLED` is ``False``."""
+        settings = crawler.settings
+        if not settings.getbool("REQUEST_TRACING_ENABLED"):
+            return None
+        return cls(crawler, output=settings.get("REQUEST_TRACING_OUTPUT"))
+
+    def request_scheduled(self, request: Request, spider: Spider) -> None:
+        # Requests built from other requests, e.g. retries and redirects,
+        # share their meta, so each scheduled request gets a new trace.
+        request.meta[TRACE_META_KEY] = {"scheduled": time()}
+
+    def spider_opened(self, spider: Spider) -> None:
+        if self.output:
+            self._file = Path(self.output).open("w", encoding="utf-8")
+
+    def spider_closed(self, spider: Spider) -> None:
+        assert self.crawler.stats is not None
+        for key, value in self.get_stats().items():
+            self.crawler.stats.set_value(key, value, spider=spider)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info(
+                "Request traces written to %(output)s",
+                {"output": self.output},
+                extra={"spider": spider},
+            )
+
+    def finish(
+        self, request: Request, result: Union[Response, Failure, None] = None
+    ) -> None:
+        """Record the end of the processing of *request*, whose download
+        ended with *result*, and aggregate its trace."""
+        trace = request.meta.get(TRACE_META_KEY)
+        if trace is None or "scraped" in trace:
+            return
+        trace["scraped"] = time()
+        slot = request.meta.get("download_slot", "")
+        reservoirs = self.samples.setdefault(slot, {})
+        for phase, duration in get_phase_durations(trace).items():
+            if phase not in reservoirs:
+                reservoirs[phase] = _Reservoir(self.max_samples)
+            reservoirs[phase].add(duration)
+        if self._file is not None:
+            spans = self.get_spans(request, trace, result)
+            self._file.write(json.dumps(spans) + "\n")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the count and the percentiles of the duration, in seconds,
+        of each phase of each downloader slot."""
+        stats: Dict[str, Any] = {}
+        for slot, reservoirs in sorted(self.samples.items()):
+            for phase, reservoir in reservoirs.items():
+                prefix = f"tracing/{slot}/{phase}"
+                values = sorted(reservoir.values)
+                stats[f"{prefix}/count"] = reservoir.count
+                for percent in PERCENTILES:
+                    stats[f"{prefix}/p{percent}"] = round(
+                        percentile(values, percent), 6
+                    )
+        return stats
+
+    def get_spans(
+        self,
+        request: Request,
+        trace: Dict[str, float],
+        result: Union[Response, Failure, None] = None,
+    ) -> Dict[str, Any]:
+        """Return the spans of *trace* in the OTLP JSON format, with a root
+        span for the request and a child span for each of its phases."""
+        trace_id = f"{random.getrandbits(128):032x}"  # nosec
+        root_id = f"{random.getrandbits(64):016x}"  # nosec
+        attributes = [
+            _attribute("http.request.method", request.method),
+            _attribute("url.full", request.url),
+            _attribute("scrapy.download_slot", request.meta.get("download_slot", "")),
+        ]
+        if DELAY_KEY in trace:
+            attributes.append(_attribute("scrapy.delay", trace[DELAY_KEY]))
+        status: Dict[str, Any] = {}
+        if isinstance(result, Response):
+            attributes.append(_attribute("http.response.status_code", result.status))
+        elif isinstance(result, Failure):
+            error = global_object_name(result.type)
+            attributes.append(_attribute("error.type", error))
+            status = {"code": 2, "message": error}
+        root = {
+            "traceId": trace_id,
+            "spanId": root_id,
+            "name": "request",
+            "kind": 3,  # SPAN_KIND_CLIENT
+            "startTimeUnixNano": _to_nano(trace["scheduled"]),
+            "endTimeUnixNano": _to_nano(trace["scraped"]),
+            "attributes": attributes,
+            "status": status,
+        }
+        spans = [root]
+        for name, start, end in PHASES:
+            if start not in trace or end not in trace:
+                continue
+            spans.append(
+                {
+                    "traceId": trace_id,
+                    "spanId": f"{random.getrandbits(64):016x}",  # nosec
+                    "parentSpanId": root_id,
+                    "name": name,
+                    "kind": 1,  # SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": _to_nano(trace[start]),
+                    "endTimeUnixNano": _to_nano(trace[end]),
+                }
+            )
+        assert self.crawler.spider is not None
+        resource = {
+            "attributes": [
+                _attribute("service.name", "scrapy"),
+                _attribute("scrapy.spider", self.crawler.spider.name),
+            ]
+        }
+        return {
+            "resourceSpans": [
+                {
+                    "resource": resource,
+                    "scopeSpans": [{"scope": {"name": "scrapy"}, "spans": spans}],
+                }
+            ]
+        }
@@ -0,0 +1,493 @@
+"""
+Support for splitting a single crawl across several worker processes.
+
+Each worker runs a regular crawl of the same spider. Requests are assigned to
+workers by consistent hashing of their download slot key, so all requests
+for a given slot (by default, a given domain) are downloaded by the same
+worker, which keeps per-slot concurrency and delays meaningful. Requests
+that a worker schedules for a slot owned by another worker are forwarded to
+that worker through a local queue.
+
+See :ref:`topics-workers`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import multiprocessing
+import pickle  # nosec
+import pprint
+import queue
+import shutil
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+from urllib.parse import urlparse
+
+from twisted.internet import task
+from twisted.internet.defer import Deferred
+
+from scrapy import Request, Spider, signals
+from scrapy.core.scheduler import Scheduler
+from scrapy.exceptions import DontCloseSpider, NotSupported
+from scrapy.pqueues import DownloaderInterface
+from scrapy.settings import Settings
+from scrapy.utils.request import request_from_dict
+from scrapy.utils.url import file_uri_to_path
+
+if TYPE_CHECKING:
+    from scrapy.crawler import Crawler
+
+
+logger = logging.getLogger(__name__)
+
+
+def _jump_hash(key: int, buckets: int) -> int:
+    """Jump consistent hash (Lamping and Veach, 2014)."""
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+
+def get_worker_index(slot_key: str, workers: int) -> int:
+    """Return the index of the worker, out of *workers*, that owns the
+    download slot with the given key.
+
+    The result is stable across processes and Python runs, and only a
+    ``1/workers`` fraction of the slots changes owner when a worker is added.
+
+    >>> get_worker_index("example.com", 1)
+    0
+    >>> get_worker_index("example.com", 8) == get_worker_index("example.com", 8)
+    True
+    """
+    digest = hashlib.md5(slot_key.encode("utf8")).digest()  # nosec
+    return _jump_hash(int.from_bytes(digest[:8], "big"), workers)
+
+
+class WorkerChannel:
+    """Inter-process state shared by the workers of a :class:`WorkerPool`.
+
+    It must be created before the worker processes are forked.
+    """
+
+    def __init__(self, workers: int, context: Any = None):
+        context = context or multiprocessing.get_context("fork")
+        self.workers: int = workers
+        #: Index of the worker of the current process, ``None`` in the parent.
+        self.index: Optional[int] = None
+        self.inboxes: List[Any] = [context.Queue() for _ in range(workers)]
+        self.results: Any = context.Queue()
+        self._lock = context.Lock()
+        self._idle = context.Array("b", workers, lock=False)
+        self._retired = context.Array("b", workers, lock=False)
+        # Number of messages sent to each inbox and not received yet.
+        self._in_flight = context.Array("q", workers, lock=False)
+
+    def send(self, index: int, message: Any) -> bool:
+        """Send *message* to the worker with the given index, and return
+        ``True``, or return ``False`` if that worker has exited."""
+        assert self.index is not None
+        with self._lock:
+            if self._retired[index]:
+                return False
+            self._idle[self.index] = 0
+            self._in_flight[index] += 1
+        self.inboxes[index].put(message)
+        return True
+
+    def receive(self) -> List[Any]:
+        assert self.index is not None
+        messages = []
+        inbox = self.inboxes[self.index]
+        while True:
+            try:
+                messages.append(inbox.get_nowait())
+            except queue.Empty:
+                break
+        if messages:
+            with self._lock:
+                self._idle[self.index] = 0
+                self._in_flight[self.index] -= len(messages)
+        return messages
+
+    def set_idle(self) -> bool:
+        """Mark the current worker as idle, and return ``True`` if all
+        workers are idle and there are no forwarded requests pending, i.e.
+        if the crawl is finished."""
+        assert self.index is not None
+        with self._lock:
+            self._idle[self.index] = 1
+            return not any(self._in_flight) and all(self._idle)
+
+    def retire(self, index: int) -> None:
+        """Mark a worker that exited unexpectedly as idle, and discard the
+        requests forwarded to it, so that the other workers can finish.
+
+        Requests that are forwarded to the worker afterwards are downloaded
+        by their sender instead."""
+        with self._lock:
+            self._idle[index] = 1
+            self._retired[index] = 1
+            self._in_flight[index] = 0
+
+
+#: Channel of the current worker process, set by :class:`WorkerPool`.
+_worker_channel: Optional[WorkerChannel] = None
+
+
+def get_worker_channel() -> Optional[WorkerChannel]:
+    """Return the channel of the current worker process, or ``None`` if the
+    current process is not a worker of a :class:`WorkerPool`."""
+    return _worker_channel
+
+
+def _get_worker_index(crawler: Crawler, request: Request) -> int:
+    assert _worker_channel is not None
+    slot_key = DownloaderInterface(crawler).get_slot_key(request)
+    return get_worker_index(slot_key, _worker_channel.workers)
+
+
+class ShardedScheduler(Scheduler):
+    """Scheduler used by the workers of a :class:`WorkerPool`.
+
+    It only stores the requests whose download slot is owned by the current
+    worker, forwards the rest to their owner, and keeps the spider open
+    until all workers are idle.
+
+    Outside a worker process it behaves like
+    :class:`~scrapy.core.scheduler.Scheduler`.
+    """
+
+    #: Interval, in seconds, between checks for forwarded requests.
+    poll_interval: float = 0.1
+
+    def open(self, spider: Spider) -> Optional[Deferred]:
+        self._channel: Optional[WorkerChannel] = _worker_channel
+        self._unserializable_logged: bool = False
+        if self._channel is not None:
+            assert self.crawler is not None
+            self.crawler.signals.connect(self._spider_idle, signals.spider_idle)
+            self._poll_loop: task.LoopingCall = task.LoopingCall(self._poll)
+            self._poll_loop.start(self.poll_interval, now=False)
+        return super().open(spider)
+
+    def close(self, reason: str) -> Optional[Deferred]:
+        if self._channel is not None and self._poll_loop.running:
+            self._poll_loop.stop()
+        return super().close(reason)
+
+    def enqueue_request(self, request: Request) -> bool:
+        channel = self._channel
+        if channel is not None:
+            assert self.crawler is not None
+            index = _get_worker_index(self.crawler, request)
+            if index != channel.index:
+                try:
+                    message = request.to_dict(spider=self.spider)
+                except ValueError as e:
+                    if not self._unserializable_logged:
+                        logger.warning(
+                            "Unable to forward request %(request)s to worker "
+                            "%(index)s, downloading it locally - reason: "
+                            "%(reason)s - no more unserializable requests "
+                            "will be logged (stats being collected)",
+                            {"request": request, "index": index, "reason": e},
+                            extra={"spider": self.spider},
+                        )
+                        self._unserializable_logged = True
+                    assert self.stats is not None
+                    self.stats.inc_value("workers/unserializable", spider=self.spider)
+                else:
+                    if channel.send(index, message):
+                        assert self.stats is not None
+                        self.stats.inc_value("workers/forwarded", spider=self.spider)
+                        return True
+        return super().enqueue_request(request)
+
+    def _poll(self) -> int:
+        assert self._channel is not None
+        assert self.crawler is not None and self.crawler.engine is not None
+        messages = self._channel.receive()
+        for message in messages:
+            request = request_from_dict(message, spider=self.spider)
+            self.crawler.engine.crawl(request)
+        if messages:
+            assert self.stats is not None
+            self.stats.inc_value("workers/received", len(messages), spider=self.spider)
+        return len(messages)
+
+    def _spider_idle(self, spider: Spider) -> None:
+        assert self._channel is not None
+        if self._poll() or not self._channel.set_idle():
+            raise DontCloseSpider
+
+
+#: Stats merged by keeping their maximum or minimum value, and suffixes of
+#: the keys of such stats.
+_MAX_STATS = {"elapsed_time_seconds", "finish_time"}
+_MAX_STATS_SUFFIXES = ("/max", "_max")
+_MIN_STATS = {"start_time"}
+_MIN_STATS_SUFFIXES = ("/min", "_min")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def merge_stats(stats_list: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the stats of several workers into the stats of a single crawl.
+
+    Numbers are added up, except for values which are maximums or minimums
+    by nature (``elapsed_time_seconds``, ``start_time``, ``finish_time``
+    and keys ending in ``/max``, ``_max``, ``/min`` or ``_min``), for which
+    the maximum or minimum value is kept. For other values, the first value
+    found is kept.
+
+    >>> merge_stats([{"a": 1, "x/max": 3}, {"a": 2, "x/max": 5}])
+    {'a': 3, 'x/max': 5}
+    """
+    merged: Dict[str, Any] = {}
+    for stats in stats_list:
+        for key, value in stats.items():
+            if key not in merged:
+                merged[key] = value
+                continue
+            current = merged[key]
+            try:
+                if key in _MAX_STATS or key.endswith(_MAX_STATS_SUFFIXES):
+                    merged[key] = max(current, value)
+                elif key in _MIN_STATS or key.endswith(_MIN_STATS_SUFFIXES):
+                    merged[key] = min(current, value)
+                elif _is_number(current) and _is_number(value):
+                    merged[key] = current + value
+            except TypeError:  # values of different types
+                pass
+    return merged
+
+
+def _picklable_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    result = {}
+    for key, value in stats.items():
+        try:
+            pickle.dumps(value)
+        except Exception:
+            continue
+        result[key] = value
+    return result
+
+
+def _local_feed_path(uri: str) -> Optional[Path]:
+    parsed = urlparse(uri)
+    if parsed.scheme == "file":
+        return Path(file_uri_to_path(uri))
+    if not parsed.scheme or len(parsed.scheme) == 1:  # e.g. C:\
+        return Path(uri)
+    return None
+
+
+def _merge_feed_parts(
+    target: Path, parts: List[Path], feed_options: Dict[str, Any]
+) -> None:
+    parts = [part for part in parts if part.exists()]
+    feed_format = feed_options.get("format")
+    mode = "wb" if feed_options.get("overwrite") else "ab"
+    if feed_format in ("jsonlines", "jl"):
+        with target.open(mode) as f:
+            for part in parts:
+                with part.open("rb") as part_file:
+                    shutil.copyfileobj(part_file, f)
+    elif feed_format == "csv":
+        skip_header = feed_options.get("item_export_kwargs", {}).get(
+            "include_headers_line", True
+        )
+        with target.open(mode) as f:
+            header_written = False
+            for part in parts:
+                with part.open("rb") as part_file:
+                    if header_written and skip_header:
+                        part_file.readline()
+                    shutil.copyfileobj(part_file, f)
+                header_written = header_written or part.stat().st_size > 0
+    elif feed_format == "json":
+        chunks = []
+        for part in parts:
+            content = part.read_bytes().strip()
+            if content.startswith(b"[") and content.endswith(b"]"):
+                content = content[1:-1].strip()
+            if content:
+                chunks.append(content)
+        with target.open(mode) as f:
+            f.write(b"[\n" + b",\n".join(chunks) + b"\n]")
+    else:
+        logger.warning(
+            "Cannot merge the %(format)s feed outputs of the workers into "
+            "%(target)s, they were kept as %(parts)s",
+            {"format": feed_format, "target": target, "parts": parts},
+        )
+        return
+    for part in parts:
+        part.unlink()
+
+
+class WorkerPool:
+    """Run a crawl split across several worker processes.
+
+    The worker processes are forked from the current process, so this is
+    only supported on platforms where the ``fork`` start method of
+    :mod:`multiprocessing` is available.
+
+    Each worker uses its own subdirectory of :setting:`JOBDIR`, if set. The
+    stats of all workers are merged with :func:`merge_stats` at the end, and
+    local feed outputs are merged for the ``jsonlines``, ``csv`` and ``json``
+    formats.
+    """
+
+    def __init__(self, settings: Union[Dict[str, Any], Settings], workers: int):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise NotSupported("Worker processes require the fork start method")
+        if workers < 1:
+            raise ValueError(f"The number of workers must be positive, got {workers}")
+        if isinstance(settings, dict):
+            settings = Settings(settings)
+        self.settings: Settings = settings
+        self.workers: int = workers
+        self.stats: Dict[str, Any] = {}
+
+    def _worker_settings(self, index: int) -> Settings:
+        settings = self.settings.copy()
+        if settings["SCHEDULER"] != "scrapy.core.scheduler.Scheduler":
+            logger.warning(
+                "The %(scheduler)s scheduler is replaced by ShardedScheduler "
+                "when using worker processes",
+                {"scheduler": settings["SCHEDULER"]},
+            )
+        settings.set(
+            "SCHEDULER", "scrapy.core.workers.ShardedScheduler", priority="cmdline"
+        )
+        jobdir = settings.get("JOBDIR")
+        if jobdir:
+            settings.set(
+                "JOBDIR",
+                str(Path(jobdir, f"worker-{index}")),
+                priority=settings.getpriority("JOBDIR") or "cmdline",
+            )
+        local_feeds = self._local_feeds()
+        feeds = {}
+        for uri, feed_options in settings.getdict("FEEDS").items():
+            uri = str(uri)
+            if uri in local_feeds:
+                uri = f"{uri}.{index}"
+            feeds[uri] = feed_options
+        settings.set(
+            "FEEDS", feeds, priority=settings.getpriority("FEEDS") or "cmdline"
+        )
+        return settings
+
+    def _local_feeds(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            str(uri): feed_options
+            for uri, feed_options in self.settings.getdict("FEEDS").items()
+            if _local_feed_path(str(uri)) is not None
+        }
+
+    def _run_worker(
+        self,
+        channel: WorkerChannel,
+        index: int,
+        spidercls: Union[Type[Spider], str],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> None:
+        from scrapy.crawler import CrawlerProcess
+
+        global _worker_channel
+        channel.index = index
+        _worker_channel = channel
+        process = CrawlerProcess(self._worker_settings(index))
+        crawler = process.create_crawler(spidercls)
+        process.crawl(crawler, *args, **kwargs)
+        process.start()
+        failed = process.bootstrap_failed or getattr(process, "has_exception", False)
+        stats = crawler.stats.get_stats() if crawler.stats else {}
+        channel.results.put((index, _picklable_stats(stats), failed))
+
+    def crawl(
+        self, spidercls: Union[Type[Spider], str], *args: Any, **kwargs: Any
+    ) -> bool:
+        """Run the crawl in :attr:`workers` processes and block until all of
+        them have finished.
+
+        Return ``True`` if all workers finished successfully.
+        """
+        context = multiprocessing.get_context("fork")
+        channel = WorkerChannel(self.workers, context)
+        processes = [
+            context.Process(
+                target=self._run_worker,
+                args=(channel, index, spidercls, args, kwargs),
+                name=f"scrapy-worker-{index}",
+            )
+            for index in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+        results: Dict[int, Tuple[Dict[str, Any], bool]] = {}
+        retired: Set[int] = set()
+        while len(results) + len(retired) < self.workers:
+            try:
+                index, stats, failed = channel.results.get(timeout=1)
+            except queue.Empty:
+                for index, process in enumerate(processes):
+                    if (
+                        index not in results
+                        and index not in retired
+                        and not process.is_alive()
+                    ):
+                        logger.error(
+                            "Worker %(index)s exited unexpectedly with code %(code)s",
+                            {"index": index, "code": process.exitcode},
+                        )
+                        channel.retire(index)
+                        retired.add(index)
+                continue
+            results[index] = (stats, failed)
+        for process in processes:
+            process.join()
+
+        self.stats = merge_stats(results[index][0] for index in sorted(results))
+        self.stats["workers/count"] = self.workers
+        if self.settings.getbool("STATS_DUMP"):
+            logger.info(
+                "Dumping merged Scrapy stats of %(workers)s workers:\n%(stats)s",
+                {"workers": self.workers, "stats": pprint.pformat(self.stats)},
+            )
+        for uri, feed_options in self._local_feeds().items():
+            if "%(" in uri:
+                continue
+            target = _local_feed_path(uri)
+            assert target is not None
+            parts = [
+                _local_feed_path(f"{uri}.{index}") for index in range(self.workers)
+            ]
+            _merge_feed_parts(target, [p for p in parts if p is not None], feed_options)
+
+        return (
+            not retired
+            and not any(failed for _, failed in results.values())
+            and all(process.exitcode == 0 for process in processes)
+        )
@@ -31,6 +31,7 @@ from scrapy.logformatter import LogFormatter
 from scrapy.settings import BaseSettings, Settings, overridden_settings
 from scrapy.signalmanager import SignalManager
 from scrapy.statscollectors import StatsCollector
+from scrapy.utils import trackref
 from scrapy.utils.log import (
     LogCounterHandler,
     configure_logging,
@@ -97,6 +98,8 @@ class Crawler:
             return
 
         self.addons.load_settings(self.settings)
+        if not self.settings.getbool("TRACKREF_ENABLED"):
+            trackref.set_enabled(False)
         self.stats = load_object(self.settings["STATS_CLASS"])(self)
 
         handler = LogCounterHandler(self, level=self.settings.get("LOG_LEVEL"))
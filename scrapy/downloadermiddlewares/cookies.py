@@ -1,27 +1,22 @@
 from __future__ import annotations
 
 import logging
-from collections import defaultdict
+import pickle  # nosec
+import time
+from collections import OrderedDict
 from http.cookiejar import Cookie
-from typing import (
-    TYPE_CHECKING,
-    Any,
-    DefaultDict,
-    Dict,
-    Iterable,
-    Optional,
-    Sequence,
-    Union,
-)
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Union
 
 from tldextract import TLDExtract
 
-from scrapy import Request, Spider
+from scrapy import Request, Spider, signals
 from scrapy.crawler import Crawler
 from scrapy.exceptions import NotConfigured
 from scrapy.http import Response
 from scrapy.http.cookies import CookieJar
 from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.job import job_dir
 from scrapy.utils.python import to_unicode
 
 if TYPE_CHECKING:
@@ -40,18 +35,125 @@ def _is_public_domain(domain: str) -> bool:
     return not parts.domain
 
 
+class _CookieJars(OrderedDict):  # type: ignore[type-arg]
+    """Cookie jars by ``cookiejar`` request meta key, that creates missing
+    jars like a :class:`~collections.defaultdict`.
+
+    Jars are kept in least-recently-used order, so that the least recently
+    used ones can be dropped once there are more than *max_jars* jars, or
+    once they have not been used for *ttl* seconds. The default jar, for
+    requests without a ``cookiejar`` meta key, is never dropped.
+    """
+
+    def __init__(self, max_jars: int = 0, ttl: float = 0):
+        super().__init__()
+        self.max_jars: int = max_jars
+        self.ttl: float = ttl
+        self.last_used: Dict[Any, float] = {}
+        self.evicted: int = 0
+
+    def get_jar(self, key: Any) -> CookieJar:
+        """Return the jar for *key*, creating it if needed, after dropping
+        the jars that must be dropped, which never include the returned
+        one."""
+        now = time.time()
+        if self.max_jars or self.ttl:
+            self._evict(now, key)
+        jar = self[key]
+        self.move_to_end(key)
+        self.last_used[key] = now
+        return jar
+
+    def _evict(self, now: float, keep: Any) -> None:
+        excess = 0
+        if self.max_jars:
+            # Make room for the jar of *keep* if it does not exist yet.
+            excess = len(self) + (keep not in self) - self.max_jars
+        evicted = []
+        for key in self:
+            if key is None or key == keep:
+                # The default jar is never dropped.
+                continue
+            if excess > 0 or (self.ttl and now - self.last_used[key] > self.ttl):
+                evicted.append(key)
+                excess -= 1
+            else:
+                break
+        for key in evicted:
+            del self[key]
+        self.evicted += len(evicted)
+
+    def __missing__(self, key: Any) -> CookieJar:
+        self[key] = jar = CookieJar()
+        self.last_used[key] = time.time()
+        return jar
+
+    def __delitem__(self, key: Any) -> None:
+        super().__delitem__(key)
+        self.last_used.pop(key, None)
+
+
 class CookiesMiddleware:
     """This middleware enables working with sites that need cookies"""
 
-    def __init__(self, debug: bool = False):
-        self.jars: DefaultDict[Any, CookieJar] = defaultdict(CookieJar)
+    def __init__(
+        self,
+        debug: bool = False,
+        *,
+        max_jars: int = 0,
+        jar_ttl: float = 0,
+        jobdir: Optional[str] = None,
+    ):
+        self.jars: _CookieJars = _CookieJars(max_jars, jar_ttl)
         self.debug: bool = debug
+        self.jobdir: Optional[str] = jobdir
+        if self.jobdir:
+            self._load_jars()
 
     @classmethod
     def from_crawler(cls, crawler: Crawler) -> Self:
         if not crawler.settings.getbool("COOKIES_ENABLED"):
             raise NotConfigured
-        return cls(crawler.settings.getbool("COOKIES_DEBUG"))
+        jobdir = None
+        if crawler.settings.getbool("COOKIES_PERSIST"):
+            jobdir = job_dir(crawler.settings)
+        o = cls(
+            crawler.settings.getbool("COOKIES_DEBUG"),
+            max_jars=crawler.settings.getint("COOKIES_MAX_JARS"),
+            jar_ttl=crawler.settings.getfloat("COOKIES_JAR_TTL"),
+            jobdir=jobdir,
+        )
+        if o.jobdir:
+            crawler.signals.connect(o.spider_closed, signal=signals.spider_closed)
+        return o
+
+    @property
+    def _jars_path(self) -> Path:
+        assert self.jobdir
+        return Path(self.jobdir, "cookies.pickle")
+
+    def _load_jars(self) -> None:
+        if not self._jars_path.exists():
+            return
+        with self._jars_path.open("rb") as f:
+            saved_jars: Dict[Any, List[Cookie]] = pickle.load(f)  # nosec
+        for key, cookies in saved_jars.items():
+            jar = self.jars[key]
+            for cookie in cookies:
+                jar.set_cookie(cookie)
+        logger.info(
+            "Loaded %(count)d cookie jars from %(path)s",
+            {"count": len(saved_jars), "path": self._jars_path},
+        )
+
+    def spider_closed(self, spider: Spider) -> None:
+        now = time.time()
+        saved_jars = {
+            key: [cookie for cookie in jar if not cookie.is_expired(now)]
+            for key, jar in self.jars.items()
+        }
+        with self._jars_path.open("wb") as f:
+            pickle.dump(saved_jars, f, protocol=4)
 
     def _process_cookies(
         self, cookies: Iterable[Cookie], *, jar: CookieJar, request: Request
@@ -79,7 +181,7 @@ class CookiesMiddleware:
             return None
 
         cookiejarkey = request.meta.get("cookiejar")
-        jar = self.jars[cookiejarkey]
+        jar = self.jars.get_jar(cookiejarkey)
         cookies = self._get_request_cookies(jar, request)
         self._process_cookies(cookies, jar=jar, request=request)
 
@@ -97,7 +199,7 @@ class CookiesMiddleware:
 
         # extract cookies from Set-Cookie and drop invalid/expired cookies
         cookiejarkey = request.meta.get("cookiejar")
-        jar = self.jars[cookiejarkey]
+        jar = self.jars.get_jar(cookiejarkey)
         cookies = jar.make_cookies(response, request)
         self._process_cookies(cookies, jar=jar, request=request)
 
@@ -6,7 +6,13 @@ enable this middleware and enable the ROBOTSTXT_OBEY setting.
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from time import time
 from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 
 from twisted.internet.defer import Deferred, maybeDeferred
@@ -15,10 +21,12 @@ from twisted.python.failure import Failure
 from scrapy import Spider
 from scrapy.crawler import Crawler
 from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.extensions.httpcache import parse_cachecontrol, rfc1123_to_epoch
 from scrapy.http import Request, Response
 from scrapy.http.request import NO_CALLBACK
 from scrapy.robotstxt import RobotParser
 from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.job import job_dir
 from scrapy.utils.log import failure_to_exc_info
 from scrapy.utils.misc import load_object
 
@@ -30,6 +38,33 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+# Minimum time to cache a robots.txt file for, regardless of its
+# Cache-Control and Expires headers, to avoid fetching it for every request.
+_MIN_TTL = 60
+
+_MISSING = object()
+
+
+def _get_ttl(response: Response, default_ttl: float) -> float:
+    """Return for how long the robots.txt *response* can be cached,
+    according to its Cache-Control and Expires headers."""
+    ttl: Optional[float] = None
+    cc = parse_cachecontrol(response.headers.get(b"Cache-Control", b""))
+    if b"max-age" in cc:
+        try:
+            ttl = float(cc[b"max-age"])
+        except (TypeError, ValueError):
+            pass
+    if ttl is None and b"Expires" in response.headers:
+        expires = rfc1123_to_epoch(response.headers[b"Expires"])
+        if expires is not None:
+            date = rfc1123_to_epoch(response.headers.get(b"Date")) or time()
+            ttl = expires - date
+    if ttl is None:
+        return default_ttl
+    return max(ttl, _MIN_TTL)
+
+
 class RobotsTxtMiddleware:
     DOWNLOAD_PRIORITY: int = 1000
 
@@ -41,10 +76,26 @@ class RobotsTxtMiddleware:
             "ROBOTSTXT_USER_AGENT", None
         )
         self.crawler: Crawler = crawler
-        self._parsers: Dict[str, Union[RobotParser, Deferred, None]] = {}
+        # Parsers by netloc, in least-recently-used order. Deferreds stand
+        # for robots.txt files being downloaded, None for download errors.
+        self._parsers: OrderedDict[str, Union[RobotParser, Deferred, None]] = (
+            OrderedDict()
+        )
+        self._expires: Dict[str, float] = {}
         self._parserimpl: RobotParser = load_object(
             crawler.settings.get("ROBOTSTXT_PARSER")
         )
+        self._cache_size: int = crawler.settings.getint("ROBOTSTXT_CACHE_SIZE")
+        self._cache_ttl: float = crawler.settings.getfloat("ROBOTSTXT_CACHE_TTL")
+        self._cache_dir: Optional[Path] = None
+        cache_dir = crawler.settings.get("ROBOTSTXT_CACHE_DIR")
+        if not cache_dir:
+            jobdir = job_dir(crawler.settings)
+            if jobdir:
+                cache_dir = Path(jobdir, "robotstxt")
+        if cache_dir:
+            self._cache_dir = Path(cache_dir)
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
 
         # check if parser dependencies are met, this should throw an error otherwise.
         self._parserimpl.from_crawler(self.crawler, b"")
@@ -88,7 +139,7 @@ class RobotsTxtMiddleware:
         url = urlparse_cached(request)
         netloc = url.netloc
 
-        if netloc not in self._parsers:
+        if self._get_cached_parser(netloc) is _MISSING:
             self._parsers[netloc] = Deferred()
             robotsurl = f"{url.scheme}://{url.netloc}/robots.txt"
             robotsreq = Request(
@@ -117,6 +168,101 @@ class RobotsTxtMiddleware:
             return d
         return parser
 
+    def _get_cached_parser(self, netloc: str) -> Any:
+        """Return the cached parser for *netloc*, a deferred if its
+        robots.txt file is being downloaded, or ``_MISSING`` if it must be
+        downloaded."""
+        assert self.crawler.stats
+        parser = self._parsers.get(netloc, _MISSING)
+        if parser is _MISSING:
+            return self._load_parser(netloc)
+        if isinstance(parser, Deferred):
+            return parser
+        if self._cache_ttl and self._expires[netloc] <= time():
+            del self._parsers[netloc]
+            del self._expires[netloc]
+            self.crawler.stats.inc_value("robotstxt/cache/refetch")
+            return _MISSING
+        self._parsers.move_to_end(netloc)
+        self.crawler.stats.inc_value("robotstxt/cache/hit")
+        return parser
+
+    def _cache_path(self, netloc: str) -> Path:
+        """Return the path of the robots.txt body of *netloc* on disk; its
+        metadata is stored next to it, with a ``.json`` suffix."""
+        assert self._cache_dir
+        key = hashlib.sha1(netloc.encode("utf8")).hexdigest()  # nosec
+        return self._cache_dir / key
+
+    def _load_parser(self, netloc: str) -> Any:
+        """Return the parser for the robots.txt file of *netloc* stored on
+        disk, or ``_MISSING`` if there is none or it has expired."""
+        assert self.crawler.stats
+        if self._cache_dir is None:
+            self.crawler.stats.inc_value("robotstxt/cache/miss")
+            return _MISSING
+        path = self._cache_path(netloc)
+        try:
+            metadata = json.loads(path.with_suffix(".json").read_bytes())
+            expires = float(metadata["expires"])
+            if metadata["netloc"] != netloc:
+                self.crawler.stats.inc_value("robotstxt/cache/miss")
+                return _MISSING
+            body = path.read_bytes()
+        except FileNotFoundError:
+            self.crawler.stats.inc_value("robotstxt/cache/miss")
+            return _MISSING
+        except (OSError, ValueError, TypeError, KeyError):
+            logger.warning("Could not load robots.txt cache file %s", path)
+            self.crawler.stats.inc_value("robotstxt/cache/miss")
+            return _MISSING
+        if self._cache_ttl and expires <= time():
+            self.crawler.stats.inc_value("robotstxt/cache/refetch")
+            return _MISSING
+        self.crawler.stats.inc_value("robotstxt/cache/disk_hit")
+        parser = self._parserimpl.from_crawler(self.crawler, body)
+        self._cache_parser(netloc, parser, expires)
+        return parser
+
+    def _cache_parser(
+        self, netloc: str, parser: Optional[RobotParser], expires: float
+    ) -> None:
+        self._parsers[netloc] = parser
+        self._parsers.move_to_end(netloc)
+        self._expires[netloc] = expires
+        if not self._cache_size:
+            return
+        # evict the least recently used parsers, but not pending downloads
+        excess = len(self._parsers) - self._cache_size
+        if excess <= 0:
+            return
+        assert self.crawler.stats
+        for key in list(self._parsers):
+            if excess <= 0:
+                break
+            if isinstance(self._parsers[key], Deferred):
+                continue
+            del self._parsers[key]
+            del self._expires[key]
+            excess -= 1
+            self.crawler.stats.inc_value("robotstxt/cache/eviction")
+
+    def _store_body(self, netloc: str, body: bytes, expires: float) -> None:
+        path = self._cache_path(netloc)
+        metadata = json.dumps({"netloc": netloc, "expires": expires})
+        try:
+            # The metadata is replaced last, so that it never describes an
+            # older body than the one on disk.
+            for target, data in (
+                (path, body),
+                (path.with_suffix(".json"), metadata.encode("utf-8")),
+            ):
+                tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, target)
+        except OSError as e:
+            logger.warning("Could not store robots.txt cache file %s: %s", path, e)
+
     def _logerror(self, failure: Failure, request: Request, spider: Spider) -> Failure:
         if failure.type is not IgnoreRequest:
             logger.error(
@@ -136,7 +282,10 @@ class RobotsTxtMiddleware:
         rp = self._parserimpl.from_crawler(self.crawler, response.body)
         rp_dfd = self._parsers[netloc]
         assert isinstance(rp_dfd, Deferred)
-        self._parsers[netloc] = rp
+        expires = time() + _get_ttl(response, self._cache_ttl)
+        self._cache_parser(netloc, rp, expires)
+        if self._cache_dir is not None:
+            self._store_body(netloc, response.body, expires)
         rp_dfd.callback(rp)
 
     def _robots_error(self, failure: Failure, netloc: str) -> None:
@@ -146,5 +295,5 @@ class RobotsTxtMiddleware:
             self.crawler.stats.inc_value(key)
         rp_dfd = self._parsers[netloc]
         assert isinstance(rp_dfd, Deferred)
-        self._parsers[netloc] = None
+        self._cache_parser(netloc, None, time() + self._cache_ttl)
         rp_dfd.callback(None)
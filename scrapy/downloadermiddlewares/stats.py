@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict, Union
+from typing import TYPE_CHECKING, Dict, Optional, Union
 
 from twisted.web import http
 
@@ -8,7 +8,7 @@ from scrapy import Request, Spider
 from scrapy.crawler import Crawler
 from scrapy.exceptions import NotConfigured
 from scrapy.http import Response
-from scrapy.statscollectors import StatsCollector
+from scrapy.statscollectors import StatsCollector, StatsCounter
 from scrapy.utils.python import global_object_name, to_bytes
 from scrapy.utils.request import request_httprepr
 
@@ -34,6 +34,35 @@ def get_status_size(response_status: int) -> int:
 class DownloaderStats:
     def __init__(self, stats: StatsCollector):
         self.stats: StatsCollector = stats
+        self._spider: Optional[Spider] = None
+        self._method_counters: Dict[str, StatsCounter] = {}
+        self._status_counters: Dict[int, StatsCounter] = {}
+        self._exception_type_counters: Dict[type, StatsCounter] = {}
+
+    def _get_counter(self, key: str) -> StatsCounter:
+        return self.stats.get_counter(key, spider=self._spider)
+
+    def _bind(self, spider: Spider) -> None:
+        """Get counter handles that pass *spider* to the stats collector."""
+        self._spider = spider
+        self._request_count: StatsCounter = self._get_counter(
+            "downloader/request_count"
+        )
+        self._request_bytes: StatsCounter = self._get_counter(
+            "downloader/request_bytes"
+        )
+        self._response_count: StatsCounter = self._get_counter(
+            "downloader/response_count"
+        )
+        self._response_bytes: StatsCounter = self._get_counter(
+            "downloader/response_bytes"
+        )
+        self._exception_count: StatsCounter = self._get_counter(
+            "downloader/exception_count"
+        )
+        self._method_counters.clear()
+        self._status_counters.clear()
+        self._exception_type_counters.clear()
 
     @classmethod
     def from_crawler(cls, crawler: Crawler) -> Self:
@@ -45,21 +74,33 @@ class DownloaderStats:
     def process_request(
         self, request: Request, spider: Spider
     ) -> Union[Request, Response, None]:
-        self.stats.inc_value("downloader/request_count", spider=spider)
-        self.stats.inc_value(
-            f"downloader/request_method_count/{request.method}", spider=spider
-        )
+        if spider is not self._spider:
+            self._bind(spider)
+        self._request_count.inc()
+        try:
+            method_counter = self._method_counters[request.method]
+        except KeyError:
+            method_counter = self._method_counters[request.method] = self._get_counter(
+                f"downloader/request_method_count/{request.method}"
+            )
+        method_counter.inc()
         reqlen = len(request_httprepr(request))
-        self.stats.inc_value("downloader/request_bytes", reqlen, spider=spider)
+        self._request_bytes.inc(reqlen)
         return None
 
     def process_response(
         self, request: Request, response: Response, spider: Spider
     ) -> Union[Request, Response]:
-        self.stats.inc_value("downloader/response_count", spider=spider)
-        self.stats.inc_value(
-            f"downloader/response_status_count/{response.status}", spider=spider
-        )
+        if spider is not self._spider:
+            self._bind(spider)
+        self._response_count.inc()
+        try:
+            status_counter = self._status_counters[response.status]
+        except KeyError:
+            status_counter = self._status_counters[response.status] = self._get_counter(
+                f"downloader/response_status_count/{response.status}"
+            )
+        status_counter.inc()
         reslen = (
             len(response.body)
             + get_header_size(response.headers)
@@ -67,15 +108,21 @@ class DownloaderStats:
             + 4
         )
         # response.body + b"\r\n"+ response.header + b"\r\n" + response.status
-        self.stats.inc_value("downloader/response_bytes", reslen, spider=spider)
+        self._response_bytes.inc(reslen)
         return response
 
     def process_exception(
         self, request: Request, exception: Exception, spider: Spider
     ) -> Union[Request, Response, None]:
-        ex_class = global_object_name(exception.__class__)
-        self.stats.inc_value("downloader/exception_count", spider=spider)
-        self.stats.inc_value(
-            f"downloader/exception_type_count/{ex_class}", spider=spider
-        )
+        if spider is not self._spider:
+            self._bind(spider)
+        self._exception_count.inc()
+        try:
+            type_counter = self._exception_type_counters[exception.__class__]
+        except KeyError:
+            ex_class = global_object_name(exception.__class__)
+            type_counter = self._exception_type_counters[exception.__class__] = (
+                self._get_counter(f"downloader/exception_type_count/{ex_class}")
+            )
+        type_counter.inc()
         return None
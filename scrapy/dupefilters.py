@@ -10,6 +10,7 @@ from scrapy.http.request import Request
 from scrapy.settings import BaseSettings
 from scrapy.spiders import Spider
 from scrapy.utils.job import job_dir
+from scrapy.utils.memory import estimate_collection_size
 from scrapy.utils.request import (
     RequestFingerprinter,
     RequestFingerprinterProtocol,
@@ -99,6 +100,10 @@ class RFPDupeFilter(BaseDupeFilter):
         if self.file:
             self.file.close()
 
+    def memory_usage(self) -> int:
+        """Return the estimated memory used by seen fingerprints, in bytes."""
+        return estimate_collection_size(self.fingerprints)
+
     def log(self, request: Request, spider: Spider) -> None:
         if self.debug:
             msg = "Filtered duplicate request: %(request)s (referer: %(referer)s)"
@@ -5,11 +5,11 @@ Extension for collecting core stats like items scraped and start/finish times
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from scrapy import Spider, signals
 from scrapy.crawler import Crawler
-from scrapy.statscollectors import StatsCollector
+from scrapy.statscollectors import StatsCollector, StatsCounter
 
 if TYPE_CHECKING:
     # typing.Self requires Python 3.11
@@ -20,6 +20,22 @@ class CoreStats:
     def __init__(self, stats: StatsCollector):
         self.stats: StatsCollector = stats
         self.start_time: Optional[datetime] = None
+        self._spider: Optional[Spider] = None
+        self._item_dropped_reason_counters: Dict[str, StatsCounter] = {}
+
+    def _bind(self, spider: Spider) -> None:
+        """Get counter handles that pass *spider* to the stats collector."""
+        self._spider = spider
+        self._item_scraped_count: StatsCounter = self.stats.get_counter(
+            "item_scraped_count", spider=spider
+        )
+        self._response_received_count: StatsCounter = self.stats.get_counter(
+            "response_received_count", spider=spider
+        )
+        self._item_dropped_count: StatsCounter = self.stats.get_counter(
+            "item_dropped_count", spider=spider
+        )
+        self._item_dropped_reason_counters.clear()
 
     @classmethod
     def from_crawler(cls, crawler: Crawler) -> Self:
@@ -48,12 +64,26 @@ class CoreStats:
         self.stats.set_value("finish_reason", reason, spider=spider)
 
     def item_scraped(self, item: Any, spider: Spider) -> None:
-        self.stats.inc_value("item_scraped_count", spider=spider)
+        if spider is not self._spider:
+            self._bind(spider)
+        self._item_scraped_count.inc()
 
     def response_received(self, spider: Spider) -> None:
-        self.stats.inc_value("response_received_count", spider=spider)
+        if spider is not self._spider:
+            self._bind(spider)
+        self._response_received_count.inc()
 
     def item_dropped(self, item: Any, spider: Spider, exception: BaseException) -> None:
+        if spider is not self._spider:
+            self._bind(spider)
         reason = exception.__class__.__name__
-        self.stats.inc_value("item_dropped_count", spider=spider)
-        self.stats.inc_value(f"item_dropped_reasons_count/{reason}", spider=spider)
+        self._item_dropped_count.inc()
+        try:
+            reason_counter = self._item_dropped_reason_counters[reason]
+        except KeyError:
+            reason_counter = self._item_dropped_reason_counters[reason] = (
+                self.stats.get_counter(
+                    f"item_dropped_reasons_count/{reason}", spider=spider
+                )
+            )
+        reason_counter.inc()
@@ -20,6 +20,7 @@ from scrapy.crawler import Crawler
 from scrapy.exceptions import NotConfigured
 from scrapy.mail import MailSender
 from scrapy.utils.engine import get_engine_status
+from scrapy.utils.memory import get_memory_usage, get_rss
 
 if TYPE_CHECKING:
     # typing.Self requires Python 3.11
@@ -84,7 +85,17 @@ class MemoryUsage:
 
     def update(self) -> None:
         assert self.crawler.stats
-        self.crawler.stats.max_value("memusage/max", self.get_virtual_size())
+        stats = self.crawler.stats
+        stats.max_value("memusage/max", self.get_virtual_size())
+        current = get_rss()
+        if current is not None:
+            stats.set_value("memusage/current", current)
+        if self.crawler.engine is None:
+            return
+        usage = get_memory_usage(self.crawler.engine)
+        for name, size in usage.items():
+            stats.set_value(f"memusage/tracked/{name}", size)
+        stats.set_value("memusage/tracked", sum(usage.values()))
 
     def _check_limit(self) -> None:
         assert self.crawler.engine
@@ -0,0 +1,410 @@
+"""
+Profiler extension
+
+Measures the time spent in spider callbacks, middlewares, item pipelines,
+signal handlers and feed exporters.
+
+See documentation in docs/topics/extensions.rst
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import defaultdict, deque
+from functools import wraps
+from inspect import isasyncgenfunction, iscoroutinefunction, unwrap
+from pathlib import Path
+from random import random
+from time import perf_counter, thread_time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    DefaultDict,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+from twisted.internet.defer import Deferred
+
+from scrapy import Spider, signals
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Response
+from scrapy.pipelines import _ItemBatcher
+from scrapy.utils.defer import deferred_f_from_coro_f
+from scrapy.utils.misc import build_from_crawler
+
+if TYPE_CHECKING:
+    # typing.Self requires Python 3.11
+    from typing_extensions import Self
+
+    from scrapy.crawler import Crawler
+
+
+logger = logging.getLogger(__name__)
+
+
+#: Upper bounds, in seconds, of the buckets of the wall time histograms.
+_HISTOGRAM_BOUNDS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+
+
+def _histogram_label(index: int) -> str:
+    if index == len(_HISTOGRAM_BOUNDS):
+        return f">={_HISTOGRAM_BOUNDS[-1] * 1000:g}ms"
+    return f"<{_HISTOGRAM_BOUNDS[index] * 1000:g}ms"
+
+
+def _method_name(method: Any) -> str:
+    if isinstance(method, tuple):
+        method = next(m for m in method if m is not None)
+    method = unwrap(method)
+    return getattr(method, "__qualname__", type(method).__qualname__)
+
+
+def _signal_names() -> Dict[int, str]:
+    names: Dict[int, str] = {}
+    for name, value in vars(signals).items():
+        if not name.startswith("_") and type(value) is object:
+            # Keep the first name of signals that have aliases.
+            names.setdefault(id(value), name)
+    return names
+
+
+class _KeyStats:
+    __slots__ = ("samples", "wall_time", "cpu_time", "histogram")
+
+    def __init__(self) -> None:
+        self.samples: int = 0
+        self.wall_time: float = 0.0
+        self.cpu_time: float = 0.0
+        self.histogram: List[int] = [0] * (len(_HISTOGRAM_BOUNDS) + 1)
+
+
+class _TimedAwaitable:
+    """Awaits *awaitable*, measuring each step of it as *key*."""
+
+    def __init__(self, profiler: Profiler, key: str, awaitable: Awaitable):
+        self.profiler: Profiler = profiler
+        self.key: str = key
+        self.awaitable: Awaitable = awaitable
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        iterator = self.awaitable.__await__()
+        value: Any = None
+        exception: Optional[BaseException] = None
+        while True:
+            self.profiler.enter(self.key)
+            try:
+                if exception is None:
+                    yielded = iterator.send(value)
+                else:
+                    yielded = iterator.throw(exception)
+            except StopIteration as e:
+                return e.value
+            finally:
+                self.profiler.exit()
+            try:
+                value, exception = (yield yielded), None
+            except BaseException as e:
+                value, exception = None, e
+
+
+class Profiler:
+    """Measures the wall and CPU time spent in the code of spider callbacks
+    and components, for a :setting:`PROFILING_SAMPLE_RATE` fraction of the
+    calls, and reports it in stats and in a file in the folded stacks format
+    of flame graph tools."""
+
+    def __init__(
+        self,
+        crawler: Crawler,
+        sample_rate: float = 0.1,
+        output: Optional[str] = None,
+    ):
+        if not 0 < sample_rate <= 1:
+            raise ValueError(
+                f"PROFILING_SAMPLE_RATE must be in the (0, 1] range, got "
+                f"{sample_rate!r}"
+            )
+        self.crawler: Crawler = crawler
+        self.sample_rate: float = sample_rate
+        self.output: Optional[str] = output
+        self.stats: DefaultDict[str, _KeyStats] = defaultdict(_KeyStats)
+        #: Self wall time of each stack of keys, joined with ``;``.
+        self.stacks: DefaultDict[str, float] = defaultdict(float)
+        # Frames of the measurements in progress, as [key, wall start, CPU
+        # start, wall time of children] lists, or None if not sampled.
+        self._frames: List[Optional[List[Any]]] = []
+        self._thread_id: Optional[int] = None
+        self._signal_names: Dict[int, str] = _signal_names()
+        crawler.signals.connect(self.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        settings = crawler.settings
+        if not settings.getbool("PROFILING_ENABLED"):
+            raise NotConfigured
+        return cls(
+            crawler,
+            sample_rate=settings.getfloat("PROFILING_SAMPLE_RATE"),
+            output=settings.get("PROFILING_OUTPUT"),
+        )
+
+    def enter(self, key: str) -> None:
+        """Start measuring the time spent as *key*, if sampled. Every call
+        must be followed by a call to :meth:`exit`."""
+        if threading.get_ident() != self._thread_id:
+            return
+        frames = self._frames
+        if frames[-1] is None if frames else random() >= self.sample_rate:
+            # Code called from a measurement that is not sampled is not
+            # sampled either, so that sampled stacks are complete.
+            frames.append(None)
+            return
+        frames.append([key, perf_counter(), thread_time(), 0.0])
+
+    def exit(self) -> None:
+        if threading.get_ident() != self._thread_id:
+            return
+        frame = self._frames.pop()
+        if frame is None:
+            return
+        key, wall_start, cpu_start, children_wall_time = frame
+        wall_time = perf_counter() - wall_start
+        stats = self.stats[key]
+        stats.samples += 1
+        stats.wall_time += wall_time
+        stats.cpu_time += thread_time() - cpu_start
+        index = 0
+        for bound in _HISTOGRAM_BOUNDS:
+            if wall_time < bound:
+                break
+            index += 1
+        stats.histogram[index] += 1
+        parents = [f[0] for f in self._frames if f is not None]
+        self.stacks[";".join([*parents, key])] += wall_time - children_wall_time
+        if self._frames and self._frames[-1] is not None:
+            self._frames[-1][3] += wall_time
+
+    def _timed_iterator(self, key: str, iterable: Iterable) -> Generator:
+        iterator = iter(iterable)
+        try:
+            while True:
+                self.enter(key)
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.exit()
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    async def _timed_async_iterator(
+        self, key: str, iterable: AsyncIterable
+    ) -> AsyncGenerator:
+        iterator = iterable.__aiter__()
+        try:
+            while True:
+                try:
+                    item = await _TimedAwaitable(self, key, iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def _timed_result(self, key: str, result: Any) -> Any:
+        if isinstance(result, Iterator) and not isinstance(result, Deferred):
+            return self._timed_iterator(key, result)
+        if isinstance(result, AsyncIterable):
+            return self._timed_async_iterator(key, result)
+        return result
+
+    def wrap(self, key: str, method: Any) -> Any:
+        """Return a wrapper of *method* that measures the time spent in it
+        as *key*, including each step of the iterator, asynchronous
+        iterator or coroutine that it returns."""
+        if method is None:
+            return None
+        if isinstance(method, tuple):
+            return tuple(self.wrap(key, m) for m in method)
+        wrapped = getattr(method, "__wrapped__", None)
+        if not iscoroutinefunction(method) and iscoroutinefunction(wrapped):
+            # Measure the coroutine itself, not only until it is scheduled.
+            return deferred_f_from_coro_f(self.wrap(key, wrapped))
+
+        if iscoroutinefunction(method):
+
+            @wraps(method)
+            async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
+                return await _TimedAwaitable(self, key, method(*args, **kwargs))
+
+            return coroutine_wrapper
+
+        if isasyncgenfunction(method):
+
+            @wraps(method)
+            async def async_generator_wrapper(
+                *args: Any, **kwargs: Any
+            ) -> AsyncGenerator:
+                async for item in self._timed_async_iterator(
+                    key, method(*args, **kwargs)
+                ):
+                    yield item
+
+            return async_generator_wrapper
+
+        @wraps(method)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            self.enter(key)
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                self.exit()
+            return self._timed_result(key, result)
+
+        return wrapper
+
+    def _wrap_methods(self, group: str, methods: Dict[str, Any]) -> None:
+        for methodname, chain in list(methods.items()):
+            methods[methodname] = deque(
+                (
+                    method
+                    if method is None or isinstance(method, _ItemBatcher)
+                    else self.wrap(f"{group}/{_method_name(method)}", method)
+                )
+                for method in chain
+            )
+
+    def _wrap_call_spider(self, call_spider: Callable) -> Callable:
+        @wraps(call_spider)
+        def wrapper(result: Any, request: Any, spider: Spider) -> Deferred:
+            if isinstance(result, Response):
+                callback = request.callback or spider._parse
+                group = "callbacks"
+            else:
+                callback = request.errback
+                group = "errbacks"
+            key = f"{group}/{_method_name(callback) if callback else None}"
+            self.enter(key)
+            try:
+                dfd = call_spider(result, request, spider)
+            finally:
+                self.exit()
+            return dfd.addCallback(lambda output: self._timed_result(key, output))
+
+        return wrapper
+
+    def _wrap_send_catch_log(self, send_catch_log: Callable) -> Callable:
+        @wraps(send_catch_log)
+        def wrapper(signal: Any = None, **kwargs: Any) -> Any:
+            self.enter(f"signals/{self._signal_names.get(id(signal), signal)}")
+            try:
+                return send_catch_log(signal, **kwargs)
+            finally:
+                self.exit()
+
+        return wrapper
+
+    def _wrap_exporters(self, exporters: Dict[str, Any]) -> None:
+        for format, exporter_cls in list(exporters.items()):
+            exporters[format] = self._get_exporter_factory(format, exporter_cls)
+
+    def _get_exporter_factory(self, format: str, exporter_cls: Any) -> Callable:
+        def build_exporter(*args: Any, **kwargs: Any) -> Any:
+            exporter = build_from_crawler(exporter_cls, self.crawler, *args, **kwargs)
+            exporter.export_item = self.wrap(
+                f"feeds/{format}.export_item", exporter.export_item
+            )
+            return exporter
+
+        return build_exporter
+
+    def spider_opened(self, spider: Spider) -> None:
+        from scrapy.extensions.feedexport import FeedExporter
+
+        self._thread_id = threading.get_ident()
+        engine = self.crawler.engine
+        assert engine is not None
+        scraper = engine.scraper
+        scraper.call_spider = self._wrap_call_spider(  # type: ignore[method-assign]
+            scraper.call_spider
+        )
+        downloadermw = engine.downloader.middleware
+        self._wrap_methods("downloadermw", downloadermw.methods)
+        downloadermw._chains.clear()
+        spidermw = scraper.spidermw
+        self._wrap_methods("spidermw", spidermw.methods)
+        spidermw._output_chain = None
+        spidermw._exception_handlers_from = None
+        itemproc = scraper.itemproc
+        self._wrap_methods("pipelines", itemproc.methods)
+        for batcher in getattr(itemproc, "_batchers", ()):
+            batcher.process_items = self.wrap(
+                f"pipelines/{_method_name(batcher.process_items)}",
+                batcher.process_items,
+            )
+        signal_manager = self.crawler.signals
+        for name in ("send_catch_log", "send_catch_log_deferred"):
+            setattr(
+                signal_manager,
+                name,
+                self._wrap_send_catch_log(getattr(signal_manager, name)),
+            )
+        assert self.crawler.extensions is not None
+        for extension in self.crawler.extensions.middlewares:
+            if isinstance(extension, FeedExporter):
+                self._wrap_exporters(extension.exporters)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the measurements as stats, with times extrapolated to all
+        calls from the sampled ones."""
+        scale = 1 / self.sample_rate
+        stats: Dict[str, Any] = {"profiling/sample_rate": self.sample_rate}
+        for key, key_stats in sorted(self.stats.items()):
+            prefix = f"profiling/{key}"
+            stats[f"{prefix}/samples"] = key_stats.samples
+            stats[f"{prefix}/wall_time"] = round(key_stats.wall_time * scale, 6)
+            stats[f"{prefix}/cpu_time"] = round(key_stats.cpu_time * scale, 6)
+            stats[f"{prefix}/histogram"] = {
+                _histogram_label(i): count
+                for i, count in enumerate(key_stats.histogram)
+                if count
+            }
+        return stats
+
+    def format_stacks(self) -> str:
+        """Return the self time of each stack, in microseconds, in the
+        folded stacks format used by flame graph tools."""
+        scale = 1_000_000 / self.sample_rate
+        return "".join(
+            f"{stack.replace(' ', '_')} {round(time * scale)}\n"
+            for stack, time in sorted(self.stacks.items())
+        )
+
+    def spider_closed(self, spider: Spider) -> None:
+        assert self.crawler.stats is not None
+        for key, value in self.get_stats().items():
+            self.crawler.stats.set_value(key, value, spider=spider)
+        if self.output:
+            Path(self.output).write_text(self.format_stacks(), encoding="utf-8")
+            logger.info(
+                "Stored profiling stacks in %(output)s",
+                {"output": self.output},
+                extra={"spider": spider},
+            )
@@ -30,6 +30,7 @@ from scrapy.crawler import Crawler
 from scrapy.exceptions import NotConfigured
 from scrapy.utils.decorators import defers
 from scrapy.utils.engine import print_engine_status
+from scrapy.utils.memory import print_memory_usage
 from scrapy.utils.reactor import listen_tcp
 from scrapy.utils.trackref import print_live_refs
 
@@ -115,6 +116,7 @@ class TelnetConsole(protocol.ServerFactory):
             "stats": self.crawler.stats,
             "settings": self.crawler.settings,
             "est": lambda: print_engine_status(self.crawler.engine),
+            "mem": lambda: print_memory_usage(self.crawler.engine),
             "p": pprint.pprint,
             "prefs": print_live_refs,
             "help": "This is Scrapy telnet console. For more info see: "
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Optional, Tuple
+from collections import deque
+from time import time
+from typing import TYPE_CHECKING, Any, Deque, Dict, Optional, Set, Tuple
 
 from scrapy import Request, Spider, signals
 from scrapy.core.downloader import Slot
@@ -16,6 +18,34 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+def _percentile(values: Deque[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent))]
+
+
+class _SlotState:
+    """Concurrency control state of a downloader slot."""
+
+    def __init__(self, window: int, max_concurrency: int):
+        self.concurrency: float = 1.0
+        self.max_concurrency: int = max_concurrency
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.times: Deque[float] = deque(maxlen=window)
+        self.min_latency: Optional[float] = None
+        self.last_decrease: float = 0.0
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def throughput(self) -> float:
+        if len(self.times) < 2 or self.times[-1] <= self.times[0]:
+            return 0.0
+        return (len(self.times) - 1) / (self.times[-1] - self.times[0])
+
+
 class AutoThrottle:
     def __init__(self, crawler: Crawler):
         self.crawler: Crawler = crawler
@@ -31,10 +61,32 @@ class AutoThrottle:
                 f"AUTOTHROTTLE_TARGET_CONCURRENCY "
                 f"({self.target_concurrency!r}) must be higher than 0."
             )
+        self.adjust_concurrency: bool = crawler.settings.getbool(
+            "AUTOTHROTTLE_ADJUST_CONCURRENCY"
+        )
+        self.max_concurrency: int = crawler.settings.getint(
+            "AUTOTHROTTLE_MAX_CONCURRENCY"
+        )
+        self.latency_tolerance: float = crawler.settings.getfloat(
+            "AUTOTHROTTLE_LATENCY_TOLERANCE"
+        )
+        self.window: int = crawler.settings.getint("AUTOTHROTTLE_WINDOW")
+        self._slot_states: Dict[str, _SlotState] = {}
+        self._prune_size: int = 1000
+        self._responded: Set[Request] = set()
         crawler.signals.connect(self._spider_opened, signal=signals.spider_opened)
         crawler.signals.connect(
             self._response_downloaded, signal=signals.response_downloaded
         )
+        if self.adjust_concurrency:
+            crawler.signals.connect(
+                self._request_reached_downloader,
+                signal=signals.request_reached_downloader,
+            )
+            crawler.signals.connect(
+                self._request_left_downloader, signal=signals.request_left_downloader
+            )
+            crawler.signals.connect(self._spider_closed, signal=signals.spider_closed)
 
     @classmethod
     def from_crawler(cls, crawler: Crawler) -> Self:
@@ -61,12 +113,23 @@ class AutoThrottle:
         self, response: Response, request: Request, spider: Spider
     ) -> None:
         key, slot = self._get_slot(request, spider)
+        if slot is None or slot.throttle is False:
+            return
+        assert key is not None
+        if self.adjust_concurrency:
+            # Only some download handlers (e.g. not data: or file:) set the
+            # download latency, but the download succeeded regardless.
+            self._responded.add(request)
         latency = request.meta.get("download_latency")
-        if latency is None or slot is None or slot.throttle is False:
+        if latency is None:
             return
 
         olddelay = slot.delay
-        self._adjust_delay(slot, latency, response)
+        if self.adjust_concurrency:
+            error = response.status >= 500 or response.status == 429
+            self._adjust_concurrency(key, slot, latency, error)
+        else:
+            self._adjust_delay(slot, latency, response)
         if self.debug:
             diff = slot.delay - olddelay
             size = len(response.body)
@@ -86,6 +149,61 @@ class AutoThrottle:
                 extra={"spider": spider},
             )
 
+    def _request_reached_downloader(self, request: Request, spider: Spider) -> None:
+        # Called before the downloader starts sending requests of new slots.
+        key, slot = self._get_slot(request, spider)
+        if slot is None or slot.throttle is False:
+            return
+        assert key is not None
+        slot.concurrency = int(self._get_slot_state(key, slot).concurrency)
+
+    def _request_left_downloader(self, request: Request, spider: Spider) -> None:
+        if request in self._responded:
+            self._responded.remove(request)
+            return
+        # The download failed, e.g. because of a timeout.
+        key, slot = self._get_slot(request, spider)
+        if slot is None or slot.throttle is False:
+            return
+        assert key is not None
+        self._adjust_concurrency(key, slot, None, True)
+
+    def _spider_closed(self, spider: Spider) -> None:
+        for key in list(self._slot_states):
+            self._pop_slot_state(key)
+
+    def _get_slot_state(self, key: str, slot: Slot) -> _SlotState:
+        state = self._slot_states.get(key)
+        if state is None:
+            if len(self._slot_states) >= self._prune_size:
+                self._prune_slot_states()
+                self._prune_size = max(1000, 2 * len(self._slot_states))
+            state = _SlotState(self.window, self.max_concurrency or slot.concurrency)
+            self._slot_states[key] = state
+        return state
+
+    def _prune_slot_states(self) -> None:
+        assert self.crawler.engine
+        slots = self.crawler.engine.downloader.slots
+        for key in list(self._slot_states):
+            if key not in slots:
+                self._pop_slot_state(key)
+
+    def _pop_slot_state(self, key: str) -> None:
+        """Remove the state of a slot, storing its final values in stats."""
+        state = self._slot_states.pop(key)
+        assert self.crawler.stats
+        stats: Dict[str, Any] = {
+            "concurrency": int(state.concurrency),
+            "error_rate": round(state.error_rate(), 3),
+            "throughput": round(state.throughput(), 3),
+        }
+        if state.latencies:
+            stats["latency_p50"] = round(_percentile(state.latencies, 0.5), 3)
+            stats["latency_p90"] = round(_percentile(state.latencies, 0.9), 3)
+        for name, value in stats.items():
+            self.crawler.stats.set_value(f"autothrottle/slots/{key}/{name}", value)
+
     def _get_slot(
         self, request: Request, spider: Spider
     ) -> Tuple[Optional[str], Optional[Slot]]:
@@ -121,3 +239,73 @@ class AutoThrottle:
             return
 
         slot.delay = new_delay
+
+    @staticmethod
+    def _can_increase(state: _SlotState) -> bool:
+        """Return ``False`` if a higher concurrency is unlikely to help: the
+        window still has errors, or the slot does not use its current
+        concurrency, i.e. the mean number of requests in flight (throughput
+        times latency, by Little's law) is less than half of it."""
+        if state.error_rate() > 0:
+            return False
+        throughput = state.throughput()
+        if not throughput or len(state.latencies) < 5:
+            return True
+        in_flight = throughput * _percentile(state.latencies, 0.5)
+        return in_flight >= state.concurrency / 2
+
+    def _adjust_concurrency(
+        self, key: str, slot: Slot, latency: Optional[float], error: bool
+    ) -> None:
+        """Adjust the concurrency and delay of a slot with an additive
+        increase, multiplicative decrease (AIMD) policy.
+
+        Errors, and latencies much higher than the lowest latency seen for the
+        slot, decrease the concurrency by half, at most once per round trip.
+        Otherwise, the concurrency increases by one per round trip, unless
+        :meth:`_can_increase` holds it. Once the concurrency is 1, the delay
+        is doubled instead, and it is halved back before increasing the
+        concurrency again.
+        """
+        state = self._get_slot_state(key, slot)
+        now = time()
+        state.outcomes.append(not error)
+        state.times.append(now)
+        congested = error
+        if latency is not None:
+            state.latencies.append(latency)
+            if state.min_latency is None or latency < state.min_latency:
+                state.min_latency = latency
+            else:
+                # Let the baseline follow lasting latency increases.
+                state.min_latency += (latency - state.min_latency) * 0.01
+            if len(state.latencies) >= 5:
+                p90 = _percentile(state.latencies, 0.9)
+                congested = congested or (
+                    p90 > state.min_latency * self.latency_tolerance
+                )
+
+        assert self.crawler.stats
+        if congested:
+            round_trip = _percentile(state.latencies, 0.5) if state.latencies else 0
+            if now - state.last_decrease < round_trip:
+                return
+            state.last_decrease = now
+            if state.concurrency > 1:
+                state.concurrency = max(1.0, state.concurrency / 2)
+            else:
+                state.concurrency = 1.0
+                slot.delay = min(
+                    max(slot.delay * 2, latency or 0, self.mindelay, 0.1),
+                    self.maxdelay,
+                )
+            self.crawler.stats.inc_value("autothrottle/decreases")
+        elif slot.delay > self.mindelay:
+            slot.delay = max(self.mindelay, slot.delay / 2)
+            self.crawler.stats.inc_value("autothrottle/increases")
+        elif state.concurrency < state.max_concurrency and self._can_increase(state):
+            state.concurrency = min(
+                state.concurrency + 1 / state.concurrency, state.max_concurrency
+            )
+            self.crawler.stats.inc_value("autothrottle/increases")
+        slot.concurrency = int(state.concurrency)
@@ -1,9 +1,10 @@
+import heapq
 import re
 import time
 from http.cookiejar import Cookie
 from http.cookiejar import CookieJar as _CookieJar
 from http.cookiejar import DefaultCookiePolicy
-from typing import Sequence
+from typing import List, Optional, Sequence, Tuple
 
 from scrapy import Request
 from scrapy.http import Response
@@ -15,11 +16,71 @@ from scrapy.utils.python import to_unicode
 IPV4_RE = re.compile(r"\.\d+$", re.ASCII)
 
 
+class _CookieStore(_CookieJar):
+    """:class:`http.cookiejar.CookieJar` that keeps a heap of cookie
+    expiration times, so that expired cookies can be removed as they expire
+    instead of scanning all cookies."""
+
+    def __init__(self, policy=None):
+        super().__init__(policy)
+        self._cookies_lock = _DummyLock()
+        self._expirations: List[Tuple[int, str, str, str]] = []
+        # Cookies that are set again get a new entry, and the old one is only
+        # removed once it is due, so the heap is rebuilt when it grows too
+        # much compared to the number of cookies.
+        self._expirations_limit = 1024
+
+    def set_cookie(self, cookie):
+        super().set_cookie(cookie)
+        if cookie.expires is not None:
+            heapq.heappush(
+                self._expirations,
+                (cookie.expires, cookie.domain, cookie.path, cookie.name),
+            )
+            if len(self._expirations) > self._expirations_limit:
+                self._rebuild_expirations()
+
+    def _rebuild_expirations(self):
+        self._expirations = [
+            (cookie.expires, cookie.domain, cookie.path, cookie.name)
+            for cookie in self
+            if cookie.expires is not None
+        ]
+        heapq.heapify(self._expirations)
+        self._expirations_limit = 2 * len(self._expirations) + 1024
+
+    def next_expiration(self) -> Optional[int]:
+        """Return the expiration time of the cookie that expires first, or
+        ``None`` if no cookie expires."""
+        if not self._expirations:
+            return None
+        return self._expirations[0][0]
+
+    def clear_expired_cookies(self):
+        now = time.time()
+        expirations = self._expirations
+        while expirations and expirations[0][0] <= now:
+            expires, domain, path, name = heapq.heappop(expirations)
+            try:
+                cookie = self._cookies[domain][path][name]
+            except KeyError:
+                continue
+            if cookie.expires != expires:
+                continue  # the cookie was set again
+            paths = self._cookies[domain]
+            del paths[path][name]
+            if not paths[path]:
+                del paths[path]
+                if not paths:
+                    del self._cookies[domain]
+
+
 class CookieJar:
     def __init__(self, policy=None, check_expired_frequency=10000):
         self.policy = policy or DefaultCookiePolicy()
-        self.jar = _CookieJar(self.policy)
-        self.jar._cookies_lock = _DummyLock()
+        self.jar = _CookieStore(self.policy)
+        # Expired cookies are now removed as they expire, check_expired_frequency
+        # is kept for backward compatibility.
         self.check_expired_frequency = check_expired_frequency
         self.processed = 0
 
@@ -56,8 +117,8 @@ class CookieJar:
                 wreq.add_unredirected_header("Cookie", "; ".join(attrs))
 
         self.processed += 1
-        if self.processed % self.check_expired_frequency == 0:
-            # This is still quite inefficient for large number of cookies
+        next_expiration = self.jar.next_expiration()
+        if next_expiration is not None and next_expiration <= self.jar._now:
             self.jar.clear_expired_cookies()
 
     @property
@@ -16,7 +16,7 @@ from typing import (
 
 from w3lib.http import headers_dict_to_raw
 
-from scrapy.utils.datatypes import CaseInsensitiveDict, CaselessDict
+from scrapy.utils.datatypes import CaseInsensitiveDict, CaselessDict, LocalCache
 from scrapy.utils.python import to_unicode
 
 if TYPE_CHECKING:
@@ -26,12 +26,18 @@ if TYPE_CHECKING:
 
 _RawValueT = Union[bytes, str, int]
 
+#: Normalized header names, by header name. Header names come from a small
+#: vocabulary, so normalizing them once saves work on every header access.
+_normalized_keys: LocalCache[Union[str, bytes], bytes] = LocalCache(limit=1000)
+
 
 # isn't fully compatible typing-wise with either dict or CaselessDict,
 # but it needs refactoring anyway, see also https://github.com/scrapy/scrapy/pull/5146
 class Headers(CaselessDict):
     """Case insensitive http headers dictionary"""
 
+    __slots__ = ("encoding",)
+
     def __init__(
         self,
         seq: Union[Mapping[AnyStr, Any], Iterable[Tuple[AnyStr, Any]], None] = None,
@@ -40,25 +46,63 @@ class Headers(CaselessDict):
         self.encoding: str = encoding
         super().__init__(seq)
 
+    @classmethod
+    def from_raw_headers(
+        cls, seq: Iterable[Tuple[bytes, Iterable[bytes]]], encoding: str = "utf-8"
+    ) -> Self:
+        """Return headers built from ``(name, values)`` pairs, where *values*
+        are already :class:`bytes`, e.g. those returned by
+        :meth:`twisted.web.http_headers.Headers.getAllRawHeaders`.
+
+        Values are not validated.
+        """
+        headers = cls(encoding=encoding)
+        headers._update_raw(seq)
+        return headers
+
+    def _update_raw(self, seq: Iterable[Tuple[AnyStr, Iterable[bytes]]]) -> None:
+        normkey = self.normkey
+        for k, v in seq:
+            key = normkey(k)
+            if dict.__contains__(self, key):
+                dict.__getitem__(self, key).extend(v)
+            else:
+                dict.__setitem__(self, key, list(v))
+
     def update(  # type: ignore[override]
         self, seq: Union[Mapping[AnyStr, Any], Iterable[Tuple[AnyStr, Any]]]
     ) -> None:
+        if type(seq) is type(self):  # pylint: disable=unidiomatic-typecheck
+            # Already normalized, only the value lists need to be copied.
+            items = dict.items(cast(Dict[bytes, List[bytes]], seq))
+            dict.update(self, cast(Any, ((k, list(v)) for k, v in items)))
+            return
         seq = seq.items() if isinstance(seq, Mapping) else seq
         iseq: Dict[bytes, List[bytes]] = {}
         for k, v in seq:
             iseq.setdefault(self.normkey(k), []).extend(self.normvalue(v))
-        super().update(iseq)
+        dict.update(self, cast(Any, iseq))
 
     def normkey(self, key: AnyStr) -> bytes:  # type: ignore[override]
         """Normalize key to bytes"""
-        return self._tobytes(key.title())
+        try:
+            return _normalized_keys[key]
+        except KeyError:
+            pass
+        normkey = self._tobytes(key.title())
+        # Non-ASCII str keys depend on the encoding, so they are not cached.
+        if isinstance(key, bytes) or key.isascii():
+            _normalized_keys[key] = normkey
+        return normkey
 
     def normvalue(self, value: Union[_RawValueT, Iterable[_RawValueT]]) -> List[bytes]:
         """Normalize values to bytes"""
         _value: Iterable[_RawValueT]
+        if isinstance(value, bytes):
+            return [value]
         if value is None:
             _value = []
-        elif isinstance(value, (str, bytes)):
+        elif isinstance(value, str):
             _value = [value]
         elif hasattr(value, "__iter__"):
             _value = value
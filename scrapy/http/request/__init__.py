@@ -30,7 +30,7 @@ from scrapy.http.headers import Headers
 from scrapy.utils.curl import curl_to_request_kwargs
 from scrapy.utils.python import to_bytes
 from scrapy.utils.trackref import object_ref
-from scrapy.utils.url import escape_ajax
+from scrapy.utils.url import TrustedURL, escape_ajax
 
 RequestTypeVar = TypeVar("RequestTypeVar", bound="Request")
 
@@ -64,6 +64,26 @@ class Request(object_ref):
     executed by the Downloader, thus generating a :class:`Response`.
     """
 
+    # Slots make requests smaller and faster to create; ``__dict__`` keeps
+    # supporting arbitrary attributes, and ``__weakref__`` trackref.
+    __slots__ = (
+        "_encoding",
+        "method",
+        "_url",
+        "_body",
+        "priority",
+        "callback",
+        "errback",
+        "cookies",
+        "_headers",
+        "dont_filter",
+        "_meta",
+        "_cb_kwargs",
+        "flags",
+        "__dict__",
+        "__weakref__",
+    )
+
     attributes: Tuple[str, ...] = (
         "url",
         "callback",
@@ -121,7 +141,10 @@ class Request(object_ref):
         self.errback: Optional[Callable] = errback
 
         self.cookies: Union[dict, List[dict]] = cookies or {}
-        self.headers: Headers = Headers(headers or {}, encoding=encoding)
+        # Headers are only built when needed, e.g. not for duplicate requests.
+        self._headers: Optional[Headers] = (
+            Headers(headers, encoding=encoding) if headers else None
+        )
         self.dont_filter: bool = dont_filter
 
         self._meta: Optional[Dict[str, Any]] = dict(meta) if meta else None
@@ -142,16 +165,30 @@ class Request(object_ref):
             self._meta = {}
         return self._meta
 
+    @property
+    def headers(self) -> Headers:
+        if self._headers is None:
+            self._headers = Headers(encoding=self._encoding)
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: Headers) -> None:
+        self._headers = value
+
     @property
     def url(self) -> str:
         return self._url
 
     def _set_url(self, url: str) -> None:
-        if not isinstance(url, str):
+        if type(url) is TrustedURL:  # pylint: disable=unidiomatic-typecheck
+            s = str(url)
+        elif isinstance(url, str):
+            s = safe_url_string(url, self.encoding)
+        else:
             raise TypeError(f"Request url must be str, got {type(url).__name__}")
 
-        s = safe_url_string(url, self.encoding)
-        self._url = escape_ajax(s)
+        # escape_ajax only changes URLs with a #! fragment.
+        self._url = escape_ajax(s) if "#!" in s else s
 
         if (
             "://" not in self._url
@@ -242,7 +279,7 @@ class Request(object_ref):
                 if callable(self.errback)
                 else self.errback
             ),
-            "headers": dict(self.headers),
+            "headers": dict(self._headers) if self._headers else {},
         }
         for attr in self.attributes:
             d.setdefault(attr, getattr(self, attr))
@@ -32,6 +32,7 @@ from scrapy.http.headers import Headers
 from scrapy.http.request import Request
 from scrapy.link import Link
 from scrapy.utils.trackref import object_ref
+from scrapy.utils.url import TrustedURL
 
 if TYPE_CHECKING:
     from scrapy.selector import SelectorList
@@ -209,7 +210,12 @@ class Response(object_ref):
             url = url.url
         elif url is None:
             raise ValueError("url can't be None")
-        url = self.urljoin(url)
+        # Absolute trusted URLs, e.g. from link extractors, are kept as they
+        # are so that Request does not normalize them again.
+        if (
+            type(url) is not TrustedURL or "://" not in url
+        ):  # pylint: disable=unidiomatic-typecheck
+            url = self.urljoin(url)
 
         return Request(
             url=url,
@@ -7,11 +7,14 @@ import operator
 from functools import partial
 from urllib.parse import urljoin, urlparse
 
-from lxml import etree  # nosec
+from lxml import etree, html  # nosec
 from parsel.csstranslator import HTMLTranslator
+from parsel.selector import create_root_node
+from w3lib.html import get_base_url as _get_base_url_from_text
 from w3lib.html import strip_html5_whitespace
 from w3lib.url import canonicalize_url, safe_url_string
 
+from scrapy.http import HtmlResponse
 from scrapy.link import Link
 from scrapy.linkextractors import (
     IGNORED_EXTENSIONS,
@@ -20,10 +23,16 @@ from scrapy.linkextractors import (
     _re_type,
     re,
 )
+from scrapy.utils.datatypes import LocalCache
 from scrapy.utils.misc import arg_to_iter, rel_has_nofollow
 from scrapy.utils.python import unique as unique_list
 from scrapy.utils.response import get_base_url
-from scrapy.utils.url import url_has_any_extension, url_is_from_any_domain
+from scrapy.utils.url import (
+    DomainSet,
+    TrustedURL,
+    url_has_any_extension,
+    url_is_from_any_domain,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +41,13 @@ XHTML_NAMESPACE = "http://www.w3.org/1999/xhtml"
 
 _collect_string_content = etree.XPath("string()")
 
+#: EXSLT namespaces that :class:`~scrapy.Selector` makes available to XPath
+#: expressions, so that ``restrict_xpaths`` work the same in fast mode.
+_XPATH_NAMESPACES = {
+    "re": "http://exslt.org/regular-expressions",
+    "set": "http://exslt.org/sets",
+}
+
 
 def _nons(tag):
     if isinstance(tag, str):
@@ -127,6 +143,179 @@ class LxmlParserLinkExtractor:
         return links
 
 
+# Characters that make urljoin() change an absolute URL: params, empty
+# queries and fragments, which are dropped, as well as characters that
+# urlsplit() removes or validates.
+_UNSTABLE_URL_RE = re.compile(r";|\?(#|$)|#$|[\t\n\r\[\]]")
+# Characters that make urljoin() do more than concatenating a relative URL to
+# the base URL: those above, plus dot segments and empty segments.
+_COMPLEX_URL_RE = re.compile(r"/\.|//|;|\?(#|$)|#$|[\t\n\r\[\]]")
+
+
+class _UrlJoiner:
+    """Equivalent of ``urljoin(base_url, url)`` that parses *base_url* only
+    once, and returns the most common kinds of URLs (absolute URLs, and
+    relative URLs without dot segments) without parsing them."""
+
+    __slots__ = ("base_url", "origin", "directory")
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.origin = None
+        self.directory = None
+        scheme, netloc, path, _, _, _ = urlparse(base_url)
+        if (
+            scheme in ("http", "https")
+            and netloc
+            and base_url.startswith(f"{scheme}://{netloc}")
+            and not _COMPLEX_URL_RE.search(path)
+        ):
+            self.origin = f"{scheme}://{netloc}"
+            self.directory = self.origin + (path[: path.rfind("/") + 1] or "/")
+
+    def join(self, url):
+        if self.origin is None or not url or url[0] <= " ":
+            return urljoin(self.base_url, url)
+        if url.startswith(("http://", "https://")):
+            netloc_start = url.index("//") + 2
+            if url[netloc_start : netloc_start + 1] not in (
+                "",
+                "/",
+                "?",
+                "#",
+            ) and not _UNSTABLE_URL_RE.search(url):
+                return url
+        elif ":" not in url and not _COMPLEX_URL_RE.search(url):
+            if url[0] == "/":
+                return self.origin + url
+            if url[0] not in "?#.":
+                return self.directory + url
+        return urljoin(self.base_url, url)
+
+
+class _FastLxmlParserLinkExtractor(LxmlParserLinkExtractor):
+    """:class:`LxmlParserLinkExtractor` variant used by
+    ``LxmlLinkExtractor(fast=True)``."""
+
+    def __init__(
+        self,
+        tags=("a",),
+        attrs=("href",),
+        process=None,
+        unique=False,
+        strip=True,
+        canonicalized=False,
+        collect_text=True,
+    ):
+        tags, attrs = set(arg_to_iter(tags)), set(arg_to_iter(attrs))
+        super().__init__(
+            tag=partial(operator.contains, tags),
+            attr=partial(operator.contains, attrs),
+            process=process,
+            unique=unique,
+            strip=strip,
+            canonicalized=canonicalized,
+        )
+        self.tags = tuple(tags) + tuple(f"{{{XHTML_NAMESPACE}}}{tag}" for tag in tags)
+        self.attrs = attrs
+        self.collect_text = collect_text
+        # links in page headers, footers and menus are repeated in many
+        # pages, so their normalization is cached
+        self._safe_urls = LocalCache(limit=10000)
+        self._link_keys = LocalCache(limit=10000)
+
+    def _iter_links(self, document):
+        attrs = self.attrs
+        for el in document.iter(*self.tags):
+            for attrib, value in el.items():
+                if attrib in attrs:
+                    yield (el, attrib, value)
+
+    def _safe_url_string(self, url, encoding):
+        key = (url, encoding)
+        try:
+            return self._safe_urls[key]
+        except KeyError:
+            pass
+        self._safe_urls[key] = safe_url = safe_url_string(url, encoding=encoding)
+        return safe_url
+
+    def _link_key(self, link):
+        try:
+            return self._link_keys[link.url]
+        except KeyError:
+            pass
+        self._link_keys[link.url] = key = self.link_key(link)
+        return key
+
+    def _deduplicate_if_needed(self, links):
+        if self.unique:
+            return unique_list(links, key=self._link_key)
+        return links
+
+    def _extract_links(self, selector, response_url, response_encoding, base_url):
+        return self._extract_links_from_root(
+            selector.root, response_url, response_encoding, base_url
+        )
+
+    def _extract_links_from_root(self, root, response_url, response_encoding, base_url):
+        base_joiner = _UrlJoiner(base_url)
+        response_joiner = (
+            base_joiner if base_url == response_url else _UrlJoiner(response_url)
+        )
+        process_attr = self.process_attr if self.process_attr is not _identity else None
+        seen = set() if self.unique else None
+        links = []
+        for el, attr, attr_val in self._iter_links(root):
+            # links with the same value would be deduplicated later anyway
+            if seen is not None:
+                if attr_val in seen:
+                    continue
+                seen.add(attr_val)
+            try:
+                if self.strip:
+                    attr_val = strip_html5_whitespace(attr_val)
+                url = base_joiner.join(attr_val)
+            except ValueError:
+                continue  # skipping bogus links
+            if process_attr is not None:
+                url = process_attr(url)
+                if url is None:
+                    continue
+            try:
+                url = self._safe_url_string(url, response_encoding)
+            except ValueError:
+                logger.debug(f"Skipping extraction of link with bad URL {url!r}")
+                continue
+            url = response_joiner.join(url)
+            text = (_collect_string_content(el) or "") if self.collect_text else ""
+            links.append(Link(url, text, nofollow=rel_has_nofollow(el.get("rel"))))
+        return self._deduplicate_if_needed(links)
+
+
+def _get_root(response):
+    """Return the root element of *response*, parsing its body directly
+    instead of building a :class:`~scrapy.Selector` if the response has not
+    been parsed yet."""
+    if response._cached_selector is not None or not isinstance(response, HtmlResponse):
+        return response.selector.root
+    try:
+        return create_root_node(
+            "", html.HTMLParser, body=response.body, encoding=response.encoding
+        )
+    except LookupError:  # encoding unknown to lxml
+        return response.selector.root
+
+
+def _get_base_url(response):
+    """Equivalent of :func:`~scrapy.utils.response.get_base_url` that does
+    not decode the whole response body if it has not been decoded yet."""
+    if response._cached_ubody is not None:
+        return get_base_url(response)
+    text = response.body[:4096].decode(response.encoding, errors="ignore")
+    return _get_base_url_from_text(text, response.url, response.encoding)
+
+
 class LxmlLinkExtractor:
     _csstranslator = HTMLTranslator()
 
@@ -146,16 +335,29 @@ class LxmlLinkExtractor:
         restrict_css=(),
         strip=True,
         restrict_text=None,
+        fast=False,
     ):
         tags, attrs = set(arg_to_iter(tags)), set(arg_to_iter(attrs))
-        self.link_extractor = LxmlParserLinkExtractor(
-            tag=partial(operator.contains, tags),
-            attr=partial(operator.contains, attrs),
-            unique=unique,
-            process=process_value,
-            strip=strip,
-            canonicalized=canonicalize,
-        )
+        self.fast = fast
+        if fast:
+            self.link_extractor = _FastLxmlParserLinkExtractor(
+                tags=tags,
+                attrs=attrs,
+                unique=unique,
+                process=process_value,
+                strip=strip,
+                canonicalized=canonicalize,
+                collect_text=bool(restrict_text),
+            )
+        else:
+            self.link_extractor = LxmlParserLinkExtractor(
+                tag=partial(operator.contains, tags),
+                attr=partial(operator.contains, attrs),
+                unique=unique,
+                process=process_value,
+                strip=strip,
+                canonicalized=canonicalize,
+            )
         self.allow_res = [
             x if isinstance(x, _re_type) else re.compile(x) for x in arg_to_iter(allow)
         ]
@@ -163,8 +365,8 @@ class LxmlLinkExtractor:
             x if isinstance(x, _re_type) else re.compile(x) for x in arg_to_iter(deny)
         ]
 
-        self.allow_domains = set(arg_to_iter(allow_domains))
-        self.deny_domains = set(arg_to_iter(deny_domains))
+        self.allow_domains = DomainSet(arg_to_iter(allow_domains))
+        self.deny_domains = DomainSet(arg_to_iter(deny_domains))
 
         self.restrict_xpaths = tuple(arg_to_iter(restrict_xpaths))
         self.restrict_xpaths += tuple(
@@ -220,7 +422,15 @@ class LxmlLinkExtractor:
         links = [x for x in links if self._link_allowed(x)]
         if self.canonicalize:
             for link in links:
-                link.url = canonicalize_url(link.url)
+                link.url = TrustedURL(canonicalize_url(link.url))
+        else:
+            # URLs are safe already, so requests do not need to process them
+            # again.
+            for link in links:
+                link.url = TrustedURL(link.url)
+        if self.fast:
+            # links were deduplicated on extraction already
+            return links
         links = self.link_extractor._process_links(links)
         return links
 
@@ -237,6 +447,8 @@ class LxmlLinkExtractor:
         Duplicate links are omitted if the ``unique`` attribute is set to ``True``,
         otherwise they are returned.
         """
+        if self.fast:
+            return self._extract_links_fast(response)
         base_url = get_base_url(response)
         if self.restrict_xpaths:
             docs = [
@@ -251,3 +463,25 @@ class LxmlLinkExtractor:
         if self.link_extractor.unique:
             return unique_list(all_links)
         return all_links
+
+    def _extract_links_fast(self, response):
+        root = _get_root(response)
+        base_url = _get_base_url(response)
+        if self.restrict_xpaths:
+            docs = [
+                subdoc
+                for x in self.restrict_xpaths
+                for subdoc in root.xpath(x, namespaces=_XPATH_NAMESPACES)
+                if isinstance(subdoc, etree._Element)
+            ]
+        else:
+            docs = [root]
+        all_links = []
+        for doc in docs:
+            links = self.link_extractor._extract_links_from_root(
+                doc, response.url, response.encoding, base_url
+            )
+            all_links.extend(self._process_links(links))
+        if self.link_extractor.unique:
+            return unique_list(all_links)
+        return all_links
@@ -4,9 +4,13 @@ Item pipeline
 See documentation in docs/item-pipeline.rst
 """
 
-from typing import Any, List
+from __future__ import annotations
 
-from twisted.internet.defer import Deferred
+from typing import Any, Callable, List, Optional, Tuple
+
+from twisted.internet.base import DelayedCall
+from twisted.internet.defer import Deferred, DeferredSemaphore, maybeDeferred
+from twisted.python.failure import Failure
 
 from scrapy import Spider
 from scrapy.middleware import MiddlewareManager
@@ -14,19 +18,150 @@ from scrapy.utils.conf import build_component_list
 from scrapy.utils.defer import deferred_f_from_coro_f
 
 
+class _ItemBatcher:
+    """Groups items into batches for the ``process_items`` method of a
+    pipeline, sent once there are *batch_size* items or *batch_timeout*
+    seconds after the first item of the batch."""
+
+    def __init__(
+        self,
+        process_items: Callable,
+        batch_size: int,
+        batch_timeout: float,
+        semaphore: Optional[DeferredSemaphore] = None,
+    ):
+        self.process_items: Callable = deferred_f_from_coro_f(process_items)
+        self.batch_size: int = batch_size
+        self.batch_timeout: float = batch_timeout
+        self.semaphore: Optional[DeferredSemaphore] = semaphore
+        self.pending: List[Tuple[Any, Deferred]] = []
+        self.spider: Optional[Spider] = None
+        self._timer: Optional[DelayedCall] = None
+
+    def __call__(self, item: Any, spider: Spider) -> Deferred:
+        from twisted.internet import reactor
+
+        dfd: Deferred = Deferred()
+        self.pending.append((item, dfd))
+        self.spider = spider
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = reactor.callLater(self.batch_timeout, self.flush)
+        return dfd
+
+    def flush(self) -> None:
+        """Send pending items to ``process_items`` right away."""
+        if self._timer is not None:
+            if self._timer.active():
+                self._timer.cancel()
+            self._timer = None
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        items = [item for item, _ in batch]
+        if self.semaphore is not None:
+            dfd = self.semaphore.run(self.process_items, items, self.spider)
+        else:
+            dfd = maybeDeferred(self.process_items, items, self.spider)
+        dfd.addBoth(self._batch_processed, batch)
+
+    def _batch_processed(self, result: Any, batch: List[Tuple[Any, Deferred]]) -> None:
+        if not isinstance(result, (Failure, list, tuple)):
+            result = Failure(
+                TypeError(
+                    f"process_items() must return a list, got "
+                    f"{type(result).__name__}"
+                )
+            )
+        elif not isinstance(result, Failure) and len(result) != len(batch):
+            result = Failure(
+                ValueError(
+                    f"process_items() must return one result per item, got "
+                    f"{len(result)} results for {len(batch)} items"
+                )
+            )
+        if isinstance(result, Failure):
+            for _, dfd in batch:
+                dfd.errback(result)
+            return
+        for (_, dfd), item_result in zip(batch, result):
+            if isinstance(item_result, Exception):
+                dfd.errback(Failure(item_result))
+            else:
+                dfd.callback(item_result)
+
+
 class ItemPipelineManager(MiddlewareManager):
     component_name = "item pipeline"
 
+    def __init__(self, *middlewares: Any) -> None:
+        self._semaphores: List[DeferredSemaphore] = []
+        self._batchers: List[_ItemBatcher] = []
+        super().__init__(*middlewares)
+
     @classmethod
     def _get_mwlist_from_settings(cls, settings) -> List[Any]:
         return build_component_list(settings.getwithbase("ITEM_PIPELINES"))
 
     def _add_middleware(self, pipe: Any) -> None:
         super()._add_middleware(pipe)
-        if hasattr(pipe, "process_item"):
-            self.methods["process_item"].append(
-                deferred_f_from_coro_f(pipe.process_item)
+        semaphore: Optional[DeferredSemaphore] = None
+        max_concurrent_items = getattr(pipe, "max_concurrent_items", None)
+        if max_concurrent_items:
+            semaphore = DeferredSemaphore(max_concurrent_items)
+            self._semaphores.append(semaphore)
+        if hasattr(pipe, "process_items"):
+            batch_size = getattr(pipe, "item_batch_size", 100)
+            if not isinstance(batch_size, int) or batch_size < 1:
+                raise ValueError(
+                    f"{type(pipe).__name__}.item_batch_size must be a positive "
+                    f"integer, got {batch_size!r}"
+                )
+            batch_timeout = getattr(pipe, "item_batch_timeout", 1.0)
+            if not isinstance(batch_timeout, (int, float)) or batch_timeout < 0:
+                raise ValueError(
+                    f"{type(pipe).__name__}.item_batch_timeout must be a "
+                    f"non-negative number, got {batch_timeout!r}"
+                )
+            batcher = _ItemBatcher(
+                pipe.process_items,
+                batch_size=batch_size,
+                batch_timeout=batch_timeout,
+                semaphore=semaphore,
             )
+            self._batchers.append(batcher)
+            self.methods["process_item"].append(batcher)
+        elif hasattr(pipe, "process_item"):
+            process_item = deferred_f_from_coro_f(pipe.process_item)
+            if semaphore is not None:
+                self.methods["process_item"].append(
+                    self._limit_concurrency(process_item, semaphore)
+                )
+            else:
+                self.methods["process_item"].append(process_item)
+
+    @staticmethod
+    def _limit_concurrency(
+        process_item: Callable, semaphore: DeferredSemaphore
+    ) -> Callable:
+        def limited_process_item(item: Any, spider: Spider) -> Deferred:
+            return semaphore.run(process_item, item, spider)
+
+        return limited_process_item
 
     def process_item(self, item: Any, spider: Spider) -> Deferred:
         return self._process_chain("process_item", item, spider)
+
+    def needs_backout(self) -> bool:
+        """Return ``True`` if a pipeline with ``max_concurrent_items`` has
+        as many items, or batches of items, waiting as it can process at
+        once."""
+        return any(
+            len(semaphore.waiting) >= semaphore.limit for semaphore in self._semaphores
+        )
+
+    def close_spider(self, spider: Spider) -> Deferred:
+        for batcher in self._batchers:
+            batcher.flush()
+        return super().close_spider(spider)
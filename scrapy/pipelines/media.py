@@ -10,6 +10,7 @@ from scrapy.settings import Settings
 from scrapy.utils.datatypes import SequenceExclude
 from scrapy.utils.defer import defer_result, mustbe_deferred
 from scrapy.utils.log import failure_to_exc_info
+from scrapy.utils.memory import estimate_collection_size
 from scrapy.utils.misc import arg_to_iter
 
 logger = logging.getLogger(__name__)
@@ -79,6 +80,16 @@ class MediaPipeline:
     def open_spider(self, spider):
         self.spiderinfo = self.SpiderInfo(spider)
 
+    def memory_usage(self):
+        """Return the estimated memory used by the cache of media download
+        results, in bytes."""
+        info = getattr(self, "spiderinfo", None)
+        if info is None:
+            return 0
+        return estimate_collection_size(info.downloaded) + estimate_collection_size(
+            info.downloading
+        )
+
     def process_item(self, item, spider):
         info = self.spiderinfo
         requests = arg_to_iter(self.get_media_requests(item, info))
@@ -0,0 +1,322 @@
+"""
+SQL Pipeline
+
+Stores items in a SQL database, in batches, from a dedicated writer thread.
+
+See documentation in topics/item-pipeline.rst
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+from itemadapter import ItemAdapter
+from twisted.internet import threads
+from twisted.internet.defer import Deferred
+from twisted.python.failure import Failure
+from twisted.python.threadpool import ThreadPool
+
+from scrapy import Spider
+from scrapy.exceptions import NotConfigured
+from scrapy.settings import BaseSettings
+from scrapy.utils.misc import load_object
+
+if TYPE_CHECKING:
+    # typing.Self requires Python 3.11
+    from typing_extensions import Self
+
+    from scrapy.crawler import Crawler
+
+
+logger = logging.getLogger(__name__)
+
+
+Row = Dict[str, Any]
+
+
+class DBAPIBackend:
+    """Writes rows to a table of a database through a DB-API 2.0
+    connection.
+
+    Subclasses must implement :meth:`connect`, and may override
+    :attr:`placeholder`, :attr:`transient_errors` and the methods that
+    build SQL statements for their database.
+
+    All methods but :meth:`from_settings` and :meth:`is_transient` are
+    called from the writer thread of the pipeline.
+    """
+
+    #: The placeholder for parameters in SQL statements, which depends on the
+    #: ``paramstyle`` of the DB-API module.
+    placeholder: str = "?"
+
+    #: Exceptions after which writing a batch is retried.
+    transient_errors: Tuple[Type[BaseException], ...] = ()
+
+    def __init__(self, database: str, table: str, upsert_keys: Sequence[str] = ()):
+        self.database: str = database
+        self.table: str = table
+        self.upsert_keys: List[str] = list(upsert_keys)
+        self.connection: Any = None
+        self.columns: Set[str] = set()
+
+    @classmethod
+    def from_settings(cls, settings: BaseSettings) -> Self:
+        return cls(
+            database=settings["SQL_PIPELINE_DATABASE"],
+            table=settings["SQL_PIPELINE_TABLE"],
+            upsert_keys=settings.getlist("SQL_PIPELINE_UPSERT_KEYS"),
+        )
+
+    def connect(self) -> Any:
+        """Return a new DB-API connection to :attr:`database`."""
+        raise NotImplementedError
+
+    def is_transient(self, exception: BaseException) -> bool:
+        return isinstance(exception, self.transient_errors)
+
+    def quote(self, name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def get_existing_columns(self) -> Set[str]:
+        """Return the columns of :attr:`table`, or an empty set if it does
+        not exist."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SELECT * FROM {self.quote(self.table)} WHERE 1 = 0")
+        except Exception:
+            self.connection.rollback()
+            return set()
+        else:
+            return {column[0] for column in cursor.description}
+        finally:
+            cursor.close()
+
+    def create_table_sql(self, columns: Iterable[str]) -> str:
+        columns_sql = ", ".join(self.quote(column) for column in columns)
+        return f"CREATE TABLE IF NOT EXISTS {self.quote(self.table)} ({columns_sql})"
+
+    def add_column_sql(self, column: str) -> str:
+        return f"ALTER TABLE {self.quote(self.table)} ADD COLUMN {self.quote(column)}"
+
+    def create_index_sql(self) -> str:
+        index = self.quote(f"{self.table}_upsert_keys")
+        keys_sql = ", ".join(self.quote(key) for key in self.upsert_keys)
+        return (
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {index} "
+            f"ON {self.quote(self.table)} ({keys_sql})"
+        )
+
+    def insert_sql(self, columns: Sequence[str]) -> str:
+        columns_sql = ", ".join(self.quote(column) for column in columns)
+        values_sql = ", ".join(self.placeholder for _ in columns)
+        sql = (
+            f"INSERT INTO {self.quote(self.table)} ({columns_sql}) "
+            f"VALUES ({values_sql})"
+        )
+        if not self.upsert_keys:
+            return sql
+        keys_sql = ", ".join(self.quote(key) for key in self.upsert_keys)
+        updates = [
+            f"{self.quote(column)} = excluded.{self.quote(column)}"
+            for column in columns
+            if column not in self.upsert_keys
+        ]
+        if not updates:
+            return f"{sql} ON CONFLICT ({keys_sql}) DO NOTHING"
+        return f"{sql} ON CONFLICT ({keys_sql}) DO UPDATE SET {', '.join(updates)}"
+
+    def _ensure_columns(self, cursor: Any, columns: Sequence[str]) -> None:
+        checked = bool(self.columns)
+        if not checked:
+            self.columns = self.get_existing_columns()
+            if not self.columns:
+                initial = list(dict.fromkeys([*self.upsert_keys, *columns]))
+                cursor.execute(self.create_table_sql(initial))
+                self.columns = set(initial)
+        for column in [*self.upsert_keys, *columns]:
+            if column not in self.columns:
+                cursor.execute(self.add_column_sql(column))
+                self.columns.add(column)
+        if not checked and self.upsert_keys:
+            # An existing table may lack the index, e.g. if it was created
+            # without upsert keys.
+            cursor.execute(self.create_index_sql())
+
+    def write(self, rows: List[Row]) -> None:
+        """Insert or upsert *rows* in a single transaction."""
+        if self.connection is None:
+            self.connection = self.connect()
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        cursor = self.connection.cursor()
+        try:
+            self._ensure_columns(cursor, columns)
+            cursor.executemany(
+                self.insert_sql(columns),
+                [tuple(row.get(column) for column in columns) for row in rows],
+            )
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            # The table may not have been created after all.
+            self.columns = set()
+            raise
+        finally:
+            cursor.close()
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class SQLiteBackend(DBAPIBackend):
+    """Writes rows to a table of a SQLite database file."""
+
+    transient_errors = (sqlite3.OperationalError,)
+
+    def is_transient(self, exception: BaseException) -> bool:
+        # Other operational errors, e.g. a full disk or a missing table, are
+        # not fixed by retrying.
+        if not super().is_transient(exception):
+            return False
+        message = str(exception).lower()
+        return "locked" in message or "busy" in message
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.database)
+
+
+class SQLPipeline:
+    """Stores items in batches in the table of a SQL database given by the
+    :setting:`SQL_PIPELINE_BACKEND`, :setting:`SQL_PIPELINE_DATABASE` and
+    :setting:`SQL_PIPELINE_TABLE` settings.
+
+    Batches are written one at a time from a dedicated thread, so that
+    writing does not block the reactor."""
+
+    max_concurrent_items = 1
+
+    def __init__(
+        self,
+        backend: DBAPIBackend,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        retry_times: int = 3,
+        retry_delay: float = 1.0,
+        crawler: Optional[Crawler] = None,
+    ):
+        self.backend: DBAPIBackend = backend
+        self.item_batch_size: int = batch_size
+        self.item_batch_timeout: float = flush_interval
+        self.retry_times: int = retry_times
+        self.retry_delay: float = retry_delay
+        self.crawler: Optional[Crawler] = crawler
+        self.threadpool: Optional[ThreadPool] = None
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        settings = crawler.settings
+        if not settings["SQL_PIPELINE_DATABASE"]:
+            raise NotConfigured("SQL_PIPELINE_DATABASE is not set")
+        backend_cls = load_object(settings["SQL_PIPELINE_BACKEND"])
+        return cls(
+            backend_cls.from_settings(settings),
+            batch_size=settings.getint("SQL_PIPELINE_BATCH_SIZE"),
+            flush_interval=settings.getfloat("SQL_PIPELINE_FLUSH_INTERVAL"),
+            retry_times=settings.getint("SQL_PIPELINE_RETRY_TIMES"),
+            retry_delay=settings.getfloat("SQL_PIPELINE_RETRY_DELAY"),
+            crawler=crawler,
+        )
+
+    def open_spider(self, spider: Spider) -> None:
+        self.threadpool = ThreadPool(minthreads=1, maxthreads=1, name="sql-pipeline")
+        self.threadpool.start()
+
+    def close_spider(self, spider: Spider) -> Deferred:
+        dfd = self._call_in_thread(self.backend.close)
+        dfd.addBoth(self._stop_threadpool)
+        return dfd
+
+    def _stop_threadpool(self, result: Any) -> Any:
+        assert self.threadpool is not None
+        self.threadpool.stop()
+        return result
+
+    def _call_in_thread(self, f: Any, *args: Any) -> Deferred:
+        from twisted.internet import reactor
+
+        assert self.threadpool is not None
+        return threads.deferToThreadPool(reactor, self.threadpool, f, *args)
+
+    def _inc_stats(self, key: str, count: int = 1) -> None:
+        if self.crawler is not None and self.crawler.stats is not None:
+            self.crawler.stats.inc_value(f"sql_pipeline/{key}", count)
+
+    def item_to_row(self, item: Any) -> Row:
+        """Return the row to store for *item*. Values that are not strings,
+        numbers, bytes or ``None`` are stored as JSON."""
+        row = {}
+        for key, value in ItemAdapter(item).items():
+            if not isinstance(value, (str, int, float, bytes, type(None))):
+                value = json.dumps(value, default=str)
+            row[key] = value
+        return row
+
+    def process_items(self, items: List[Any], spider: Spider) -> Deferred:
+        rows = [self.item_to_row(item) for item in items]
+        return self._write(rows, spider).addCallback(lambda _: items)
+
+    def _write(self, rows: List[Row], spider: Spider, attempt: int = 0) -> Deferred:
+        dfd = self._call_in_thread(self.backend.write, rows)
+        dfd.addCallbacks(
+            self._written,
+            self._write_failed,
+            callbackArgs=(rows,),
+            errbackArgs=(rows, spider, attempt),
+        )
+        return dfd
+
+    def _written(self, result: Any, rows: List[Row]) -> None:
+        self._inc_stats("batches")
+        self._inc_stats("items", len(rows))
+
+    def _write_failed(
+        self, failure: Failure, rows: List[Row], spider: Spider, attempt: int
+    ) -> Any:
+        from twisted.internet import reactor
+        from twisted.internet.task import deferLater
+
+        assert failure.value is not None
+        if not self.backend.is_transient(failure.value) or attempt >= self.retry_times:
+            self._inc_stats("failed_batches")
+            return failure
+        delay = self.retry_delay * 2**attempt
+        self._inc_stats("retries")
+        logger.warning(
+            "Retrying to write %(count)d items in %(delay).1fs "
+            "(attempt %(attempt)d of %(retry_times)d): %(error)s",
+            {
+                "count": len(rows),
+                "delay": delay,
+                "attempt": attempt + 1,
+                "retry_times": self.retry_times,
+                "error": failure.value,
+            },
+            extra={"spider": spider},
+        )
+        return deferLater(reactor, delay, self._write, rows, spider, attempt + 1)
@@ -1,7 +1,12 @@
 import hashlib
+import heapq
 import logging
+import shutil
+import tempfile
+from collections import Counter, deque
 
-from scrapy.utils.misc import build_from_crawler
+from scrapy.utils.memory import estimate_request_size
+from scrapy.utils.misc import build_from_crawler, load_object
 
 logger = logging.getLogger(__name__)
 
@@ -102,6 +107,35 @@ class ScrapyPriorityQueue:
             self.curprio = min(prios) if prios else None
         return m
 
+    def push_many(self, requests):
+        """Push several requests, in order."""
+        queues = self.queues
+        curprio = self.curprio
+        for request in requests:
+            priority = self.priority(request)
+            q = queues.get(priority)
+            if q is None:
+                q = queues[priority] = self.qfactory(priority)
+            q.push(request)  # this may fail (eg. serialization error)
+            if curprio is None or priority < curprio:
+                curprio = self.curprio = priority
+
+    def pop_many(self, count):
+        """Pop up to *count* requests, in the same order as calling
+        :meth:`pop` *count* times, only looking for the next priority when
+        the current one is exhausted."""
+        requests = []
+        while self.curprio is not None and len(requests) < count:
+            q = self.queues[self.curprio]
+            for _ in range(min(count - len(requests), len(q))):
+                requests.append(q.pop())
+            if not q:
+                del self.queues[self.curprio]
+                q.close()
+                prios = [p for p, q in self.queues.items() if q]
+                self.curprio = min(prios) if prios else None
+        return requests
+
     def peek(self):
         """Returns the next object to be returned by :meth:`pop`,
         but without removing it from the queue.
@@ -141,6 +175,17 @@ class DownloaderInterface:
             return 0
         return len(self.downloader.slots[slot].active)
 
+    def is_busy(self, slot, extra=0):
+        """Return ``True`` if a new request for *slot* would have to wait in
+        the Downloader, assuming that *extra* more requests were sent to it."""
+        downloader_slot = self.downloader.slots.get(slot)
+        if downloader_slot is None:
+            return False
+        if len(downloader_slot.active) + extra >= downloader_slot.concurrency:
+            return True
+        # Requests already waiting for the download delay.
+        return bool(downloader_slot.delay and (downloader_slot.queue or extra))
+
 
 class DownloaderAwarePriorityQueue:
     """PriorityQueue which takes Downloader activity into account:
@@ -199,6 +244,25 @@ class DownloaderAwarePriorityQueue:
             del self.pqueues[slot]
         return request
 
+    def pop_many(self, count):
+        """Pop up to *count* requests, in the same order as calling
+        :meth:`pop` *count* times while sending each popped request to the
+        downloader: each popped request counts as an active download of its
+        slot for the rest of the batch."""
+        stats = self._downloader_interface.stats(self.pqueues)
+        heapq.heapify(stats)
+        requests = []
+        while stats and len(requests) < count:
+            active, slot = stats[0]
+            queue = self.pqueues[slot]
+            requests.append(queue.pop())
+            if len(queue) == 0:
+                del self.pqueues[slot]
+                heapq.heappop(stats)
+            else:
+                heapq.heapreplace(stats, (active + 1, slot))
+        return requests
+
     def push(self, request):
         slot = self._downloader_interface.get_slot_key(request)
         if slot not in self.pqueues:
@@ -230,3 +294,334 @@ class DownloaderAwarePriorityQueue:
 
     def __contains__(self, slot):
         return slot in self.pqueues
+
+
+class SlotFairPriorityQueue:
+    """PriorityQueue for broad crawls that serves download slots (by
+    default, domains) in turns.
+
+    Requests are stored in a single priority queue shared by all slots, the
+    segment, so the number of downstream queues (and folders, with
+    :setting:`JOBDIR`) does not depend on the number of slots. Up to
+    :setting:`SCHEDULER_SLOT_FAIR_READY_SIZE` requests are moved from the
+    segment, in priority order, to per-slot ready lists, and requests are
+    popped from the ready lists of slots in turns, skipping slots that have
+    reached their concurrency, or that have requests waiting for their
+    download delay. Only slots with ready requests take memory.
+
+    If all ready requests belong to such slots, more requests are moved from
+    the segment to the ready lists, up to :attr:`max_ready_factor` times
+    :setting:`SCHEDULER_SLOT_FAIR_READY_SIZE` requests, to find requests of
+    other slots.
+    """
+
+    #: Maximum size of the ready lists, as a multiple of the ready size, when
+    #: looking for requests of slots that can start a download.
+    max_ready_factor = 10
+
+    @classmethod
+    def from_crawler(cls, crawler, downstream_queue_cls, key, startprios=()):
+        return cls(crawler, downstream_queue_cls, key, startprios)
+
+    def __init__(self, crawler, downstream_queue_cls, key, startprios=()):
+        if isinstance(startprios, dict):
+            raise ValueError(
+                "SlotFairPriorityQueue accepts ``startprios`` as a list; a "
+                "dict is passed. Most likely, it means the state is created "
+                "by an incompatible priority queue. Only a crawl started with "
+                "the same priority queue class can be resumed."
+            )
+        self._downloader_interface = DownloaderInterface(crawler)
+        self.ready_size = max(
+            crawler.settings.getint("SCHEDULER_SLOT_FAIR_READY_SIZE"), 1
+        )
+        self.max_ready = self.ready_size * self.max_ready_factor
+        self.segment = ScrapyPriorityQueue(
+            crawler, downstream_queue_cls, key, startprios
+        )
+        self.ready = {}  # slot -> deque of requests
+        self.ready_count = 0
+        self._ready_prios = Counter()
+        self._turns = deque()  # slots with ready requests, in serving order
+
+    def _refill(self, count):
+        for request in self.segment.pop_many(count):
+            slot = self._downloader_interface.get_slot_key(request)
+            requests = self.ready.get(slot)
+            if requests is None:
+                requests = self.ready[slot] = deque()
+                self._turns.append(slot)
+            requests.append(request)
+            self._ready_prios[self.segment.priority(request)] += 1
+            self.ready_count += 1
+
+    def _should_refill(self):
+        segment_prio = self.segment.curprio
+        if segment_prio is None:
+            return False
+        if self.ready_count < self.ready_size:
+            return True
+        # Do not let requests with a higher priority wait in the segment.
+        return segment_prio < min(self._ready_prios)
+
+    def _pop(self, taken):
+        if self._should_refill():
+            self._refill(max(self.ready_size - self.ready_count, 1))
+        request = self._pop_ready(taken)
+        while (
+            request is None
+            and self.segment.curprio is not None
+            and self.ready_count < self.max_ready
+        ):
+            # Every ready request belongs to a busy slot.
+            self._refill(min(self.ready_size, self.max_ready - self.ready_count))
+            request = self._pop_ready(taken)
+        return request
+
+    def _pop_ready(self, taken):
+        turns = self._turns
+        is_busy = self._downloader_interface.is_busy
+        for _ in range(len(turns)):
+            slot = turns[0]
+            if is_busy(slot, taken[slot]):
+                turns.rotate(-1)
+                continue
+            requests = self.ready[slot]
+            request = requests.popleft()
+            if requests:
+                turns.rotate(-1)
+            else:
+                turns.popleft()
+                del self.ready[slot]
+            priority = self.segment.priority(request)
+            self._ready_prios[priority] -= 1
+            if not self._ready_prios[priority]:
+                del self._ready_prios[priority]
+            self.ready_count -= 1
+            taken[slot] += 1
+            return request
+        return None
+
+    def pop(self):
+        return self._pop(Counter())
+
+    def pop_many(self, count):
+        """Pop up to *count* requests, counting each popped request as an
+        active download of its slot for the rest of the batch."""
+        taken = Counter()
+        requests = []
+        while len(requests) < count:
+            request = self._pop(taken)
+            if request is None:
+                break
+            requests.append(request)
+        return requests
+
+    def push(self, request):
+        self.segment.push(request)
+
+    def push_many(self, requests):
+        self.segment.push_many(requests)
+
+    def peek(self):
+        """Returns the next object to be returned by :meth:`pop`,
+        ignoring the state of the Downloader, but without removing it from
+        the queue.
+
+        Raises :exc:`NotImplementedError` if the underlying queue class does
+        not implement a ``peek`` method, which is optional for queues.
+        """
+        if self._turns and not self._should_refill():
+            return self.ready[self._turns[0]][0]
+        return self.segment.peek()
+
+    def close(self):
+        for requests in self.ready.values():
+            self.segment.push_many(requests)
+        self.ready.clear()
+        self._turns.clear()
+        self._ready_prios.clear()
+        self.ready_count = 0
+        return self.segment.close()
+
+    def __len__(self):
+        return len(self.segment) + self.ready_count
+
+    def __contains__(self, slot):
+        return slot in self.ready
+
+
+class SpilloverPriorityQueue:
+    """Priority queue that keeps up to
+    :setting:`SCHEDULER_SPILLOVER_MAX_REQUESTS` requests (and up to
+    :setting:`SCHEDULER_SPILLOVER_MAX_BYTES` bytes of requests) in memory,
+    and spills the rest to disk.
+
+    When memory is full, the requests with the lowest priority are spilled to
+    a disk queue, and they are moved back to memory in batches of
+    :setting:`SCHEDULER_SPILLOVER_BATCH_SIZE` requests when memory runs out of
+    requests, or when the disk queue has requests with a higher priority than
+    those in memory.
+
+    Without :setting:`JOBDIR`, the disk queue uses a temporary folder that is
+    removed when the queue is closed. With :setting:`JOBDIR`, the disk queue
+    uses the job folder, and requests in memory are written to it when the
+    queue is closed, so that the crawl can be resumed.
+
+    Requests that cannot be serialized are always kept in memory.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler, downstream_queue_cls, key, startprios=()):
+        return cls(crawler, downstream_queue_cls, key, startprios)
+
+    def __init__(self, crawler, downstream_queue_cls, key, startprios=()):
+        settings = crawler.settings
+        self.crawler = crawler
+        self.max_requests = settings.getint("SCHEDULER_SPILLOVER_MAX_REQUESTS")
+        self.max_bytes = settings.getint("SCHEDULER_SPILLOVER_MAX_BYTES")
+        self.batch_size = max(settings.getint("SCHEDULER_SPILLOVER_BATCH_SIZE"), 1)
+        # The scheduler uses a key for persistent queues only.
+        self.persistent = bool(key)
+        if self.persistent:
+            memory_queue_cls = load_object(settings["SCHEDULER_MEMORY_QUEUE"])
+            disk_queue_cls = downstream_queue_cls
+            self._tmpdir = None
+            disk_key = key
+        else:
+            memory_queue_cls = downstream_queue_cls
+            disk_queue_cls = load_object(settings["SCHEDULER_DISK_QUEUE"])
+            self._tmpdir = tempfile.mkdtemp(prefix="scrapy-spillover-")
+            disk_key = self._tmpdir
+        self.memory = ScrapyPriorityQueue(crawler, memory_queue_cls, "")
+        self.disk = ScrapyPriorityQueue(crawler, disk_queue_cls, disk_key, startprios)
+        self.memory_count = 0
+        self.memory_bytes = 0
+
+    def _memory_full(self):
+        return self.memory_count >= self.max_requests or bool(
+            self.max_bytes and self.memory_bytes >= self.max_bytes
+        )
+
+    def _push_memory(self, request):
+        self.memory.push(request)
+        self.memory_count += 1
+        self.memory_bytes += estimate_request_size(request)
+
+    def _pop_memory(self):
+        request = self.memory.pop()
+        if request is not None:
+            self.memory_count -= 1
+            self.memory_bytes -= estimate_request_size(request)
+        return request
+
+    def _push_disk(self, request):
+        """Push *request* to disk, and return ``False`` if it cannot be
+        serialized."""
+        try:
+            self.disk.push(request)
+        except ValueError:
+            self._inc_stat("unserializable")
+            return False
+        self._inc_stat("spilled")
+        return True
+
+    def _spill_lowest(self, priority):
+        """Spill a request from memory with a lower priority than *priority*,
+        and return ``True`` on success."""
+        queues = self.memory.queues
+        lowest = max((p for p, q in queues.items() if q), default=None)
+        if lowest is None or lowest <= priority:
+            return False
+        q = queues[lowest]
+        request = q.pop()
+        if not self._push_disk(request):
+            q.push(request)
+            return False
+        self.memory_count -= 1
+        self.memory_bytes -= estimate_request_size(request)
+        if not q:
+            del queues[lowest]
+            q.close()
+            if lowest == self.memory.curprio:
+                self.memory.curprio = None
+        return True
+
+    def _refill(self):
+        """Move a batch of requests from disk to memory."""
+        room = max(self.max_requests - self.memory_count, 1)
+        requests = self.disk.pop_many(min(self.batch_size, room))
+        self.memory.push_many(requests)
+        self.memory_count += len(requests)
+        self.memory_bytes += sum(estimate_request_size(r) for r in requests)
+        self._inc_stat("refilled", len(requests))
+
+    def _inc_stat(self, key, count=1):
+        if self.crawler.stats is not None:
+            self.crawler.stats.inc_value(f"scheduler/spillover/{key}", count)
+
+    def push(self, request):
+        if self._memory_full():
+            priority = self.memory.priority(request)
+            if not self._spill_lowest(priority) and self._push_disk(request):
+                return
+        self._push_memory(request)
+
+    def push_many(self, requests):
+        for request in requests:
+            self.push(request)
+
+    def pop(self):
+        disk_prio = self.disk.curprio
+        if disk_prio is not None:
+            memory_prio = self.memory.curprio
+            if memory_prio is None or disk_prio < memory_prio:
+                self._refill()
+        return self._pop_memory()
+
+    def pop_many(self, count):
+        requests = []
+        while len(requests) < count:
+            request = self.pop()
+            if request is None:
+                break
+            requests.append(request)
+        return requests
+
+    def peek(self):
+        """Returns the next object to be returned by :meth:`pop`,
+        but without removing it from the queue.
+
+        Raises :exc:`NotImplementedError` if the underlying queue class does
+        not implement a ``peek`` method, which is optional for queues.
+        """
+        disk_prio = self.disk.curprio
+        memory_prio = self.memory.curprio
+        if disk_prio is not None and (memory_prio is None or disk_prio < memory_prio):
+            return self.disk.peek()
+        return self.memory.peek()
+
+    def close(self):
+        if self.persistent:
+            for request in self.memory.pop_many(self.memory_count):
+                if not self._push_disk(request):
+                    logger.warning(
+                        "Dropping request %(request)s that cannot be "
+                        "serialized on shutdown",
+                        {"request": request},
+                    )
+        self.memory.close()
+        self.memory_count = self.memory_bytes = 0
+        active = self.disk.close()
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            return []
+        return active
+
+    def memory_usage(self):
+        """Return the estimated memory used by the requests kept in memory,
+        in bytes."""
+        return self.memory_bytes
+
+    def __len__(self):
+        return self.memory_count + len(self.disk)
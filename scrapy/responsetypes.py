@@ -9,6 +9,7 @@ from pkgutil import get_data
 from typing import Dict, Mapping, Optional, Type, Union
 
 from scrapy.http import Response
+from scrapy.utils.datatypes import LocalCache
 from scrapy.utils.misc import load_object
 from scrapy.utils.python import binary_is_text, to_bytes, to_unicode
 
@@ -33,6 +34,11 @@ class ResponseTypes:
 
     def __init__(self) -> None:
         self.classes: Dict[str, Type[Response]] = {}
+        # Content-Type header values come from a small vocabulary, so their
+        # response class is only looked up once.
+        self._content_type_classes: LocalCache[Union[str, bytes], Type[Response]] = (
+            LocalCache(limit=1000)
+        )
         self.mimetypes: MimeTypes = MimeTypes()
         mimedata = get_data("scrapy", "mime.types")
         if not mimedata:
@@ -59,10 +65,15 @@ class ResponseTypes:
         header"""
         if content_encoding:
             return Response
+        try:
+            return self._content_type_classes[content_type]
+        except KeyError:
+            pass
         mimetype = (
             to_unicode(content_type, encoding="latin-1").split(";")[0].strip().lower()
         )
-        return self.from_mimetype(mimetype)
+        cls = self._content_type_classes[content_type] = self.from_mimetype(mimetype)
+        return cls
 
     def from_content_disposition(
         self, content_disposition: Union[str, bytes]
@@ -23,14 +23,21 @@ AJAXCRAWL_ENABLED = False
 
 ASYNCIO_EVENT_LOOP = None
 
+AUTOTHROTTLE_ADJUST_CONCURRENCY = False
 AUTOTHROTTLE_ENABLED = False
 AUTOTHROTTLE_DEBUG = False
+AUTOTHROTTLE_LATENCY_TOLERANCE = 2.0
+AUTOTHROTTLE_MAX_CONCURRENCY = 0
 AUTOTHROTTLE_MAX_DELAY = 60.0
 AUTOTHROTTLE_START_DELAY = 5.0
 AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+AUTOTHROTTLE_WINDOW = 20
 
 BOT_NAME = "scrapybot"
 
+CALLBACK_POOL_MAX_PENDING = 0
+CALLBACK_POOL_SIZE = 0
+
 CLOSESPIDER_TIMEOUT = 0
 CLOSESPIDER_PAGECOUNT = 0
 CLOSESPIDER_ITEMCOUNT = 0
@@ -48,6 +55,9 @@ CONCURRENT_REQUESTS_PER_IP = 0
 
 COOKIES_ENABLED = True
 COOKIES_DEBUG = False
+COOKIES_JAR_TTL = 0
+COOKIES_MAX_JARS = 0
+COOKIES_PERSIST = False
 
 DEFAULT_ITEM_CLASS = "scrapy.item.Item"
 
@@ -67,6 +77,9 @@ DNS_TIMEOUT = 60
 
 DOWNLOAD_DELAY = 0
 
+DOWNLOAD_RATE_LIMIT = 0
+DOWNLOAD_RATE_LIMITS = {}
+
 DOWNLOAD_HANDLERS = {}
 DOWNLOAD_HANDLERS_BASE = {
     "data": "scrapy.core.downloader.handlers.datauri.DataURIDownloadHandler",
@@ -126,6 +139,8 @@ EDITOR = "vi"
 if sys.platform == "win32":
     EDITOR = "%s -m idlelib.idle"
 
+ENGINE_COROUTINES = False
+
 EXTENSIONS = {}
 
 EXTENSIONS_BASE = {
@@ -138,6 +153,7 @@ EXTENSIONS_BASE = {
     "scrapy.extensions.logstats.LogStats": 0,
     "scrapy.extensions.spiderstate.SpiderState": 0,
     "scrapy.extensions.throttle.AutoThrottle": 0,
+    "scrapy.extensions.profiling.Profiler": 0,
 }
 
 FEED_TEMPDIR = None
@@ -176,6 +192,11 @@ FEED_STORAGE_S3_ACL = ""
 FILES_STORE_S3_ACL = "private"
 FILES_STORE_GCS_ACL = ""
 
+FRONTIER_ADDRESS = "tcp://127.0.0.1:6810"
+FRONTIER_BACKEND = "scrapy.core.frontier.MemoryFrontierBackend"
+FRONTIER_BATCH_SIZE = 100
+FRONTIER_LEASE_TIMEOUT = 300
+
 FTP_USER = "anonymous"
 FTP_PASSWORD = "guest"  # nosec
 FTP_PASSIVE_MODE = True
@@ -236,6 +257,9 @@ MEMUSAGE_CHECK_INTERVAL_SECONDS = 60.0
 MEMUSAGE_ENABLED = True
 MEMUSAGE_LIMIT_MB = 0
 MEMUSAGE_NOTIFY_MAIL = []
+MEMUSAGE_RESUME_RATIO = 0.8
+MEMUSAGE_SOFT_LIMIT_MB = 0
+MEMUSAGE_TRACKED_SOFT_LIMIT_MB = 0
 MEMUSAGE_WARNING_MB = 0
 
 METAREFRESH_ENABLED = True
@@ -248,6 +272,10 @@ PERIODIC_LOG_DELTA = None
 PERIODIC_LOG_STATS = None
 PERIODIC_LOG_TIMING_ENABLED = False
 
+PROFILING_ENABLED = False
+PROFILING_OUTPUT = None
+PROFILING_SAMPLE_RATE = 0.1
+
 RANDOMIZE_DOWNLOAD_DELAY = True
 
 REACTOR_THREADPOOL_MAXSIZE = 10
@@ -262,6 +290,9 @@ REFERRER_POLICY = "scrapy.spidermiddlewares.referer.DefaultReferrerPolicy"
 REQUEST_FINGERPRINTER_CLASS = "scrapy.utils.request.RequestFingerprinter"
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "SENTINEL"
 
+REQUEST_TRACING_ENABLED = False
+REQUEST_TRACING_OUTPUT = None
+
 RETRY_ENABLED = True
 RETRY_TIMES = 2  # initial response + 2 retries = 3 requests
 RETRY_HTTP_CODES = [500, 502, 503, 504, 522, 524, 408, 429]
@@ -282,6 +313,9 @@ RETRY_EXCEPTIONS = [
     "scrapy.core.downloader.handlers.http11.TunnelError",
 ]
 
+ROBOTSTXT_CACHE_DIR = None
+ROBOTSTXT_CACHE_SIZE = 0
+ROBOTSTXT_CACHE_TTL = 24 * 60 * 60  # 24h
 ROBOTSTXT_OBEY = False
 ROBOTSTXT_PARSER = "scrapy.robotstxt.ProtegoRobotParser"
 ROBOTSTXT_USER_AGENT = None
@@ -290,6 +324,10 @@ SCHEDULER = "scrapy.core.scheduler.Scheduler"
 SCHEDULER_DISK_QUEUE = "scrapy.squeues.PickleLifoDiskQueue"
 SCHEDULER_MEMORY_QUEUE = "scrapy.squeues.LifoMemoryQueue"
 SCHEDULER_PRIORITY_QUEUE = "scrapy.pqueues.ScrapyPriorityQueue"
+SCHEDULER_SLOT_FAIR_READY_SIZE = 1000
+SCHEDULER_SPILLOVER_BATCH_SIZE = 1000
+SCHEDULER_SPILLOVER_MAX_BYTES = 0
+SCHEDULER_SPILLOVER_MAX_REQUESTS = 10000
 
 SCRAPER_SLOT_MAX_ACTIVE_SIZE = 5000000
 
@@ -305,11 +343,25 @@ SPIDER_MIDDLEWARES_BASE = {
     "scrapy.spidermiddlewares.referer.RefererMiddleware": 700,
     "scrapy.spidermiddlewares.urllength.UrlLengthMiddleware": 800,
     "scrapy.spidermiddlewares.depth.DepthMiddleware": 900,
+    "scrapy.spidermiddlewares.workers.WorkerStartRequestsMiddleware": 950,
     # Spider side
 }
 
 SPIDER_MODULES = []
 
+SQL_PIPELINE_BACKEND = "scrapy.pipelines.sql.SQLiteBackend"
+SQL_PIPELINE_BATCH_SIZE = 100
+SQL_PIPELINE_DATABASE = ""
+SQL_PIPELINE_FLUSH_INTERVAL = 1.0
+SQL_PIPELINE_RETRY_DELAY = 1.0
+SQL_PIPELINE_RETRY_TIMES = 3
+SQL_PIPELINE_TABLE = "items"
+SQL_PIPELINE_UPSERT_KEYS = []
+
+START_REQUESTS_BATCH_SIZE = 0
+START_REQUESTS_HIGH_WATERMARK = 1000
+START_REQUESTS_THREAD = False
+
 STATS_CLASS = "scrapy.statscollectors.MemoryStatsCollector"
 STATS_DUMP = True
 
@@ -327,6 +379,8 @@ TELNETCONSOLE_HOST = "127.0.0.1"
 TELNETCONSOLE_USERNAME = "scrapy"
 TELNETCONSOLE_PASSWORD = None
 
+TRACKREF_ENABLED = True
+
 TWISTED_REACTOR = None
 
 SPIDER_CONTRACTS = {}
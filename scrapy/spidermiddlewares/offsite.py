@@ -9,13 +9,14 @@ from __future__ import annotations
 import logging
 import re
 import warnings
-from typing import TYPE_CHECKING, Any, AsyncIterable, Iterable, Set
+from typing import TYPE_CHECKING, Any, AsyncIterable, Iterable, List, Optional, Set
 
 from scrapy import Spider, signals
 from scrapy.crawler import Crawler
 from scrapy.http import Request, Response
 from scrapy.statscollectors import StatsCollector
 from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.url import DomainSet
 
 if TYPE_CHECKING:
     # typing.Self requires Python 3.11
@@ -24,10 +25,15 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+_url_pattern = re.compile(r"^https?://.*$")
+_port_pattern = re.compile(r":\d+$")
+
 
 class OffsiteMiddleware:
     def __init__(self, stats: StatsCollector):
         self.stats: StatsCollector = stats
+        self._spider: Optional[Spider] = None
+        self._host_regex: Optional[re.Pattern[str]] = None
 
     @classmethod
     def from_crawler(cls, crawler: Crawler) -> Self:
@@ -66,41 +72,98 @@ class OffsiteMiddleware:
         return False
 
     def should_follow(self, request: Request, spider: Spider) -> bool:
-        regex = self.host_regex
         # hostname can be None for wrong urls (like javascript links)
         host = urlparse_cached(request).hostname or ""
+        if self.domain_set is not None:
+            return self.domain_set.match(host)
+        regex = self.host_regex
         return bool(regex.search(host))
 
-    def get_host_regex(self, spider: Spider) -> re.Pattern[str]:
-        """Override this method to implement a different offsite policy"""
+    def _get_allowed_domains(self, spider: Spider) -> Optional[List[str]]:
         allowed_domains = getattr(spider, "allowed_domains", None)
         if not allowed_domains:
+            return None  # allow all by default
+        return [
+            domain
+            for domain in allowed_domains
+            if domain is not None and self._is_valid_domain(domain)
+        ]
+
+    @staticmethod
+    def _is_valid_domain(domain: str) -> bool:
+        if _url_pattern.match(domain):
+            message = (
+                "allowed_domains accepts only domains, not URLs. "
+                f"Ignoring URL entry {domain} in allowed_domains."
+            )
+            warnings.warn(message, URLWarning)
+            return False
+        if _port_pattern.search(domain):
+            message = (
+                "allowed_domains accepts only domains without ports. "
+                f"Ignoring entry {domain} in allowed_domains."
+            )
+            warnings.warn(message, PortWarning)
+            return False
+        return True
+
+    @property
+    def host_regex(self) -> re.Pattern[str]:
+        # Only built on demand when allowed domains are matched with a domain
+        # set.
+        if self._host_regex is None:
+            assert self._spider is not None
+            self._host_regex = self.get_host_regex(self._spider)
+        return self._host_regex
+
+    @host_regex.setter
+    def host_regex(self, value: re.Pattern[str]) -> None:
+        self._host_regex = value
+
+    def get_host_regex(self, spider: Spider) -> re.Pattern[str]:
+        """Override this method to implement a different offsite policy"""
+        domains = self._get_allowed_domains(spider)
+        if domains is None:
             return re.compile("")  # allow all by default
-        url_pattern = re.compile(r"^https?://.*$")
-        port_pattern = re.compile(r":\d+$")
-        domains = []
-        for domain in allowed_domains:
-            if domain is None:
-                continue
-            if url_pattern.match(domain):
-                message = (
-                    "allowed_domains accepts only domains, not URLs. "
-                    f"Ignoring URL entry {domain} in allowed_domains."
-                )
-                warnings.warn(message, URLWarning)
-            elif port_pattern.search(domain):
-                message = (
-                    "allowed_domains accepts only domains without ports. "
-                    f"Ignoring entry {domain} in allowed_domains."
-                )
-                warnings.warn(message, PortWarning)
-            else:
-                domains.append(re.escape(domain))
-        regex = rf'^(.*\.)?({"|".join(domains)})$'
+        regex = rf'^(.*\.)?({"|".join(re.escape(d) for d in domains)})$'
         return re.compile(regex)
 
+    def get_domain_set(self, spider: Spider) -> Optional[DomainSet]:
+        """Return the :class:`~scrapy.utils.url.DomainSet` of the domains
+        allowed for *spider*, or ``None`` to allow all domains.
+
+        If the ``allowed_domains`` attribute of the spider is a
+        :class:`~scrapy.utils.url.DomainSet`, it is used as is, so that
+        domains added to it or removed from it during the crawl apply to the
+        following requests, and it allows no domain while it is empty.
+        Entries that are URLs or have a port are removed from it.
+        """
+        allowed_domains = getattr(spider, "allowed_domains", None)
+        if isinstance(allowed_domains, DomainSet):
+            for domain in list(allowed_domains):
+                if not self._is_valid_domain(domain):
+                    allowed_domains.discard(domain)
+            return allowed_domains
+        domains = self._get_allowed_domains(spider)
+        if domains is None:
+            return None
+        return DomainSet(domains)
+
     def spider_opened(self, spider: Spider) -> None:
-        self.host_regex: re.Pattern[str] = self.get_host_regex(spider)
+        # Subclasses that customize the host regex keep using it, otherwise
+        # the allowed domains are matched with a domain set, which is faster
+        # to build and to match for many domains.
+        cls = type(self)
+        self._spider = spider
+        self._host_regex = None
+        self.domain_set: Optional[DomainSet] = None
+        if (
+            cls.get_host_regex is OffsiteMiddleware.get_host_regex
+            and cls.should_follow is OffsiteMiddleware.should_follow
+        ):
+            self.domain_set = self.get_domain_set(spider)
+        else:
+            self.host_regex = self.get_host_regex(spider)
         self.domains_seen: Set[str] = set()
 
 
@@ -0,0 +1,57 @@
+"""
+Worker Start Requests Spider Middleware
+
+See documentation in docs/topics/practices.rst
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable
+
+from scrapy import Spider
+from scrapy.core.workers import WorkerChannel, get_worker_channel, get_worker_index
+from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Request
+from scrapy.pqueues import DownloaderInterface
+
+if TYPE_CHECKING:
+    # typing.Self requires Python 3.11
+    from typing_extensions import Self
+
+
+class WorkerStartRequestsMiddleware:
+    """Spider middleware that drops, in each worker of a
+    :class:`~scrapy.core.workers.WorkerPool`, the start requests owned by
+    other workers.
+
+    Every worker iterates the start requests of the spider, so forwarding
+    them would schedule each of them once per worker.
+    """
+
+    def __init__(self, crawler: Crawler, channel: WorkerChannel):
+        self.crawler: Crawler = crawler
+        self.channel: WorkerChannel = channel
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> Self:
+        channel = get_worker_channel()
+        if channel is None:
+            raise NotConfigured
+        return cls(crawler, channel)
+
+    def process_start_requests(
+        self, start_requests: Iterable[Request], spider: Spider
+    ) -> Iterable[Request]:
+        assert self.crawler.stats is not None
+        # The engine, and hence the downloader, does not exist yet when
+        # middlewares are built.
+        downloader_interface = DownloaderInterface(self.crawler)
+        for request in start_requests:
+            slot_key = downloader_interface.get_slot_key(request)
+            if get_worker_index(slot_key, self.channel.workers) == self.channel.index:
+                yield request
+            else:
+                self.crawler.stats.inc_value(
+                    "workers/start_requests/skipped", spider=spider
+                )
@@ -4,7 +4,7 @@ Scrapy extension for collecting scraping stats
 
 import logging
 import pprint
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from scrapy import Spider
 
@@ -17,6 +17,54 @@ logger = logging.getLogger(__name__)
 StatsT = Dict[str, Any]
 
 
+class StatsCounter:
+    """Handle to a single counter of a stats collector.
+
+    Components that increase the same stat on every request can obtain a
+    handle once, through :meth:`StatsCollector.get_counter`, and call
+    :meth:`inc` on it instead of calling
+    :meth:`~StatsCollector.inc_value` with the stat key every time.
+    """
+
+    __slots__ = ("_stats", "key", "start", "spider")
+
+    def __init__(
+        self,
+        stats: "StatsCollector",
+        key: str,
+        start: int = 0,
+        spider: Optional[Spider] = None,
+    ):
+        self._stats: StatsCollector = stats
+        self.key: str = key
+        self.start: int = start
+        self.spider: Optional[Spider] = spider
+
+    def inc(self, count: int = 1) -> None:
+        self._stats.inc_value(self.key, count, self.start, spider=self.spider)
+
+
+class _ArrayStatsCounter(StatsCounter):
+    __slots__ = ("_values", "_used", "_index")
+
+    def __init__(
+        self,
+        stats: "CounterStatsCollector",
+        key: str,
+        start: int,
+        index: int,
+        spider: Optional[Spider] = None,
+    ):
+        super().__init__(stats, key, start, spider)
+        self._values: List[Any] = stats._counter_values
+        self._used: bytearray = stats._counter_used
+        self._index: int = index
+
+    def inc(self, count: int = 1) -> None:
+        self._values[self._index] += count
+        self._used[self._index] = 1
+
+
 class StatsCollector:
     def __init__(self, crawler: "Crawler"):
         self._dump: bool = crawler.settings.getbool("STATS_DUMP")
@@ -42,6 +90,16 @@ class StatsCollector:
         d = self._stats
         d[key] = d.setdefault(key, start) + count
 
+    def get_counter(
+        self, key: str, start: int = 0, spider: Optional[Spider] = None
+    ) -> StatsCounter:
+        """Return a :class:`StatsCounter` handle for the *key* stat.
+
+        Calling ``inc(count)`` on the handle is equivalent to calling
+        ``inc_value(key, count, start, spider=spider)`` on this collector.
+        """
+        return StatsCounter(self, key, start, spider)
+
     def max_value(self, key: str, value: Any, spider: Optional[Spider] = None) -> None:
         self._stats[key] = max(self._stats.setdefault(key, value), value)
 
@@ -75,6 +133,113 @@ class MemoryStatsCollector(StatsCollector):
         self.spider_stats[spider.name] = stats
 
 
+class CounterStatsCollector(MemoryStatsCollector):
+    """A :class:`MemoryStatsCollector` that stores the values of the
+    counters obtained through :meth:`get_counter` in a flat list, so that
+    increasing them does not involve any dict lookup or key building.
+
+    The counter values are only written into the stats dict when stats are
+    read, e.g. through :meth:`get_value` or :meth:`get_stats`.
+    """
+
+    def __init__(self, crawler: "Crawler"):
+        super().__init__(crawler)
+        self._counter_index: Dict[str, int] = {}
+        self._counter_keys: List[str] = []
+        self._counter_starts: List[Any] = []
+        self._counter_values: List[Any] = []
+        self._counter_used: bytearray = bytearray()
+
+    def _materialize(self) -> None:
+        used = self._counter_used
+        values = self._counter_values
+        stats = self._stats
+        for index, key in enumerate(self._counter_keys):
+            if used[index]:
+                stats[key] = values[index]
+
+    def get_counter(
+        self, key: str, start: int = 0, spider: Optional[Spider] = None
+    ) -> StatsCounter:
+        index = self._counter_index.get(key)
+        if index is None:
+            index = len(self._counter_keys)
+            self._counter_index[key] = index
+            self._counter_keys.append(key)
+            self._counter_starts.append(start)
+            if key in self._stats:
+                self._counter_values.append(self._stats[key])
+                self._counter_used.append(1)
+            else:
+                self._counter_values.append(start)
+                self._counter_used.append(0)
+        return _ArrayStatsCounter(self, key, start, index, spider)
+
+    def get_value(
+        self, key: str, default: Any = None, spider: Optional[Spider] = None
+    ) -> Any:
+        index = self._counter_index.get(key)
+        if index is not None:
+            if self._counter_used[index]:
+                return self._counter_values[index]
+            return default
+        return super().get_value(key, default, spider)
+
+    def get_stats(self, spider: Optional[Spider] = None) -> StatsT:
+        self._materialize()
+        return super().get_stats(spider)
+
+    def set_value(self, key: str, value: Any, spider: Optional[Spider] = None) -> None:
+        index = self._counter_index.get(key)
+        if index is not None:
+            self._counter_values[index] = value
+            self._counter_used[index] = 1
+        super().set_value(key, value, spider)
+
+    def set_stats(self, stats: StatsT, spider: Optional[Spider] = None) -> None:
+        super().set_stats(stats, spider)
+        for index, key in enumerate(self._counter_keys):
+            if key in stats:
+                self._counter_values[index] = stats[key]
+                self._counter_used[index] = 1
+            else:
+                self._counter_values[index] = self._counter_starts[index]
+                self._counter_used[index] = 0
+
+    def inc_value(
+        self, key: str, count: int = 1, start: int = 0, spider: Optional[Spider] = None
+    ) -> None:
+        index = self._counter_index.get(key)
+        if index is None:
+            super().inc_value(key, count, start, spider)
+            return
+        if not self._counter_used[index]:
+            self._counter_values[index] = start
+            self._counter_used[index] = 1
+        self._counter_values[index] += count
+
+    def max_value(self, key: str, value: Any, spider: Optional[Spider] = None) -> None:
+        if key in self._counter_index:
+            self.set_value(key, max(self.get_value(key, value), value), spider)
+        else:
+            super().max_value(key, value, spider)
+
+    def min_value(self, key: str, value: Any, spider: Optional[Spider] = None) -> None:
+        if key in self._counter_index:
+            self.set_value(key, min(self.get_value(key, value), value), spider)
+        else:
+            super().min_value(key, value, spider)
+
+    def clear_stats(self, spider: Optional[Spider] = None) -> None:
+        super().clear_stats(spider)
+        self._counter_values[:] = self._counter_starts
+        self._counter_used[:] = bytes(len(self._counter_used))
+
+    def close_spider(self, spider: Spider, reason: str) -> None:
+        self._materialize()
+        super().close_spider(spider, reason)
+
+
 class DummyStatsCollector(StatsCollector):
     def get_value(
         self, key: str, default: Any = None, spider: Optional[Spider] = None
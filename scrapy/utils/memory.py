@@ -0,0 +1,94 @@
+"""Helper functions to estimate the memory used by Scrapy components.
+
+Components report an estimate of the memory they use, in bytes, by
+implementing a ``memory_usage()`` method. :func:`get_memory_usage` collects
+those estimates from the scheduler, the dupefilter, the downloader, the
+scraper, item pipelines and extensions.
+
+See :ref:`topics-leaks-memory-usage`.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from scrapy import Request
+
+if TYPE_CHECKING:
+    from scrapy.core.engine import ExecutionEngine
+
+
+def get_rss() -> Optional[int]:
+    """Return the current resident set size of the process in bytes, or
+    ``None`` if it cannot be read from ``/proc``."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def estimate_request_size(request: Request) -> int:
+    """Return a rough estimate of the memory used by *request*, in bytes."""
+    return 500 + len(request.url) + len(request.body)
+
+
+def estimate_collection_size(collection: Any) -> int:
+    """Return a rough estimate of the memory used by *collection*, a set or
+    a dict, in bytes, assuming that all its items are about as big as the
+    first one."""
+    size = sys.getsizeof(collection)
+    if not collection:
+        return size
+    if isinstance(collection, dict):
+        key, value = next(iter(collection.items()))
+        item_size = sys.getsizeof(key) + sys.getsizeof(value)
+        if isinstance(value, dict):
+            item_size += sum(sys.getsizeof(v) for v in value.values())
+    else:
+        item_size = sys.getsizeof(next(iter(collection)))
+    return size + len(collection) * item_size
+
+
+def _components(engine: ExecutionEngine) -> Iterable[Tuple[str, Any]]:
+    if engine.slot is not None:
+        yield "scheduler", engine.slot.scheduler
+        yield "dupefilter", getattr(engine.slot.scheduler, "df", None)
+    yield "downloader", engine.downloader
+    for pipeline in engine.scraper.itemproc.middlewares:
+        yield f"pipelines/{type(pipeline).__name__}", pipeline
+    if engine.crawler.extensions is not None:
+        for extension in engine.crawler.extensions.middlewares:
+            yield f"extensions/{type(extension).__name__}", extension
+
+
+def get_memory_usage(engine: ExecutionEngine) -> Dict[str, int]:
+    """Return the estimated memory usage, in bytes, of each component of
+    *engine* that reports it."""
+    usage: Dict[str, int] = {}
+    if engine.scraper.slot is not None:
+        usage["scraper"] = engine.scraper.slot.active_size
+    for name, component in _components(engine):
+        memory_usage = getattr(component, "memory_usage", None)
+        if callable(memory_usage):
+            usage[name] = memory_usage()
+    return usage
+
+
+def format_memory_usage(engine: ExecutionEngine) -> str:
+    usage = get_memory_usage(engine)
+    rss = get_rss()
+    lines: List[str] = ["Memory usage", ""]
+    if rss is not None:
+        lines.append(f"{'current RSS':<40} {rss / 1024 / 1024:10.1f} MiB")
+    lines.append(f"{'tracked':<40} {sum(usage.values()) / 1024 / 1024:10.1f} MiB")
+    for name, size in sorted(usage.items(), key=lambda x: -x[1]):
+        lines.append(f"  {name:<38} {size / 1024 / 1024:10.1f} MiB")
+    return "\n".join(lines) + "\n"
+
+
+def print_memory_usage(engine: ExecutionEngine) -> None:
+    print(format_memory_usage(engine))
@@ -187,6 +187,7 @@ def memoizemethod_noargs(method: Callable) -> Callable:
 _BINARYCHARS = {
     i for i in range(32) if to_bytes(chr(i)) not in {b"\0", b"\t", b"\n", b"\r"}
 }
+_BINARYCHARS_BYTES = bytes(sorted(_BINARYCHARS))
 
 
 def binary_is_text(data: bytes) -> bool:
@@ -195,7 +196,9 @@ def binary_is_text(data: bytes) -> bool:
     """
     if not isinstance(data, bytes):
         raise TypeError(f"data must be bytes, got '{type(data).__name__}'")
-    return all(c not in _BINARYCHARS for c in data)
+    # bytes.translate() removes the unprintable characters in C, which is
+    # much faster than checking every byte in Python.
+    return len(data.translate(None, _BINARYCHARS_BYTES)) == len(data)
 
 
 def get_func_args(func: Callable, stripself: bool = False) -> List[str]:
@@ -5,8 +5,9 @@ If you want live objects for a particular class to be tracked, you only have to
 subclass from object_ref (instead of object).
 
 About performance: This library has a minimal performance impact when enabled,
-and no performance penalty at all when disabled (as object_ref becomes just an
-alias to object in that case).
+and almost none when disabled with :func:`set_enabled` (see the
+:setting:`TRACKREF_ENABLED` setting), which is worth doing for crawls that
+create millions of requests.
 """
 
 from collections import defaultdict
@@ -22,6 +23,18 @@ if TYPE_CHECKING:
 
 NoneType = type(None)
 live_refs: DefaultDict[type, WeakKeyDictionary] = defaultdict(WeakKeyDictionary)
+_enabled: bool = True
+
+
+def set_enabled(enabled: bool) -> None:
+    """Enable or disable the recording of new instances, for the whole
+    process. Instances created while disabled are never recorded."""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
 
 
 class object_ref:
@@ -31,7 +44,8 @@ class object_ref:
 
     def __new__(cls, *args: Any, **kwargs: Any) -> "Self":
         obj = object.__new__(cls)
-        live_refs[cls][obj] = time()
+        if _enabled:
+            live_refs[cls][obj] = time()
         return obj
 
 
@@ -7,7 +7,20 @@ to the w3lib.url module. Always import those from there instead.
 """
 
 import re
-from typing import TYPE_CHECKING, Iterable, Optional, Type, Union, cast
+from collections.abc import MutableSet
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 from urllib.parse import ParseResult, urldefrag, urlparse, urlunparse
 
 # scrapy.utils.url was moved to w3lib.url and import * ensures this
@@ -24,11 +37,109 @@ if TYPE_CHECKING:
 UrlT = Union[str, bytes, ParseResult]
 
 
+class DomainSet(MutableSet):  # type: ignore[type-arg]
+    """Set of domains that can tell whether a host belongs to any of them,
+    i.e. is one of them or one of their subdomains.
+
+    Domains are stored in a trie of their labels, from the top-level one
+    down, so :meth:`match` takes ``O(labels)`` time regardless of the
+    number of domains. Domains are case-insensitive, and can be added and
+    removed at any time.
+    """
+
+    __slots__ = ("_root", "_len")
+
+    def __init__(self, domains: Iterable[str] = ()):
+        # Each node maps labels to child nodes, and None to the domain that
+        # ends at that node, if any.
+        self._root: Dict[Optional[str], Any] = {}
+        self._len: int = 0
+        for domain in domains:
+            self.add(domain)
+
+    @staticmethod
+    def _labels(domain: str) -> List[str]:
+        labels = domain.lower().split(".")
+        labels.reverse()
+        return labels
+
+    def add(self, domain: str) -> None:
+        node = self._root
+        for label in self._labels(domain):
+            node = node.setdefault(label, {})
+        if None not in node:
+            node[None] = domain.lower()
+            self._len += 1
+
+    def discard(self, domain: str) -> None:
+        node = self._root
+        path: List[Tuple[Dict[Optional[str], Any], str]] = []
+        for label in self._labels(domain):
+            if label not in node:
+                return
+            path.append((node, label))
+            node = node[label]
+        if None not in node:
+            return
+        del node[None]
+        self._len -= 1
+        for parent, label in reversed(path):
+            if parent[label]:
+                break
+            del parent[label]
+
+    def match(self, host: str) -> bool:
+        """Return ``True`` if *host* is one of the domains of the set or a
+        subdomain of one of them."""
+        node = self._root
+        for label in self._labels(host):
+            child: Optional[Dict[Optional[str], Any]] = node.get(label)
+            if child is None:
+                return False
+            if None in child:
+                return True
+            node = child
+        return False
+
+    def __contains__(self, domain: object) -> bool:
+        if not isinstance(domain, str):
+            return False
+        node = self._root
+        for label in self._labels(domain):
+            child: Optional[Dict[Optional[str], Any]] = node.get(label)
+            if child is None:
+                return False
+            node = child
+        return None in node
+
+    def __iter__(self) -> Iterator[str]:
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for label, child in node.items():
+                if label is None:
+                    yield child
+                else:
+                    stack.append(child)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({sorted(self)!r})"
+
+
 def url_is_from_any_domain(url: UrlT, domains: Iterable[str]) -> bool:
-    """Return True if the url belongs to any of the given domains"""
+    """Return True if the url belongs to any of the given domains
+
+    If *domains* is a :class:`DomainSet`, the check does not depend on the
+    number of domains.
+    """
     host = parse_url(url).netloc.lower()
     if not host:
         return False
+    if isinstance(domains, DomainSet):
+        return domains.match(host)
     domains = [d.lower() for d in domains]
     return any((host == d) or (host.endswith(f".{d}")) for d in domains)
 
@@ -55,6 +166,18 @@ def parse_url(url: UrlT, encoding: Optional[str] = None) -> ParseResult:
     return cast(ParseResult, urlparse(to_unicode(url, encoding)))
 
 
+class TrustedURL(str):
+    """A URL that is already safe, i.e. that :func:`~w3lib.url.safe_url_string`
+    would return unchanged, such as the URLs of the links returned by
+    :ref:`link extractors <topics-link-extractors>`.
+
+    :class:`~scrapy.Request` uses such URLs as they are, instead of normalizing
+    them again. Any operation on a trusted URL returns a regular string.
+    """
+
+    __slots__ = ()
+
+
 def escape_ajax(url: str) -> str:
     """
     Return the crawlable url according to:
@@ -3,12 +3,14 @@ Some spiders used for testing and benchmarking
 """
 
 import asyncio
+import os
 import time
 from urllib.parse import urlencode
 
 from twisted.internet import defer
 
 from scrapy import signals
+from scrapy.core.callbackpool import process_pool_callback
 from scrapy.exceptions import StopDownload
 from scrapy.http import Request
 from scrapy.item import Item
@@ -105,6 +107,24 @@ class SimpleSpider(MetaSpider):
         self.logger.info(f"Got response {response.status}")
 
 
+class CallbackPoolSpider(SimpleSpider):
+    name = "callback_pool"
+
+    @process_pool_callback
+    def parse(self, response, foo=None):
+        if response.status == 500:
+            raise ValueError("oops")
+        yield {"status": response.status, "foo": foo, "pid": os.getpid()}
+        if response.status == 200:
+            for status in (202, 500):
+                yield Request(
+                    self.mockserver.url(f"/status?n={status}"),
+                    callback=self.parse,
+                    cb_kwargs={"foo": "bar"},
+                    meta={"handle_httpstatus_all": True},
+                )
+
+
 class AsyncDefSpider(SimpleSpider):
     name = "asyncdef"
 
@@ -1134,6 +1134,7 @@ class HelpMessageTest(CommandTest):
             "genspider",
             "check",
             "bench",
+            "frontier",
         ]
 
     def test_help_messages(self):
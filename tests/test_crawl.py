@@ -1,5 +1,6 @@
 import json
 import logging
+import os
 import unittest
 from ipaddress import IPv4Address
 from socket import gethostbyname
@@ -13,6 +14,7 @@ from twisted.python.failure import Failure
 from twisted.trial.unittest import TestCase
 
 from scrapy import signals
+from scrapy.core.callbackpool import CallbackPool, is_process_pool_callback
 from scrapy.crawler import CrawlerRunner
 from scrapy.exceptions import StopDownload
 from scrapy.http import Request
@@ -37,6 +39,7 @@ from tests.spiders import (
     BrokenStartRequestsSpider,
     BytesReceivedCallbackSpider,
     BytesReceivedErrbackSpider,
+    CallbackPoolSpider,
     CrawlSpiderWithAsyncCallback,
     CrawlSpiderWithAsyncGeneratorCallback,
     CrawlSpiderWithErrback,
@@ -411,6 +414,50 @@ with multiples lines
         self.assertIn("Got response 200", str(log))
 
 
+class CallbackPoolTestCase(TestCase):
+    def setUp(self):
+        self.mockserver = MockServer()
+        self.mockserver.__enter__()
+
+    def tearDown(self):
+        self.mockserver.__exit__(None, None, None)
+
+    @defer.inlineCallbacks
+    def test_callback_pool(self):
+        items = []
+
+        def _on_item_scraped(item):
+            items.append(item)
+
+        crawler = get_crawler(CallbackPoolSpider, {"CALLBACK_POOL_SIZE": 2})
+        crawler.signals.connect(_on_item_scraped, signals.item_scraped)
+        with LogCapture() as log:
+            yield crawler.crawl(
+                self.mockserver.url("/status?n=200"), mockserver=self.mockserver
+            )
+        self.assertEqual(
+            sorted((item["status"], item["foo"]) for item in items),
+            [(200, None), (202, "bar")],
+        )
+        self.assertNotIn(os.getpid(), [item["pid"] for item in items])
+        self.assertIn("Spider error processing", str(log))
+        self.assertEqual(crawler.stats.get_value("callback_pool/processed"), 3)
+        self.assertEqual(crawler.stats.get_value("spider_exceptions/ValueError"), 1)
+
+    def test_default_async_callback(self):
+        class AsyncParseSpider(SimpleSpider):
+            async def parse(self, response):
+                pass
+
+        crawler = get_crawler(AsyncParseSpider)
+        spider = crawler._create_spider(mockserver=self.mockserver)
+        request = Request("https://example.com", meta={"callback_pool": True})
+        self.assertTrue(is_process_pool_callback(request, spider))
+        with LogCapture() as log:
+            self.assertFalse(CallbackPool(crawler).can_run(request, spider))
+        self.assertIn("asynchronous callbacks are not supported", str(log))
+
+
 class CrawlSpiderTestCase(TestCase):
     def setUp(self):
         self.mockserver = MockServer()
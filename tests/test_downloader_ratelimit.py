@@ -0,0 +1,134 @@
+import time
+
+import pytest
+from twisted.internet import defer
+from twisted.trial.unittest import TestCase
+
+from scrapy import Request
+from scrapy.core.downloader import Downloader
+from scrapy.core.downloader.ratelimit import (
+    RateLimiter,
+    TokenBucket,
+    get_shared_bucket,
+    parse_rate_limit,
+)
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.test import get_crawler
+from tests.mockserver import MockServer
+from tests.spiders import MetaSpider
+
+
+def test_token_bucket():
+    bucket = TokenBucket(2, burst=2)
+    assert bucket.reserve(100) == 0
+    assert bucket.reserve(100) == 0
+    assert bucket.reserve(100) == pytest.approx(0.5)
+    assert bucket.reserve(100) == pytest.approx(1)
+    assert bucket.reserve(101) == pytest.approx(0.5)
+    assert bucket.wait_time(110) == 0
+    assert bucket.tokens == 2
+
+
+def test_token_bucket_invalid():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (5, (5.0, 1.0)),
+        ("2.5", (2.5, 1.0)),
+        ({"rate": 10, "burst": 3}, (10.0, 3.0)),
+        ('{"rate": 10}', (10.0, 1.0)),
+    ],
+)
+def test_parse_rate_limit(value, expected):
+    assert parse_rate_limit(value) == expected
+
+
+def test_shared_bucket():
+    bucket = get_shared_bucket("test", 10, 5)
+    assert get_shared_bucket("test", 20, 10) is bucket
+    assert (bucket.rate, bucket.burst) == (10, 5)
+    get_shared_bucket("test", 5)
+    assert (bucket.rate, bucket.burst) == (5, 1)
+
+
+def test_rate_limiter_buckets():
+    limiter = RateLimiter(100, {"example.com": 10, "a.example.com": 5, "b.com": 1})
+    slot_bucket = TokenBucket(1)
+    buckets = limiter.get_buckets(Request("https://a.example.com"), slot_bucket)
+    assert buckets == [
+        limiter.global_bucket,
+        limiter.domain_buckets["a.example.com"],
+        limiter.domain_buckets["example.com"],
+        slot_bucket,
+    ]
+    buckets = limiter.get_buckets(Request("https://example.com"))
+    assert buckets == [limiter.global_bucket, limiter.domain_buckets["example.com"]]
+    buckets = limiter.get_buckets(Request("https://notexample.com"))
+    assert buckets == [limiter.global_bucket]
+
+
+def test_rate_limiter_shared():
+    limiter1 = RateLimiter(100, {"example.com": 10})
+    limiter2 = RateLimiter(100, {"example.com": 10})
+    assert limiter1.global_bucket is limiter2.global_bucket
+    assert (
+        limiter1.domain_buckets["example.com"] is limiter2.domain_buckets["example.com"]
+    )
+
+
+def test_rate_limiter_reserve():
+    limiter = RateLimiter(None, {"example.com": {"rate": 1, "burst": 2}})
+    request = Request("https://example.com")
+    assert limiter.reserve(request, 100) == 0
+    assert limiter.reserve(request, 100) == 0
+    assert limiter.reserve(request, 100) == pytest.approx(1)
+    assert limiter.reserve(Request("https://example.org"), 100) == 0
+
+
+def test_downloader_settings():
+    crawler = get_crawler(settings_dict={"DOWNLOAD_SLOTS": {"a": {"rate_limit": 2}}})
+    downloader = Downloader(crawler)
+    downloader._slot_gc_loop.stop()  # Prevent an unclean reactor.
+    assert downloader.rate_limiter is None
+    _, slot = downloader._get_slot(
+        Request("https://example.com", meta={"download_slot": "a"}), spider=None
+    )
+    assert slot.rate_bucket is not None
+    assert slot.rate_bucket.rate == 2
+
+
+class RateLimitSpider(MetaSpider):
+    name = "rate_limit"
+
+    def start_requests(self):
+        self.times = []
+        for i in range(5):
+            yield Request(
+                self.mockserver.url(f"/?n={i}"),
+                meta={"download_slot": str(i)},
+            )
+
+    def parse(self, response):
+        self.times.append(time.time())
+
+
+class CrawlTestCase(TestCase):
+    def setUp(self):
+        self.mockserver = MockServer()
+        self.mockserver.__enter__()
+
+    def tearDown(self):
+        self.mockserver.__exit__(None, None, None)
+
+    @defer.inlineCallbacks
+    def test_global_rate_limit(self):
+        settings = {"DOWNLOAD_RATE_LIMIT": 5}
+        crawler = CrawlerRunner(settings).create_crawler(RateLimitSpider)
+        yield crawler.crawl(mockserver=self.mockserver)
+        times = sorted(crawler.spider.times)
+        self.assertEqual(len(times), 5)
+        self.assertGreater(times[-1] - times[0], 0.6)
@@ -1,4 +1,5 @@
 import asyncio
+from typing import Any, Dict, Optional
 from unittest import mock
 
 from pytest import mark
@@ -16,7 +17,7 @@ from scrapy.utils.test import get_crawler, get_from_asyncio_queue
 
 
 class ManagerTestCase(TestCase):
-    settings_dict = None
+    settings_dict: Optional[Dict[str, Any]] = None
 
     def setUp(self):
         self.crawler = get_crawler(Spider, self.settings_dict)
@@ -265,3 +266,86 @@ class MiddlewareUsingCoro(ManagerTestCase):
 
         self.assertIs(results[0], resp)
         self.assertFalse(download_func.called)
+
+
+class CompiledChainTest(ManagerTestCase):
+    """Synchronous middlewares run without Deferreds, and the chain only
+    switches to the asynchronous path when needed"""
+
+    settings_dict = {"DOWNLOADER_MIDDLEWARES_BASE": {}}
+
+    def test_sync_result_available_immediately(self):
+        calls = []
+
+        class SyncMiddleware:
+            def process_request(self, request, spider):
+                calls.append("request")
+
+            def process_response(self, request, response, spider):
+                calls.append("response")
+                return response
+
+        self.mwman._add_middleware(SyncMiddleware())
+        self.mwman._add_middleware(SyncMiddleware())
+        req = Request("http://example.com/index.html")
+        resp = Response(req.url)
+        dfd = self.mwman.download(lambda **kwargs: resp, req, self.spider)
+        self.assertTrue(dfd.called)
+        self.assertIs(dfd.result, resp)
+        self.assertEqual(calls, ["request", "request", "response", "response"])
+
+    def test_mixed_chain(self):
+        calls = []
+        resp = Response("http://example.com/index.html")
+
+        class SyncMiddleware:
+            def process_request(self, request, spider):
+                calls.append("sync")
+
+        class DeferredMiddleware:
+            def process_request(self, request, spider):
+                calls.append("deferred")
+                return defer.succeed(None)
+
+        class CoroMiddleware:
+            async def process_request(self, request, spider):
+                calls.append("coro")
+
+            async def process_response(self, request, response, spider):
+                calls.append("coro response")
+                return response
+
+        for mw in (SyncMiddleware, DeferredMiddleware, SyncMiddleware, CoroMiddleware):
+            self.mwman._add_middleware(mw())
+        self.mwman._add_middleware(SyncMiddleware())
+        self.assertEqual(
+            [is_async for _, is_async in self.mwman._get_chain("process_request")],
+            [False, False, False, True, False],
+        )
+        req = Request("http://example.com/index.html")
+        ret = self._download(req, resp)
+        self.assertIs(ret, resp)
+        self.assertEqual(
+            calls, ["sync", "deferred", "sync", "coro", "sync", "coro response"]
+        )
+
+    def test_exception_chain(self):
+        resp = Response("http://example.com/index.html")
+
+        class FailingMiddleware:
+            def process_request(self, request, spider):
+                raise ValueError
+
+        class DeferredMiddleware:
+            def process_exception(self, request, exception, spider):
+                return defer.succeed(None)
+
+        class RecoveringMiddleware:
+            def process_exception(self, request, exception, spider):
+                return resp
+
+        self.mwman._add_middleware(RecoveringMiddleware())
+        self.mwman._add_middleware(DeferredMiddleware())
+        self.mwman._add_middleware(FailingMiddleware())
+        req = Request("http://example.com/index.html")
+        self.assertIs(self._download(req), resp)
@@ -1,4 +1,5 @@
 import logging
+from tempfile import mkdtemp
 from unittest import TestCase
 
 import pytest
@@ -732,3 +733,83 @@ class CookiesMiddlewareTest(TestCase):
             "co.uk",
             cookies=True,
         )
+
+
+class CookieJarsTest(TestCase):
+    def setUp(self):
+        self.spider = Spider("foo")
+
+    def _crawl(self, mw, url, jar, set_cookie=None):
+        request = Request(url, meta={"cookiejar": jar})
+        mw.process_request(request, self.spider)
+        headers = {"Set-Cookie": set_cookie} if set_cookie else {}
+        mw.process_response(request, Response(url, headers=headers), self.spider)
+        return request
+
+    def test_max_jars(self):
+        mw = CookiesMiddleware(max_jars=3)
+        self._crawl(mw, "http://example.com", None, "a=b")
+        for i in range(5):
+            self._crawl(mw, "http://example.com", i, f"jar={i}")
+        self.assertEqual(set(mw.jars), {None, 3, 4})
+        self.assertEqual(mw.jars.evicted, 3)
+        request = self._crawl(mw, "http://example.com", None)
+        self.assertEqual(request.headers.get("Cookie"), b"a=b")
+        request = self._crawl(mw, "http://example.com", 4)
+        self.assertEqual(request.headers.get("Cookie"), b"jar=4")
+        request = self._crawl(mw, "http://example.com", 0)
+        self.assertIsNone(request.headers.get("Cookie"))
+
+    def test_max_jars_keeps_returned_jar(self):
+        mw = CookiesMiddleware(max_jars=1)
+        self._crawl(mw, "http://example.com", None, "a=b")
+        self._crawl(mw, "http://example.com", 0, "jar=0")
+        request = self._crawl(mw, "http://example.com", 0)
+        self.assertEqual(request.headers.get("Cookie"), b"jar=0")
+        self._crawl(mw, "http://example.com", 1, "jar=1")
+        self.assertEqual(set(mw.jars), {None, 1})
+        request = self._crawl(mw, "http://example.com", 1)
+        self.assertEqual(request.headers.get("Cookie"), b"jar=1")
+
+    def test_jar_ttl_keeps_returned_jar(self):
+        mw = CookiesMiddleware(jar_ttl=10)
+        self._crawl(mw, "http://example.com", 0, "jar=0")
+        mw.jars.last_used[0] -= 20
+        request = self._crawl(mw, "http://example.com", 0)
+        self.assertEqual(request.headers.get("Cookie"), b"jar=0")
+
+    def test_jar_ttl(self):
+        mw = CookiesMiddleware(jar_ttl=10)
+        for i in range(3):
+            self._crawl(mw, "http://example.com", i, f"jar={i}")
+        mw.jars.last_used[0] -= 20
+        self._crawl(mw, "http://example.com", 2)
+        self.assertEqual(set(mw.jars), {1, 2})
+
+    def test_unlimited(self):
+        mw = CookiesMiddleware()
+        for i in range(100):
+            self._crawl(mw, "http://example.com", i, f"jar={i}")
+        self.assertEqual(len(mw.jars), 100)
+
+    def test_persist(self):
+        jobdir = mkdtemp()
+        settings = {"COOKIES_PERSIST": True, "JOBDIR": jobdir}
+        crawler = get_crawler(settings_dict=settings)
+        mw = CookiesMiddleware.from_crawler(crawler)
+        self._crawl(mw, "http://example.com", None, "a=b")
+        self._crawl(mw, "http://example.com", "session", "c=d")
+        self._crawl(mw, "http://example.com", "expired", "e=f; Max-Age=0")
+        mw.spider_closed(self.spider)
+
+        mw = CookiesMiddleware.from_crawler(get_crawler(settings_dict=settings))
+        request = self._crawl(mw, "http://example.com", None)
+        self.assertEqual(request.headers.get("Cookie"), b"a=b")
+        request = self._crawl(mw, "http://example.com", "session")
+        self.assertEqual(request.headers.get("Cookie"), b"c=d")
+        self.assertEqual(len(mw.jars["expired"]), 0)
+
+    def test_persist_no_jobdir(self):
+        crawler = get_crawler(settings_dict={"COOKIES_PERSIST": True})
+        mw = CookiesMiddleware.from_crawler(crawler)
+        self.assertIsNone(mw.jobdir)
@@ -1,7 +1,15 @@
+import json
+import time
+from tempfile import mkdtemp
 from unittest import mock
 
 from twisted.internet import error, reactor
-from twisted.internet.defer import Deferred, DeferredList, maybeDeferred
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    inlineCallbacks,
+    maybeDeferred,
+)
 from twisted.python import failure
 from twisted.trial import unittest
 
@@ -267,3 +275,124 @@ class RobotsTxtMiddlewareWithReppyTest(RobotsTxtMiddlewareTest):
         self.crawler.settings.set(
             "ROBOTSTXT_PARSER", "scrapy.robotstxt.ReppyRobotParser"
         )
+
+
+class RobotsTxtCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.crawler = mock.MagicMock()
+        self.crawler.settings = Settings({"ROBOTSTXT_OBEY": True})
+        self.headers = {}
+
+        def return_response(request):
+            response = TextResponse(
+                request.url,
+                body=b"User-Agent: *\nDisallow: /admin/\n",
+                headers=self.headers,
+            )
+            deferred = Deferred()
+            reactor.callFromThread(deferred.callback, response)
+            return deferred
+
+        self.crawler.engine.download.side_effect = return_response
+
+    def _stat(self, key):
+        return sum(
+            1
+            for call in self.crawler.stats.inc_value.call_args_list
+            if call[0][0] == key
+        )
+
+    @inlineCallbacks
+    def _assert_ignored(self, middleware, url):
+        with self.assertRaises(IgnoreRequest):
+            yield maybeDeferred(middleware.process_request, Request(url), None)
+
+    @inlineCallbacks
+    def test_hit(self):
+        middleware = RobotsTxtMiddleware(self.crawler)
+        yield self._assert_ignored(middleware, "http://site.local/admin/")
+        yield self._assert_ignored(middleware, "http://site.local/admin/")
+        self.assertEqual(self.crawler.engine.download.call_count, 1)
+        self.assertEqual(self._stat("robotstxt/cache/miss"), 1)
+        self.assertEqual(self._stat("robotstxt/cache/hit"), 1)
+
+    @inlineCallbacks
+    def test_lru(self):
+        self.crawler.settings.set("ROBOTSTXT_CACHE_SIZE", 2)
+        middleware = RobotsTxtMiddleware(self.crawler)
+        for host in ("a", "b", "a", "c", "a", "b"):
+            yield self._assert_ignored(middleware, f"http://{host}.local/admin/")
+        self.assertEqual(list(middleware._parsers), ["a.local", "b.local"])
+        self.assertEqual(self.crawler.engine.download.call_count, 4)
+        self.assertEqual(self._stat("robotstxt/cache/eviction"), 2)
+
+    @inlineCallbacks
+    def test_ttl(self):
+        middleware = RobotsTxtMiddleware(self.crawler)
+        yield self._assert_ignored(middleware, "http://site.local/admin/")
+        expires = middleware._expires["site.local"]
+        self.assertLess(abs(expires - time.time() - 24 * 60 * 60), 10)
+        middleware._expires["site.local"] = time.time() - 1
+        yield self._assert_ignored(middleware, "http://site.local/admin/")
+        self.assertEqual(self.crawler.engine.download.call_count, 2)
+        self.assertEqual(self._stat("robotstxt/cache/refetch"), 1)
+
+    @inlineCallbacks
+    def test_ttl_headers(self):
+        middleware = RobotsTxtMiddleware(self.crawler)
+        self.headers = {"Cache-Control": "public, max-age=3600"}
+        yield self._assert_ignored(middleware, "http://a.local/admin/")
+        self.assertLess(abs(middleware._expires["a.local"] - time.time() - 3600), 10)
+        self.headers = {
+            "Date": "Mon, 01 Jan 2024 00:00:00 GMT",
+            "Expires": "Mon, 01 Jan 2024 02:00:00 GMT",
+        }
+        yield self._assert_ignored(middleware, "http://b.local/admin/")
+        self.assertLess(abs(middleware._expires["b.local"] - time.time() - 7200), 10)
+        self.headers = {"Cache-Control": "no-cache, max-age=0"}
+        yield self._assert_ignored(middleware, "http://c.local/admin/")
+        self.assertLess(abs(middleware._expires["c.local"] - time.time() - 60), 10)
+
+    @inlineCallbacks
+    def test_disk(self):
+        self.crawler.settings.set("JOBDIR", mkdtemp())
+        middleware = RobotsTxtMiddleware(self.crawler)
+        yield self._assert_ignored(middleware, "http://site.local/admin/")
+        middleware = RobotsTxtMiddleware(self.crawler)
+        yield self._assert_ignored(middleware, "http://site.local/admin/")
+        yield self._assert_ignored(middleware, "http://site.local/admin/")
+        self.assertEqual(self.crawler.engine.download.call_count, 1)
+        self.assertEqual(self._stat("robotstxt/cache/disk_hit"), 1)
+        self.assertEqual(self._stat("robotstxt/cache/hit"), 1)
+
+    @inlineCallbacks
+    def test_disk_format(self):
+        self.crawler.settings.set("ROBOTSTXT_CACHE_DIR", mkdtemp())
+        middleware = RobotsTxtMiddleware(self.crawler)
+        yield self._assert_ignored(middleware, "http://site.local/admin/")
+        path = middleware._cache_path("site.local")
+        self.assertIn(b"Disallow: /admin/", path.read_bytes())
+        metadata = json.loads(path.with_suffix(".json").read_text())
+        self.assertEqual(metadata["netloc"], "site.local")
+        self.assertEqual(metadata["expires"], middleware._expires["site.local"])
+
+        path.with_suffix(".json").write_bytes(b"\x80\x04invalid")
+        middleware = RobotsTxtMiddleware(self.crawler)
+        yield self._assert_ignored(middleware, "http://site.local/admin/")
+        self.assertEqual(self.crawler.engine.download.call_count, 2)
+        self.assertEqual(self._stat("robotstxt/cache/miss"), 2)
+
+    @inlineCallbacks
+    def test_disk_expired(self):
+        self.crawler.settings.set("ROBOTSTXT_CACHE_DIR", mkdtemp())
+        self.headers = {"Cache-Control": "max-age=60"}
+        middleware = RobotsTxtMiddleware(self.crawler)
+        yield self._assert_ignored(middleware, "http://site.local/admin/")
+        middleware = RobotsTxtMiddleware(self.crawler)
+        with mock.patch(
+            "scrapy.downloadermiddlewares.robotstxt.time",
+            return_value=time.time() + 120,
+        ):
+            yield self._assert_ignored(middleware, "http://site.local/admin/")
+        self.assertEqual(self.crawler.engine.download.call_count, 2)
+        self.assertEqual(self._stat("robotstxt/cache/refetch"), 1)
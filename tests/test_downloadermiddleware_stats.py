@@ -46,3 +46,26 @@ class TestDownloaderStats(TestCase):
 
     def tearDown(self):
         self.crawler.stats.close_spider(self.spider, "")
+
+
+class TestDownloaderStatsCounterStatsCollector(TestDownloaderStats):
+    def setUp(self):
+        self.crawler = get_crawler(
+            Spider,
+            {"STATS_CLASS": "scrapy.statscollectors.CounterStatsCollector"},
+        )
+        self.spider = self.crawler._create_spider("scrapytest.org")
+        self.mw = DownloaderStats(self.crawler.stats)
+
+        self.crawler.stats.open_spider(self.spider)
+
+        self.req = Request("http://scrapytest.org")
+        self.res = Response("scrapytest.org", status=400)
+
+    def test_repeated_calls(self):
+        for _ in range(3):
+            self.mw.process_request(self.req, self.spider)
+            self.mw.process_response(self.req, self.res, self.spider)
+        self.assertStatsEqual("downloader/request_count", 3)
+        self.assertStatsEqual("downloader/request_method_count/GET", 3)
+        self.assertStatsEqual("downloader/response_status_count/400", 3)
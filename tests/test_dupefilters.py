@@ -91,6 +91,16 @@ class RFPDupeFilterTest(unittest.TestCase):
 
         dupefilter.close("finished")
 
+    def test_memory_usage(self):
+        dupefilter = _get_dupefilter()
+        empty = dupefilter.memory_usage()
+        dupefilter.request_seen(Request("http://scrapytest.org/1"))
+        one = dupefilter.memory_usage()
+        self.assertGreater(one, empty)
+        dupefilter.request_seen(Request("http://scrapytest.org/2"))
+        self.assertEqual(dupefilter.memory_usage() - one, one - empty)
+        dupefilter.close("finished")
+
     def test_dupefilter_path(self):
         r1 = Request("http://scrapytest.org/1")
         r2 = Request("http://scrapytest.org/2")
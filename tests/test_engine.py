@@ -104,6 +104,19 @@ class DataClassItemsSpider(TestSpider):
     item_cls = DataClassItem
 
 
+class CoroutineEngineSpider(TestSpider):
+    custom_settings = {"ENGINE_COROUTINES": True}
+
+
+class CoroutineEngineItemErrorSpider(TestSpider):
+    custom_settings = {
+        "ENGINE_COROUTINES": True,
+        "ITEM_PIPELINES": {
+            "tests.pipelines.ProcessWithZeroDivisionErrorPipeline": 300,
+        },
+    }
+
+
 class ItemZeroDivisionErrorSpider(TestSpider):
     custom_settings = {
         "ITEM_PIPELINES": {
@@ -257,6 +270,23 @@ class EngineTest(unittest.TestCase):
             self._assert_signals_caught(run)
             self._assert_bytes_received(run)
 
+    @defer.inlineCallbacks
+    def test_crawler_coroutines(self):
+        run = CrawlerRun(CoroutineEngineSpider)
+        yield run.run()
+        self._assert_visited_urls(run)
+        self._assert_scheduled_requests(run, count=9)
+        self._assert_downloaded_responses(run, count=9)
+        self._assert_scraped_items(run)
+        self._assert_signals_caught(run)
+        self._assert_bytes_received(run)
+
+    @defer.inlineCallbacks
+    def test_crawler_coroutines_itemerror(self):
+        run = CrawlerRun(CoroutineEngineItemErrorSpider)
+        yield run.run()
+        self._assert_items_error(run)
+
     @defer.inlineCallbacks
     def test_crawler_dupefilter(self):
         run = CrawlerRun(TestDupeFilterSpider)
@@ -4,6 +4,7 @@ from twisted.internet import defer
 from scrapy.exceptions import StopDownload
 from tests.test_engine import (
     AttrsItemsSpider,
+    CoroutineEngineSpider,
     CrawlerRun,
     DataClassItemsSpider,
     DictItemsSpider,
@@ -61,6 +62,17 @@ class BytesReceivedEngineTest(EngineTest):
             self._assert_headers_received(run)
             self._assert_bytes_received(run)
 
+    @defer.inlineCallbacks
+    def test_crawler_coroutines(self):
+        run = BytesReceivedCrawlerRun(CoroutineEngineSpider)
+        yield run.run()
+        self._assert_visited_urls(run)
+        self._assert_scheduled_requests(run, count=9)
+        self._assert_downloaded_responses(run, count=9)
+        self._assert_signals_caught(run)
+        self._assert_headers_received(run)
+        self._assert_bytes_received(run)
+
     def _assert_bytes_received(self, run: CrawlerRun):
         self.assertEqual(9, len(run.bytes))
         for request, data in run.bytes.items():
@@ -4,6 +4,7 @@ from twisted.internet import defer
 from scrapy.exceptions import StopDownload
 from tests.test_engine import (
     AttrsItemsSpider,
+    CoroutineEngineSpider,
     CrawlerRun,
     DataClassItemsSpider,
     DictItemsSpider,
@@ -60,6 +61,16 @@ class HeadersReceivedEngineTest(EngineTest):
             self._assert_bytes_received(run)
             self._assert_headers_received(run)
 
+    @defer.inlineCallbacks
+    def test_crawler_coroutines(self):
+        run = HeadersReceivedCrawlerRun(CoroutineEngineSpider)
+        yield run.run()
+        self._assert_visited_urls(run)
+        self._assert_downloaded_responses(run, count=6)
+        self._assert_signals_caught(run)
+        self._assert_bytes_received(run)
+        self._assert_headers_received(run)
+
     def _assert_bytes_received(self, run: CrawlerRun):
         self.assertEqual(0, len(run.bytes))
 
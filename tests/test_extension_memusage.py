@@ -0,0 +1,31 @@
+import sys
+from unittest import mock
+
+import pytest
+
+from scrapy.core.engine import ExecutionEngine
+from scrapy.extensions.memusage import MemoryUsage
+from scrapy.utils.test import get_crawler
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="The resource module is not available"
+)
+
+
+def _get_extension(settings=None):
+    crawler = get_crawler(settings_dict=settings)
+    crawler._apply_settings()
+    crawler.engine = ExecutionEngine(crawler, lambda _: None)
+    return MemoryUsage.from_crawler(crawler)
+
+
+def test_update():
+    extension = _get_extension()
+    with mock.patch("scrapy.extensions.memusage.get_rss", return_value=1024):
+        extension.update()
+    stats = extension.crawler.stats
+    assert stats.get_value("memusage/current") == 1024
+    assert stats.get_value("memusage/tracked/downloader") == 0
+    assert stats.get_value("memusage/tracked") == 0
+    assert stats.get_value("memusage/max") > 0
+    extension.crawler.engine.downloader.close()
@@ -0,0 +1,179 @@
+import threading
+from inspect import isasyncgenfunction, iscoroutinefunction
+from pathlib import Path
+from tempfile import mkdtemp
+from unittest import TestCase, mock
+
+from twisted.internet import defer
+from twisted.trial import unittest
+
+from scrapy.exceptions import NotConfigured
+from scrapy.extensions.profiling import Profiler
+from scrapy.utils.defer import deferred_from_coro, maybe_deferred_to_future
+from scrapy.utils.test import get_crawler
+from tests.mockserver import MockServer
+from tests.spiders import ItemSpider
+
+
+class Pipeline:
+    def process_item(self, item, spider):
+        return item
+
+
+def _get_profiler(sample_rate=1.0):
+    profiler = Profiler(get_crawler(), sample_rate=sample_rate)
+    profiler._thread_id = threading.get_ident()
+    return profiler
+
+
+class ProfilerTest(TestCase):
+    def test_not_configured(self):
+        with self.assertRaises(NotConfigured):
+            Profiler.from_crawler(get_crawler())
+
+    def test_invalid_sample_rate(self):
+        with self.assertRaises(ValueError):
+            Profiler(get_crawler(), sample_rate=0)
+
+    def test_function(self):
+        profiler = _get_profiler()
+
+        def inner(x):
+            return x * 2
+
+        inner = profiler.wrap("inner", inner)
+        outer = profiler.wrap("outer", lambda x: inner(x) + 1)
+        self.assertEqual(outer(1), 3)
+        self.assertEqual(outer(2), 5)
+        self.assertEqual(profiler.stats["outer"].samples, 2)
+        self.assertEqual(profiler.stats["inner"].samples, 2)
+        self.assertGreaterEqual(
+            profiler.stats["outer"].wall_time, profiler.stats["inner"].wall_time
+        )
+        self.assertEqual(set(profiler.stacks), {"outer", "outer;inner"})
+        self.assertEqual(sum(profiler.stats["outer"].histogram), 2)
+        self.assertEqual(profiler._frames, [])
+
+    def test_exception(self):
+        profiler = _get_profiler()
+        wrapped = profiler.wrap("f", lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            wrapped()
+        self.assertEqual(profiler.stats["f"].samples, 1)
+        self.assertEqual(profiler._frames, [])
+
+    def test_generator(self):
+        profiler = _get_profiler()
+
+        def gen():
+            yield 1
+            yield 2
+
+        wrapped = profiler.wrap("gen", gen)
+        self.assertEqual(list(wrapped()), [1, 2])
+        # The call and each of the 3 steps.
+        self.assertEqual(profiler.stats["gen"].samples, 4)
+
+    def test_preserves_kind(self):
+        profiler = _get_profiler()
+
+        async def coroutine():
+            pass
+
+        async def async_generator():
+            yield
+
+        self.assertTrue(iscoroutinefunction(profiler.wrap("c", coroutine)))
+        self.assertTrue(isasyncgenfunction(profiler.wrap("a", async_generator)))
+        wrapped = profiler.wrap("c", coroutine)
+        self.assertEqual(wrapped.__qualname__, coroutine.__qualname__)
+
+    def test_sampling(self):
+        profiler = _get_profiler(sample_rate=0.5)
+        inner = profiler.wrap("inner", lambda: None)
+        outer = profiler.wrap("outer", inner)
+        with mock.patch("scrapy.extensions.profiling.random", return_value=0.7):
+            outer()
+            inner()
+        self.assertEqual(profiler.stats, {})
+        with mock.patch("scrapy.extensions.profiling.random", return_value=0.2):
+            outer()
+        self.assertEqual(profiler.stats["inner"].samples, 1)
+        stats = profiler.get_stats()
+        self.assertEqual(stats["profiling/sample_rate"], 0.5)
+        self.assertEqual(
+            stats["profiling/inner/wall_time"],
+            round(profiler.stats["inner"].wall_time * 2, 6),
+        )
+
+    def test_other_thread(self):
+        profiler = _get_profiler()
+        wrapped = profiler.wrap("f", lambda: None)
+        thread = threading.Thread(target=wrapped)
+        thread.start()
+        thread.join()
+        self.assertEqual(profiler.stats, {})
+
+    def test_format_stacks(self):
+        profiler = _get_profiler(sample_rate=0.5)
+        profiler.stacks["a"] = 0.001
+        profiler.stacks["a;b c"] = 0.0005
+        self.assertEqual(profiler.format_stacks(), "a 2000\na;b_c 1000\n")
+
+
+class ProfilerAsyncTest(unittest.TestCase):
+    @defer.inlineCallbacks
+    def test_coroutine(self):
+        from twisted.internet import reactor
+
+        profiler = _get_profiler()
+
+        async def coroutine():
+            for _ in range(2):
+                d = defer.Deferred()
+                reactor.callLater(0, d.callback, None)
+                await maybe_deferred_to_future(d)
+            return 1
+
+        wrapped = profiler.wrap("coroutine", coroutine)
+        result = yield deferred_from_coro(wrapped())
+        self.assertEqual(result, 1)
+        self.assertEqual(profiler.stats["coroutine"].samples, 3)
+        self.assertEqual(profiler._frames, [])
+
+
+class ProfilerCrawlTest(unittest.TestCase):
+    def setUp(self):
+        self.mockserver = MockServer()
+        self.mockserver.__enter__()
+
+    def tearDown(self):
+        self.mockserver.__exit__(None, None, None)
+
+    @defer.inlineCallbacks
+    def test_crawl(self):
+        tmpdir = Path(mkdtemp())
+        output = tmpdir / "profile.folded"
+        settings = {
+            "PROFILING_ENABLED": True,
+            "PROFILING_SAMPLE_RATE": 1,
+            "PROFILING_OUTPUT": str(output),
+            "ITEM_PIPELINES": {Pipeline: 0},
+            "FEEDS": {str(tmpdir / "items.jsonl"): {"format": "jsonlines"}},
+        }
+        crawler = get_crawler(ItemSpider, settings)
+        yield crawler.crawl(total=2, mockserver=self.mockserver)
+        stats = crawler.stats.get_stats()
+        for key in (
+            "callbacks/ItemSpider.parse",
+            "downloadermw/RetryMiddleware.process_response",
+            "spidermw/DepthMiddleware.process_spider_output",
+            "pipelines/Pipeline.process_item",
+            "signals/item_scraped",
+            "feeds/jsonlines.export_item",
+        ):
+            self.assertGreater(stats[f"profiling/{key}/samples"], 0, key)
+            self.assertIn(f"profiling/{key}/histogram", stats)
+        stacks = output.read_text()
+        self.assertIn("signals/item_scraped;feeds/jsonlines.export_item ", stacks)
+        self.assertIn(";callbacks/ItemSpider.parse ", stacks)
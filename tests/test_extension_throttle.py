@@ -1,9 +1,10 @@
 from logging import INFO
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 
 from scrapy import Request, Spider
+from scrapy.core.downloader import Slot
 from scrapy.exceptions import NotConfigured
 from scrapy.extensions.throttle import AutoThrottle
 from scrapy.http.response import Response
@@ -341,3 +342,154 @@ def test_debug_disabled(caplog):
         at._response_downloaded(response, request, spider)
 
     assert caplog.record_tuples == []
+
+
+def _get_aimd_throttle(settings=None):
+    settings = {
+        "AUTOTHROTTLE_ADJUST_CONCURRENCY": True,
+        "AUTOTHROTTLE_START_DELAY": 0.0,
+        **(settings or {}),
+    }
+    crawler = get_crawler(settings)
+    at = build_from_crawler(AutoThrottle, crawler)
+    spider = TestSpider()
+    at._spider_opened(spider)
+    crawler.stats.open_spider(spider)
+    crawler.engine = Mock()
+    crawler.engine.downloader = Mock()
+    slot = Slot(8, 0.0, False)
+    crawler.engine.downloader.slots = {"foo": slot}
+    return crawler, at, spider, slot
+
+
+def _download(at, spider, latency=1.0, status=200):
+    meta = {"download_latency": latency, "download_slot": "foo"}
+    request = Request("https://example.com", meta=meta)
+    response = Response(request.url, status=status)
+    at._request_reached_downloader(request, spider)
+    at._response_downloaded(response, request, spider)
+    at._request_left_downloader(request, spider)
+
+
+def test_adjust_concurrency_increase():
+    crawler, at, spider, slot = _get_aimd_throttle()
+    at._request_reached_downloader(
+        Request("https://example.com", meta={"download_slot": "foo"}), spider
+    )
+    assert slot.concurrency == 1
+    concurrencies = []
+    for _ in range(60):
+        _download(at, spider)
+        concurrencies.append(slot.concurrency)
+    assert concurrencies == sorted(concurrencies)
+    assert concurrencies[0] == 2
+    assert concurrencies[-1] == 8
+    assert slot.delay == 0.0
+
+
+def test_adjust_concurrency_max():
+    crawler, at, spider, slot = _get_aimd_throttle({"AUTOTHROTTLE_MAX_CONCURRENCY": 3})
+    for _ in range(60):
+        _download(at, spider)
+    assert slot.concurrency == 3
+
+
+@pytest.mark.parametrize(
+    ("latency", "status"),
+    (
+        (1.0, 503),
+        (1.0, 429),
+        (10.0, 200),
+        (None, None),
+    ),
+)
+def test_adjust_concurrency_decrease(latency, status):
+    crawler, at, spider, slot = _get_aimd_throttle()
+    for _ in range(60):
+        _download(at, spider)
+    assert slot.concurrency == 8
+    state = at._slot_states["foo"]
+    state.last_decrease = 0.0
+    if latency is None:
+        # Download error
+        request = Request("https://example.com", meta={"download_slot": "foo"})
+        at._request_left_downloader(request, spider)
+    else:
+        for _ in range(3 if status == 200 else 1):
+            _download(at, spider, latency, status)
+    assert slot.concurrency == 4
+    assert crawler.stats.get_value("autothrottle/decreases") == 1
+
+
+def test_adjust_concurrency_no_latency():
+    crawler, at, spider, slot = _get_aimd_throttle()
+    for _ in range(60):
+        _download(at, spider)
+    state = at._slot_states["foo"]
+    state.last_decrease = 0.0
+    # e.g. a data: or file: download
+    _download(at, spider, latency=None)
+    assert slot.concurrency == 8
+    assert not at._responded
+
+
+def test_adjust_concurrency_delay():
+    crawler, at, spider, slot = _get_aimd_throttle()
+    state = at._get_slot_state("foo", slot)
+    _download(at, spider, 1.0, 503)
+    assert slot.concurrency == 1
+    assert slot.delay == 1.0
+    state.last_decrease = 0.0
+    _download(at, spider, 1.0, 503)
+    assert slot.delay == 2.0
+    _download(at, spider)
+    assert slot.delay == 1.0
+    assert slot.concurrency == 1
+
+
+def test_adjust_concurrency_stats():
+    crawler, at, spider, slot = _get_aimd_throttle()
+    for _ in range(5):
+        _download(at, spider)
+    at._spider_closed(spider)
+    stats = crawler.stats.get_stats()
+    assert stats["autothrottle/slots/foo/concurrency"] == slot.concurrency
+    assert stats["autothrottle/slots/foo/latency_p50"] == 1.0
+    assert stats["autothrottle/slots/foo/latency_p90"] == 1.0
+    assert stats["autothrottle/slots/foo/error_rate"] == 0.0
+    assert "autothrottle/slots/foo/throughput" in stats
+
+
+def test_adjust_concurrency_errors_hold():
+    crawler, at, spider, slot = _get_aimd_throttle()
+    for _ in range(60):
+        _download(at, spider)
+    assert slot.concurrency == 8
+    at._slot_states["foo"].last_decrease = 0.0
+    _download(at, spider, 1.0, 503)
+    state = at._slot_states["foo"]
+    assert state.concurrency == 4.0
+    # The concurrency holds until the error leaves the window.
+    for _ in range(19):
+        _download(at, spider)
+    assert state.concurrency == 4.0
+    _download(at, spider)
+    assert state.concurrency > 4.0
+
+
+def test_adjust_concurrency_unused_hold():
+    crawler, at, spider, slot = _get_aimd_throttle()
+    now = 0.0
+
+    def fake_time():
+        return now
+
+    with patch("scrapy.extensions.throttle.time", fake_time):
+        # One response every 10 seconds with a 1 second latency means that
+        # there is 0.1 request in flight on average.
+        for _ in range(20):
+            now += 10.0
+            _download(at, spider)
+    # The concurrency stops increasing once there are enough latencies to
+    # estimate the number of requests in flight.
+    assert slot.concurrency == 3
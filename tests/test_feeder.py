@@ -0,0 +1,252 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest import TestCase, mock
+from urllib.parse import urlencode
+
+from testfixtures import LogCapture
+from twisted.internet import defer
+from twisted.trial import unittest
+
+from scrapy import Request, Spider
+from scrapy.core.feeder import StartRequestsFeeder
+from scrapy.utils.test import get_crawler
+from tests.mockserver import MockServer
+from tests.spiders import BrokenStartRequestsSpider, DuplicateStartRequestsSpider
+
+
+class FilteredStartRequestsSpider(DuplicateStartRequestsSpider):
+    dont_filter = False
+
+
+class FailingStartRequestsSpider(BrokenStartRequestsSpider):
+    fail_yielding = True
+
+
+class LazyStartRequestsSpider(BrokenStartRequestsSpider):
+    def start_requests(self):
+        for s in range(100):
+            qargs = {"total": 10, "seed": s}
+            url = self.mockserver.url(f"/follow?{urlencode(qargs, doseq=True)}")
+            yield Request(url, meta={"seed": s})
+        # Callbacks may not have run yet, but responses must have been
+        # received.
+        self.received_before_end = self.crawler.stats.get_value(
+            "response_received_count", 0
+        )
+
+
+class MockSpiderMiddlewareManager:
+    def __init__(self):
+        self.methods = []
+
+    def process_start_requests(self, start_requests, spider):
+        for method in self.methods:
+            start_requests = method(start_requests)
+        return defer.succeed(start_requests)
+
+
+class MockEngine:
+    def __init__(self, settings=None):
+        self.settings = get_crawler(settings_dict=settings).settings
+        self.spider = Spider("foo")
+        self.scheduled = []
+        self.slot = SimpleNamespace(scheduler=self.scheduled, nextcall=mock.Mock())
+        self.scraper = SimpleNamespace(spidermw=MockSpiderMiddlewareManager())
+
+    def _schedule_requests(self, requests):
+        self.scheduled.extend(requests)
+
+
+def start_requests(count, fail_at=None, wait_at=None, event=None):
+    for i in range(count):
+        if i == fail_at:
+            1 / 0
+        if i == wait_at:
+            event.wait(5)
+        yield Request(f"https://example.com/{i}")
+
+
+def drop_even(requests):
+    for request in requests:
+        if int(request.url.rsplit("/", 1)[1]) % 2:
+            yield request
+
+
+class StartRequestsFeederTest(TestCase):
+    def _get_feeder(self, requests, use_thread=False, middlewares=()):
+        engine = MockEngine()
+        spidermw = engine.scraper.spidermw
+        spidermw.methods.extend(middlewares)
+        feeder = StartRequestsFeeder(
+            engine, requests, batch_size=3, high_watermark=5, use_thread=use_thread
+        )
+        # Done by the engine.
+        dfd = spidermw.process_start_requests(feeder.requests, engine.spider)
+        feeder.requests = dfd.result
+        self.addCleanup(feeder.close)
+        return feeder, engine
+
+    def test_from_engine(self):
+        self.assertIsNone(StartRequestsFeeder.from_engine(MockEngine(), iter([])))
+        engine = MockEngine(
+            {"START_REQUESTS_BATCH_SIZE": 10, "START_REQUESTS_HIGH_WATERMARK": 20}
+        )
+        feeder = StartRequestsFeeder.from_engine(engine, iter([]))
+        self.assertEqual(feeder.batch_size, 10)
+        self.assertEqual(feeder.high_watermark, 20)
+        self.assertIsNone(feeder._thread)
+
+    def test_feed(self):
+        feeder, engine = self._get_feeder(start_requests(8))
+        self.assertTrue(feeder.feed())
+        self.assertEqual(len(engine.scheduled), 3)
+        self.assertTrue(feeder.feed())
+        self.assertEqual(len(engine.scheduled), 6)
+        # The scheduler is above the high watermark.
+        self.assertTrue(feeder.feed())
+        self.assertEqual(len(engine.scheduled), 6)
+        del engine.scheduled[:4]
+        self.assertTrue(feeder.feed())
+        self.assertEqual(len(engine.scheduled), 4)
+        del engine.scheduled[:]
+        self.assertFalse(feeder.feed())
+        self.assertTrue(feeder.done)
+        self.assertEqual(engine.slot.nextcall.schedule.call_count, 3)
+
+    def test_error(self):
+        feeder, engine = self._get_feeder(start_requests(8, fail_at=4))
+        self.assertTrue(feeder.feed())
+        # Start requests read before the error are still scheduled.
+        self.assertTrue(feeder.feed())
+        self.assertEqual(len(engine.scheduled), 4)
+        with LogCapture() as log:
+            self.assertFalse(feeder.feed())
+        self.assertIn("Error while obtaining start requests", str(log))
+        self.assertEqual(len(engine.scheduled), 4)
+
+    def _feed_until_done(self, feeder):
+        for _ in range(100):
+            if not feeder.feed():
+                return
+            time.sleep(0.01)
+        self.fail("Start requests were not consumed")
+
+    @mock.patch("twisted.internet.reactor.callFromThread")
+    def test_thread(self, callFromThread):
+        feeder, engine = self._get_feeder(start_requests(4), use_thread=True)
+        self.assertFalse(feeder._thread.is_alive())
+        self._feed_until_done(feeder)
+        self.assertEqual(len(engine.scheduled), 4)
+        feeder._thread.join(1)
+        self.assertFalse(feeder._thread.is_alive())
+        self.assertTrue(callFromThread.called)
+
+    @mock.patch("twisted.internet.reactor.callFromThread")
+    def test_thread_middlewares(self, callFromThread):
+        threads = set()
+
+        def process_start_requests(requests):
+            for request in requests:
+                threads.add(threading.current_thread())
+                yield request
+
+        feeder, engine = self._get_feeder(
+            start_requests(8),
+            use_thread=True,
+            middlewares=[process_start_requests, drop_even],
+        )
+        self._feed_until_done(feeder)
+        self.assertEqual(len(engine.scheduled), 4)
+        self.assertEqual(threads, {threading.current_thread()})
+
+    @mock.patch("twisted.internet.reactor.callFromThread")
+    def test_thread_middlewares_no_wait(self, callFromThread):
+        # When spider middlewares drop start requests, the feeder does not
+        # wait for the thread to read more of them.
+        event = threading.Event()
+        self.addCleanup(event.set)
+        feeder, engine = self._get_feeder(
+            start_requests(6, wait_at=3, event=event),
+            use_thread=True,
+            middlewares=[drop_even],
+        )
+        for _ in range(100):
+            feeder.feed()
+            if engine.scheduled:
+                break
+            time.sleep(0.01)
+        start = time.monotonic()
+        self.assertTrue(feeder.feed())
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual([r.url for r in engine.scheduled], ["https://example.com/1"])
+        event.set()
+        self._feed_until_done(feeder)
+        self.assertEqual(len(engine.scheduled), 3)
+
+    @mock.patch("twisted.internet.reactor.callFromThread")
+    def test_thread_error(self, callFromThread):
+        feeder, engine = self._get_feeder(start_requests(8, fail_at=4), use_thread=True)
+        with LogCapture() as log:
+            self._feed_until_done(feeder)
+        self.assertIn("Error while obtaining start requests", str(log))
+        self.assertEqual(len(engine.scheduled), 4)
+
+    @mock.patch("twisted.internet.reactor.callFromThread")
+    def test_thread_close(self, callFromThread):
+        feeder, engine = self._get_feeder(start_requests(100), use_thread=True)
+        feeder.feed()
+        feeder.close()
+        feeder._thread.join(1)
+        self.assertFalse(feeder._thread.is_alive())
+        self.assertFalse(feeder.feed())
+
+
+class StartRequestsFeederCrawlTest(unittest.TestCase):
+    def setUp(self):
+        self.mockserver = MockServer()
+        self.mockserver.__enter__()
+
+    def tearDown(self):
+        self.mockserver.__exit__(None, None, None)
+
+    def _get_crawler(self, spidercls, use_thread):
+        settings = {
+            "START_REQUESTS_BATCH_SIZE": 5,
+            "START_REQUESTS_HIGH_WATERMARK": 10,
+            "START_REQUESTS_THREAD": use_thread,
+        }
+        return get_crawler(spidercls, settings)
+
+    @defer.inlineCallbacks
+    def _test_crawl(self, use_thread):
+        crawler = self._get_crawler(LazyStartRequestsSpider, use_thread)
+        with LogCapture() as log:
+            yield crawler.crawl(mockserver=self.mockserver)
+        self.assertNotIn("Error while obtaining start requests", str(log))
+        self.assertGreater(crawler.spider.received_before_end, 0)
+        seeds = {seed for seed in crawler.spider.seedsseen if seed is not None}
+        self.assertEqual(seeds, set(range(100)))
+        self.assertEqual(crawler.stats.get_value("finish_reason"), "finished")
+
+    def test_crawl(self):
+        return self._test_crawl(use_thread=False)
+
+    def test_crawl_thread(self):
+        return self._test_crawl(use_thread=True)
+
+    @defer.inlineCallbacks
+    def test_duplicates(self):
+        crawler = self._get_crawler(FilteredStartRequestsSpider, use_thread=False)
+        yield crawler.crawl(mockserver=self.mockserver)
+        self.assertEqual(crawler.spider.visited, 2)
+        self.assertEqual(crawler.stats.get_value("dupefilter/filtered"), 4)
+
+    @defer.inlineCallbacks
+    def test_error(self):
+        crawler = self._get_crawler(FailingStartRequestsSpider, use_thread=True)
+        with LogCapture() as log:
+            yield crawler.crawl(mockserver=self.mockserver)
+        self.assertIn("Error while obtaining start requests", str(log))
+        seeds = {seed for seed in crawler.spider.seedsseen if seed is not None}
+        self.assertEqual(seeds, {0})
@@ -0,0 +1,63 @@
+from unittest import TestCase, mock
+
+from scrapy import Request
+from scrapy.core.engine import ExecutionEngine
+from scrapy.core.flowcontrol import MemoryFlowController
+from scrapy.utils.test import get_crawler
+
+MiB = 1024 * 1024
+
+
+class MemoryFlowControllerTest(TestCase):
+    def _get_engine(self, settings=None):
+        crawler = get_crawler(settings_dict=settings)
+        crawler._apply_settings()
+        engine = ExecutionEngine(crawler, lambda _: None)
+        crawler.engine = engine
+        self.addCleanup(engine.downloader.close)
+        return engine
+
+    def _check(self, flow, rss):
+        flow._last_check = float("-inf")
+        with mock.patch("scrapy.core.flowcontrol.get_rss", return_value=rss):
+            return flow.needs_backout()
+
+    def test_disabled(self):
+        flow = self._get_engine().memory_flow
+        self.assertFalse(flow.enabled)
+        self.assertFalse(self._check(flow, 10**12))
+
+    def test_rss(self):
+        flow = self._get_engine({"MEMUSAGE_SOFT_LIMIT_MB": 100}).memory_flow
+        self.assertFalse(self._check(flow, 90 * MiB))
+        self.assertTrue(self._check(flow, 101 * MiB))
+        # Memory usage must go below the low watermark to resume.
+        self.assertTrue(self._check(flow, 90 * MiB))
+        self.assertFalse(self._check(flow, 79 * MiB))
+        stats = flow.crawler.stats
+        self.assertEqual(stats.get_value("memusage/soft_limit_reached"), 1)
+
+    def test_check_interval(self):
+        flow = self._get_engine({"MEMUSAGE_SOFT_LIMIT_MB": 100}).memory_flow
+        self.assertTrue(self._check(flow, 101 * MiB))
+        with mock.patch("scrapy.core.flowcontrol.get_rss", return_value=0):
+            self.assertTrue(flow.needs_backout())
+
+    def test_tracked(self):
+        engine = self._get_engine({"MEMUSAGE_TRACKED_SOFT_LIMIT_MB": 1})
+        flow = engine.memory_flow
+        request = Request("https://example.com", method="POST", body=b"a" * MiB)
+        engine.downloader.active.add(request)
+        self.assertTrue(self._check(flow, None))
+        engine.downloader.active.remove(request)
+        self.assertFalse(self._check(flow, None))
+
+    def test_rss_unavailable(self):
+        with mock.patch("scrapy.core.flowcontrol.get_rss", return_value=None):
+            flow = self._get_engine({"MEMUSAGE_SOFT_LIMIT_MB": 100}).memory_flow
+        self.assertFalse(flow.enabled)
+
+    def test_invalid_resume_ratio(self):
+        crawler = get_crawler(settings_dict={"MEMUSAGE_RESUME_RATIO": 1.5})
+        with self.assertRaises(ValueError):
+            MemoryFlowController(crawler, None)
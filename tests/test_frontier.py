@@ -0,0 +1,323 @@
+import json
+import threading
+import time
+from unittest import TestCase, mock
+
+from twisted.internet import defer, reactor, threads
+from twisted.trial import unittest
+
+from scrapy import Request, Spider
+from scrapy.core.frontier import (
+    FrontierClient,
+    FrontierDupeFilter,
+    FrontierError,
+    FrontierScheduler,
+    FrontierServer,
+    MemoryFrontierBackend,
+    deserialize_request,
+    parse_address,
+    serialize_request,
+)
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.test import get_crawler
+from tests.mockserver import MockServer
+from tests.spiders import FollowAllSpider
+from tests.test_scheduler import MockDownloader, MockEngine
+
+
+class ParseAddressTest(TestCase):
+    def test_parse(self):
+        self.assertEqual(
+            parse_address("tcp://127.0.0.1:6810"), ("tcp", ("127.0.0.1", 6810))
+        )
+        self.assertEqual(parse_address("unix:///tmp/a.sock"), ("unix", "/tmp/a.sock"))
+        for address in ("127.0.0.1:6810", "tcp://127.0.0.1", "unix://"):
+            with self.assertRaises(ValueError):
+                parse_address(address)
+
+
+class SerializationTest(TestCase):
+    def test_roundtrip(self):
+        spider = Spider("foo")
+        request = Request(
+            "https://example.com",
+            method="POST",
+            headers={"X-Foo": b"\xff"},
+            body=b"\x00\x01",
+            meta={"tuple": (1, "a"), "ints": {1: [b"b"]}},
+        )
+        data = serialize_request(request, spider)
+        self.assertIsInstance(data, str)
+        copy = deserialize_request(data, spider)
+        self.assertEqual(copy.url, request.url)
+        self.assertEqual(copy.method, "POST")
+        self.assertEqual(copy.headers, request.headers)
+        self.assertEqual(copy.body, request.body)
+        self.assertEqual(copy.meta, request.meta)
+
+    def test_invalid(self):
+        spider = Spider("foo")
+        with self.assertRaises(ValueError):
+            request = Request("https://a.example", meta={"a": object()})
+            serialize_request(request, spider)
+        data = json.loads(serialize_request(Request("https://a.example"), spider))
+        data["d"].append(["_class", "os.system"])
+        with self.assertRaisesRegex(ValueError, "not a Request class"):
+            deserialize_request(json.dumps(data), spider)
+
+
+class MemoryFrontierBackendTest(TestCase):
+    def setUp(self):
+        self.backend = MemoryFrontierBackend()
+
+    def _data(self, leased):
+        return [data for _, data in leased]
+
+    def test_dedupe(self):
+        queued = self.backend.enqueue(
+            0, [["a", "s", 0, "1"], ["a", "s", 0, "2"], [None, "s", 0, "3"]]
+        )
+        self.assertEqual(queued, [True, False, True])
+        self.assertEqual(self.backend.seen(0, ["a", "b", "b"]), [True, False, True])
+        stats = self.backend.stats(0)
+        self.assertEqual(stats, {"queued": 2, "leased": 0, "seen": 2})
+
+    def test_slot_fairness(self):
+        self.backend.enqueue(
+            0,
+            [
+                [None, "a", 0, "a1"],
+                [None, "a", 0, "a2"],
+                [None, "a", 1, "a3"],
+                [None, "b", 0, "b1"],
+                [None, "c", 0, "c1"],
+            ],
+        )
+        leased = self.backend.dequeue(0, 4, 60)
+        self.assertEqual(self._data(leased), ["a3", "b1", "c1", "a1"])
+        self.assertEqual(self._data(self.backend.dequeue(0, 4, 60)), ["a2"])
+        self.assertEqual(self.backend.stats(0)["leased"], 5)
+
+    def test_leases(self):
+        self.backend.enqueue(0, [[None, "a", 0, str(i)] for i in range(3)])
+        leased = self.backend.dequeue(1, 3, 60)
+        self.assertEqual(self.backend.dequeue(2, 3, 60), [])
+        self.backend.settle(1, [leased[0][0]], [], 60)
+        self.assertEqual(self.backend.stats(0), {"queued": 0, "leased": 2, "seen": 0})
+        self.backend.release(1)
+        self.assertEqual(self._data(self.backend.dequeue(2, 3, 60)), ["1", "2"])
+
+    def test_lease_timeout(self):
+        self.backend.enqueue(0, [[None, "a", 0, str(i)] for i in range(2)])
+        leased = self.backend.dequeue(1, 2, 60)
+        self.backend.settle(1, [], [leased[1][0]], 120)
+        with mock.patch("scrapy.core.frontier.time", return_value=time.time() + 90):
+            leased = self.backend.dequeue(2, 2, 60)
+            self.assertEqual(self._data(leased), ["0"])
+            self.backend.settle(2, [leased[0][0]], [], 60)
+        with mock.patch("scrapy.core.frontier.time", return_value=time.time() + 150):
+            self.assertEqual(self._data(self.backend.dequeue(2, 2, 60)), ["1"])
+
+
+class ServerTestMixin:
+    def start_server(self):
+        self.server = FrontierServer("tcp://127.0.0.1:0")
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def stop_server(self):
+        self.server.shutdown()
+        self.thread.join()
+
+
+class FrontierServerTest(ServerTestMixin, TestCase):
+    def setUp(self):
+        self.start_server()
+
+    def tearDown(self):
+        self.stop_server()
+
+    def test_client(self):
+        client = FrontierClient(self.server.address)
+        self.assertEqual(client.call("enqueue", requests=[["a", "s", 0, "x"]]), [True])
+        self.assertEqual(client.call("seen", fingerprints=["a"]), [True])
+        with self.assertRaises(FrontierError):
+            client.call("unknown")
+        with self.assertRaises(FrontierError):
+            client.call("seen", unknown=[])
+        leased = client.call("dequeue", count=5, lease_timeout=60)
+        self.assertEqual([data for _, data in leased], ["x"])
+        client.close()
+
+        # Requests leased by disconnected clients are queued again.
+        client = FrontierClient(self.server.address)
+        for _ in range(50):
+            if client.call("stats")["queued"]:
+                break
+            time.sleep(0.01)
+        self.assertEqual(client.call("stats"), {"queued": 1, "leased": 0, "seen": 1})
+        client.close()
+
+
+class FrontierSchedulerTest(ServerTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.start_server()
+        self.crawler = get_crawler(
+            Spider,
+            {
+                "SCHEDULER": "scrapy.core.frontier.FrontierScheduler",
+                "DUPEFILTER_CLASS": "scrapy.core.frontier.FrontierDupeFilter",
+                "FRONTIER_ADDRESS": self.server.address,
+                "FRONTIER_BATCH_SIZE": 2,
+            },
+        )
+        self.crawler.engine = MockEngine(downloader=MockDownloader())
+        self.spider = self.crawler._create_spider("foo")
+        self.crawler.stats.open_spider(self.spider)
+        self.scheduler = FrontierScheduler.from_crawler(self.crawler)
+        self.assertIsInstance(self.scheduler.df, FrontierDupeFilter)
+        self.scheduler.open(self.spider)
+
+    def tearDown(self):
+        dfd = self.scheduler.close("finished")
+        dfd.addBoth(lambda _: self.stop_server())
+        return dfd
+
+    @defer.inlineCallbacks
+    def _wait_for_server(self):
+        """Wait until the scheduler gets the answers of all its calls to the
+        server."""
+        scheduler = self.scheduler
+        while scheduler._sending or scheduler._fetching or scheduler._stats_pending:
+            yield threads.deferToThreadPool(reactor, scheduler.threadpool, lambda: None)
+
+    @defer.inlineCallbacks
+    def _has_pending_requests(self):
+        """Return :meth:`has_pending_requests` once the scheduler gets the
+        stats that it asks the server for."""
+        for _ in range(5):
+            self.scheduler.has_pending_requests()
+            yield self._wait_for_server()
+        return self.scheduler.has_pending_requests()
+
+    @defer.inlineCallbacks
+    def test_enqueue_dequeue(self):
+        # Stats are not known until the server answers.
+        self.assertTrue(self.scheduler.has_pending_requests())
+        pending = yield self._has_pending_requests()
+        self.assertFalse(pending)
+
+        requests = [
+            Request("https://a.example/1", priority=1),
+            Request("https://a.example/1"),
+            Request("https://a.example/1", dont_filter=True),
+            Request("https://b.example/1", callback=lambda response: None),
+            Request("https://a.example/2"),
+        ]
+        # Duplicates are filtered by the server once it answers.
+        self.assertEqual(self.scheduler.enqueue_requests(requests), [True] * 5)
+        self.assertTrue(self.scheduler.enqueue_request(Request("https://a.example/2")))
+        self.assertTrue(self.scheduler.has_pending_requests())
+        yield self._wait_for_server()
+        len(self.scheduler)
+        yield self._wait_for_server()
+        self.assertEqual(len(self.scheduler), 4)
+
+        requests = []
+        for _ in range(10):
+            requests.extend(self.scheduler.next_requests(2))
+            yield self._wait_for_server()
+        urls = [r.url for r in requests]
+        self.assertEqual(
+            urls,
+            [
+                "https://b.example/1",
+                "https://a.example/1",
+                "https://a.example/1",
+                "https://a.example/2",
+            ],
+        )
+        self.assertTrue(requests[2].dont_filter)
+        pending = yield self._has_pending_requests()
+        self.assertFalse(pending)
+
+        stats = self.crawler.stats
+        self.assertEqual(stats.get_value("scheduler/enqueued/frontier"), 3)
+        self.assertEqual(stats.get_value("scheduler/enqueued/memory"), 1)
+        self.assertEqual(stats.get_value("scheduler/dequeued/frontier"), 3)
+        self.assertEqual(stats.get_value("scheduler/dequeued"), 4)
+        self.assertEqual(stats.get_value("scheduler/unserializable"), 1)
+        self.assertEqual(stats.get_value("dupefilter/filtered"), 2)
+
+    @defer.inlineCallbacks
+    def test_server_error(self):
+        self.stop_server()
+        with self.assertLogs("scrapy.core.frontier", "ERROR") as logs:
+            requests = [Request("https://a.example/1"), Request("https://a.example/2")]
+            self.assertEqual(self.scheduler.enqueue_requests(requests), [True, True])
+            self.assertTrue(self.scheduler.has_pending_requests())
+            yield self._wait_for_server()
+            self.assertEqual(len(self.scheduler), 2)
+            self.assertEqual(len(self.scheduler.next_requests(5)), 2)
+            pending = yield self._has_pending_requests()
+            self.assertTrue(pending)
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(self.crawler.stats.get_value("scheduler/enqueued/memory"), 2)
+        self.start_server()
+
+    @defer.inlineCallbacks
+    def test_calls_in_thread(self):
+        answer = threading.Event()
+        call = self.scheduler.client.call
+
+        def slow_call(*args, **kwargs):
+            answer.wait(10)
+            return call(*args, **kwargs)
+
+        with mock.patch.object(self.scheduler.client, "call", slow_call):
+            start = time.monotonic()
+            self.scheduler.enqueue_requests([Request("https://a.example/1")])
+            self.assertEqual(self.scheduler.next_requests(2), [])
+            self.assertTrue(self.scheduler.has_pending_requests())
+            len(self.scheduler)
+            self.assertLess(time.monotonic() - start, 1)
+            answer.set()
+            yield self._wait_for_server()
+        requests = self.scheduler.next_requests(2)
+        yield self._wait_for_server()
+        requests.extend(self.scheduler.next_requests(2))
+        self.assertEqual([r.url for r in requests], ["https://a.example/1"])
+
+
+class FrontierCrawlTest(ServerTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.start_server()
+        self.mockserver = MockServer()
+        self.mockserver.__enter__()
+
+    def tearDown(self):
+        self.mockserver.__exit__(None, None, None)
+        self.stop_server()
+
+    @defer.inlineCallbacks
+    def test_shared_frontier(self):
+        settings = {
+            "SCHEDULER": "scrapy.core.frontier.FrontierScheduler",
+            "DUPEFILTER_CLASS": "scrapy.core.frontier.FrontierDupeFilter",
+            "FRONTIER_ADDRESS": self.server.address,
+            "FRONTIER_BATCH_SIZE": 1,
+        }
+        runner = CrawlerRunner(settings)
+        crawlers = [runner.create_crawler(FollowAllSpider) for _ in range(2)]
+        kwargs = {"total": 10, "show": 20, "order": "desc"}
+        yield defer.DeferredList(
+            [
+                crawler.crawl(mockserver=self.mockserver, **kwargs)
+                for crawler in crawlers
+            ]
+        )
+        urls = [url for c in crawlers for url in c.spider.urls_visited]
+        # Both crawlers download the start URL (dont_filter=True), while
+        # other URLs are only downloaded once.
+        self.assertEqual(len(set(urls)), 11)
+        self.assertEqual(len(urls), 12)
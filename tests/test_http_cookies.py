@@ -1,7 +1,8 @@
+import time
 from unittest import TestCase
 
 from scrapy.http import Request, Response
-from scrapy.http.cookies import WrappedRequest, WrappedResponse
+from scrapy.http.cookies import CookieJar, WrappedRequest, WrappedResponse
 from scrapy.utils.httpobj import urlparse_cached
 
 
@@ -65,3 +66,48 @@ class WrappedResponseTest(TestCase):
     def test_get_all(self):
         # get_all result must be native string
         self.assertEqual(self.wrapped.get_all("content-type"), ["text/html"])
+
+
+class CookieJarTest(TestCase):
+    def _set_cookies(self, jar, *set_cookies):
+        request = Request("http://www.example.com/page.html")
+        response = Response(
+            "http://www.example.com/page.html",
+            headers={"Set-Cookie": list(set_cookies)},
+        )
+        jar.extract_cookies(response, request)
+
+    def test_clear_expired_cookies(self):
+        jar = CookieJar()
+        now = int(time.time())
+        self._set_cookies(jar, "a=1", "b=2; Max-Age=3600", "c=3; Path=/foo")
+        self.assertEqual(len(jar), 3)
+        for cookie in jar:
+            if cookie.name == "b":
+                cookie.expires = now - 1
+            if cookie.name == "c":
+                cookie.expires = now + 3600
+        jar.jar._rebuild_expirations()
+        self.assertEqual(jar.jar.next_expiration(), now - 1)
+        request = Request("http://www.example.com/foo/")
+        jar.add_cookie_header(request)
+        self.assertEqual(request.headers["Cookie"], b"c=3; a=1")
+        self.assertEqual(sorted(cookie.name for cookie in jar), ["a", "c"])
+        self.assertEqual(jar.jar.next_expiration(), now + 3600)
+
+    def test_cookie_set_again(self):
+        jar = CookieJar()
+        self._set_cookies(jar, "a=1; Max-Age=1")
+        self._set_cookies(jar, "a=2; Max-Age=3600")
+        cookie = next(iter(jar))
+        jar.jar._expirations[0] = (0, *jar.jar._expirations[0][1:])
+        jar.jar.clear_expired_cookies()
+        self.assertEqual(list(jar), [cookie])
+        self.assertEqual(len(jar.jar._expirations), 1)
+
+    def test_expirations_limit(self):
+        jar = CookieJar()
+        for i in range(3000):
+            self._set_cookies(jar, f"a={i}; Max-Age=3600")
+        self.assertEqual(len(jar), 1)
+        self.assertLessEqual(len(jar.jar._expirations), 1024)
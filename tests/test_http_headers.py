@@ -102,6 +102,26 @@ class HeadersTest(unittest.TestCase):
         self.assertEqual(h.getlist("Content-Type"), [b"text/html"])
         self.assertEqual(h.getlist("X-Forwarded-For"), [b"ip1", b"ip2"])
 
+    def test_update_replaces(self):
+        h = Headers({"Content-Type": "text/html", "Accept": "*/*"})
+        h.update(Headers({"content-type": ["text/xml", "text/plain"]}))
+        self.assertEqual(h.getlist("Content-Type"), [b"text/xml", b"text/plain"])
+        self.assertEqual(h.getlist("Accept"), [b"*/*"])
+
+    def test_from_raw_headers(self):
+        raw = [(b"content-type", [b"text/html"]), (b"Set-Cookie", [b"a=1"])]
+        raw.append((b"set-cookie", [b"b=2"]))
+        h = Headers.from_raw_headers(raw, encoding="latin1")
+        self.assertEqual(h.encoding, "latin1")
+        self.assertEqual(h[b"Content-Type"], b"text/html")
+        self.assertEqual(h.getlist("Set-Cookie"), [b"a=1", b"b=2"])
+        self.assertEqual(raw[1][1], [b"a=1"])
+
+    def test_normkey_encoding(self):
+        self.assertEqual(Headers({"ü": "a"}), {"Ü".encode(): [b"a"]})
+        h = Headers({"ü": "a"}, encoding="latin1")
+        self.assertEqual(h, {"Ü".encode("latin1"): [b"a"]})
+
     def test_copy(self):
         h1 = Headers({"header1": ["value1", "value2"]})
         h2 = copy.copy(h1)
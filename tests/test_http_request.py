@@ -18,6 +18,7 @@ from scrapy.http import (
 from scrapy.http.request import NO_CALLBACK
 from scrapy.utils.httpobj import urlparse_cached
 from scrapy.utils.python import to_bytes, to_unicode
+from scrapy.utils.url import TrustedURL
 
 
 class RequestTest(unittest.TestCase):
@@ -87,6 +88,20 @@ class RequestTest(unittest.TestCase):
             for s in v:
                 self.assertIsInstance(s, bytes)
 
+    def test_headers_lazy(self):
+        r = Request("http://www.scrapy.org")
+        self.assertIsNone(r._headers)
+        self.assertEqual(r.to_dict()["headers"], {})
+        r.headers["Accept"] = "text/html"
+        self.assertEqual(r.headers, {b"Accept": [b"text/html"]})
+        r.headers = Headers({"Accept": "*/*"})
+        self.assertEqual(r.replace().headers, {b"Accept": [b"*/*"]})
+
+    def test_attributes(self):
+        r = self.request_class("http://www.scrapy.org")
+        r.custom = "value"
+        self.assertEqual(r.custom, "value")
+
     def test_eq(self):
         url = "http://www.scrapy.org"
         r1 = self.request_class(url=url)
@@ -102,6 +117,15 @@ class RequestTest(unittest.TestCase):
         r = self.request_class(url="http://www.scrapy.org/path")
         self.assertEqual(r.url, "http://www.scrapy.org/path")
 
+    def test_url_trusted(self):
+        url = TrustedURL("http://www.scrapy.org/path")
+        r = self.request_class(url=url)
+        self.assertEqual(r.url, "http://www.scrapy.org/path")
+        self.assertIs(type(r.url), str)
+        r = self.request_class(url=TrustedURL("http://www.scrapy.org/#!a=b"))
+        self.assertEqual(r.url, "http://www.scrapy.org/?_escaped_fragment_=a%3Db")
+        self.assertRaises(ValueError, self.request_class, TrustedURL("/foo"))
+
     def test_url_quoting(self):
         r = self.request_class(url="http://www.scrapy.org/blank%20space")
         self.assertEqual(r.url, "http://www.scrapy.org/blank%20space")
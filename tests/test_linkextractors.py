@@ -2,14 +2,18 @@ import pickle
 import re
 import unittest
 from typing import Optional
+from unittest import mock
+from urllib.parse import urljoin
 
 from packaging.version import Version
 from pytest import mark
 from w3lib import __version__ as w3lib_version
+from w3lib.url import safe_url_string
 
 from scrapy.http import HtmlResponse, XmlResponse
 from scrapy.link import Link
-from scrapy.linkextractors.lxmlhtml import LxmlLinkExtractor
+from scrapy.linkextractors.lxmlhtml import LxmlLinkExtractor, _UrlJoiner
+from scrapy.utils.url import TrustedURL
 from tests import get_testdata
 
 
@@ -32,6 +36,19 @@ class Base:
                 )
             )
 
+        def test_urls_trusted(self):
+            for canonicalize in (False, True):
+                lx = self.extractor_cls(canonicalize=canonicalize)
+                for link in lx.extract_links(self.response):
+                    self.assertIsInstance(link.url, TrustedURL)
+                    with mock.patch(
+                        "scrapy.http.request.safe_url_string"
+                    ) as safe_url_string_mock:
+                        request = self.response.follow(link)
+                    safe_url_string_mock.assert_not_called()
+                    self.assertEqual(request.url, safe_url_string(link.url))
+                    self.assertIs(type(request.url), str)
+
         def test_extract_all_links(self):
             lx = self.extractor_cls()
             page4_url = "http://example.com/page%204.html"
@@ -860,3 +877,116 @@ class LxmlLinkExtractorTestCase(Base.LinkExtractorTestCase):
     def test_link_allowed_is_false_with_missing_url_prefix(self):
         bad_link = Link("should_have_prefix.example")
         self.assertFalse(LxmlLinkExtractor()._link_allowed(bad_link))
+
+
+class FastLxmlLinkExtractorTestCase(unittest.TestCase):
+    def _links(self, response, **kwargs):
+        return [
+            (link.url, link.nofollow)
+            for link in LxmlLinkExtractor(**kwargs).extract_links(response)
+        ]
+
+    def _assert_same_links(self, body, url="http://example.com/index", **kwargs):
+        expected = self._links(HtmlResponse(url, body=body), **kwargs)
+        response = HtmlResponse(url, body=body)
+        self.assertEqual(self._links(response, fast=True, **kwargs), expected)
+        return response
+
+    def test_same_links(self):
+        for name in (
+            "linkextractor.html",
+            "linkextractor_latin1.html",
+            "linkextractor_noenc.html",
+        ):
+            body = get_testdata("link_extractor", name)
+            for kwargs in (
+                {},
+                {"unique": False},
+                {"canonicalize": True},
+                {"allow": "sample", "deny": "3"},
+                {"restrict_xpaths": "//div[@id='subwrapper']"},
+                {"restrict_xpaths": '//a[re:test(@href, "sample[12]")]'},
+                {"restrict_css": "#subwrapper a"},
+                {"tags": ("a", "img"), "attrs": ("href", "src")},
+                {"process_value": lambda value: value.replace("sample", "x")},
+            ):
+                with self.subTest(name=name, kwargs=kwargs):
+                    self._assert_same_links(body, **kwargs)
+
+    def test_base_url(self):
+        body = b"""<html><head><base href="http://otherdomain.com/base/"></head>
+        <body><a href="page.html">Page</a><a href="/root">Root</a></body></html>"""
+        self._assert_same_links(body)
+
+    def test_xhtml(self):
+        body = get_testdata("link_extractor", "linkextractor.html").replace(
+            b"<html>", b'<html xmlns="http://www.w3.org/1999/xhtml">'
+        )
+        self._assert_same_links(body)
+
+    def test_no_selector(self):
+        body = get_testdata("link_extractor", "linkextractor.html")
+        response = self._assert_same_links(body)
+        self.assertIsNone(response._cached_selector)
+
+    def test_parsed_response(self):
+        body = get_testdata("link_extractor", "linkextractor.html")
+        response = HtmlResponse("http://example.com/index", body=body)
+        selector = response.selector
+        self.assertEqual(
+            self._links(response, fast=True), self._links(response, fast=False)
+        )
+        self.assertIs(response.selector, selector)
+
+    def test_text(self):
+        body = get_testdata("link_extractor", "linkextractor.html")
+        response = HtmlResponse("http://example.com/index", body=body)
+        links = LxmlLinkExtractor(fast=True).extract_links(response)
+        self.assertTrue(links)
+        self.assertTrue(all(link.text == "" for link in links))
+        links = LxmlLinkExtractor(fast=True, restrict_text="sample 2").extract_links(
+            response
+        )
+        self.assertEqual(
+            links, [Link(url="http://example.com/sample2.html", text="sample 2")]
+        )
+
+    def test_empty_body(self):
+        response = HtmlResponse("http://example.com/index", body=b"")
+        self.assertEqual(LxmlLinkExtractor(fast=True).extract_links(response), [])
+
+
+@mark.parametrize(
+    "base_url",
+    [
+        "http://example.com",
+        "http://example.com/a/b",
+        "https://example.com:8080/a/b/;p?q=1#f",
+        "http://example.com/a//b/./c",
+        "file:///tmp/a",
+    ],
+)
+@mark.parametrize(
+    "url",
+    [
+        "",
+        "page.html",
+        "a/b?c=d#e",
+        "/root",
+        "//other.example/x",
+        "../up",
+        "./here",
+        "?q",
+        "#frag",
+        "/a;b",
+        "/a?",
+        "http://other.example",
+        "http://other.example/x?y#z",
+        "https://other.example/x;y",
+        "mailto:user@example.com",
+        "javascript:void(0)",
+        "a\tb",
+    ],
+)
+def test_url_joiner(base_url, url):
+    assert _UrlJoiner(base_url).join(url) == urljoin(base_url, url)
@@ -0,0 +1,170 @@
+import sqlite3
+from pathlib import Path
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from testfixtures import LogCapture
+from twisted.internet import defer
+from twisted.trial import unittest
+
+from scrapy import Spider
+from scrapy.exceptions import NotConfigured
+from scrapy.pipelines.sql import SQLiteBackend, SQLPipeline
+from scrapy.utils.test import get_crawler
+
+
+def _get_database():
+    return str(Path(mkdtemp()) / "items.db")
+
+
+def _get_rows(database, table="items"):
+    with sqlite3.connect(database) as connection:
+        cursor = connection.execute(f"SELECT * FROM {table} ORDER BY rowid")
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class SQLiteBackendTest(TestCase):
+    def setUp(self):
+        self.database = _get_database()
+
+    def test_insert(self):
+        backend = SQLiteBackend(self.database, "items")
+        backend.write([{"a": 1, "b": "x"}, {"a": 2}])
+        # New fields are added as columns.
+        backend.write([{"c": b"y"}])
+        backend.close()
+        self.assertEqual(
+            _get_rows(self.database),
+            [
+                {"a": 1, "b": "x", "c": None},
+                {"a": 2, "b": None, "c": None},
+                {"a": None, "b": None, "c": b"y"},
+            ],
+        )
+
+    def test_existing_table(self):
+        with sqlite3.connect(self.database) as connection:
+            connection.execute("CREATE TABLE items (a INTEGER, b TEXT)")
+        backend = SQLiteBackend(self.database, "items")
+        backend.write([{"b": "x", "c": 1}])
+        backend.close()
+        self.assertEqual(_get_rows(self.database), [{"a": None, "b": "x", "c": 1}])
+
+    def test_upsert(self):
+        backend = SQLiteBackend(self.database, "items", upsert_keys=["id"])
+        backend.write([{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+        backend.write([{"id": 1, "name": "c"}])
+        backend.close()
+        self.assertEqual(
+            _get_rows(self.database), [{"id": 1, "name": "c"}, {"id": 2, "name": "b"}]
+        )
+
+    def test_upsert_keys_only(self):
+        backend = SQLiteBackend(self.database, "items", upsert_keys=["id"])
+        backend.write([{"id": 1}, {"id": 1}])
+        backend.close()
+        self.assertEqual(_get_rows(self.database), [{"id": 1}])
+
+    def test_upsert_existing_table(self):
+        with sqlite3.connect(self.database) as connection:
+            connection.execute("CREATE TABLE items (name TEXT)")
+        backend = SQLiteBackend(self.database, "items", upsert_keys=["id"])
+        backend.write([{"id": 1, "name": "a"}])
+        backend.write([{"id": 1, "name": "b"}])
+        backend.close()
+        self.assertEqual(_get_rows(self.database), [{"name": "b", "id": 1}])
+
+    def test_is_transient(self):
+        backend = SQLiteBackend(self.database, "items")
+        self.assertTrue(
+            backend.is_transient(sqlite3.OperationalError("database is locked"))
+        )
+        self.assertFalse(
+            backend.is_transient(sqlite3.OperationalError("no such table: items"))
+        )
+        self.assertFalse(backend.is_transient(sqlite3.IntegrityError("locked")))
+
+    def test_rollback(self):
+        backend = SQLiteBackend(self.database, "items", upsert_keys=["id"])
+        backend.write([{"id": 1}])
+        with self.assertRaises(sqlite3.ProgrammingError):
+            backend.write([{"id": 2, "name": "a"}, {"id": 3, "name": {}}])
+        backend.write([{"id": 4, "name": "b"}])
+        backend.close()
+        self.assertEqual(
+            _get_rows(self.database), [{"id": 1, "name": None}, {"id": 4, "name": "b"}]
+        )
+
+
+class FlakyBackend(SQLiteBackend):
+    failures = 1
+
+    def write(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        super().write(rows)
+
+
+class SQLPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.database = _get_database()
+        self.spider = Spider("foo")
+
+    def _get_pipeline(self, settings=None):
+        settings = {
+            "SQL_PIPELINE_DATABASE": self.database,
+            "SQL_PIPELINE_RETRY_DELAY": 0,
+            **(settings or {}),
+        }
+        crawler = get_crawler(Spider, settings)
+        pipeline = SQLPipeline.from_crawler(crawler)
+        pipeline.open_spider(self.spider)
+        return pipeline
+
+    def test_not_configured(self):
+        with self.assertRaises(NotConfigured):
+            SQLPipeline.from_crawler(get_crawler(Spider))
+
+    @defer.inlineCallbacks
+    def test_process_items(self):
+        pipeline = self._get_pipeline({"SQL_PIPELINE_BATCH_SIZE": 10})
+        self.assertEqual(pipeline.item_batch_size, 10)
+        items = [{"url": "https://example.com", "tags": ["a", "b"]}]
+        result = yield pipeline.process_items(items, self.spider)
+        self.assertIs(result, items)
+        yield pipeline.close_spider(self.spider)
+        self.assertEqual(
+            _get_rows(self.database),
+            [{"url": "https://example.com", "tags": '["a", "b"]'}],
+        )
+        stats = pipeline.crawler.stats
+        self.assertEqual(stats.get_value("sql_pipeline/batches"), 1)
+        self.assertEqual(stats.get_value("sql_pipeline/items"), 1)
+
+    @defer.inlineCallbacks
+    def test_retry(self):
+        pipeline = self._get_pipeline(
+            {"SQL_PIPELINE_BACKEND": "tests.test_pipeline_sql.FlakyBackend"}
+        )
+        with LogCapture() as log:
+            yield pipeline.process_items([{"a": 1}], self.spider)
+        self.assertIn("Retrying to write 1 items", str(log))
+        yield pipeline.close_spider(self.spider)
+        self.assertEqual(_get_rows(self.database), [{"a": 1}])
+        self.assertEqual(pipeline.crawler.stats.get_value("sql_pipeline/retries"), 1)
+
+    @defer.inlineCallbacks
+    def test_retry_exhausted(self):
+        pipeline = self._get_pipeline(
+            {
+                "SQL_PIPELINE_BACKEND": "tests.test_pipeline_sql.FlakyBackend",
+                "SQL_PIPELINE_RETRY_TIMES": 0,
+            }
+        )
+        with self.assertRaises(sqlite3.OperationalError):
+            yield pipeline.process_items([{"a": 1}], self.spider)
+        yield pipeline.close_spider(self.spider)
+        stats = pipeline.crawler.stats
+        self.assertEqual(stats.get_value("sql_pipeline/failed_batches"), 1)
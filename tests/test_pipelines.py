@@ -6,6 +6,8 @@ from twisted.internet.defer import Deferred
 from twisted.trial import unittest
 
 from scrapy import Request, Spider, signals
+from scrapy.exceptions import DropItem
+from scrapy.pipelines import ItemPipelineManager
 from scrapy.utils.defer import deferred_to_future, maybe_deferred_to_future
 from scrapy.utils.test import get_crawler, get_from_asyncio_queue
 from tests.mockserver import MockServer
@@ -66,6 +68,25 @@ class AsyncDefNotAsyncioPipeline:
         return item
 
 
+class BatchPipeline:
+    item_batch_size = 4
+    item_batch_timeout = 0.1
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    async def process_items(self, items, spider):
+        d = Deferred()
+        from twisted.internet import reactor
+
+        reactor.callLater(0, d.callback, None)
+        await maybe_deferred_to_future(d)
+        self.batch_sizes.append(len(items))
+        for item in items:
+            item["pipeline_passed"] = True
+        return items
+
+
 class ItemSpider(Spider):
     name = "itemspider"
 
@@ -76,6 +97,118 @@ class ItemSpider(Spider):
         return {"field": 42}
 
 
+class ItemsSpider(ItemSpider):
+    def parse(self, response):
+        for i in range(10):
+            yield {"field": i}
+
+
+class LimitedPipeline:
+    max_concurrent_items = 2
+
+    def __init__(self):
+        self.pending = []
+
+    def process_item(self, item, spider):
+        d = Deferred()
+        self.pending.append((item, d))
+        return d
+
+
+class ItemPipelineManagerTest(unittest.TestCase):
+    def test_max_concurrent_items(self):
+        pipeline = LimitedPipeline()
+        manager = ItemPipelineManager(pipeline)
+        results = []
+        for i in range(4):
+            manager.process_item({"i": i}, None).addCallback(results.append)
+        self.assertEqual(len(pipeline.pending), 2)
+        self.assertTrue(manager.needs_backout())
+        item, d = pipeline.pending.pop(0)
+        d.callback(item)
+        self.assertEqual(results, [{"i": 0}])
+        self.assertEqual(len(pipeline.pending), 2)
+        self.assertFalse(manager.needs_backout())
+
+    def test_process_items(self):
+        batches = []
+
+        class Pipeline:
+            item_batch_size = 3
+
+            def process_items(self, items, spider):
+                batches.append(items)
+                return [DropItem("1") if i["i"] == 1 else i for i in items]
+
+        manager = ItemPipelineManager(Pipeline())
+        results = []
+        for i in range(4):
+            manager.process_item({"i": i}, None).addBoth(results.append)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(results[0], {"i": 0})
+        self.assertIsInstance(results[1].value, DropItem)
+        self.assertEqual(results[2], {"i": 2})
+        # The last item is sent when the spider is closed.
+        manager.close_spider(None)
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(results[3], {"i": 3})
+
+    def test_process_items_wrong_length(self):
+        class Pipeline:
+            item_batch_size = 2
+
+            def process_items(self, items, spider):
+                return items[:1]
+
+        manager = ItemPipelineManager(Pipeline())
+        results = []
+        for i in range(2):
+            manager.process_item({"i": i}, None).addErrback(results.append)
+        self.assertEqual(len(results), 2)
+        self.assertIsInstance(results[0].value, ValueError)
+
+    def test_process_items_wrong_type(self):
+        class Pipeline:
+            item_batch_size = 2
+
+            def process_items(self, items, spider):
+                pass
+
+        manager = ItemPipelineManager(Pipeline())
+        results = []
+        for i in range(2):
+            manager.process_item({"i": i}, None).addErrback(results.append)
+        self.assertEqual(len(results), 2)
+        self.assertIsInstance(results[1].value, TypeError)
+        self.assertIn("got NoneType", str(results[1].value))
+
+    def test_invalid_batch_settings(self):
+        for name, value in (
+            ("item_batch_size", 0),
+            ("item_batch_size", None),
+            ("item_batch_size", 2.5),
+            ("item_batch_timeout", None),
+            ("item_batch_timeout", -1),
+        ):
+
+            class Pipeline:
+                def process_items(self, items, spider):
+                    return items
+
+            setattr(Pipeline, name, value)
+            with self.subTest(name=name, value=value):
+                with self.assertRaisesRegex(ValueError, name):
+                    ItemPipelineManager(Pipeline())
+
+    @defer.inlineCallbacks
+    def test_process_items_timeout(self):
+        pipeline = BatchPipeline()
+        manager = ItemPipelineManager(pipeline)
+        item = yield manager.process_item({}, None)
+        self.assertEqual(item, {"pipeline_passed": True})
+        self.assertEqual(pipeline.batch_sizes, [1])
+
+
 class PipelineTestCase(unittest.TestCase):
     def setUp(self):
         self.mockserver = MockServer()
@@ -89,11 +222,11 @@ class PipelineTestCase(unittest.TestCase):
         self.assertTrue(item.get("pipeline_passed"))
         self.items.append(item)
 
-    def _create_crawler(self, pipeline_class):
+    def _create_crawler(self, pipeline_class, spider_class=ItemSpider):
         settings = {
             "ITEM_PIPELINES": {pipeline_class: 1},
         }
-        crawler = get_crawler(ItemSpider, settings)
+        crawler = get_crawler(spider_class, settings)
         crawler.signals.connect(self._on_item_scraped, signals.item_scraped)
         self.items = []
         return crawler
@@ -129,3 +262,11 @@ class PipelineTestCase(unittest.TestCase):
         crawler = self._create_crawler(AsyncDefNotAsyncioPipeline)
         yield crawler.crawl(mockserver=self.mockserver)
         self.assertEqual(len(self.items), 1)
+
+    @defer.inlineCallbacks
+    def test_batch_pipeline(self):
+        crawler = self._create_crawler(BatchPipeline, ItemsSpider)
+        yield crawler.crawl(mockserver=self.mockserver)
+        self.assertEqual(len(self.items), 10)
+        pipeline = crawler.engine.scraper.itemproc.middlewares[0]
+        self.assertEqual(pipeline.batch_sizes, [4, 4, 2])
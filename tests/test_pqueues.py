@@ -1,14 +1,20 @@
+import os
 import tempfile
 import unittest
 
 import queuelib
 
 from scrapy.http.request import Request
-from scrapy.pqueues import DownloaderAwarePriorityQueue, ScrapyPriorityQueue
+from scrapy.pqueues import (
+    DownloaderAwarePriorityQueue,
+    ScrapyPriorityQueue,
+    SlotFairPriorityQueue,
+    SpilloverPriorityQueue,
+)
 from scrapy.spiders import Spider
-from scrapy.squeues import FifoMemoryQueue
+from scrapy.squeues import FifoMemoryQueue, PickleFifoDiskQueue
 from scrapy.utils.test import get_crawler
-from tests.test_scheduler import MockDownloader, MockEngine
+from tests.test_scheduler import MockDownloader, MockEngine, MockSlot
 
 
 class PriorityQueueTest(unittest.TestCase):
@@ -93,6 +99,25 @@ class PriorityQueueTest(unittest.TestCase):
         self.assertEqual(dequeued.priority, req3.priority)
         self.assertEqual(queue.close(), [-1, -2])
 
+    def test_push_pop_many(self):
+        temp_dir = tempfile.mkdtemp()
+        queue = ScrapyPriorityQueue.from_crawler(
+            self.crawler, FifoMemoryQueue, temp_dir
+        )
+        self.assertEqual(queue.pop_many(5), [])
+        requests = [
+            Request(f"https://example.org/{i}", priority=i % 3) for i in range(9)
+        ]
+        queue.push_many(requests)
+        self.assertEqual(len(queue), 9)
+        expected = sorted(requests, key=lambda r: -r.priority)
+        self.assertEqual(queue.pop_many(4), expected[:4])
+        self.assertEqual(queue.pop_many(0), [])
+        self.assertEqual(queue.pop_many(10), expected[4:])
+        self.assertEqual(len(queue), 0)
+        self.assertIsNone(queue.pop())
+        self.assertEqual(queue.close(), [])
+
 
 class DownloaderAwarePriorityQueueTest(unittest.TestCase):
     def setUp(self):
@@ -155,3 +180,217 @@ class DownloaderAwarePriorityQueueTest(unittest.TestCase):
         self.assertEqual(self.queue.peek().url, req3.url)
         self.assertEqual(self.queue.pop().url, req3.url)
         self.assertIsNone(self.queue.peek())
+
+    def test_pop_many(self):
+        downloader = self.queue._downloader_interface.downloader
+        downloader.increment("a")
+        downloader.increment("a")
+        for slot in "abc":
+            for i in range(3):
+                request = Request(f"https://{slot}.example/{i}")
+                request.meta["download_slot"] = slot
+                self.queue.push(request)
+        slots = [r.meta["download_slot"] for r in self.queue.pop_many(7)]
+        self.assertEqual(slots, ["b", "c", "b", "c", "a", "b", "c"])
+        self.assertEqual(len(self.queue), 2)
+        self.assertEqual(len(self.queue.pop_many(5)), 2)
+        self.assertEqual(len(self.queue), 0)
+
+
+class SpilloverPriorityQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.crawler = get_crawler(
+            Spider,
+            {
+                "SCHEDULER_DISK_QUEUE": "scrapy.squeues.PickleFifoDiskQueue",
+                "SCHEDULER_MEMORY_QUEUE": "scrapy.squeues.FifoMemoryQueue",
+                "SCHEDULER_SPILLOVER_MAX_REQUESTS": 3,
+                "SCHEDULER_SPILLOVER_BATCH_SIZE": 2,
+            },
+        )
+        self.crawler.stats.open_spider(None)
+
+    def test_spill_refill(self):
+        queue = SpilloverPriorityQueue.from_crawler(self.crawler, FifoMemoryQueue, "")
+        tmpdir = queue._tmpdir
+        self.assertTrue(os.path.isdir(tmpdir))
+        requests = [
+            Request(f"https://example.org/{i}", priority=i % 4) for i in range(8)
+        ]
+        queue.push_many(requests)
+        self.assertEqual(len(queue), 8)
+        self.assertEqual(queue.memory_count, 3)
+        self.assertEqual(len(queue.disk), 5)
+        self.assertEqual(queue.peek().priority, 3)
+        priorities = [r.priority for r in queue.pop_many(10)]
+        self.assertEqual(priorities, [3, 3, 2, 2, 1, 1, 0, 0])
+        self.assertEqual(len(queue), 0)
+        self.assertIsNone(queue.pop())
+        stats = self.crawler.stats
+        self.assertGreater(stats.get_value("scheduler/spillover/spilled"), 0)
+        self.assertEqual(
+            stats.get_value("scheduler/spillover/spilled"),
+            stats.get_value("scheduler/spillover/refilled"),
+        )
+        self.assertEqual(queue.close(), [])
+        self.assertFalse(os.path.exists(tmpdir))
+
+    def test_max_bytes(self):
+        self.crawler.settings.frozen = False
+        self.crawler.settings.set("SCHEDULER_SPILLOVER_MAX_BYTES", 1)
+        queue = SpilloverPriorityQueue.from_crawler(self.crawler, FifoMemoryQueue, "")
+        for i in range(3):
+            queue.push(Request(f"https://example.org/{i}"))
+        self.assertEqual(queue.memory_count, 1)
+        self.assertEqual(len(queue.disk), 2)
+        urls = [r.url for r in queue.pop_many(3)]
+        self.assertEqual(urls, [f"https://example.org/{i}" for i in range(3)])
+        queue.close()
+
+    def test_unserializable(self):
+        queue = SpilloverPriorityQueue.from_crawler(self.crawler, FifoMemoryQueue, "")
+        requests = [Request(f"https://example.org/{i}") for i in range(5)]
+        requests[4].callback = lambda response: None
+        queue.push_many(requests)
+        self.assertEqual(queue.memory_count, 4)
+        self.assertEqual(len(queue.disk), 1)
+        stats = self.crawler.stats
+        self.assertEqual(stats.get_value("scheduler/spillover/unserializable"), 1)
+        self.assertEqual(len(queue.pop_many(5)), 5)
+        queue.close()
+
+    def test_persistent(self):
+        key = tempfile.mkdtemp()
+        queue = SpilloverPriorityQueue.from_crawler(
+            self.crawler, PickleFifoDiskQueue, key
+        )
+        requests = [
+            Request(f"https://example.org/{i}", priority=i % 2) for i in range(6)
+        ]
+        queue.push_many(requests)
+        self.assertEqual(queue.memory_count, 3)
+        startprios = queue.close()
+        self.assertEqual(sorted(startprios), [-1, 0])
+
+        queue = SpilloverPriorityQueue.from_crawler(
+            self.crawler, PickleFifoDiskQueue, key, startprios
+        )
+        self.assertEqual(len(queue), 6)
+        urls = [r.url for r in queue.pop_many(6)]
+        self.assertEqual(
+            sorted(urls[:3]), [f"https://example.org/{i}" for i in (1, 3, 5)]
+        )
+        self.assertEqual(
+            sorted(urls[3:]), [f"https://example.org/{i}" for i in (0, 2, 4)]
+        )
+        self.assertEqual(queue.close(), [])
+
+
+class SlotFairPriorityQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.crawler = get_crawler(Spider, {"SCHEDULER_SLOT_FAIR_READY_SIZE": 100})
+        self.downloader = MockDownloader()
+        self.crawler.engine = MockEngine(downloader=self.downloader)
+        self.queue = SlotFairPriorityQueue.from_crawler(
+            self.crawler, FifoMemoryQueue, ""
+        )
+
+    def tearDown(self):
+        self.queue.close()
+
+    def _push(self, slots, priority=0):
+        for slot in slots:
+            request = Request(f"https://{slot}.example", priority=priority)
+            request.meta["download_slot"] = slot
+            self.queue.push(request)
+
+    def _slots(self, requests):
+        return [r.meta["download_slot"] for r in requests]
+
+    def test_turns(self):
+        self._push("aaabbc")
+        self.assertEqual(len(self.queue), 6)
+        slots = self._slots(self.queue.pop() for _ in range(6))
+        self.assertEqual(slots, ["a", "b", "c", "a", "b", "a"])
+        self.assertIsNone(self.queue.pop())
+        self.assertEqual(len(self.queue), 0)
+
+    def test_ready_size(self):
+        self.queue.ready_size = 3
+        self._push("aaaaab")
+        self.assertEqual(self.queue.pop().meta["download_slot"], "a")
+        self.assertEqual(self.queue.ready_count, 2)
+        self.assertNotIn("b", self.queue)
+        # "b" is served on its first turn after getting into the ready lists.
+        slots = self._slots(self.queue.pop_many(10))
+        self.assertEqual(slots, ["a", "a", "a", "b", "a"])
+
+    def test_busy_slots(self):
+        self.downloader.slots["a"] = MockSlot(active=[1], concurrency=1)
+        self.downloader.slots["b"] = MockSlot(active=[], delay=1.0, queue=[1])
+        self._push("aabbc")
+        self.assertEqual(self._slots([self.queue.pop()]), ["c"])
+        self.assertIsNone(self.queue.pop())
+        self.assertEqual(len(self.queue), 4)
+        self.downloader.slots["a"].active.clear()
+        self.assertEqual(self._slots(self.queue.pop_many(5)), ["a"])
+        self.downloader.slots["b"].queue.clear()
+        self.assertEqual(self._slots(self.queue.pop_many(5)), ["b", "a"])
+        self.assertEqual(self._slots(self.queue.pop_many(5)), ["b"])
+
+    def test_busy_ready_slots(self):
+        self.queue.ready_size = 10
+        self.queue.max_ready = 100
+        self.downloader.slots["a"] = MockSlot(active=[], concurrency=1)
+        self._push("a" * 50 + "b" * 5)
+        self.assertEqual(self._slots([self.queue.pop()]), ["a"])
+        self.downloader.slots["a"].active.append(1)
+        self.assertEqual(self._slots([self.queue.pop()]), ["b"])
+        self.assertEqual(self.queue.ready_count, 49)
+        self.assertEqual(self._slots(self.queue.pop_many(10)), ["b"] * 4)
+        self.assertIsNone(self.queue.pop())
+
+        # The ready lists do not grow past max_ready.
+        self._push("a" * 100 + "c")
+        self.assertIsNone(self.queue.pop())
+        self.assertEqual(self.queue.ready_count, 100)
+        self.assertEqual(len(self.queue), 150)
+
+    def test_batch_concurrency(self):
+        self.downloader.slots["a"] = MockSlot(active=[], concurrency=2)
+        self._push("aaaab")
+        self.assertEqual(self._slots(self.queue.pop_many(5)), ["a", "b", "a"])
+        self.assertEqual(self._slots(self.queue.pop_many(5)), ["a", "a"])
+
+    def test_priority(self):
+        self._push("abc")
+        self.assertEqual(self.queue.pop().meta["download_slot"], "a")
+        self._push("d", priority=1)
+        self.assertEqual(self.queue.peek().meta["download_slot"], "d")
+        slots = self._slots(self.queue.pop_many(3))
+        self.assertEqual(slots[0], "b")
+        self.assertEqual(sorted(slots), ["b", "c", "d"])
+
+    def test_persistent(self):
+        key = tempfile.mkdtemp()
+        queue = SlotFairPriorityQueue.from_crawler(
+            self.crawler, PickleFifoDiskQueue, key
+        )
+        for i in range(6):
+            request = Request(f"https://example.org/{i}", priority=i % 2)
+            request.meta["download_slot"] = str(i % 3)
+            queue.push(request)
+        queue.pop()
+        self.assertEqual(queue.ready_count, 5)
+        startprios = queue.close()
+        self.assertEqual(sorted(startprios), [-1, 0])
+        with self.assertRaises(ValueError):
+            SlotFairPriorityQueue.from_crawler(
+                self.crawler, PickleFifoDiskQueue, key, {"0": startprios}
+            )
+        queue = SlotFairPriorityQueue.from_crawler(
+            self.crawler, PickleFifoDiskQueue, key, startprios
+        )
+        self.assertEqual(len(queue), 5)
+        self.assertEqual(len(queue.pop_many(10)), 5)
+        self.assertEqual(queue.close(), [])
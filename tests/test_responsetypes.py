@@ -58,6 +58,11 @@ class ResponseTypesTest(unittest.TestCase):
         for source, cls in mappings:
             retcls = responsetypes.from_content_type(source)
             assert retcls is cls, f"{source} ==> {retcls} != {cls}"
+            # The second lookup is memoized.
+            retcls = responsetypes.from_content_type(source)
+            assert retcls is cls, f"{source} ==> {retcls} != {cls}"
+            retcls = responsetypes.from_content_type(source, b"gzip")
+            assert retcls is Response, f"{source} ==> {retcls} != {Response}"
 
     def test_from_body(self):
         mappings = [
@@ -13,12 +13,15 @@ from scrapy.crawler import Crawler
 from scrapy.http import Request
 from scrapy.spiders import Spider
 from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.memory import estimate_request_size
 from scrapy.utils.misc import load_object
 from scrapy.utils.test import get_crawler
 from tests.mockserver import MockServer
 
 MockEngine = collections.namedtuple("MockEngine", ["downloader"])
-MockSlot = collections.namedtuple("MockSlot", ["active"])
+MockSlot = collections.namedtuple(
+    "MockSlot", ["active", "concurrency", "delay", "queue"], defaults=(8, 0, ())
+)
 
 
 class MockDownloader:
@@ -44,8 +47,9 @@ class MockDownloader:
 
 
 class MockCrawler(Crawler):
-    def __init__(self, priority_queue_cls, jobdir):
+    def __init__(self, priority_queue_cls, jobdir, settings=None):
         settings = {
+            **(settings or {}),
             "SCHEDULER_DEBUG": False,
             "SCHEDULER_DISK_QUEUE": "scrapy.squeues.PickleLifoDiskQueue",
             "SCHEDULER_MEMORY_QUEUE": "scrapy.squeues.LifoMemoryQueue",
@@ -62,9 +66,12 @@ class MockCrawler(Crawler):
 class SchedulerHandler:
     priority_queue_cls: Optional[str] = None
     jobdir = None
+    settings: Optional[dict] = None
 
     def create_scheduler(self):
-        self.mock_crawler = MockCrawler(self.priority_queue_cls, self.jobdir)
+        self.mock_crawler = MockCrawler(
+            self.priority_queue_cls, self.jobdir, self.settings
+        )
         self.scheduler = Scheduler.from_crawler(self.mock_crawler)
         self.spider = Spider(name="spider")
         self.scheduler.open(self.spider)
@@ -126,6 +133,50 @@ class BaseSchedulerInMemoryTester(SchedulerHandler):
             priorities, sorted([x[1] for x in _PRIORITIES], key=lambda x: -x)
         )
 
+    def test_batches(self):
+        requests = [Request(url, priority=priority) for url, priority in _PRIORITIES]
+        self.assertEqual(self.scheduler.enqueue_requests(requests), [True] * 5)
+        self.assertEqual(len(self.scheduler), len(requests))
+
+        priorities = [r.priority for r in self.scheduler.next_requests(2)]
+        priorities += [r.priority for r in self.scheduler.next_requests(10)]
+        self.assertEqual(self.scheduler.next_requests(10), [])
+        self.assertEqual(
+            priorities, sorted([x[1] for x in _PRIORITIES], key=lambda x: -x)
+        )
+        stats = self.mock_crawler.stats
+        self.assertEqual(stats.get_value("scheduler/enqueued"), len(requests))
+        self.assertEqual(stats.get_value("scheduler/dequeued"), len(requests))
+
+    def test_batches_custom_hooks(self):
+        pushed = []
+
+        class CustomScheduler(Scheduler):
+            def _mqpush(self, request):
+                pushed.append(request)
+                super()._mqpush(request)
+
+        scheduler = CustomScheduler.from_crawler(self.mock_crawler)
+        scheduler.open(self.spider)
+        requests = [Request(url) for url in sorted(_URLS)]
+        self.assertEqual(scheduler.enqueue_requests(requests), [True] * 3)
+        self.assertEqual(pushed, requests)
+        self.assertEqual(len(scheduler.next_requests(10)), 3)
+        scheduler.close("finished")
+
+    def test_memory_usage(self):
+        self.assertEqual(self.scheduler.memory_usage(), 0)
+        requests = [Request(url) for url in sorted(_URLS)]
+        self.scheduler.enqueue_request(requests[0])
+        self.scheduler.enqueue_requests(requests[1:])
+        # Priority queues may keep some requests out of memory.
+        usage = self.scheduler.memory_usage()
+        self.assertGreater(usage, 0)
+        self.assertLessEqual(usage, sum(map(estimate_request_size, requests)))
+        while self.scheduler.next_request():
+            pass
+        self.assertEqual(self.scheduler.memory_usage(), 0)
+
 
 class BaseSchedulerOnDiskTester(SchedulerHandler):
     def setUp(self):
@@ -179,6 +230,20 @@ class BaseSchedulerOnDiskTester(SchedulerHandler):
             priorities, sorted([x[1] for x in _PRIORITIES], key=lambda x: -x)
         )
 
+    def test_batches(self):
+        requests = [Request(url, priority=priority) for url, priority in _PRIORITIES]
+        self.assertEqual(self.scheduler.enqueue_requests(requests), [True] * 5)
+
+        self.close_scheduler()
+        self.create_scheduler()
+
+        priorities = [r.priority for r in self.scheduler.next_requests(10)]
+        self.assertEqual(
+            priorities, sorted([x[1] for x in _PRIORITIES], key=lambda x: -x)
+        )
+        stats = self.mock_crawler.stats
+        self.assertEqual(stats.get_value("scheduler/dequeued/disk"), len(requests))
+
 
 class TestSchedulerInMemory(BaseSchedulerInMemoryTester, unittest.TestCase):
     priority_queue_cls = "scrapy.pqueues.ScrapyPriorityQueue"
@@ -188,6 +253,24 @@ class TestSchedulerOnDisk(BaseSchedulerOnDiskTester, unittest.TestCase):
     priority_queue_cls = "scrapy.pqueues.ScrapyPriorityQueue"
 
 
+_SPILLOVER_SETTINGS = {
+    "SCHEDULER_SPILLOVER_MAX_REQUESTS": 2,
+    "SCHEDULER_SPILLOVER_BATCH_SIZE": 2,
+}
+
+
+class TestSchedulerWithSpilloverInMemory(
+    BaseSchedulerInMemoryTester, unittest.TestCase
+):
+    priority_queue_cls = "scrapy.pqueues.SpilloverPriorityQueue"
+    settings = _SPILLOVER_SETTINGS
+
+
+class TestSchedulerWithSpilloverOnDisk(BaseSchedulerOnDiskTester, unittest.TestCase):
+    priority_queue_cls = "scrapy.pqueues.SpilloverPriorityQueue"
+    settings = _SPILLOVER_SETTINGS
+
+
 _URLS_WITH_SLOTS = [
     ("http://foo.com/a", "a"),
     ("http://foo.com/b", "a"),
@@ -301,6 +384,19 @@ class TestSchedulerWithDownloaderAwareOnDisk(
     reopen = True
 
 
+class TestSchedulerWithSlotFairInMemory(
+    DownloaderAwareSchedulerTestMixin, BaseSchedulerInMemoryTester, unittest.TestCase
+):
+    priority_queue_cls = "scrapy.pqueues.SlotFairPriorityQueue"
+
+
+class TestSchedulerWithSlotFairOnDisk(
+    DownloaderAwareSchedulerTestMixin, BaseSchedulerOnDiskTester, unittest.TestCase
+):
+    priority_queue_cls = "scrapy.pqueues.SlotFairPriorityQueue"
+    reopen = True
+
+
 class StartUrlsSpider(Spider):
     def __init__(self, start_urls):
         self.start_urls = start_urls
@@ -83,6 +83,25 @@ class BaseSchedulerTest(TestCase, InterfaceCheckMixin):
         self.assertRaises(NotImplementedError, self.scheduler.next_request)
 
 
+class BatchScheduler(MinimalScheduler, BaseScheduler):
+    pass
+
+
+class BaseSchedulerBatchTest(TestCase):
+    def test_batches(self):
+        scheduler = BatchScheduler()
+        requests = [Request(url) for url in URLS]
+        self.assertEqual(
+            scheduler.enqueue_requests(requests + requests[:1]),
+            [True] * len(URLS) + [False],
+        )
+        dequeued = scheduler.next_requests(2)
+        self.assertEqual(len(dequeued), 2)
+        dequeued += scheduler.next_requests(5)
+        self.assertEqual({r.url for r in dequeued}, set(URLS))
+        self.assertEqual(scheduler.next_requests(5), [])
+
+
 class MinimalSchedulerTest(TestCase, InterfaceCheckMixin):
     def setUp(self):
         self.scheduler = MinimalScheduler()
@@ -163,3 +182,7 @@ class MinimalSchedulerCrawlTest(TwistedTestCase):
 
 class SimpleSchedulerCrawlTest(MinimalSchedulerCrawlTest):
     scheduler_cls = SimpleScheduler
+
+
+class BatchSchedulerCrawlTest(MinimalSchedulerCrawlTest):
+    scheduler_cls = BatchScheduler
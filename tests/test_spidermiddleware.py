@@ -13,6 +13,7 @@ from scrapy.http import Request, Response
 from scrapy.spiders import Spider
 from scrapy.utils.asyncgen import collect_asyncgen
 from scrapy.utils.defer import deferred_from_coro, maybe_deferred_to_future
+from scrapy.utils.python import MutableChain
 from scrapy.utils.test import get_crawler
 
 
@@ -544,3 +545,38 @@ class ProcessSpiderExceptionTest(BaseAsyncSpiderMiddlewareTestCase):
     def test_exc_async_simple(self):
         """Async exc mw -> simple output mw; cannot work as downgrading is not supported"""
         return self._test_asyncgen_nodowngrade(self.MW_SIMPLE, self.MW_EXC_ASYNCGEN)
+
+
+class CompiledOutputChainTest(SpiderMiddlewareTestCase):
+    def test_sync_output_available_immediately(self):
+        self.mwman._add_middleware(ProcessSpiderOutputSimpleMiddleware())
+        self.mwman._add_middleware(ProcessSpiderOutputSimpleMiddleware())
+        dfd = self.mwman._process_spider_output(
+            self.response, self.spider, [{"foo": "bar"}]
+        )
+        self.assertTrue(dfd.called)
+        self.assertEqual(list(dfd.result), [{"foo": "bar"}])
+
+    def test_unwrapped_without_exception_handlers(self):
+        class ExceptionMiddleware:
+            def process_spider_exception(self, response, exception, spider):
+                return [{"recovered": True}]
+
+        self.mwman._add_middleware(ProcessSpiderOutputSimpleMiddleware())
+        self.mwman._add_middleware(ExceptionMiddleware())
+        self.mwman._add_middleware(ProcessSpiderOutputSimpleMiddleware())
+        self.assertTrue(self.mwman._has_exception_handlers(0))
+        self.assertTrue(self.mwman._has_exception_handlers(1))
+        self.assertFalse(self.mwman._has_exception_handlers(2))
+        result = [{"foo": "bar"}]
+        evaluated = self.mwman._evaluate_iterable(
+            self.response, self.spider, result, 2, MutableChain()
+        )
+        self.assertIs(evaluated, result)
+
+        def failing():
+            yield {"foo": "bar"}
+            1 / 0
+
+        dfd = self.mwman._process_spider_output(self.response, self.spider, failing())
+        self.assertEqual(list(dfd.result), [{"foo": "bar"}, {"recovered": True}])
@@ -6,6 +6,7 @@ from scrapy.http import Request, Response
 from scrapy.spidermiddlewares.offsite import OffsiteMiddleware, PortWarning, URLWarning
 from scrapy.spiders import Spider
 from scrapy.utils.test import get_crawler
+from scrapy.utils.url import DomainSet
 
 
 class TestOffsiteMiddleware(TestCase):
@@ -47,6 +48,11 @@ class TestOffsiteMiddleware(TestCase):
         out = list(self.mw.process_spider_output(res, reqs, self.spider))
         self.assertEqual(out, onsite_reqs)
 
+    def test_host_regex_attribute(self):
+        self.assertEqual(
+            self.mw.host_regex.pattern, self.mw.get_host_regex(self.spider).pattern
+        )
+
 
 class TestOffsiteMiddleware2(TestOffsiteMiddleware):
     def _get_spiderargs(self):
@@ -103,3 +109,57 @@ class TestOffsiteMiddleware6(TestOffsiteMiddleware4):
             warnings.simplefilter("always")
             self.mw.get_host_regex(self.spider)
             assert issubclass(w[-1].category, PortWarning)
+
+
+class TestOffsiteMiddlewareDomainSet(TestOffsiteMiddleware):
+    def _get_spiderargs(self):
+        return {
+            "name": "foo",
+            "allowed_domains": DomainSet(
+                ["scrapytest.org", "scrapy.org", "scrapy.test.org"]
+            ),
+        }
+
+    def test_update(self):
+        request = Request("http://example.com/1")
+        self.assertFalse(self.mw.should_follow(request, self.spider))
+        self.spider.allowed_domains.add("example.com")
+        self.assertTrue(self.mw.should_follow(request, self.spider))
+        self.spider.allowed_domains.discard("example.com")
+        self.assertFalse(self.mw.should_follow(request, self.spider))
+
+    def test_empty(self):
+        request = Request("http://scrapy.org/1")
+        self.assertTrue(self.mw.should_follow(request, self.spider))
+        for domain in list(self.spider.allowed_domains):
+            self.spider.allowed_domains.discard(domain)
+        self.assertFalse(self.mw.should_follow(request, self.spider))
+
+    def test_invalid_domains(self):
+        self.spider.allowed_domains.add("http://example.com")
+        self.spider.allowed_domains.add("scrapytest.org:8000")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            domains = self.mw.get_domain_set(self.spider)
+        self.assertCountEqual(
+            [warning.category for warning in w], [URLWarning, PortWarning]
+        )
+        self.assertEqual(
+            sorted(domains), ["scrapy.org", "scrapy.test.org", "scrapytest.org"]
+        )
+
+
+class TestOffsiteMiddlewareHostRegex(TestOffsiteMiddleware):
+    def setUp(self):
+        class HostRegexMiddleware(OffsiteMiddleware):
+            def get_host_regex(self, spider):
+                return super().get_host_regex(spider)
+
+        crawler = get_crawler(Spider)
+        self.spider = crawler._create_spider(**self._get_spiderargs())
+        self.mw = HostRegexMiddleware.from_crawler(crawler)
+        self.mw.spider_opened(self.spider)
+
+    def test_host_regex(self):
+        self.assertIsNone(self.mw.domain_set)
+        self.assertTrue(self.mw.host_regex.search("scrapy.org"))
@@ -2,9 +2,15 @@ import unittest
 from datetime import datetime
 from unittest import mock
 
+from scrapy.downloadermiddlewares.stats import DownloaderStats
 from scrapy.extensions.corestats import CoreStats
+from scrapy.http import Request
 from scrapy.spiders import Spider
-from scrapy.statscollectors import DummyStatsCollector, StatsCollector
+from scrapy.statscollectors import (
+    CounterStatsCollector,
+    DummyStatsCollector,
+    StatsCollector,
+)
 from scrapy.utils.test import get_crawler
 
 
@@ -94,3 +100,92 @@ class StatsCollectorTest(unittest.TestCase):
         stats.set_value("test", "value", spider=self.spider)
         self.assertEqual(stats.get_stats(), {})
         self.assertEqual(stats.get_stats("a"), {})
+
+
+class CounterStatsCollectorTest(unittest.TestCase):
+    def setUp(self):
+        self.crawler = get_crawler(Spider)
+        self.spider = self.crawler._create_spider("foo")
+
+    def test_counter(self):
+        stats = CounterStatsCollector(self.crawler)
+        stats.set_value("existing", 5)
+        counter = stats.get_counter("counter")
+        existing = stats.get_counter("existing")
+        self.assertEqual(stats.get_stats(), {"existing": 5})
+        self.assertEqual(stats.get_value("counter"), None)
+        counter.inc()
+        counter.inc(3)
+        existing.inc()
+        self.assertEqual(stats.get_value("counter"), 4)
+        self.assertEqual(stats.get_stats(), {"existing": 6, "counter": 4})
+        stats.inc_value("counter", 2)
+        self.assertEqual(stats.get_value("counter"), 6)
+        stats.max_value("counter", 10)
+        stats.min_value("existing", 1)
+        self.assertEqual(stats.get_stats(), {"existing": 1, "counter": 10})
+        stats.clear_stats()
+        self.assertEqual(stats.get_stats(), {})
+        counter.inc()
+        self.assertEqual(stats.get_stats(), {"counter": 1})
+        stats.set_stats({"existing": 3})
+        existing.inc()
+        self.assertEqual(stats.get_stats(), {"existing": 4})
+
+    def test_counter_start(self):
+        stats = CounterStatsCollector(self.crawler)
+        counter = stats.get_counter("counter", start=10)
+        self.assertIs(stats.get_counter("counter")._index, counter._index)
+        counter.inc()
+        self.assertEqual(stats.get_value("counter"), 11)
+
+    def test_close_spider(self):
+        stats = CounterStatsCollector(self.crawler)
+        stats.get_counter("counter").inc()
+        stats.close_spider(self.spider, "finished")
+        self.assertEqual(stats.spider_stats, {"foo": {"counter": 1}})
+
+    def test_base_collector_counter(self):
+        stats = StatsCollector(self.crawler)
+        stats.get_counter("counter", start=1).inc(2)
+        self.assertEqual(stats.get_stats(), {"counter": 3})
+        stats = DummyStatsCollector(self.crawler)
+        stats.get_counter("counter").inc()
+        self.assertEqual(stats.get_stats(), {})
+
+    def test_counter_spider(self):
+        calls = []
+
+        class SpiderStatsCollector(StatsCollector):
+            def inc_value(self, key, count=1, start=0, spider=None):
+                calls.append((key, spider))
+
+        self.crawler.stats = SpiderStatsCollector(self.crawler)
+        CoreStats.from_crawler(self.crawler).item_scraped({}, self.spider)
+        DownloaderStats(self.crawler.stats).process_request(
+            Request("https://example.com"), self.spider
+        )
+        self.assertEqual(
+            calls,
+            [
+                ("item_scraped_count", self.spider),
+                ("downloader/request_count", self.spider),
+                ("downloader/request_method_count/GET", self.spider),
+                ("downloader/request_bytes", self.spider),
+            ],
+        )
+
+    def test_core_stats(self):
+        self.crawler.stats = CounterStatsCollector(self.crawler)
+        ext = CoreStats.from_crawler(self.crawler)
+        ext.item_scraped({}, self.spider)
+        ext.item_scraped({}, self.spider)
+        ext.item_dropped({}, self.spider, ZeroDivisionError())
+        self.assertEqual(
+            self.crawler.stats.get_stats(),
+            {
+                "item_scraped_count": 2,
+                "item_dropped_count": 1,
+                "item_dropped_reasons_count/ZeroDivisionError": 1,
+            },
+        )
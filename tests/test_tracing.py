@@ -0,0 +1,196 @@
+import json
+from pathlib import Path
+from tempfile import mkdtemp
+from typing import Any, Dict
+from unittest import TestCase
+
+from twisted.internet import defer
+from twisted.python.failure import Failure
+from twisted.trial import unittest
+
+from scrapy import Request, Spider
+from scrapy.core.tracing import (
+    PHASES,
+    TRACE_META_KEY,
+    RequestTracer,
+    _Reservoir,
+    add_delay,
+    get_phase_durations,
+    mark,
+    percentile,
+)
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+from tests.mockserver import MockServer
+from tests.spiders import FollowAllSpider
+
+
+def _get_tracer(settings=None):
+    crawler = get_crawler(Spider, {"REQUEST_TRACING_ENABLED": True, **(settings or {})})
+    crawler.spider = crawler._create_spider("foo")
+    return RequestTracer.from_crawler(crawler)
+
+
+def _get_trace():
+    return {mark: float(i) for i, (_, mark, _) in enumerate(PHASES)}
+
+
+class TracingFunctionsTest(TestCase):
+    def test_mark(self):
+        request = Request("https://example.com")
+        mark(request, "sent")
+        add_delay(request, 1)
+        self.assertNotIn(TRACE_META_KEY, request.meta)
+        request.meta[TRACE_META_KEY] = {}
+        mark(request, "sent")
+        add_delay(request, 1)
+        add_delay(request, 0.5)
+        self.assertEqual(set(request.meta[TRACE_META_KEY]), {"sent", "delay"})
+        self.assertEqual(request.meta[TRACE_META_KEY]["delay"], 1.5)
+
+    def test_get_phase_durations(self):
+        trace = {**_get_trace(), "scraped": float(len(PHASES)), "delay": 0.5}
+        durations = get_phase_durations(trace)
+        self.assertEqual(
+            durations,
+            {
+                **{name: 1.0 for name, _, _ in PHASES},
+                "delay": 0.5,
+                "total": float(len(PHASES)),
+            },
+        )
+
+    def test_get_phase_durations_missing(self):
+        # A failed download has no response marks.
+        trace = {"scheduled": 0.0, "dequeued": 1.0, "scrape_started": 3.0}
+        self.assertEqual(get_phase_durations(trace), {"scheduler": 1.0})
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3], 90), 3)
+        self.assertEqual(percentile([1, 2], 50), 1)
+
+    def test_reservoir(self):
+        reservoir = _Reservoir(10)
+        for i in range(100):
+            reservoir.add(i)
+        self.assertEqual(reservoir.count, 100)
+        self.assertEqual(len(reservoir.values), 10)
+
+
+class RequestTracerTest(TestCase):
+    def test_disabled(self):
+        self.assertIsNone(RequestTracer.from_crawler(get_crawler(Spider)))
+
+    def test_request_scheduled(self):
+        tracer = _get_tracer()
+        request = Request("https://example.com")
+        tracer.request_scheduled(request, None)
+        trace = request.meta[TRACE_META_KEY]
+        # Retries and redirects get a new trace.
+        retry = request.replace()
+        tracer.request_scheduled(retry, None)
+        self.assertIsNot(retry.meta[TRACE_META_KEY], trace)
+        self.assertEqual(set(retry.meta[TRACE_META_KEY]), {"scheduled"})
+
+    def test_finish(self):
+        tracer = _get_tracer()
+        for slot in ("a", "a", "b"):
+            request = Request(
+                "https://example.com",
+                meta={TRACE_META_KEY: _get_trace(), "download_slot": slot},
+            )
+            tracer.finish(request)
+            # Only the first call counts.
+            tracer.finish(request)
+        stats = tracer.get_stats()
+        self.assertEqual(stats["tracing/a/scheduler/count"], 2)
+        self.assertEqual(stats["tracing/a/scheduler/p50"], 1.0)
+        self.assertEqual(stats["tracing/b/body/count"], 1)
+        self.assertIn("tracing/b/total/p99", stats)
+        self.assertNotIn("tracing/a/delay/count", stats)
+
+    def test_get_spans(self):
+        tracer = _get_tracer()
+        trace = {"scheduled": 1.0, "dequeued": 2.0, "delay": 0.25, "scraped": 3.0}
+        request = Request("https://example.com", meta={"download_slot": "a"})
+        failure = Failure(ValueError())
+        data = tracer.get_spans(request, trace, failure)
+        resource_spans = data["resourceSpans"][0]
+        spans = resource_spans["scopeSpans"][0]["spans"]
+        root, scheduler = spans
+        self.assertEqual(root["name"], "request")
+        self.assertEqual(root["startTimeUnixNano"], "1000000000")
+        self.assertEqual(root["endTimeUnixNano"], "3000000000")
+        self.assertEqual(root["status"], {"code": 2, "message": "builtins.ValueError"})
+        self.assertEqual(len(root["traceId"]), 32)
+        self.assertEqual(len(root["spanId"]), 16)
+        attributes = {
+            attribute["key"]: attribute["value"] for attribute in root["attributes"]
+        }
+        self.assertEqual(attributes["scrapy.download_slot"], {"stringValue": "a"})
+        self.assertEqual(attributes["scrapy.delay"], {"doubleValue": 0.25})
+        self.assertEqual(scheduler["name"], "scheduler")
+        self.assertEqual(scheduler["traceId"], root["traceId"])
+        self.assertEqual(scheduler["parentSpanId"], root["spanId"])
+        self.assertEqual(scheduler["endTimeUnixNano"], "2000000000")
+
+        response = Response("https://example.com", status=404)
+        root = tracer.get_spans(request, trace, response)["resourceSpans"][0][
+            "scopeSpans"
+        ][0]["spans"][0]
+        self.assertIn(
+            {"key": "http.response.status_code", "value": {"intValue": "404"}},
+            root["attributes"],
+        )
+        self.assertEqual(root["status"], {})
+
+
+class RequestTracerCrawlTest(unittest.TestCase):
+    settings: Dict[str, Any] = {}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mockserver = MockServer()
+        cls.mockserver.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.mockserver.__exit__(None, None, None)
+
+    @defer.inlineCallbacks
+    def test_crawl(self):
+        output = Path(mkdtemp()) / "traces.jsonl"
+        settings = {
+            "REQUEST_TRACING_ENABLED": True,
+            "REQUEST_TRACING_OUTPUT": str(output),
+            "DOWNLOAD_DELAY": 0.05,
+            "RANDOMIZE_DOWNLOAD_DELAY": False,
+            **self.settings,
+        }
+        crawler = get_crawler(FollowAllSpider, settings)
+        yield crawler.crawl(total=4, mockserver=self.mockserver)
+        stats = crawler.stats.get_stats()
+        count = len(crawler.spider.urls_visited)
+        self.assertGreater(count, 1)
+        for phase in [name for name, _, _ in PHASES] + ["delay", "total"]:
+            self.assertIn(f"tracing/127.0.0.1/{phase}/p90", stats)
+        self.assertEqual(stats["tracing/127.0.0.1/total/count"], count)
+
+        lines = output.read_text().splitlines()
+        self.assertEqual(len(lines), count)
+        spans = json.loads(lines[-1])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertEqual(
+            [span["name"] for span in spans],
+            ["request"] + [name for name, _, _ in PHASES],
+        )
+        for span in spans:
+            self.assertLessEqual(
+                int(span["startTimeUnixNano"]), int(span["endTimeUnixNano"])
+            )
+
+
+class RequestTracerCoroutinesCrawlTest(RequestTracerCrawlTest):
+    settings = {"ENGINE_COROUTINES": True}
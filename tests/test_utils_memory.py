@@ -0,0 +1,73 @@
+import sys
+import unittest
+from pathlib import Path
+
+from scrapy import Request
+from scrapy.core.engine import ExecutionEngine
+from scrapy.utils.memory import (
+    estimate_collection_size,
+    estimate_request_size,
+    format_memory_usage,
+    get_memory_usage,
+    get_rss,
+)
+from scrapy.utils.test import get_crawler
+from tests.spiders import SimpleSpider
+
+
+class GetRSSTest(unittest.TestCase):
+    def test_get_rss(self):
+        rss = get_rss()
+        if not Path("/proc/self/statm").exists():
+            self.assertIsNone(rss)
+        else:
+            self.assertGreater(rss, 0)
+
+
+class EstimateTest(unittest.TestCase):
+    def test_request(self):
+        request = Request("https://example.com", method="POST", body=b"a" * 100)
+        self.assertEqual(estimate_request_size(request), 619)
+
+    def test_collection(self):
+        self.assertEqual(estimate_collection_size(set()), sys.getsizeof(set()))
+        fingerprints = {f"{i:040x}" for i in range(10)}
+        self.assertEqual(
+            estimate_collection_size(fingerprints),
+            sys.getsizeof(fingerprints) + 10 * sys.getsizeof("0" * 40),
+        )
+        results = {"a": {"url": "b"}}
+        self.assertEqual(
+            estimate_collection_size(results),
+            sys.getsizeof(results)
+            + sys.getsizeof("a")
+            + sys.getsizeof({"url": "b"})
+            + sys.getsizeof("b"),
+        )
+
+
+class MemoryUsagePipeline:
+    def process_item(self, item, spider):
+        return item
+
+    def memory_usage(self):
+        return 1000
+
+
+class GetMemoryUsageTest(unittest.TestCase):
+    def test_engine(self):
+        crawler = get_crawler(
+            SimpleSpider,
+            {"ITEM_PIPELINES": {MemoryUsagePipeline: 0}},
+        )
+        crawler._apply_settings()
+        engine = ExecutionEngine(crawler, lambda _: None)
+        crawler.engine = engine
+        request = Request("https://example.com")
+        engine.downloader.active.add(request)
+        usage = get_memory_usage(engine)
+        self.assertEqual(usage["downloader"], estimate_request_size(request))
+        self.assertEqual(usage["pipelines/MemoryUsagePipeline"], 1000)
+        self.assertNotIn("scheduler", usage)
+        self.assertIn("pipelines/MemoryUsagePipeline", format_memory_usage(engine))
+        engine.downloader.close()
@@ -148,6 +148,11 @@ class BinaryIsTextTest(unittest.TestCase):
     def test_real_binary_bytes(self):
         assert not binary_is_text(b"\x02\xa3")
 
+    def test_control_characters(self):
+        assert binary_is_text(b"a\tb\r\nc\0")
+        for i in (1, 8, 11, 12, 27, 31):
+            assert not binary_is_text(b"text" + bytes([i]) + b"text")
+
 
 class UtilsPythonTestCase(unittest.TestCase):
     def test_equal_attributes(self):
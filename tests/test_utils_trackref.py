@@ -87,3 +87,11 @@ Foo                                 1   oldest: 0s ago\n\n""",
             set(trackref.iter_all("Foo")),
             {o1, o3},
         )
+
+    def test_disabled(self):
+        o1 = Foo()  # NOQA
+        trackref.set_enabled(False)
+        self.addCleanup(trackref.set_enabled, True)
+        self.assertFalse(trackref.is_enabled())
+        o2 = Foo()  # NOQA
+        self.assertEqual(list(trackref.iter_all("Foo")), [o1])
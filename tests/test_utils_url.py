@@ -4,6 +4,7 @@ from scrapy.linkextractors import IGNORED_EXTENSIONS
 from scrapy.spiders import Spider
 from scrapy.utils.misc import arg_to_iter
 from scrapy.utils.url import (
+    DomainSet,
     _is_filesystem_path,
     add_http_if_no_scheme,
     guess_scheme,
@@ -43,6 +44,16 @@ class UrlUtilsTest(unittest.TestCase):
             url_is_from_any_domain(url + ".testdomain.com", ["testdomain.com"])
         )
 
+    def test_url_is_from_any_domain_set(self):
+        domains = DomainSet(["wheele-bin-art.CO.UK", "192.169.0.15:8080"])
+        url = "http://www.Wheele-Bin-Art.co.uk/get/product/123"
+        self.assertTrue(url_is_from_any_domain(url, domains))
+        self.assertFalse(url_is_from_any_domain(url, DomainSet(["art.co.uk"])))
+        url = "http://192.169.0.15:8080/mypage.html"
+        self.assertTrue(url_is_from_any_domain(url, domains))
+        self.assertFalse(url_is_from_any_domain(url, DomainSet(["192.169.0.15"])))
+        self.assertFalse(url_is_from_any_domain("javascript:void(0)", domains))
+
     def test_url_is_from_spider(self):
         spider = Spider(name="example.com")
         self.assertTrue(
@@ -160,6 +171,65 @@ class UrlUtilsTest(unittest.TestCase):
         )
 
 
+class DomainSetTest(unittest.TestCase):
+    def test_match(self):
+        domains = DomainSet(["example.com", "Sub.Example.ORG", "co.uk"])
+        for host in (
+            "example.com",
+            "www.example.com",
+            "a.b.example.com",
+            "sub.example.org",
+            "x.sub.example.org",
+            "EXAMPLE.COM",
+            "shop.co.uk",
+        ):
+            self.assertTrue(domains.match(host), host)
+        for host in (
+            "",
+            "com",
+            "badexample.com",
+            "example.com.evil.net",
+            "example.org",
+            "notsub.example.org",
+            "uk",
+        ):
+            self.assertFalse(domains.match(host), host)
+
+    def test_set(self):
+        domains = DomainSet(["example.com", "a.example.com", "Example.com"])
+        self.assertEqual(len(domains), 2)
+        self.assertEqual(domains, {"example.com", "a.example.com"})
+        self.assertIn("EXAMPLE.com", domains)
+        self.assertNotIn("b.example.com", domains)
+        self.assertNotIn("com", domains)
+        self.assertNotIn(None, domains)
+        self.assertTrue(domains)
+        self.assertFalse(DomainSet())
+
+    def test_update(self):
+        domains = DomainSet(["example.com", "a.example.com"])
+        domains.discard("example.com")
+        self.assertFalse(domains.match("b.example.com"))
+        self.assertTrue(domains.match("x.a.example.com"))
+        domains.discard("example.com")
+        domains.discard("b.example.com")
+        domains.remove("a.example.com")
+        self.assertEqual(len(domains), 0)
+        self.assertEqual(domains._root, {})
+        with self.assertRaises(KeyError):
+            domains.remove("a.example.com")
+        domains.add("example.org")
+        domains |= {"example.net"}
+        self.assertEqual(domains, {"example.org", "example.net"})
+        self.assertTrue(domains.match("www.example.net"))
+
+    def test_large(self):
+        domains = DomainSet(f"domain{i}.example{i % 100}.com" for i in range(50000))
+        self.assertEqual(len(domains), 50000)
+        self.assertTrue(domains.match("www.domain49999.example99.com"))
+        self.assertFalse(domains.match("www.domain49999.example98.com"))
+
+
 class AddHttpIfNoScheme(unittest.TestCase):
     def test_add_scheme(self):
         self.assertEqual(
@@ -0,0 +1,214 @@
+import json
+import subprocess
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from scrapy.core.workers import (
+    WorkerChannel,
+    _merge_feed_parts,
+    get_worker_index,
+    merge_stats,
+)
+from scrapy.utils.test import get_testenv
+from tests.mockserver import MockServer
+
+
+class GetWorkerIndexTest(TestCase):
+    def test_range(self):
+        for workers in range(1, 10):
+            for i in range(100):
+                index = get_worker_index(f"host{i}.example", workers)
+                self.assertGreaterEqual(index, 0)
+                self.assertLess(index, workers)
+
+    def test_balance(self):
+        counts = Counter(get_worker_index(f"host{i}.example", 4) for i in range(4000))
+        self.assertEqual(len(counts), 4)
+        for count in counts.values():
+            self.assertGreater(count, 800)
+
+    def test_consistency(self):
+        keys = [f"host{i}.example" for i in range(1000)]
+        moved = sum(get_worker_index(k, 4) != get_worker_index(k, 5) for k in keys)
+        self.assertLess(moved, 300)
+        for key in keys:
+            index = get_worker_index(key, 5)
+            if index != 4:
+                self.assertEqual(index, get_worker_index(key, 4))
+
+
+class WorkerChannelTest(TestCase):
+    def test_idle(self):
+        channel = WorkerChannel(2)
+        channel.index = 0
+        self.assertFalse(channel.set_idle())
+        channel.index = 1
+        channel.send(0, {"url": "http://example.com"})
+        self.assertFalse(channel.set_idle())
+        channel.index = 0
+        messages = []
+        while not messages:
+            messages = channel.receive()
+        self.assertEqual(messages, [{"url": "http://example.com"}])
+        self.assertTrue(channel.set_idle())
+
+    def test_retire(self):
+        channel = WorkerChannel(2)
+        channel.index = 0
+        channel.send(1, {"url": "http://example.com"})
+        self.assertFalse(channel.set_idle())
+        while not channel.inboxes[1].qsize():
+            pass
+        channel.retire(1)
+        self.assertTrue(channel.set_idle())
+        # Requests for retired workers are not forwarded.
+        self.assertFalse(channel.send(1, {"url": "http://example.com"}))
+        self.assertTrue(channel.set_idle())
+
+
+class MergeStatsTest(TestCase):
+    def test_merge(self):
+        start1, start2 = datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11)
+        stats = merge_stats(
+            [
+                {
+                    "start_time": start2,
+                    "finish_time": start2,
+                    "item_scraped_count": 2,
+                    "elapsed_time_seconds": 3.0,
+                    "memusage/max": 100,
+                    "finish_reason": "finished",
+                },
+                {
+                    "start_time": start1,
+                    "finish_time": start1,
+                    "item_scraped_count": 3,
+                    "elapsed_time_seconds": 5.0,
+                    "memusage/max": 50,
+                    "finish_reason": "shutdown",
+                    "log_count/ERROR": 1,
+                },
+            ]
+        )
+        self.assertEqual(
+            stats,
+            {
+                "start_time": start1,
+                "finish_time": start2,
+                "item_scraped_count": 5,
+                "elapsed_time_seconds": 5.0,
+                "memusage/max": 100,
+                "finish_reason": "finished",
+                "log_count/ERROR": 1,
+            },
+        )
+
+    def test_merge_key_names(self):
+        stats = merge_stats(
+            [
+                {"request_depth_max": 3, "admin/pages": 1, "x/min": 2},
+                {"request_depth_max": 2, "admin/pages": 2, "x/min": 1},
+            ]
+        )
+        self.assertEqual(stats, {"request_depth_max": 3, "admin/pages": 3, "x/min": 1})
+
+
+class MergeFeedPartsTest(TestCase):
+    def setUp(self):
+        self.tmpdir = Path(mkdtemp())
+
+    def _parts(self, *contents):
+        parts = []
+        for i, content in enumerate(contents):
+            part = self.tmpdir / f"part{i}"
+            part.write_bytes(content)
+            parts.append(part)
+        return parts
+
+    def test_jsonlines(self):
+        target = self.tmpdir / "items.jl"
+        parts = self._parts(b'{"a": 1}\n', b'{"a": 2}\n')
+        _merge_feed_parts(target, parts, {"format": "jsonlines", "overwrite": True})
+        self.assertEqual(target.read_bytes(), b'{"a": 1}\n{"a": 2}\n')
+        self.assertFalse(any(part.exists() for part in parts))
+
+    def test_csv(self):
+        target = self.tmpdir / "items.csv"
+        parts = self._parts(b"a\r\n1\r\n", b"", b"a\r\n2\r\n")
+        _merge_feed_parts(target, parts, {"format": "csv", "overwrite": True})
+        self.assertEqual(target.read_bytes(), b"a\r\n1\r\n2\r\n")
+
+    def test_json(self):
+        target = self.tmpdir / "items.json"
+        parts = self._parts(b'[\n{"a": 1}\n]', b"[]", b'[\n{"a": 2},\n{"a": 3}\n]')
+        _merge_feed_parts(target, parts, {"format": "json", "overwrite": True})
+        self.assertEqual(
+            json.loads(target.read_bytes()), [{"a": 1}, {"a": 2}, {"a": 3}]
+        )
+
+    def test_unsupported(self):
+        target = self.tmpdir / "items.xml"
+        parts = self._parts(b"<items></items>", b"<items></items>")
+        _merge_feed_parts(target, parts, {"format": "xml", "overwrite": True})
+        self.assertFalse(target.exists())
+        self.assertTrue(all(part.exists() for part in parts))
+
+
+WORKERS_SPIDER = """
+import scrapy
+
+class MySpider(scrapy.Spider):
+    name = "myspider"
+    hosts = ("127.0.0.1", "localhost")
+
+    def start_requests(self):
+        for host in self.hosts:
+            yield scrapy.Request(self.port_url.format(host=host, n=200))
+
+    def parse(self, response):
+        yield {"url": response.url}
+        if "n=200" in response.url:
+            for host in self.hosts:
+                yield scrapy.Request(self.port_url.format(host=host, n=202))
+"""
+
+
+class WorkerPoolTest(TestCase):
+    def test_crawl(self):
+        tmpdir = Path(mkdtemp())
+        spider_file = tmpdir / "myspider.py"
+        output = tmpdir / "items.jl"
+        with MockServer() as mockserver:
+            port_url = mockserver.url("/status?n={n}").replace("127.0.0.1", "{host}")
+            spider_file.write_text(WORKERS_SPIDER, encoding="utf-8")
+            p = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "scrapy.cmdline",
+                    "runspider",
+                    str(spider_file),
+                    "--workers",
+                    "2",
+                    "-a",
+                    f"port_url={port_url}",
+                    "-O",
+                    f"{output}:jsonlines",
+                ],
+                cwd=tmpdir,
+                env=get_testenv(),
+                capture_output=True,
+                timeout=60,
+            )
+        log = p.stderr.decode()
+        self.assertEqual(p.returncode, 0, log)
+        urls = [json.loads(line)["url"] for line in output.read_text().splitlines()]
+        self.assertEqual(len(urls), 4, log)
+        self.assertEqual(len(set(urls)), 4, log)
+        self.assertIn("Dumping merged Scrapy stats of 2 workers", log)
+        self.assertIn("'workers/forwarded': 2", log)
+        self.assertFalse((tmpdir / "items.jl.0").exists())